@@ -12,6 +12,7 @@ Note that Asteroid code has two other representations of complex numbers:
 """
 import functools
 import torch
+import torch.nn.functional as F
 from asteroid_filterbanks import transforms
 from torch import nn
 
@@ -73,30 +74,126 @@ class OnReIm(nn.Module):
         return torch_complex_from_reim(self.re_module(x.real), self.im_module(x.imag))
 
 
+# Modules computing `W x + b`, for which the "gauss" and "native" fusion modes apply.
+_LINEAR_MODULES = (nn.Linear, nn.modules.conv._ConvNd)
+FUSE_MODES = (None, "batch", "gauss", "native")
+
+
 class ComplexMultiplicationWrapper(nn.Module):
     """Make a complex-valued module `F` from a real-valued module `f` by applying
     complex multiplication rules:
 
-    F(a + i b) = f1(a) - f1(b) + i (f2(b) + f2(a))
+    F(a + i b) = f1(a) - f2(b) + i (f1(b) + f2(a))
 
     where `f1`, `f2` are instances of `f` that do *not* share weights.
 
+    The four terms can be computed in fewer module calls (``fuse_mode``):
+
+    - ``None``: four calls, as in the formula above.
+    - ``"batch"`` (default): `a` and `b` are stacked along the batch axis (dim 0) so
+      that `f1` and `f2` are called once each, on a twice larger batch. This requires
+      `f` to process batch items independently, which is the case of convolutions,
+      linear layers and batch-first RNNs.
+    - ``"gauss"``: for linear layers and convolutions only, use Gauss' trick to compute
+      the complex product with three real products instead of four. Might be less
+      accurate when `a` and `b` are of opposite signs and similar magnitudes.
+    - ``"native"``: for linear layers and convolutions only, run a single PyTorch
+      complex convolution/matrix product with weight `W1 + i W2`.
+
+    ``"gauss"`` and ``"native"`` fall back to ``"batch"`` for other modules.
+    All modes give the same outputs (up to floating point errors) and share the same
+    parameters, so that they can be changed after training with :func:`set_fuse_mode`.
+
     Args:
         module_cls (callable): A class or function that returns a Torch module/functional.
             Constructor of `f` in the formula above.  Called 2x with `*args`, `**kwargs`,
             to construct the real and imaginary component modules.
+        fuse_mode (str, optional): One of ``None``, ``"batch"``, ``"gauss"``, ``"native"``.
+            Keyword-only.
     """
 
-    def __init__(self, module_cls, *args, **kwargs):
+    def __init__(self, module_cls, *args, fuse_mode="batch", **kwargs):
         super().__init__()
         self.re_module = module_cls(*args, **kwargs)
         self.im_module = module_cls(*args, **kwargs)
+        self.fuse_mode = fuse_mode
+
+    @property
+    def fuse_mode(self):
+        return self._fuse_mode
+
+    @fuse_mode.setter
+    def fuse_mode(self, mode):
+        if mode not in FUSE_MODES:
+            raise ValueError(f"Unknown fuse_mode {mode}, expected one of {FUSE_MODES}.")
+        self._fuse_mode = mode
 
     def forward(self, x: ComplexTensor) -> ComplexTensor:
-        return torch_complex_from_reim(
-            self.re_module(x.real) - self.im_module(x.imag),
-            self.re_module(x.imag) + self.im_module(x.real),
+        if self.fuse_mode is None:
+            return torch_complex_from_reim(
+                self.re_module(x.real) - self.im_module(x.imag),
+                self.re_module(x.imag) + self.im_module(x.real),
+            )
+        if self.fuse_mode in ["gauss", "native"] and isinstance(self.re_module, _LINEAR_MODULES):
+            if self.fuse_mode == "native":
+                return self._native_forward(x)
+            return self._gauss_forward(x)
+        # Stack real and imaginary parts along the batch axis.
+        reim = torch.cat([x.real, x.imag], dim=0)
+        re_a, re_b = self.re_module(reim).chunk(2, dim=0)
+        im_a, im_b = self.im_module(reim).chunk(2, dim=0)
+        return torch_complex_from_reim(re_a - im_b, re_b + im_a)
+
+    def _native_forward(self, x):
+        weight = torch.complex(self.re_module.weight, self.im_module.weight)
+        bias = None
+        if self.re_module.bias is not None:
+            re_bias, im_bias = self.re_module.bias, self.im_module.bias
+            bias = torch.complex(re_bias - im_bias, re_bias + im_bias)
+        return _linear_forward(self.re_module, x, weight, bias)
+
+    def _gauss_forward(self, x):
+        # (W1 + i W2)(a + i b) = k1 - k3 + i (k1 + k2) with k1 = W1 (a + b),
+        # k2 = (W2 - W1) a and k3 = (W1 + W2) b. Biases are folded in k2 and k3.
+        w1, w2 = self.re_module.weight, self.im_module.weight
+        b1, b2 = self.re_module.bias, self.im_module.bias
+        has_bias = b1 is not None
+        k1 = _linear_forward(self.re_module, x.real + x.imag, w1, None)
+        k2 = _linear_forward(self.re_module, x.real, w2 - w1, b1 + b2 if has_bias else None)
+        k3 = _linear_forward(self.re_module, x.imag, w1 + w2, b2 - b1 if has_bias else None)
+        return torch_complex_from_reim(k1 - k3, k1 + k2)
+
+
+def _linear_forward(module, x, weight, bias):
+    """Run the linear layer or convolution `module` with another `weight` and `bias`."""
+    if isinstance(module, nn.Linear):
+        return F.linear(x, weight, bias)
+    if isinstance(module, nn.modules.conv._ConvTransposeNd):
+        conv_transpose = [F.conv_transpose1d, F.conv_transpose2d, F.conv_transpose3d]
+        return conv_transpose[len(module.kernel_size) - 1](
+            x,
+            weight,
+            bias,
+            module.stride,
+            module.padding,
+            module.output_padding,
+            module.groups,
+            module.dilation,
         )
+    return module._conv_forward(x, weight, bias)
+
+
+def set_fuse_mode(module: nn.Module, fuse_mode):
+    """Set the ``fuse_mode`` of all the :class:`ComplexMultiplicationWrapper` in
+    `module` (ex: to switch a pretrained model to ``"native"`` for inference).
+
+    Returns:
+        The module, modified in place.
+    """
+    for submodule in module.modules():
+        if isinstance(submodule, ComplexMultiplicationWrapper):
+            submodule.fuse_mode = fuse_mode
+    return module
 
 
 class ComplexSingleRNN(nn.Module):
@@ -116,6 +213,8 @@ class ComplexSingleRNN(nn.Module):
         bidirectional (bool, optional): Whether the RNN layers are
             bidirectional. Default is ``False``.
         dropout: Not yet supported.
+        fuse_mode (str, optional): How the complex multiplications are computed.
+            See :class:`ComplexMultiplicationWrapper`.
 
     References
         [1] : "DCCRN: Deep Complex Convolution Recurrent Network for Phase-Aware Speech Enhancement",
@@ -123,7 +222,14 @@ class ComplexSingleRNN(nn.Module):
     """
 
     def __init__(
-        self, rnn_type, input_size, hidden_size, n_layers=1, dropout=0, bidirectional=False
+        self,
+        rnn_type,
+        input_size,
+        hidden_size,
+        n_layers=1,
+        dropout=0,
+        bidirectional=False,
+        fuse_mode="batch",
     ):
         assert not (dropout and n_layers > 1), "Dropout is not yet supported for complex RNN"
         super().__init__()
@@ -135,6 +241,7 @@ class ComplexSingleRNN(nn.Module):
             "n_layers": 1,
             "dropout": 0,
             "bidirectional": bidirectional,
+            "fuse_mode": fuse_mode,
         }
         first_rnn = ComplexMultiplicationWrapper(SingleRNN, input_size=input_size, **kwargs)
         self.rnns = torch.nn.ModuleList([first_rnn])
@@ -1,3 +1,4 @@
+from .audio_index import AudioIndex, AudioInfo
 from .avspeech_dataset import AVSpeechDataset
 from .wham_dataset import WhamDataset
 from .whamr_dataset import WhamRDataset
@@ -10,8 +11,15 @@ from .kinect_wsj import KinectWsjMixDataset
 from .fuss_dataset import FUSSDataset
 from .dampvsep_dataset import DAMPVSEPSinglesDataset
 from .vad_dataset import LibriVADDataset
+from .dynamic_mixing import DynamicMixingDataset, DynamicMixer
+from .fir_augmentation import FIRFilterBank, design_fir_bank
+from .track_cache import TrackCache
+from .packed_audio import pack_audio, read_packed
+from .feature_store import FeatureStore
 
 __all__ = [
+    "AudioIndex",
+    "AudioInfo",
     "AVSpeechDataset",
     "WhamDataset",
     "WhamRDataset",
@@ -24,4 +32,12 @@ __all__ = [
     "FUSSDataset",
     "DAMPVSEPSinglesDataset",
     "LibriVADDataset",
+    "DynamicMixingDataset",
+    "DynamicMixer",
+    "FIRFilterBank",
+    "design_fir_bank",
+    "TrackCache",
+    "pack_audio",
+    "read_packed",
+    "FeatureStore",
 ]
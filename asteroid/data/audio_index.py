@@ -0,0 +1,98 @@
+import json
+import os
+import random
+import warnings
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import soundfile as sf
+
+
+class AudioInfo(namedtuple("AudioInfo", ["frames", "samplerate", "channels"])):
+    """Length (in samples), sample rate and number of channels of an audio file."""
+
+    __slots__ = ()
+
+    @property
+    def duration(self):
+        return self.frames / self.samplerate
+
+
+class AudioIndex:
+    """Index of the lengths, sample rates and numbers of channels of audio files.
+
+    The headers of the files are read once, in parallel, with ``soundfile.info``
+    (without decoding the audio), and the index is saved to ``index_path`` so that
+    next runs only read the headers of new files. Datasets use it to sample
+    segments and read them partially instead of decoding whole files.
+
+    Args:
+        paths (list): Paths of the audio files to index.
+        index_path (str, optional): Json file to load the index from and save it to,
+            usually next to the metadata of the dataset. If None, the index is
+            not saved.
+        num_workers (int): Number of threads reading headers, which mostly helps
+            on network filesystems.
+        refresh (bool): Whether to read the headers of all the files again, e.g.
+            if files were modified since the index was saved.
+
+    Examples
+        >>> index = AudioIndex(["s1.wav", "s2.wav"], index_path="audio_index.json")
+        >>> index["s1.wav"].frames
+        32000
+        >>> start, stop = index.sample_segment("s1.wav", 16000)
+        >>> wav, _ = sf.read("s1.wav", start=start, stop=stop)
+    """
+
+    def __init__(self, paths, index_path=None, num_workers=8, refresh=False):
+        self.index_path = index_path
+        self.infos = {}
+        if index_path is not None and os.path.isfile(index_path) and not refresh:
+            with open(index_path, "r") as f:
+                self.infos = {k: AudioInfo(*v) for k, v in json.load(f).items()}
+        missing = sorted({str(p) for p in paths} - set(self.infos))
+        if missing:
+            with ThreadPoolExecutor(num_workers) as executor:
+                for path, info in zip(missing, executor.map(sf.info, missing)):
+                    self.infos[path] = AudioInfo(info.frames, info.samplerate, info.channels)
+            if index_path is not None:
+                self.save(index_path)
+
+    def __getitem__(self, path):
+        return self.infos[str(path)]
+
+    def __contains__(self, path):
+        return str(path) in self.infos
+
+    def __len__(self):
+        return len(self.infos)
+
+    def frames(self, path):
+        """Length of the file, in samples."""
+        return self[path].frames
+
+    def sample_segment(self, path, length, rng=random):
+        """Random segment of ``length`` samples of the file.
+
+        Args:
+            path (str): Path of the file.
+            length (int): Length of the segment, in samples.
+            rng (random.Random): Random number generator.
+
+        Returns:
+            tuple: ``(start, stop)`` to read with ``soundfile.read``, with
+            ``stop - start == length``. For files shorter than ``length``, the
+            whole file is read, and the caller pads it to ``length``.
+        """
+        start = rng.randint(0, max(self.frames(path) - length, 0))
+        return start, start + length
+
+    def save(self, index_path):
+        """Save the index to a json file. Warns if it is not writable."""
+        tmp_path = f"{index_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({k: list(v) for k, v in self.infos.items()}, f)
+            os.replace(tmp_path, index_path)
+        except OSError as err:
+            warnings.warn(f"Could not save the audio index to {index_path}: {err}")
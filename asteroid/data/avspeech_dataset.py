@@ -1,3 +1,4 @@
+import hashlib
 import re
 import librosa
 import numpy as np
@@ -9,6 +10,8 @@ import pandas as pd
 from typing import Union
 from asteroid_filterbanks import Encoder, Decoder, STFTFB
 
+from .feature_store import FeatureStore
+
 
 def get_frames(video):
     import cv2  # Fix sphinx import
@@ -118,6 +121,10 @@ class AVSpeechDataset(data.Dataset):
         input_df_path (str,Path): path for combination dataset.
         embed_dir (str,Path): path where embeddings are stored.
         n_src (int): number of sources.
+        feature_dir (str,Path, optional): directory of the features written by
+            :meth:`materialize`. If given, items are read from it instead of
+            decoding the audio and computing the spectrograms.
+        cache_size (int): number of items of the feature store kept in memory.
 
     References
         [1] "Looking to Listen at the Cocktail Party: A Speaker-Independent Audio-Visual
@@ -126,7 +133,14 @@ class AVSpeechDataset(data.Dataset):
 
     dataset_name = "AVSpeech"
 
-    def __init__(self, input_df_path: Union[str, Path], embed_dir: Union[str, Path], n_src=2):
+    def __init__(
+        self,
+        input_df_path: Union[str, Path],
+        embed_dir: Union[str, Path],
+        n_src=2,
+        feature_dir: Union[str, Path, None] = None,
+        cache_size=0,
+    ):
         if isinstance(input_df_path, str):
             input_df_path = Path(input_df_path)
         if isinstance(embed_dir, str):
@@ -136,6 +150,11 @@ class AVSpeechDataset(data.Dataset):
         self.embed_dir = embed_dir
         self.input_df = pd.read_csv(input_df_path.as_posix())
         self.stft_encoder = Encoder(STFTFB(n_filters=512, kernel_size=400, stride=160))
+        self.cache_size = cache_size
+        self.feature_store = None
+        if feature_dir is not None:
+            self.feature_store = FeatureStore(str(feature_dir), cache_size=cache_size)
+            self.feature_store.check(len(self), self._fingerprint())
 
     @staticmethod
     def encode(x: np.ndarray, p=0.3, stft_encoder=None, EPS=1e-8):
@@ -171,6 +190,49 @@ class AVSpeechDataset(data.Dataset):
         return len(self.input_df)
 
     def __getitem__(self, idx):
+        if self.feature_store is not None:
+            features = self.feature_store[idx]
+            audio_tensors = torch.tensor(features["audio"])
+            video_tensors = [torch.tensor(embed) for embed in features["embed"]]
+            return audio_tensors, video_tensors, torch.tensor(features["mixture"])
+        return self._compute_item(idx)
+
+    def materialize(self, feature_dir: Union[str, Path], shard_size=256, num_workers=8):
+        """Compute the spectrograms and load the embeddings of all the items once,
+        and write them to a :class:`~asteroid.data.feature_store.FeatureStore` that
+        the dataset then reads from. An interrupted call resumes where it stopped.
+
+        Args:
+            feature_dir (str,Path): directory of the features.
+            shard_size (int): number of items per shard file.
+            num_workers (int): number of threads computing the features.
+        """
+
+        @torch.no_grad()
+        def get_item(idx):
+            audio_tensors, video_tensors, mixed_signal_tensor = self._compute_item(idx)
+            return dict(
+                audio=audio_tensors.detach().numpy(),
+                embed=np.stack([embed.numpy() for embed in video_tensors]),
+                mixture=mixed_signal_tensor.detach().numpy(),
+            )
+
+        FeatureStore.write(
+            str(feature_dir),
+            get_item,
+            len(self),
+            shard_size=shard_size,
+            num_workers=num_workers,
+            fingerprint=self._fingerprint(),
+        )
+        self.feature_store = FeatureStore(str(feature_dir), cache_size=self.cache_size)
+
+    def _fingerprint(self):
+        # Rows (and their order) of the combination dataframe the features are keyed by.
+        csv = self.input_df.to_csv(index=False) + str(self.n_src)
+        return hashlib.sha1(csv.encode()).hexdigest()
+
+    def _compute_item(self, idx):
         row = self.input_df.iloc[idx, :]
         all_signals = []
 
@@ -4,12 +4,18 @@ import json
 import os
 import soundfile as sf
 
+from .audio_index import AudioIndex
+
 
 class DNSDataset(data.Dataset):
     """Deep Noise Suppression (DNS) Challenge's dataset.
 
     Args
         json_dir (str): path to the JSON directory (from the recipe).
+        segment (float, optional): Length of the random segments, in seconds.
+            If None (default), whole files are returned. Segments are read
+            partially, using an :class:`AudioIndex` of the mixtures saved in
+            ``json_dir``.
 
     References
         "The INTERSPEECH 2020 Deep Noise Suppression Challenge: Datasets,
@@ -18,14 +24,21 @@ class DNSDataset(data.Dataset):
 
     dataset_name = "DNS"
 
-    def __init__(self, json_dir):
+    def __init__(self, json_dir, segment=None):
 
         super(DNSDataset, self).__init__()
         self.json_dir = json_dir
+        self.segment = segment
         with open(os.path.join(json_dir, "file_infos.json"), "r") as f:
             self.mix_infos = json.load(f)
 
         self.wav_ids = list(self.mix_infos.keys())
+        self.audio_index = None
+        if segment is not None:
+            self.audio_index = AudioIndex(
+                [utt_info["mix"] for utt_info in self.mix_infos.values()],
+                index_path=os.path.join(json_dir, "audio_index.json"),
+            )
 
     def __len__(self):
         return len(self.wav_ids)
@@ -36,12 +49,18 @@ class DNSDataset(data.Dataset):
             mixture, vstack([source_arrays])
         """
         utt_info = self.mix_infos[self.wav_ids[idx]]
-        # Load mixture
-        x = torch.from_numpy(sf.read(utt_info["mix"], dtype="float32")[0])
-        # Load clean
-        speech = torch.from_numpy(sf.read(utt_info["clean"], dtype="float32")[0])
-        # Load noise
-        noise = torch.from_numpy(sf.read(utt_info["noise"], dtype="float32")[0])
+        start, stop = 0, None
+        if self.segment is not None:
+            seg_len = int(self.segment * self.audio_index[utt_info["mix"]].samplerate)
+            start, stop = self.audio_index.sample_segment(utt_info["mix"], seg_len)
+        # Load mixture, clean and noise
+        x, speech, noise = [
+            torch.from_numpy(sf.read(utt_info[key], dtype="float32", start=start, stop=stop)[0])
+            for key in ["mix", "clean", "noise"]
+        ]
+        if stop is not None and len(x) < stop - start:
+            pad = (0, stop - start - len(x))
+            x, speech, noise = [torch.nn.functional.pad(w, pad) for w in (x, speech, noise)]
         return x, speech, noise
 
     def get_infos(self):
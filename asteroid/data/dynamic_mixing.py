@@ -0,0 +1,277 @@
+import json
+from collections import defaultdict
+
+import numpy as np
+import soundfile as sf
+import torch
+from torch import nn
+from torch.utils import data
+
+EPS = 1e-8
+
+
+class DynamicMixingDataset(data.Dataset):
+    """Dataset drawing new mixtures at each epoch from pools of utterances (dynamic mixing).
+
+    Each item is a dictionary of *unmixed* segments and of randomly drawn mixing
+    parameters. Mixing itself is done by :class:`DynamicMixer`, on batches and on the
+    device the model runs on, so that data loader workers only read audio.
+
+    The returned dictionaries contain:
+
+    - ``'sources'``: :class:`torch.Tensor` of shape $(n\\_src, time)$, random segments of
+      ``n_src`` utterances (from different speakers when the speakers are known).
+      With speed perturbation, segments are long enough to be played faster.
+    - ``'levels_db'``: :class:`torch.Tensor` of shape $(n\\_src,)$, RMS level of each
+      source in dBFS, drawn uniformly in ``level_range``.
+    - ``'speed'`` (if ``speed_range`` is given): :class:`torch.Tensor` of shape
+      $(n\\_src,)$, speed factor of each source.
+    - ``'noise'`` and ``'snr_db'`` (if ``noise_index`` is given): noise segment of
+      shape $(time,)$ and its SNR wrt. the sum of the sources, drawn in ``snr_range``.
+    - ``'rirs'`` (if ``rir_index`` is given): :class:`torch.Tensor` of shape
+      $(n\\_src, rir\\_len)$, one room impulse response per source.
+
+    Items only depend on ``seed``, the epoch (see :meth:`set_epoch`) and their index,
+    so that the data is reproducible whatever the number of workers. Call
+    :meth:`set_epoch` at the start of each epoch to draw new mixtures (workers get
+    the new epoch when they are restarted, i.e. without ``persistent_workers``).
+
+    Args:
+        source_index (str or list): Pool of utterances to mix. List of
+            ``[path, n_samples]`` or ``[path, n_samples, speaker]``, or path to a json file
+            containing such a list (as the json files of :class:`WhamDataset`).
+        n_src (int): Number of sources per mixture.
+        sample_rate (int): The sampling rate of the wav files.
+        segment (float): Length of the mixtures, in seconds.
+        noise_index (str or list, optional): Pool of noise files, in the same format as
+            ``source_index`` (e.g. WHAM! noise). If None, mixtures are clean.
+        rir_index (str or list, optional): Pool of room impulse responses, in the same
+            format as ``source_index``. If None, no reverberation is applied.
+        n_mixtures (int, optional): Number of mixtures per epoch. Defaults to the
+            number of utterances divided by ``n_src``.
+        level_range (tuple): Range of the sources' RMS levels, in dBFS.
+        snr_range (tuple): Range of the SNR of the noise, in dB.
+        speed_range (tuple, optional): Range of the speed perturbation factors
+            (e.g. ``(0.95, 1.05)``). If None, no speed perturbation is applied.
+        rir_duration (float): RIRs are truncated or zero-padded to this duration,
+            in seconds.
+        seed (int, optional): Seed of the mixing parameters. If None, a different
+            dataset is drawn at each run.
+
+    Examples
+        >>> dataset = DynamicMixingDataset("data/wav8k/min/tr/s1.json", n_src=2,
+        ...                                noise_index="data/wav8k/min/tr/noise.json", seed=0)
+        >>> mixer = DynamicMixer(dataset.seg_len)
+        >>> class MySystem(System):
+        ...     def on_train_epoch_start(self):
+        ...         dataset.set_epoch(self.current_epoch)
+        ...
+        ...     def on_after_batch_transfer(self, batch, dataloader_idx):
+        ...         return mixer(batch)
+    """
+
+    dataset_name = "DynamicMixing"
+
+    def __init__(
+        self,
+        source_index,
+        n_src=2,
+        sample_rate=8000,
+        segment=4.0,
+        noise_index=None,
+        rir_index=None,
+        n_mixtures=None,
+        level_range=(-25.0, -15.0),
+        snr_range=(-6.0, 3.0),
+        speed_range=None,
+        rir_duration=1.0,
+        seed=None,
+    ):
+        super().__init__()
+        self.sources = _load_index(source_index)
+        self.noises = None if noise_index is None else _load_index(noise_index)
+        self.rirs = None if rir_index is None else _load_index(rir_index)
+        if len(self.sources) < n_src:
+            raise ValueError(
+                f"Cannot draw {n_src} sources from a pool of {len(self.sources)} utterances."
+            )
+        self.n_src = n_src
+        self.sample_rate = sample_rate
+        self.segment = segment
+        self.seg_len = int(segment * sample_rate)
+        self.n_mixtures = n_mixtures if n_mixtures else len(self.sources) // n_src
+        self.level_range = level_range
+        self.snr_range = snr_range
+        self.speed_range = speed_range
+        self.rir_len = int(rir_duration * sample_rate)
+        self.seed = np.random.SeedSequence().entropy if seed is None else seed
+        self.epoch = 0
+
+        # Utterances per speaker, to mix different speakers together.
+        self.speakers = None
+        if all(len(info) > 2 for info in self.sources):
+            self.speakers = defaultdict(list)
+            for i, info in enumerate(self.sources):
+                self.speakers[info[2]].append(i)
+            self.speakers = list(self.speakers.values())
+            if len(self.speakers) < n_src:
+                raise ValueError(
+                    f"Cannot draw {n_src} different speakers among {len(self.speakers)}."
+                )
+        # With speed perturbation, sources are read longer to be played faster.
+        if speed_range is None:
+            self.read_len = self.seg_len
+        else:
+            self.read_len = int(np.ceil((self.seg_len - 1) * max(speed_range))) + 2
+
+    def set_epoch(self, epoch):
+        """Draw the mixtures of epoch ``epoch``."""
+        self.epoch = epoch
+
+    def __len__(self):
+        return self.n_mixtures
+
+    def __getitem__(self, idx):
+        rng = np.random.default_rng([self.seed, self.epoch, idx])
+        if self.speakers is None:
+            utt_ids = rng.choice(len(self.sources), self.n_src, replace=False)
+        else:
+            spk_ids = rng.choice(len(self.speakers), self.n_src, replace=False)
+            utt_ids = [rng.choice(self.speakers[spk]) for spk in spk_ids]
+        sources = np.stack([self._read(self.sources[i], self.read_len, rng) for i in utt_ids])
+        sample = {
+            "sources": torch.from_numpy(sources),
+            "levels_db": torch.from_numpy(rng.uniform(*self.level_range, self.n_src)).float(),
+        }
+        if self.speed_range is not None:
+            speed = rng.uniform(*self.speed_range, self.n_src)
+            sample["speed"] = torch.from_numpy(speed).float()
+        if self.noises is not None:
+            noise = self.noises[rng.integers(len(self.noises))]
+            sample["noise"] = torch.from_numpy(self._read(noise, self.seg_len, rng))
+            sample["snr_db"] = torch.tensor(rng.uniform(*self.snr_range), dtype=torch.float32)
+        if self.rirs is not None:
+            rir_ids = rng.integers(len(self.rirs), size=self.n_src)
+            rirs = [self._read(self.rirs[i], self.rir_len, rng, start=0) for i in rir_ids]
+            sample["rirs"] = torch.from_numpy(np.stack(rirs))
+        return sample
+
+    @staticmethod
+    def _read(info, length, rng, start=None):
+        """Read ``length`` samples of the file, from ``start`` or a random start.
+        Files shorter than ``length`` are zero-padded."""
+        path, n_samples = info[0], info[1]
+        if start is None:
+            start = rng.integers(0, max(n_samples - length, 0) + 1)
+        wav, _ = sf.read(path, start=start, stop=start + length, dtype="float32", always_2d=True)
+        wav = wav[:, 0]
+        if len(wav) < length:
+            wav = np.pad(wav, (0, length - len(wav)))
+        return wav
+
+    def get_infos(self):
+        """Get dataset infos (for publishing models).
+
+        Returns:
+            dict, dataset infos with keys `dataset`, `task` and `licences`.
+        """
+        infos = dict()
+        infos["dataset"] = self.dataset_name
+        infos["task"] = "sep_clean" if self.noises is None else "sep_noisy"
+        infos["licenses"] = []
+        return infos
+
+
+class DynamicMixer(nn.Module):
+    """Mix batches drawn from :class:`DynamicMixingDataset`, on their device.
+
+    Sources are speed perturbed (linear interpolation), scaled to their RMS level,
+    convolved with their RIR (FFT convolution) and summed, before adding the noise
+    at the given SNR. All the operations are batched.
+
+    Args:
+        seg_len (int): Length of the mixtures, in samples (``dataset.seg_len``).
+        reverberant_targets (bool): If True, the targets are the reverberant sources.
+            Otherwise (default), the targets are the dry sources, as in WHAMR!
+            dereverberation tasks.
+
+    Returns:
+        tuple: mixture of shape $(batch, time)$ and targets of shape
+        $(batch, n\\_src, time)$, as returned by :class:`WhamDataset`.
+    """
+
+    def __init__(self, seg_len, reverberant_targets=False):
+        super().__init__()
+        self.seg_len = seg_len
+        self.reverberant_targets = reverberant_targets
+
+    def forward(self, batch):
+        sources = batch["sources"]
+        if "speed" in batch:
+            sources = speed_perturb(sources, batch["speed"], self.seg_len)
+        else:
+            sources = sources[..., : self.seg_len]
+        sources = set_rms_level(sources, batch["levels_db"])
+        targets = sources
+        if "rirs" in batch:
+            sources = fft_convolve(sources, batch["rirs"].to(sources.dtype), self.seg_len)
+            if self.reverberant_targets:
+                targets = sources
+        mixture = sources.sum(1)
+        if "noise" in batch:
+            noise = batch["noise"].to(mixture.dtype)
+            gain = _rms(mixture) / _rms(noise) * 10 ** (-batch["snr_db"] / 20)
+            mixture = mixture + gain[:, None] * noise
+        return mixture, targets
+
+
+def speed_perturb(wav, speed, length):
+    """Change the speed of signals by linear interpolation.
+
+    Args:
+        wav (:class:`torch.Tensor`): Signals of shape $(..., time)$.
+        speed (:class:`torch.Tensor`): Speed factors, of shape $(...)$.
+        length (int): Output length. ``wav`` should have at least
+            ``(length - 1) * speed + 2`` samples.
+
+    Returns:
+        :class:`torch.Tensor`: Signals of shape $(..., length)$.
+    """
+    pos = torch.arange(length, device=wav.device, dtype=wav.dtype) * speed[..., None]
+    left = pos.floor().long().clamp(max=wav.shape[-1] - 2)
+    frac = pos - left
+    left_val = wav.gather(-1, left)
+    return left_val + frac * (wav.gather(-1, left + 1) - left_val)
+
+
+def set_rms_level(wav, levels_db):
+    """Scale signals of shape $(..., time)$ to RMS levels (in dBFS) of shape $(...)$."""
+    gain = 10 ** (levels_db / 20) / _rms(wav)
+    return wav * gain[..., None]
+
+
+def fft_convolve(wav, filters, length):
+    """Batched convolution of signals with filters, computed with FFTs.
+
+    Args:
+        wav (:class:`torch.Tensor`): Signals of shape $(..., time)$.
+        filters (:class:`torch.Tensor`): Filters of shape $(..., filter\\_len)$.
+        length (int): Number of output samples to keep.
+
+    Returns:
+        :class:`torch.Tensor`: First ``length`` samples of the full convolution.
+    """
+    n_fft = 2 ** int(np.ceil(np.log2(wav.shape[-1] + filters.shape[-1] - 1)))
+    spec = torch.fft.rfft(wav, n_fft) * torch.fft.rfft(filters, n_fft)
+    return torch.fft.irfft(spec, n_fft)[..., :length]
+
+
+def _rms(wav):
+    return wav.pow(2).mean(-1).clamp_min(EPS).sqrt()
+
+
+def _load_index(index):
+    if isinstance(index, str):
+        with open(index, "r") as f:
+            return json.load(f)
+    return list(index)
@@ -0,0 +1,211 @@
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+
+
+class FeatureStore:
+    """Sharded store of precomputed features, read as memory maps, with an LRU cache.
+
+    Each item of a dataset is a dictionary of arrays of fixed shapes (e.g. the
+    spectrograms of the mixture and sources, and the video embeddings). They are
+    written once with :meth:`write`, in ``.npy`` shards of ``shard_size`` items per
+    feature, and items are then read by index from memory maps instead of being
+    decoded and computed at each access. The ``cache_size`` most recently read
+    items are kept in memory.
+
+    Args:
+        store_dir (str): Directory written by :meth:`write`.
+        cache_size (int): Number of items kept in memory. 0 disables the cache.
+
+    Attributes:
+        hits (int): Number of reads served from the cache.
+        misses (int): Number of reads from the shards.
+
+    Examples
+        >>> store = FeatureStore.write("features/train", compute_item, n_items=len(dataset))
+        >>> store = FeatureStore("features/train", cache_size=512)
+        >>> store[0]["mixture"].shape
+        (514, 301)
+    """
+
+    META_FILE = "meta.json"
+
+    def __init__(self, store_dir, cache_size=0):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, self.META_FILE), "r") as f:
+            self.meta = json.load(f)
+        self.n_items = self.meta["n_items"]
+        self.shard_size = self.meta["shard_size"]
+        self.features = list(self.meta["features"])
+        self.fingerprint = self.meta.get("fingerprint")
+        missing = [path for path in self._shard_paths() if not os.path.isfile(path)]
+        if missing:
+            raise RuntimeError(
+                f"{len(missing)} shards are missing in {store_dir}, the store was "
+                "not completely written. Call `FeatureStore.write` again to resume."
+            )
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        # Opened lazily, so that each DataLoader worker maps its own files.
+        self._shards = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def write(cls, store_dir, get_item, n_items, shard_size=256, num_workers=0, fingerprint=None):
+        """Compute and write the features of all the items, resuming a previous call.
+
+        Args:
+            store_dir (str): Directory of the store.
+            get_item (callable): Returns the features of an item given its index,
+                as a dictionary of arrays whose shapes do not depend on the item.
+            n_items (int): Number of items.
+            shard_size (int): Number of items per shard file.
+            num_workers (int): Number of threads computing the items. If 0, they
+                are computed in the main thread.
+            fingerprint (str, optional): Identifies the items (e.g. a hash of the
+                metadata of the dataset). Resuming into, or reading (see
+                :meth:`check`) a store with another fingerprint raises.
+
+        Returns:
+            FeatureStore: The store.
+        """
+        os.makedirs(store_dir, exist_ok=True)
+        meta_path = os.path.join(store_dir, cls.META_FILE)
+        n_shards = (n_items + shard_size - 1) // shard_size
+        meta = None
+        if os.path.isfile(meta_path):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            expected = dict(n_items=n_items, shard_size=shard_size, fingerprint=fingerprint)
+            if any(meta.get(key) != value for key, value in expected.items()):
+                raise ValueError(
+                    f"{store_dir} contains a different feature store, remove it first."
+                )
+            # Nothing to compute (not even the first item) if all the shards exist.
+            if all(
+                os.path.isfile(cls._shard_path(store_dir, name, shard_id))
+                for name in meta["features"]
+                for shard_id in range(n_shards)
+            ):
+                return cls(store_dir)
+        first = {name: np.asarray(feat) for name, feat in get_item(0).items()}
+        new_meta = dict(
+            n_items=n_items,
+            shard_size=shard_size,
+            features={
+                name: dict(shape=list(feat.shape), dtype=feat.dtype.str)
+                for name, feat in first.items()
+            },
+            fingerprint=fingerprint,
+        )
+        if meta is None:
+            _atomic_json_dump(new_meta, meta_path)
+        elif meta != new_meta:
+            raise ValueError(f"{store_dir} contains a different feature store, remove it first.")
+
+        for shard_id in range(n_shards):
+            indices = range(shard_id * shard_size, min((shard_id + 1) * shard_size, n_items))
+            paths = {name: cls._shard_path(store_dir, name, shard_id) for name in first}
+            if all(os.path.isfile(path) for path in paths.values()):
+                continue
+            tmp_paths = {name: f"{path}.{os.getpid()}.tmp.npy" for name, path in paths.items()}
+            arrays = {
+                name: np.lib.format.open_memmap(
+                    tmp_paths[name], mode="w+", dtype=feat.dtype, shape=(len(indices),) + feat.shape
+                )
+                for name, feat in first.items()
+            }
+            write_item = partial(cls._write_item, get_item, first, arrays)
+            if num_workers > 0:
+                with ThreadPoolExecutor(num_workers) as executor:
+                    list(executor.map(write_item, enumerate(indices)))
+            else:
+                for pos_idx in enumerate(indices):
+                    write_item(pos_idx)
+            for name, array in arrays.items():
+                array.flush()
+                os.replace(tmp_paths[name], paths[name])
+        return cls(store_dir)
+
+    @staticmethod
+    def _write_item(get_item, first, arrays, pos_idx):
+        pos, idx = pos_idx
+        item = first if idx == 0 else get_item(idx)
+        for name, array in arrays.items():
+            feat = np.asarray(item[name])
+            if feat.shape != array.shape[1:]:
+                raise ValueError(
+                    f"Feature {name} of item {idx} has shape {feat.shape}, "
+                    f"expected {array.shape[1:]}."
+                )
+            array[pos] = feat
+
+    def check(self, n_items, fingerprint=None):
+        """Raise if the store does not hold ``n_items`` items with this fingerprint."""
+        if self.n_items != n_items or self.fingerprint != fingerprint:
+            raise ValueError(
+                f"The feature store in {self.store_dir} was written for other items, "
+                "write it again."
+            )
+
+    def __len__(self):
+        return self.n_items
+
+    def __getitem__(self, idx):
+        """Features of item ``idx``, as a dictionary of arrays."""
+        if not 0 <= idx < self.n_items:
+            raise IndexError(f"Index {idx} out of range for {self.n_items} items.")
+        item = self._cache.get(idx)
+        if item is not None:
+            self.hits += 1
+            self._cache.move_to_end(idx)
+            return item
+        self.misses += 1
+        shard_id, pos = divmod(idx, self.shard_size)
+        item = {name: np.array(self._shard(name, shard_id)[pos]) for name in self.features}
+        if self.cache_size > 0:
+            self._cache[idx] = item
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return item
+
+    def stats(self):
+        """Hit and miss statistics of the cache."""
+        n_reads = self.hits + self.misses
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hits / n_reads if n_reads else 0.0,
+            n_cached=len(self._cache),
+        )
+
+    def _shard(self, name, shard_id):
+        shard = self._shards.get((name, shard_id))
+        if shard is None:
+            path = self._shard_path(self.store_dir, name, shard_id)
+            shard = self._shards[(name, shard_id)] = np.load(path, mmap_mode="r")
+        return shard
+
+    def _shard_paths(self):
+        n_shards = (self.n_items + self.shard_size - 1) // self.shard_size
+        return [
+            self._shard_path(self.store_dir, name, shard_id)
+            for name in self.features
+            for shard_id in range(n_shards)
+        ]
+
+    @staticmethod
+    def _shard_path(store_dir, name, shard_id):
+        return os.path.join(store_dir, f"{name}_{shard_id:05d}.npy")
+
+
+def _atomic_json_dump(obj, path):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(obj, f)
+    os.replace(tmp_path, path)
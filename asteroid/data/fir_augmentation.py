@@ -0,0 +1,91 @@
+import numpy as np
+import torch
+from scipy.signal import firwin2
+from torch import nn
+
+from .dynamic_mixing import fft_convolve
+
+
+def design_fir_bank(responses, n_taps, sample_rate, n_filters=None, jitter_snr_db=None, seed=None):
+    """Design a bank of FIR filters from (randomly perturbed) frequency responses.
+
+    Args:
+        responses (list): Frequency responses, as dictionaries with keys ``'freq'``
+            (frequencies in Hz, from 0 to ``sample_rate / 2``) and ``'gain'``, as
+            expected by :func:`scipy.signal.firwin2`.
+        n_taps (int): Number of taps of the filters (odd).
+        sample_rate (int): Sample rate.
+        n_filters (int, optional): Number of filters in the bank, drawn uniformly
+            among the responses. Defaults to one filter per response.
+        jitter_snr_db (float or tuple, optional): If given, Gaussian noise of
+            standard deviation ``var(gain) / 10 ** (snr / 20)`` is added to the
+            gains of each filter, with ``snr`` fixed or drawn uniformly in the
+            ``(low, high)`` range. If None, the responses are not perturbed.
+        seed (int, optional): Seed of the random draws.
+
+    Returns:
+        numpy.ndarray: The filters, of shape $(n\\_filters, n\\_taps)$.
+    """
+    rng = np.random.default_rng(seed)
+    if n_filters is None:
+        resp_ids = np.arange(len(responses))
+    else:
+        resp_ids = rng.integers(len(responses), size=n_filters)
+    firs = []
+    for resp_id in resp_ids:
+        freqs = np.asarray(responses[resp_id]["freq"], dtype=float)
+        gains = np.array(responses[resp_id]["gain"], dtype=float)
+        if jitter_snr_db is not None:
+            snr_db = jitter_snr_db
+            if isinstance(jitter_snr_db, (tuple, list)):
+                snr_db = rng.uniform(*jitter_snr_db)
+            gains += rng.normal(0, np.var(gains) / 10 ** (snr_db / 20), gains.shape)
+        firs.append(firwin2(n_taps, freqs, gains, fs=sample_rate))
+    return np.stack(firs)
+
+
+class FIRFilterBank(nn.Module):
+    """Filter batches of signals with random filters of a pre-designed FIR bank.
+
+    Designing FIR filters (e.g. the jittered responses of face masks in DeMask) for
+    each example is slow, so a large bank is designed once (see
+    :func:`design_fir_bank`) and examples are filtered with randomly chosen filters
+    of the bank, with batched FFT convolutions. Use it on the device, after the
+    batch is transferred, or in a ``collate_fn``.
+
+    Args:
+        firs (array-like): Bank of filters, of shape $(n\\_filters, n\\_taps)$.
+        compensate_delay (bool): If True (default), the output is advanced by
+            ``(n_taps - 1) // 2`` samples, the group delay of linear phase filters,
+            to be aligned with the input.
+
+    Examples
+        >>> firs = design_fir_bank(mask_responses, n_taps=97, sample_rate=16000,
+        ...                        n_filters=4096, jitter_snr_db=(3, 12))
+        >>> fir_bank = FIRFilterBank(firs).to("cuda")
+        >>> masked = fir_bank(clean.to("cuda"))
+    """
+
+    def __init__(self, firs, compensate_delay=True):
+        super().__init__()
+        self.register_buffer("firs", torch.as_tensor(np.asarray(firs), dtype=torch.float))
+        self.compensate_delay = compensate_delay
+
+    def forward(self, wav, fir_ids=None):
+        """Filter signals.
+
+        Args:
+            wav (:class:`torch.Tensor`): Signals of shape $(batch, time)$ or
+                $(batch, channels, time)$.
+            fir_ids (:class:`torch.LongTensor`, optional): Indices of the filters
+                to use, of shape $(batch,)$. Drawn uniformly if None.
+
+        Returns:
+            :class:`torch.Tensor`: Filtered signals, with the shape of ``wav``.
+        """
+        if fir_ids is None:
+            fir_ids = torch.randint(len(self.firs), (wav.shape[0],), device=self.firs.device)
+        firs = self.firs[fir_ids].to(wav.dtype)
+        firs = firs.reshape(firs.shape[:1] + (1,) * (wav.ndim - 2) + firs.shape[1:])
+        delay = (self.firs.shape[-1] - 1) // 2 if self.compensate_delay else 0
+        return fft_convolve(wav, firs, wav.shape[-1] + delay)[..., delay:]
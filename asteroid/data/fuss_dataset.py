@@ -1,9 +1,12 @@
+import os
 import torch
 from torch.utils.data import Dataset
 import numpy as np
 import pandas as pd
 import soundfile as sf
 
+from .audio_index import AudioIndex
+
 
 class FUSSDataset(Dataset):
     """Dataset class for FUSS [1] tasks.
@@ -13,6 +16,10 @@ class FUSSDataset(Dataset):
             of the recipe.
         return_bg (bool): Whether to return the background along the mixture
             and sources (useful for SIR, SAR computation). Default: False.
+        segment (float, optional): Length of the random segments, in seconds.
+            If None (default), whole files are returned. Segments are read
+            partially, using an :class:`AudioIndex` of the mixtures saved next to
+            ``file_list_path``.
 
     References
         [1] Scott Wisdom et al. "What's All the FUSS About Free Universal
@@ -21,10 +28,11 @@ class FUSSDataset(Dataset):
 
     dataset_name = "FUSS"
 
-    def __init__(self, file_list_path, return_bg=False):
+    def __init__(self, file_list_path, return_bg=False, segment=None):
         super().__init__()
         # Arguments
         self.return_bg = return_bg
+        self.segment = segment
         # Constants
         self.max_n_fg = 3
         self.n_src = self.max_n_fg  # Same variable as in WHAM
@@ -43,6 +51,12 @@ class FUSSDataset(Dataset):
         # self.mix_df.dropna(threshold=remove_less_than, inplace=True)
         # self.mix_df.reset_index(inplace=True)
         self.mix_df.fillna(value="", inplace=True)
+        self.audio_index = None
+        if segment is not None:
+            self.audio_index = AudioIndex(
+                self.mix_df["mix"],
+                index_path=os.path.splitext(file_list_path)[0] + "_audio_index.json",
+            )
 
     def __len__(self):
         return len(self.mix_df)
@@ -50,17 +64,28 @@ class FUSSDataset(Dataset):
     def __getitem__(self, idx):
         # Each line has absolute to miture, background and foregrounds
         line = self.mix_df.iloc[idx]
-        mix = sf.read(line["mix"], dtype="float32")[0]
+        start, stop = 0, None
+        if self.segment is not None:
+            seg_len = int(self.segment * self.sample_rate)
+            start, stop = self.audio_index.sample_segment(line["mix"], seg_len)
+
+        def read(path):
+            wav = sf.read(path, dtype="float32", start=start, stop=stop)[0]
+            if stop is not None and len(wav) < stop - start:
+                wav = np.pad(wav, (0, stop - start - len(wav)))
+            return wav
+
+        mix = read(line["mix"])
         sources = []
         for fg_path in [line[fg_n] for fg_n in self.fg_names]:
             if fg_path:
-                sources.append(sf.read(fg_path, dtype="float32")[0])
+                sources.append(read(fg_path))
             else:
                 sources.append(np.zeros_like(mix))
         sources = torch.from_numpy(np.vstack(sources))
 
         if self.return_bg:
-            bg = sf.read(line["bg"], dtype="float32")[0]
+            bg = read(line["bg"])
             return torch.from_numpy(mix), sources, torch.from_numpy(bg)
         return torch.from_numpy(mix), sources
 
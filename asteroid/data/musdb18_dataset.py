@@ -5,6 +5,9 @@ import torch
 import tqdm
 import soundfile as sf
 
+from .audio_index import AudioIndex
+from .track_cache import TrackCache
+
 
 class MUSDB18Dataset(torch.utils.data.Dataset):
     """MUSDB18 music separation dataset
@@ -63,6 +66,12 @@ class MUSDB18Dataset(torch.utils.data.Dataset):
         source_augmentations (:obj:`list` of :obj:`callable`): list of augmentation
             function names, defaults to no-op augmentations (input = output)
         sample_rate (int, optional): Samplerate of files in dataset.
+        cache_size (int, optional): If positive, decoded stems are kept in an LRU
+            cache of this size (in bytes, per DataLoader worker) and segments are
+            sliced from memory, which speeds up ``random_track_mix`` and
+            ``samples_per_track > 1``. Defaults to 0 (no cache).
+        cache_dir (str, optional): Directory where decoded stems are stored and
+            memory mapped, so that workers share them (see :class:`TrackCache`).
 
     Attributes:
         root (str): Root path of dataset
@@ -84,6 +93,8 @@ class MUSDB18Dataset(torch.utils.data.Dataset):
             function names, defaults to no-op augmentations (input = output)
         sample_rate (int, optional): Samplerate of files in dataset.
         tracks (:obj:`list` of :obj:`Dict`): List of track metadata
+        cache (:class:`TrackCache` or None): Cache of decoded stems, with hit and
+            miss statistics (``cache.stats()``).
 
     References
         "The 2018 Signal Separation Evaluation Campaign" Stoter et al. 2018.
@@ -105,6 +116,8 @@ class MUSDB18Dataset(torch.utils.data.Dataset):
         random_track_mix=False,
         source_augmentations=lambda audio: audio,
         sample_rate=44100,
+        cache_size=0,
+        cache_dir=None,
     ):
 
         self.root = Path(root).expanduser()
@@ -122,6 +135,7 @@ class MUSDB18Dataset(torch.utils.data.Dataset):
         self.tracks = list(self.get_tracks())
         if not self.tracks:
             raise RuntimeError("No tracks found.")
+        self.cache = TrackCache(cache_size, store_dir=cache_dir) if cache_size > 0 else None
 
     def __getitem__(self, index):
         # assemble the mixture of target and interferers
@@ -154,12 +168,11 @@ class MUSDB18Dataset(torch.utils.data.Dataset):
                 stop_sample = None
 
             # load actual audio
-            audio, _ = sf.read(
-                Path(self.tracks[track_id]["path"] / source).with_suffix(self.suffix),
-                always_2d=True,
-                start=start_sample,
-                stop=stop_sample,
-            )
+            path = Path(self.tracks[track_id]["path"] / source).with_suffix(self.suffix)
+            if self.cache is not None:
+                audio = self.cache.read(path, start=start_sample, stop=stop_sample)
+            else:
+                audio, _ = sf.read(path, always_2d=True, start=start_sample, stop=stop_sample)
             # convert to torch tensor
             audio = torch.tensor(audio.T, dtype=torch.float)
             # apply source-wise augmentations
@@ -178,8 +191,12 @@ class MUSDB18Dataset(torch.utils.data.Dataset):
         return len(self.tracks) * self.samples_per_track
 
     def get_tracks(self):
-        """Loads input and output tracks"""
+        """Loads input and output tracks.
+
+        The headers of the stems are read in parallel and indexed in
+        ``root/split/audio_index.json`` (see :class:`AudioIndex`)."""
         p = Path(self.root, self.split)
+        track_paths = []
         for track_path in tqdm.tqdm(p.iterdir()):
             if track_path.is_dir():
                 if self.subset and track_path.stem not in self.subset:
@@ -190,20 +207,26 @@ class MUSDB18Dataset(torch.utils.data.Dataset):
                 if not all(sp.exists() for sp in source_paths):
                     print("Exclude track due to non-existing source", track_path)
                     continue
-
-                # get metadata
-                infos = list(map(sf.info, source_paths))
-                if not all(i.samplerate == self.sample_rate for i in infos):
-                    print("Exclude track due to different sample rate ", track_path)
-                    continue
-
-                if self.segment is not None:
-                    # get minimum duration of track
-                    min_duration = min(i.duration for i in infos)
-                    if min_duration > self.segment:
-                        yield ({"path": track_path, "min_duration": min_duration})
-                else:
-                    yield ({"path": track_path, "min_duration": None})
+                track_paths.append(track_path)
+
+        # get metadata
+        audio_index = AudioIndex(
+            [track_path / (s + self.suffix) for track_path in track_paths for s in self.sources],
+            index_path=p / "audio_index.json",
+        )
+        for track_path in track_paths:
+            infos = [audio_index[track_path / (s + self.suffix)] for s in self.sources]
+            if not all(i.samplerate == self.sample_rate for i in infos):
+                print("Exclude track due to different sample rate ", track_path)
+                continue
+
+            if self.segment is not None:
+                # get minimum duration of track
+                min_duration = min(i.duration for i in infos)
+                if min_duration > self.segment:
+                    yield ({"path": track_path, "min_duration": min_duration})
+            else:
+                yield ({"path": track_path, "min_duration": None})
 
     def get_infos(self):
         """Get dataset infos (for publishing models).
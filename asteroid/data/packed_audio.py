@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import soundfile as sf
+
+PACKED_EXTENSIONS = (".wav", ".flac", ".npy")
+
+
+def pack_audio(paths, out_path):
+    """Pack audio files of the same length into one multichannel file.
+
+    Multichannel datasets often store each microphone and each source in a
+    separate file. Packing them together lets datasets read all the channels of
+    a segment with a single seek, see :func:`read_packed`.
+
+    Args:
+        paths (list): Paths of the (single or multichannel) files to pack, in the
+            order of the output channels.
+        out_path (str): Path of the packed file. Either ``.wav`` (with the subtype
+            of the first file, e.g. ``PCM_16``), ``.flac`` (at most 8 channels) or
+            ``.npy`` (float32, read partially with memory mapping).
+
+    Returns:
+        list: Number of channels of each input file, to locate them in the output.
+    """
+    ext = os.path.splitext(out_path)[1]
+    if ext not in PACKED_EXTENSIONS:
+        raise ValueError(f"Unsupported packed format {ext}, expected one of {PACKED_EXTENSIONS}.")
+    infos = [sf.info(path) for path in paths]
+    if len({(info.frames, info.samplerate) for info in infos}) > 1:
+        raise ValueError(f"Files to pack have different lengths or sample rates: {paths}.")
+    audio = np.concatenate(
+        [sf.read(path, dtype="float32", always_2d=True)[0] for path in paths], axis=1
+    )
+    tmp_path = f"{out_path}.{os.getpid()}.tmp{ext}"
+    if ext == ".npy":
+        np.save(tmp_path, audio)
+    else:
+        subtype = infos[0].subtype if ext == ".wav" else None
+        sf.write(tmp_path, audio, infos[0].samplerate, subtype=subtype)
+    os.replace(tmp_path, out_path)
+    return [info.channels for info in infos]
+
+
+def read_packed(path, start=0, stop=None, channels=None):
+    """Read a segment of a file written by :func:`pack_audio`, with a single seek.
+
+    Args:
+        path (str): Path of the packed file.
+        start (int): First frame to read.
+        stop (int, optional): Frame to stop at. Reads until the end if None.
+        channels (list, optional): Channels to return. All channels if None.
+
+    Returns:
+        numpy.ndarray: float32 array of shape $(channels, frames)$.
+    """
+    if path.endswith(".npy"):
+        audio = np.load(path, mmap_mode="r")[start:stop]
+    else:
+        audio = sf.read(path, start=start, stop=stop, dtype="float32", always_2d=True)[0]
+    audio = audio.T
+    if channels is not None:
+        audio = audio[channels]
+    return np.ascontiguousarray(audio)
@@ -1,7 +1,11 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import torch
 from torch.utils import data
 import numpy as np
 import soundfile as sf
+from .packed_audio import pack_audio, read_packed
 from .wham_dataset import normalize_tensor_wav
 
 from .wsj0_mix import wsj0_license
@@ -58,6 +62,10 @@ class SmsWsjDataset(data.Dataset):
             targets.
         normalize_audio (bool): If True then both sources and the mixture are
             normalized with the standard deviation of the mixture.
+        packed_dir (str, optional): Directory of examples packed with :meth:`pack`.
+            If given, all the channels of the observation and the sources are read
+            from one file per example.
+        packed_ext (str): Format of the packed files, ``'.wav'`` or ``'.npy'``.
 
     References
         "SMS-WSJ: Database, performance measures, and baseline recipe for
@@ -76,6 +84,8 @@ class SmsWsjDataset(data.Dataset):
         segment=4.0,
         nondefault_nsrc=None,
         normalize_audio=False,
+        packed_dir=None,
+        packed_ext=".wav",
     ):
         try:
             import sms_wsj  # noqa
@@ -100,6 +110,10 @@ class SmsWsjDataset(data.Dataset):
         self.single_channel = single_channel
         self.sample_rate = sample_rate
         self.normalize_audio = normalize_audio
+        if packed_dir is not None and target == "source":
+            raise ValueError("Only the 'early' and 'image' targets can be packed.")
+        self.packed_dir = packed_dir
+        self.packed_ext = packed_ext
         self.seg_len = None if segment is None else int(segment * sample_rate)
         if not nondefault_nsrc:
             self.n_src = self.target_dict["default_nsrc"]
@@ -166,50 +180,60 @@ class SmsWsjDataset(data.Dataset):
             stop = None
         else:
             stop = rand_start + self.seg_len
-        # Load mixture
-        x, _ = sf.read(audio_path[in_signal], start=rand_start, stop=stop, dtype="float32")
-        x = x.T
-
         num_channels = self.target_dict["infos"]["num_channels"]
-        if self.single_channel:
-            if self.like_test:
-                ref_channel = 0
-            else:
-                ref_channel = np.random.randint(0, num_channels)
-            x = x[ref_channel]
-        seg_len = torch.as_tensor([x.shape[-1]])
-        # Load sources
-        source_arrays = []
-        for idx in range(self.n_src):
-            try:
-                s = 0
-                for t in target:
-                    if t == "speech_source":
-                        start = 0
-                        stop_ = None
-                    else:
-                        start = rand_start
-                        stop_ = stop
-                    s_, _ = sf.read(audio_path[t][idx], start=start, stop=stop_, dtype="float32")
-                    s += s_.T
-            except IndexError:
-                if self.single_channel:
-                    s = np.zeros((seg_len,))
+        if self.packed_dir is not None:
+            x, sources = self._read_packed(example, rand_start, stop)
+            if self.single_channel:
+                ref_channel = 0 if self.like_test else np.random.randint(0, num_channels)
+                x = x[ref_channel]
+            sources = torch.from_numpy(sources)
+        else:
+            # Load mixture
+            x, _ = sf.read(audio_path[in_signal], start=rand_start, stop=stop, dtype="float32")
+            x = x.T
+
+            if self.single_channel:
+                if self.like_test:
+                    ref_channel = 0
                 else:
-                    s = np.zeros((num_channels, seg_len))
-            source_arrays.append(s)
+                    ref_channel = np.random.randint(0, num_channels)
+                x = x[ref_channel]
+            seg_len = torch.as_tensor([x.shape[-1]])
+            # Load sources
+            source_arrays = []
+            for idx in range(self.n_src):
+                try:
+                    s = 0
+                    for t in target:
+                        if t == "speech_source":
+                            start = 0
+                            stop_ = None
+                        else:
+                            start = rand_start
+                            stop_ = stop
+                        s_, _ = sf.read(
+                            audio_path[t][idx], start=start, stop=stop_, dtype="float32"
+                        )
+                        s += s_.T
+                except IndexError:
+                    if self.single_channel:
+                        s = np.zeros((seg_len,))
+                    else:
+                        s = np.zeros((num_channels, seg_len))
+                source_arrays.append(s)
 
-        if target[0] == "speech_source":
-            from sms_wsj.database.utils import extract_piece
+            if target[0] == "speech_source":
+                from sms_wsj.database.utils import extract_piece
 
-            offset = example["offset"]
-            source_arrays = [
-                extract_piece(s, offset_, num_samples) for s, offset_ in zip(source_arrays, offset)
-            ]
-            source_arrays = [s[rand_start:stop] for s in source_arrays]
+                offset = example["offset"]
+                source_arrays = [
+                    extract_piece(s, offset_, num_samples)
+                    for s, offset_ in zip(source_arrays, offset)
+                ]
+                source_arrays = [s[rand_start:stop] for s in source_arrays]
 
-        sources = torch.from_numpy(np.stack(source_arrays, axis=0))
-        assert sources.shape[-1] == seg_len[0], (sources.shape, seg_len)
+            sources = torch.from_numpy(np.stack(source_arrays, axis=0))
+            assert sources.shape[-1] == seg_len[0], (sources.shape, seg_len)
         if self.single_channel and not target[0] == "source":
             sources = sources[:, ref_channel]
 
@@ -221,6 +245,56 @@ class SmsWsjDataset(data.Dataset):
             sources = normalize_tensor_wav(sources, eps=self.EPS, std=m_std)
         return mixture, sources
 
+    def _read_packed(self, example, start, stop):
+        """Read the mixture and the sources of an example packed by :meth:`pack`."""
+        path = os.path.join(self.packed_dir, example["example_id"] + self.packed_ext)
+        num_channels = self.target_dict["infos"]["num_channels"]
+        n_spk = len(example["audio_path"]["speech_reverberation_early"])
+        # [observation, early_1, ..., early_n, tail_1, ..., tail_n], each with all channels.
+        audio = read_packed(path, start, stop)
+        audio = audio.reshape(1 + 2 * n_spk, num_channels, audio.shape[-1])
+        sources = audio[1 : 1 + n_spk]
+        if self.target == "image":
+            sources = sources + audio[1 + n_spk :]
+        # Zeros for missing sources (nondefault_nsrc)
+        missing = np.zeros((self.n_src - n_spk,) + sources.shape[1:], dtype=sources.dtype)
+        return audio[0], np.concatenate([sources, missing])
+
+    def pack(self, packed_dir, packed_ext=".wav", num_workers=8):
+        """Pack the observation and the reverberant sources of each example into one
+        multichannel file (see :func:`~asteroid.data.packed_audio.pack_audio`), and
+        read examples from them.
+
+        Packed files contain the observation, the early reverberation of each source
+        and then the late reverberation of each source, with all channels, such that
+        a segment is read with a single seek instead of one per file. They do not
+        contain the (unaligned) non reverberant sources, so the ``'source'`` target
+        cannot be packed.
+
+        Args:
+            packed_dir (str): Directory of the packed files.
+            packed_ext (str): Format of the packed files, ``'.wav'`` or ``'.npy'``.
+            num_workers (int): Number of threads packing files.
+        """
+        if self.target == "source":
+            raise ValueError("Only the 'early' and 'image' targets can be packed.")
+        os.makedirs(packed_dir, exist_ok=True)
+
+        def pack_example(example):
+            out_path = os.path.join(packed_dir, example["example_id"] + packed_ext)
+            if os.path.isfile(out_path):
+                return
+            audio_path = example["audio_path"]
+            paths = [audio_path["observation"]]
+            paths += audio_path["speech_reverberation_early"]
+            paths += audio_path["speech_reverberation_tail"]
+            pack_audio(paths, out_path)
+
+        with ThreadPoolExecutor(num_workers) as executor:
+            list(executor.map(pack_example, self.dataset))
+        self.packed_dir = packed_dir
+        self.packed_ext = packed_ext
+
     def get_infos(self):
         """Get dataset infos (for publishing models).
 
@@ -0,0 +1,98 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+import soundfile as sf
+
+
+class TrackCache:
+    """LRU cache of decoded audio files, with a memory cap.
+
+    Whole files are decoded (as float32) on their first read and segments are then
+    sliced from memory, instead of seeking into (and, for compressed formats,
+    decoding) the file at each read. Least recently used files are evicted once
+    the cache holds more than ``max_bytes``. Files larger than ``max_bytes`` are
+    not cached.
+
+    Each DataLoader worker holds its own cache. With ``store_dir``, decoded files
+    are also written as ``.npy`` files and read back as memory maps: the workers
+    then share one copy of each file through the page cache (use a tmpfs such as
+    ``/dev/shm`` for a shared-memory store).
+
+    Args:
+        max_bytes (int): Maximum size of the cached files, in bytes.
+        store_dir (str, optional): Directory of the decoded ``.npy`` files.
+
+    Attributes:
+        hits (int): Number of reads served from the cache.
+        misses (int): Number of reads that decoded a file.
+        evictions (int): Number of files evicted from the cache.
+    """
+
+    def __init__(self, max_bytes, store_dir=None):
+        self.max_bytes = max_bytes
+        self.store_dir = store_dir
+        if store_dir is not None:
+            os.makedirs(store_dir, exist_ok=True)
+        self._tracks = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def read(self, path, start=0, stop=None):
+        """Read frames ``start`` to ``stop`` of a file, as ``soundfile.read``.
+
+        Returns:
+            numpy.ndarray: The audio, of shape $(frames, channels)$ and dtype float32.
+        """
+        path = str(path)
+        audio = self._tracks.get(path)
+        if audio is None:
+            self.misses += 1
+            audio = self._load(path)
+            if audio.nbytes <= self.max_bytes:
+                self._tracks[path] = audio
+                self.size += audio.nbytes
+                self._evict()
+        else:
+            self.hits += 1
+            self._tracks.move_to_end(path)
+        return np.array(audio[start:stop])
+
+    def stats(self):
+        """Hit and miss statistics of the cache."""
+        n_reads = self.hits + self.misses
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hits / n_reads if n_reads else 0.0,
+            evictions=self.evictions,
+            n_tracks=len(self._tracks),
+            size_bytes=self.size,
+        )
+
+    def clear(self):
+        self._tracks.clear()
+        self.size = 0
+
+    def _evict(self):
+        while self.size > self.max_bytes:
+            _, audio = self._tracks.popitem(last=False)
+            self.size -= audio.nbytes
+            self.evictions += 1
+
+    def _load(self, path):
+        if self.store_dir is None:
+            return sf.read(path, dtype="float32", always_2d=True)[0]
+        stat = os.stat(path)
+        key = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        npy_path = os.path.join(self.store_dir, hashlib.sha1(key.encode()).hexdigest() + ".npy")
+        if not os.path.isfile(npy_path):
+            audio = sf.read(path, dtype="float32", always_2d=True)[0]
+            # Write atomically, other workers may be reading the same file.
+            tmp_path = f"{npy_path}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, audio)
+            os.replace(tmp_path, npy_path)
+        return np.load(npy_path, mmap_mode="r")
@@ -12,12 +12,9 @@ def online_mixing_collate(batch):
     batch, n_src, _ = targets.shape
 
     energies = torch.sum(targets**2, dim=-1, keepdim=True)
-    new_src = []
-    for i in range(targets.shape[1]):
-        new_s = targets[torch.randperm(batch), i, :]
-        new_s = new_s * torch.sqrt(energies[:, i] / (new_s**2).sum(-1, keepdims=True))
-        new_src.append(new_s)
-
-    targets = torch.stack(new_src, dim=1)
+    # One batch permutation per source, applied with a single gather.
+    perms = torch.argsort(torch.rand(n_src, batch), dim=-1).t()
+    new_src = targets[perms, torch.arange(n_src)]
+    targets = new_src * torch.sqrt(energies / (new_src**2).sum(-1, keepdim=True))
     inputs = targets.sum(1)
     return inputs, targets
@@ -1,15 +1,18 @@
 import json
+import os
 import soundfile as sf
 import torch
 from torch.utils.data import Dataset, DataLoader
-import random
+
+from .audio_index import AudioIndex
 
 
 class LibriVADDataset(Dataset):
     """Dataset class for Voice Activity Detection.
 
     Args:
-        md_file_path (str): The path to the metadata file.
+        md_file_path (str): The path to the metadata file. The lengths of the files
+            are indexed in ``audio_index.json`` next to it (see :class:`AudioIndex`).
     """
 
     def __init__(self, md_file_path, sample_rate=8000, segment=3):
@@ -19,6 +22,10 @@ class LibriVADDataset(Dataset):
             self.md = json.load(json_file)
         self.segment = segment
         self.sample_rate = sample_rate
+        self.audio_index = AudioIndex(
+            [row["mixture_path"] for row in self.md],
+            index_path=os.path.join(os.path.dirname(md_file_path), "audio_index.json"),
+        )
 
     def __len__(self):
         return len(self.md)
@@ -28,10 +35,10 @@ class LibriVADDataset(Dataset):
         row = self.md[idx]
         # Get mixture path
         self.source_path = row[f"mixture_path"]
-        length = len(sf.read(self.source_path)[0])
+        length = self.audio_index.frames(self.source_path)
         if self.segment is not None:
-            start = random.randint(0, length - int(self.segment * self.sample_rate))
-            stop = start + int(self.segment * self.sample_rate)
+            seg_len = int(self.segment * self.sample_rate)
+            start, stop = self.audio_index.sample_segment(self.source_path, seg_len)
         else:
             start = 0
             stop = None
@@ -40,6 +47,9 @@ class LibriVADDataset(Dataset):
         # Convert sources to tensor
         source = torch.from_numpy(s)
         label = from_vad_to_label(length, row["VAD"], start, stop).unsqueeze(0)
+        if stop is not None and len(source) < stop - start:
+            source = torch.nn.functional.pad(source, (0, stop - start - len(source)))
+            label = torch.nn.functional.pad(label, (0, stop - start - label.shape[-1]))
         return source, label
 
 
@@ -1,5 +1,5 @@
 from .consistency import mixture_consistency
-from .overlap_add import LambdaOverlapAdd, DualPathProcessing
+from .overlap_add import LambdaOverlapAdd, DualPathProcessing, strided_unfold, overlap_add
 from .beamforming import (
     SCM,
     Beamformer,
@@ -7,10 +7,16 @@ from .beamforming import (
     SoudenMVDRBeamformer,
     SDWMWFBeamformer,
     GEVBeamformer,
+    BeamformerPipeline,
+    OnlineSCM,
+    OnlineMVDRBeamformer,
+    OnlineGEVBeamformer,
 )
 
 __all__ = [
     "mixture_consistency",
     "LambdaOverlapAdd",
     "DualPathProcessing",
+    "strided_unfold",
+    "overlap_add",
 ]
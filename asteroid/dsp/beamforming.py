@@ -10,6 +10,59 @@ class SCM(nn.Module):
         return compute_scm(x, mask=mask, normalize=normalize)
 
 
+class OnlineSCM(nn.Module):
+    r"""Recursive SCM estimation with exponential forgetting, for block-online processing.
+
+    Each frame contributes a (masked) rank-1 update
+    :math:`\mathbf{R}_t = \alpha \mathbf{R}_{t-1} + m_t \mathbf{x}_t \mathbf{x}_t^H`
+    and the SCM is :math:`\mathbf{R}_t / w_t` with :math:`w_t = \alpha w_{t-1} + m_t`.
+    The updates of all the frames of a chunk are applied at once. With
+    ``forgetting_factor=1``, feeding an utterance chunk by chunk gives
+    the same SCM as :func:`compute_scm` on the whole utterance.
+
+    Args:
+        forgetting_factor (float): :math:`\alpha`, in (0, 1].
+        normalize (bool): Whether to normalize with the (decayed) sum of the mask.
+    """
+
+    def __init__(self, forgetting_factor: float = 0.99, normalize: bool = True):
+        super().__init__()
+        if not 0 < forgetting_factor <= 1:
+            raise ValueError(f"Expected forgetting_factor in (0, 1], received {forgetting_factor}")
+        self.forgetting_factor = forgetting_factor
+        self.normalize = normalize
+
+    def forward(self, x: torch.Tensor, mask: torch.Tensor = None, state=None):
+        """Update the SCM estimate with a chunk of frames.
+
+        Args:
+            x (torch.ComplexTensor): shape [batch, mics, freqs, frames]
+            mask (torch.Tensor): [batch, freqs, frames] or [batch, 1, freqs, frames]. Optional
+            state (tuple, optional): ``(acc_scm, acc_weight)`` returned by the previous call.
+
+        Returns:
+            tuple:
+                torch.ComplexTensor, the SCM at the last frame with shape (batch, mics, mics, freqs).
+                tuple, the state ``(acc_scm, acc_weight)`` to pass to the next call.
+        """
+        batch, mics, freqs, frames = x.shape
+        if mask is None:
+            mask = torch.ones(batch, 1, freqs, frames, dtype=x.real.dtype, device=x.device)
+        if mask.ndim == 3:
+            mask = mask[:, None]
+        # Weight of each frame at the end of the chunk: alpha ** (frames - 1 - t).
+        exponents = torch.arange(frames - 1, -1, -1, device=x.device, dtype=mask.dtype)
+        weighted_mask = mask * self.forgetting_factor**exponents
+        acc_scm = torch.einsum("bmft,bnft->bmnf", weighted_mask * x, x.conj())
+        acc_weight = weighted_mask.sum(-1, keepdim=True).transpose(-1, -2)  # -> b11f
+        if state is not None:
+            decay = self.forgetting_factor**frames
+            acc_scm = acc_scm + decay * state[0]
+            acc_weight = acc_weight + decay * state[1]
+        scm = acc_scm / acc_weight if self.normalize else acc_scm
+        return scm, (acc_scm, acc_weight)
+
+
 class Beamformer(nn.Module):
     """Base class for beamforming modules."""
 
@@ -332,6 +385,447 @@ class GEVDBeamformer(Beamformer):
         return self.apply_beamforming_vector(bf_vect, mix=mix)
 
 
+class SCMDecomposition:
+    r"""Generalized eigenvalue decomposition of a (target, noise) SCM pair.
+
+    The decomposition is computed once, in a single batched call over batch and
+    frequencies, and all the beamforming matrices of the SDW-MWF family
+    (Souden MVDR, SDW-MWF, GEVD) and the GEV vector derive from it.
+    With :math:`\mathbf{V}^H \Sigma_{nn} \mathbf{V} = \mathbf{I}` and
+    :math:`\mathbf{V}^H \Sigma_{ss} \mathbf{V} = \Lambda`, the beamforming
+    matrices write :math:`\mathbf{V} g(\Lambda) \mathbf{V}^{-1}` where only the
+    gain function :math:`g` changes between beamformers.
+
+    Args:
+        target_scm (torch.ComplexTensor): (batch, mics, mics, freqs)
+        noise_scm (torch.ComplexTensor): (batch, mics, mics, freqs)
+        eps (float): Diagonal loading used for the noise SCMs which are not
+            positive definite (only those are conditioned).
+
+    Attributes:
+        e_val (torch.Tensor): Generalized eigenvalues in ascending order (batch, freqs, mics).
+        e_vec (torch.ComplexTensor): Generalized eigenvectors :math:`\mathbf{V}`
+            (batch, freqs, mics, mics).
+        e_vec_inv (torch.ComplexTensor): :math:`\mathbf{V}^{-1}` (batch, freqs, mics, mics).
+    """
+
+    def __init__(self, target_scm: torch.Tensor, noise_scm: torch.Tensor, eps: float = 1e-6):
+        self.input_dtype = _common_dtype(target_scm, noise_scm)
+        solve_dtype = self.input_dtype
+        if self.input_dtype not in [torch.float64, torch.complex128]:
+            solve_dtype = _precision_mapping()[self.input_dtype]
+        target_scm_t = target_scm.permute(0, 3, 1, 2).to(solve_dtype)  # -> bfmm
+        noise_scm_t = noise_scm.permute(0, 3, 1, 2).to(solve_dtype)  # -> bfmm
+
+        cholesky = _stable_cholesky(noise_scm_t, eps=eps)
+        eye = torch.eye(cholesky.shape[-1], dtype=solve_dtype, device=cholesky.device)
+        inv_cholesky = torch.linalg.solve_triangular(cholesky, eye.expand_as(cholesky), upper=False)
+        # C = L^-1 Σss L^-H, V = L^-H Q and V^-1 = Q^H L^H (no extra inversion).
+        cmat = inv_cholesky @ target_scm_t @ inv_cholesky.mH
+        e_val, e_vec = torch.linalg.eigh(cmat)
+        self.e_val = e_val
+        self.e_vec = inv_cholesky.mH @ e_vec
+        self.e_vec_inv = (cholesky @ e_vec).mH
+
+    def filter_matrix(self, gains: torch.Tensor):
+        r"""Return :math:`\mathbf{V} diag(gains) \mathbf{V}^{-1}` (batch, freqs, mics, mics)."""
+        return (self.e_vec * gains.to(self.e_vec.dtype)[..., None, :]) @ self.e_vec_inv
+
+    def clamped_eigenvalues(self, max_val: float = None):
+        """Generalized eigenvalues, clamped to be positive."""
+        return torch.clamp(self.e_val, min=torch.finfo(self.e_val.dtype).eps, max=max_val)
+
+    def mvdr_gains(self, eps: float = 1e-8):
+        r"""Gains of Souden's MVDR: :math:`\Lambda / Tr(\Lambda)`."""
+        return self.e_val / (self.e_val.sum(-1, keepdim=True) + eps)
+
+    def mwf_gains(self, mu: float = 1.0, rank: int = None, max_val: float = None):
+        r"""Gains of the SDW-MWF :math:`\Lambda (\Lambda + \mu I)^{-1}`, optionally
+        restricted to the ``rank`` highest eigenvalues (GEVD beamformer)."""
+        e_val = self.clamped_eigenvalues(max_val=max_val)
+        gains = e_val / (e_val + mu)
+        if rank:
+            gains[..., :-rank] = 0.0
+        return gains
+
+    def gev_vector(self):
+        """Normalized principal generalized eigenvector (batch, mics, freqs)."""
+        bf_vect = self.e_vec[..., -1]
+        bf_vect = bf_vect / torch.norm(bf_vect, dim=-1, keepdim=True)
+        return bf_vect.transpose(-1, -2).to(self.input_dtype)
+
+    def reference_snr(self, gains: torch.Tensor, eps: float = 1e-6):
+        r"""A posteriori SNR of each reference mic for the filter with ``gains``.
+
+        Equivalent to :func:`get_optimal_reference_mic`'s criterion, but evaluated
+        in the eigenspace for all mics at once: with :math:`\mathbf{U} = \mathbf{V}^{-1}`,
+        the output noise power of mic :math:`m` is :math:`\sum_k g_k^2 |U_{km}|^2`
+        and the target power is :math:`\sum_k g_k^2 \lambda_k |U_{km}|^2`.
+
+        Returns:
+            torch.Tensor of shape (batch, mics).
+        """
+        gains_sq = gains**2  # bfk
+        u_pow = self.e_vec_inv.abs() ** 2  # bfkm
+        weights = torch.stack([gains_sq * self.e_val, gains_sq])  # -> 2bfk
+        powers = torch.einsum("sbfk,bfkm->sbm", weights, u_pow)
+        return powers[0] / torch.clamp(powers[1], min=eps)
+
+    def beamforming_vector(self, gains: torch.Tensor, ref_mic=0):
+        """Return the beamforming vector (batch, mics, freqs) for ``gains`` and ``ref_mic``.
+
+        Args:
+            gains (torch.Tensor): Gains applied to the generalized eigenvalues (batch, freqs, mics).
+            ref_mic (Optional[Union[int, torch.Tensor]]): See
+                :meth:`Beamformer.get_reference_mic_vects`. If None, the mic maximizing
+                :meth:`reference_snr` is selected.
+        """
+        bf_mat = self.filter_matrix(gains)
+        if ref_mic is None:
+            ref_mic = torch.argmax(self.reference_snr(gains), dim=-1)
+        batch_mic_vects = Beamformer.get_reference_mic_vects(ref_mic, bf_mat)
+        bf_vect = torch.matmul(bf_mat, batch_mic_vects.to(bf_mat.dtype))  # -> bfmm  -> bfm1
+        return bf_vect.squeeze(-1).transpose(-1, -2).to(self.input_dtype)  # bfm1 -> bmf
+
+
+class BeamformerPipeline(Beamformer):
+    """Compute several beamformers from a shared SCM estimation and factorization.
+
+    Target and noise SCMs are computed once, their generalized eigenvalue
+    decomposition is computed once for all frequencies
+    (see :class:`SCMDecomposition`), and it is shared across the requested
+    beamformers and the reference microphone selection. Use it instead of
+    calling several :class:`Beamformer` on the same SCMs.
+
+    Args:
+        beamformers (tuple of str): Beamformers to compute, among
+            ``"souden_mvdr"``, ``"rtf_mvdr"``, ``"sdw_mwf"``, ``"gev"`` and ``"gevd"``.
+        mu (float): Speech distortion constant of the SDW-MWF and GEVD beamformers.
+        rank (int): Rank of the GEVD beamformer (see :class:`GEVDBeamformer`).
+        eps (float): Diagonal loading of the non positive definite noise SCMs.
+
+    Examples
+        >>> pipeline = BeamformerPipeline(beamformers=("souden_mvdr", "gev"))
+        >>> outputs = pipeline(mix_stft, target_mask=speech_mask, noise_mask=noise_mask)
+        >>> outputs["gev"].shape  # (batch, freqs, frames)
+    """
+
+    _supported = ("souden_mvdr", "rtf_mvdr", "sdw_mwf", "gev", "gevd")
+
+    def __init__(
+        self,
+        beamformers=("souden_mvdr", "sdw_mwf", "gev", "gevd"),
+        mu: float = 1.0,
+        rank: int = 1,
+        eps: float = 1e-6,
+    ):
+        super().__init__()
+        unknown = set(beamformers) - set(self._supported)
+        if unknown:
+            raise ValueError(
+                f"Unsupported beamformers {sorted(unknown)}. Expected any of {self._supported}."
+            )
+        self.beamformers = tuple(beamformers)
+        self.mu = mu
+        self.rank = rank
+        self.eps = eps
+
+    def forward(
+        self,
+        mix: torch.Tensor,
+        target_mask: torch.Tensor = None,
+        noise_mask: torch.Tensor = None,
+        target_scm: torch.Tensor = None,
+        noise_scm: torch.Tensor = None,
+        ref_mic: Union[torch.Tensor, torch.LongTensor, int] = None,
+    ):
+        """Compute and apply all the beamformers.
+
+        Args:
+            mix (torch.ComplexTensor): shape (batch, mics, freqs, frames)
+            target_mask (torch.Tensor): (batch, freqs, frames) or (batch, 1, freqs, frames).
+                Used to compute ``target_scm`` if it is not given.
+            noise_mask (torch.Tensor): (batch, freqs, frames) or (batch, 1, freqs, frames).
+                Used to compute ``noise_scm`` if it is not given.
+            target_scm (torch.ComplexTensor): (batch, mics, mics, freqs). Optional.
+            noise_scm (torch.ComplexTensor): (batch, mics, mics, freqs). Optional.
+            ref_mic (Optional[Union[int, torch.Tensor]]): reference microphone,
+                see :meth:`Beamformer.get_reference_mic_vects`. If None, it is
+                selected per beamformer from the shared decomposition.
+
+        Returns:
+            dict mapping each beamformer name to the filtered mixture,
+            torch.ComplexTensor (batch, freqs, frames).
+        """
+        if target_scm is None:
+            target_scm = compute_scm(mix, mask=target_mask)
+        if noise_scm is None:
+            noise_scm = compute_scm(mix, mask=noise_mask)
+        decomposition = SCMDecomposition(target_scm, noise_scm, eps=self.eps)
+        return {
+            name: self.apply_beamforming_vector(bf_vect, mix=mix)
+            for name, bf_vect in self.compute_beamforming_vectors(
+                decomposition, target_scm=target_scm, noise_scm=noise_scm, ref_mic=ref_mic
+            ).items()
+        }
+
+    def compute_beamforming_vectors(
+        self,
+        decomposition: SCMDecomposition,
+        target_scm: torch.Tensor = None,
+        noise_scm: torch.Tensor = None,
+        ref_mic=None,
+    ):
+        """Return a dict of beamforming vectors (batch, mics, freqs) from a decomposition.
+
+        ``target_scm`` and ``noise_scm`` are only needed for ``"rtf_mvdr"``.
+        """
+        bf_vects = {}
+        for name in self.beamformers:
+            if name == "souden_mvdr":
+                gains = decomposition.mvdr_gains()
+                bf_vects[name] = decomposition.beamforming_vector(gains, ref_mic=ref_mic)
+            elif name == "sdw_mwf":
+                gains = decomposition.mwf_gains(mu=self.mu)
+                bf_vects[name] = decomposition.beamforming_vector(gains, ref_mic=ref_mic)
+            elif name == "gevd":
+                gains = decomposition.mwf_gains(mu=self.mu, rank=self.rank, max_val=1e6)
+                # Same as GEVDBeamformer, which always uses the first mic.
+                ref = 0 if ref_mic is None else ref_mic
+                bf_vects[name] = decomposition.beamforming_vector(gains, ref_mic=ref)
+            elif name == "gev":
+                bf_vects[name] = decomposition.gev_vector()
+            elif name == "rtf_mvdr":
+                bf_vects[name] = self._rtf_mvdr_vector(decomposition, target_scm)
+        return bf_vects
+
+    @staticmethod
+    def _rtf_mvdr_vector(decomposition: SCMDecomposition, target_scm: torch.Tensor):
+        # Σnn^-1 = V V^H: reuse the decomposition instead of solving again.
+        _, e_vec = torch.linalg.eigh(target_scm.permute(0, 3, 1, 2))
+        rtf_vec = e_vec[..., -1:].to(decomposition.e_vec.dtype)  # -> bfm1
+        e_vec = decomposition.e_vec
+        numerator = e_vec @ (e_vec.mH @ rtf_vec)  # -> bfm1
+        denominator = torch.matmul(rtf_vec.mH, numerator)  # -> bf11
+        bf_vect = (numerator / denominator).squeeze(-1).transpose(-1, -2)  # -> bmf
+        return bf_vect.to(decomposition.input_dtype)
+
+
+class _OnlineBeamformer(Beamformer):
+    """Base class for block-online beamformers.
+
+    The target SCM is tracked with :class:`OnlineSCM` and the inverse of the noise
+    SCM with rank-1 Sherman-Morrison updates (see :func:`sherman_morrison_update`),
+    so that the filter is updated every ``update_every`` frames without solving
+    a linear system from scratch. The filter used for a block of frames is computed
+    from the statistics up to the end of this block.
+    All the statistics are scale invariant for the supported beamformers, they are
+    kept unnormalized.
+
+    Args:
+        forgetting_factor (float): Forgetting factor of the SCM estimates, in (0, 1].
+            With ``1`` and ``update_every`` larger than the number of frames, the output
+            matches the corresponding offline beamformer.
+        update_every (int): Number of frames between two filter updates.
+        diag_loading (float): Initial noise SCM is ``diag_loading * I``, to make it invertible.
+            The loading is topped up after each update so that it does not fade with the
+            forgetting factor (see :meth:`load_diagonal`).
+    """
+
+    def __init__(
+        self, forgetting_factor: float = 0.99, update_every: int = 1, diag_loading: float = 1e-6
+    ):
+        super().__init__()
+        self.target_scm = OnlineSCM(forgetting_factor=forgetting_factor, normalize=False)
+        self.forgetting_factor = forgetting_factor
+        self.update_every = update_every
+        self.diag_loading = diag_loading
+
+    def forward(
+        self,
+        mix: torch.Tensor,
+        target_mask: torch.Tensor,
+        noise_mask: torch.Tensor,
+        state: dict = None,
+    ):
+        """Beamform a chunk of frames, updating the statistics along the way.
+
+        Args:
+            mix (torch.ComplexTensor): shape (batch, mics, freqs, frames)
+            target_mask (torch.Tensor): (batch, freqs, frames) or (batch, 1, freqs, frames)
+            noise_mask (torch.Tensor): (batch, freqs, frames) or (batch, 1, freqs, frames)
+            state (dict, optional): State returned by the previous call, to process a
+                stream chunk by chunk.
+
+        Returns:
+            tuple:
+                Filtered mixture. torch.ComplexTensor (batch, freqs, frames)
+                dict, the state to pass to the next call. ``state["bf_vect"]`` holds the
+                current beamforming vector (batch, mics, freqs).
+        """
+        if target_mask.ndim == 3:
+            target_mask = target_mask[:, None]
+        if noise_mask.ndim == 3:
+            noise_mask = noise_mask[:, None]
+        input_dtype = mix.dtype
+        solve_dtype = input_dtype
+        if input_dtype not in [torch.float64, torch.complex128]:
+            solve_dtype = _precision_mapping()[input_dtype]
+        mix_solve = mix.to(solve_dtype)
+        target_mask = target_mask.to(mix_solve.real.dtype)
+        noise_mask = noise_mask.to(mix_solve.real.dtype)
+
+        if state is None:
+            state = self.init_state(mix_solve)
+        outputs = []
+        for start in range(0, mix.shape[-1], self.update_every):
+            block = slice(start, start + self.update_every)
+            _, state["target"] = self.target_scm(
+                mix_solve[..., block], mask=target_mask[..., block], state=state["target"]
+            )
+            for t in range(block.start, min(block.stop, mix.shape[-1])):
+                state["noise_inv"] = sherman_morrison_update(
+                    state["noise_inv"],
+                    mix_solve[..., t].transpose(-1, -2),  # -> bfm
+                    noise_mask[:, 0, :, t],
+                    forgetting_factor=self.forgetting_factor,
+                )
+            n_frames = min(block.stop, mix.shape[-1]) - block.start
+            state["noise_inv"] = self.load_diagonal(state["noise_inv"], n_frames)
+            target_scm = state["target"][0].permute(0, 3, 1, 2)  # -> bfmm
+            state["bf_vect"] = self.compute_beamforming_vector(
+                target_scm, state["noise_inv"], state["bf_vect"]
+            )
+            outputs.append(
+                self.apply_beamforming_vector(state["bf_vect"], mix=mix_solve[..., block])
+            )
+        return torch.cat(outputs, dim=-1).to(input_dtype), state
+
+    def init_state(self, mix: torch.Tensor):
+        """Return the initial state for a mixture of shape (batch, mics, freqs, frames)."""
+        batch, mics, freqs, _ = mix.shape
+        eye = torch.eye(mics, dtype=mix.dtype, device=mix.device)
+        return {
+            "target": None,
+            "noise_inv": (eye / self.diag_loading).expand(batch, freqs, mics, mics).clone(),
+            "bf_vect": None,
+        }
+
+    def load_diagonal(self, noise_scm_inv: torch.Tensor, n_frames: int):
+        r"""Add :math:`\delta (1 - \alpha^n) \mathbf{I}` to the noise SCM after ``n`` frames.
+
+        The initial diagonal loading :math:`\delta \mathbf{I}` fades as :math:`\alpha^t`
+        and the inverse grows without bound when the noise mask stays at zero. This keeps
+        the noise SCM above :math:`\delta \mathbf{I}` (it does nothing with
+        ``forgetting_factor=1``), with one Sherman-Morrison update per microphone.
+        """
+        loading = self.diag_loading * (1 - self.forgetting_factor**n_frames)
+        if loading == 0:
+            return noise_scm_inv
+        mics = noise_scm_inv.shape[-1]
+        eye = torch.eye(mics, dtype=noise_scm_inv.dtype, device=noise_scm_inv.device)
+        weight = torch.full(
+            noise_scm_inv.shape[:-2], loading, dtype=eye.real.dtype, device=eye.device
+        )
+        for mic_vect in eye:
+            noise_scm_inv = sherman_morrison_update(
+                noise_scm_inv, mic_vect.expand(noise_scm_inv.shape[:-1]), weight
+            )
+        return noise_scm_inv
+
+    def compute_beamforming_vector(
+        self, target_scm: torch.Tensor, noise_scm_inv: torch.Tensor, prev_bf_vect: torch.Tensor
+    ):
+        """Compute the beamforming vector (batch, mics, freqs) from the target SCM
+        (batch, freqs, mics, mics), the inverse noise SCM (batch, freqs, mics, mics) and the
+        previous beamforming vector (None at the first update)."""
+        raise NotImplementedError
+
+
+class OnlineMVDRBeamformer(_OnlineBeamformer):
+    r"""Block-online MVDR beamformer (Souden's formulation, see :class:`SoudenMVDRBeamformer`).
+
+    :math:`\mathbf{w}_t = \displaystyle \frac{\Sigma_{nn, t}^{-1} \Sigma_{ss, t}}{
+    Tr\left( \Sigma_{nn, t}^{-1} \Sigma_{ss, t} \right) }\mathbf{u}`, where the
+    inverse noise SCM is tracked with Sherman-Morrison updates.
+
+    Args:
+        forgetting_factor (float): See :class:`_OnlineBeamformer`.
+        update_every (int): See :class:`_OnlineBeamformer`.
+        diag_loading (float): See :class:`_OnlineBeamformer`.
+        ref_mic (Union[int, torch.Tensor]): reference microphone, see
+            :meth:`Beamformer.get_reference_mic_vects`.
+        eps (float): numerical stabilizer.
+    """
+
+    def __init__(
+        self,
+        forgetting_factor: float = 0.99,
+        update_every: int = 1,
+        diag_loading: float = 1e-6,
+        ref_mic: Union[torch.Tensor, torch.LongTensor, int] = 0,
+        eps: float = 1e-8,
+    ):
+        super().__init__(
+            forgetting_factor=forgetting_factor,
+            update_every=update_every,
+            diag_loading=diag_loading,
+        )
+        self.ref_mic = ref_mic
+        self.eps = eps
+
+    def compute_beamforming_vector(self, target_scm, noise_scm_inv, prev_bf_vect):
+        numerator = torch.matmul(noise_scm_inv, target_scm)
+        bf_mat = numerator / (batch_trace(numerator)[..., None, None] + self.eps)  # bfmm
+        batch_mic_vects = self.get_reference_mic_vects(self.ref_mic, bf_mat)
+        bf_vect = torch.matmul(bf_mat, batch_mic_vects.to(bf_mat.dtype))  # -> bfm1
+        return bf_vect.squeeze(-1).transpose(-1, -2)  # bfm1 -> bmf
+
+
+class OnlineGEVBeamformer(_OnlineBeamformer):
+    r"""Block-online GEV beamformer (see :class:`GEVBeamformer`).
+
+    The principal eigenvector of :math:`\Sigma_{nn, t}^{-1}\Sigma_{ss, t}` is tracked
+    with a few power iterations per update, warm-started from the previous
+    filter (or from ones where it vanished), instead of a full generalized
+    eigenvalue decomposition.
+
+    Args:
+        forgetting_factor (float): See :class:`_OnlineBeamformer`.
+        update_every (int): See :class:`_OnlineBeamformer`.
+        diag_loading (float): See :class:`_OnlineBeamformer`.
+        n_power_iterations (int): Number of power iterations per update.
+    """
+
+    def __init__(
+        self,
+        forgetting_factor: float = 0.99,
+        update_every: int = 1,
+        diag_loading: float = 1e-6,
+        n_power_iterations: int = 3,
+    ):
+        super().__init__(
+            forgetting_factor=forgetting_factor,
+            update_every=update_every,
+            diag_loading=diag_loading,
+        )
+        self.n_power_iterations = n_power_iterations
+
+    def compute_beamforming_vector(self, target_scm, noise_scm_inv, prev_bf_vect):
+        operator = torch.matmul(noise_scm_inv, target_scm)  # bfmm
+        bf_vect = torch.ones_like(operator[..., 0])  # bfm
+        if prev_bf_vect is not None:
+            # Re-seed the bins where the filter collapsed (e.g. no target activity yet),
+            # the power iterations would otherwise stay at zero forever.
+            prev_bf_vect = prev_bf_vect.transpose(-1, -2)  # bmf -> bfm
+            degenerate = torch.norm(prev_bf_vect, dim=-1, keepdim=True) < 1e-20
+            bf_vect = torch.where(degenerate, bf_vect, prev_bf_vect)
+        for _ in range(self.n_power_iterations):
+            bf_vect = torch.matmul(operator, bf_vect.unsqueeze(-1)).squeeze(-1)
+            bf_vect = bf_vect / torch.clamp(torch.norm(bf_vect, dim=-1, keepdim=True), min=1e-30)
+        return bf_vect.transpose(-1, -2)  # bfm -> bmf
+
+
 def compute_scm(x: torch.Tensor, mask: torch.Tensor = None, normalize: bool = True):
     """Compute the spatial covariance matrix from a STFT signal x.
 
@@ -371,35 +865,66 @@ def get_optimal_reference_mic(
         eps: value to clip the denominator.
 
     Returns:
-        torch.
+        torch.LongTensor of size ``batch``, the optimal reference mic indices.
 
     References
         Erdogan et al. 2016: "Improved MVDR beamforming using single-channel maskprediction networks"
             https://www.merl.com/publications/docs/TR2016-072.pdf
     """
-    den = torch.clamp(
-        torch.einsum("...flm,...fln,...fnm->...m", bf_mat.conj(), noise_scm, bf_mat).real, min=eps
-    )
-    snr_post = (
-        torch.einsum("...flm,...fln,...fnm->...m", bf_mat.conj(), target_scm, bf_mat).real / den
-    )
+    # Target and noise quadratic forms for all mics in a single matmul: diag(W^H Σ W).
+    scms = torch.stack([target_scm, noise_scm])  # -> 2bfmm
+    quad_forms = (bf_mat.conj() * torch.matmul(scms, bf_mat)).sum(-2).sum(-2).real  # -> 2bm
+    snr_post = quad_forms[0] / torch.clamp(quad_forms[1], min=eps)
     assert torch.all(torch.isfinite(snr_post)), snr_post
     return torch.argmax(snr_post, dim=-1)
 
 
+def sherman_morrison_update(
+    inv: torch.Tensor, x: torch.Tensor, weight: torch.Tensor = None, forgetting_factor: float = 1.0
+):
+    r"""Update the inverse of a matrix after a weighted rank-1 update.
+
+    Return the inverse of :math:`\alpha \mathbf{R} + w \mathbf{x}\mathbf{x}^H` given
+    :math:`\mathbf{P} = \mathbf{R}^{-1}` (Hermitian), without any matrix inversion:
+    :math:`\frac{1}{\alpha}\left(\mathbf{P} - \frac{w \mathbf{P}\mathbf{x}
+    \mathbf{x}^H \mathbf{P}}{\alpha + w \mathbf{x}^H \mathbf{P} \mathbf{x}}\right)`.
+
+    Args:
+        inv (torch.ComplexTensor): :math:`\mathbf{P}`, shape (..., mics, mics).
+        x (torch.ComplexTensor): shape (..., mics).
+        weight (torch.Tensor): :math:`w`, shape (...). Defaults to 1.
+        forgetting_factor (float): :math:`\alpha`.
+
+    Returns:
+        torch.ComplexTensor, shape (..., mics, mics).
+    """
+    if weight is None:
+        weight = torch.ones(x.shape[:-1], dtype=x.real.dtype, device=x.device)
+    gain = torch.matmul(inv, x.unsqueeze(-1))  # -> ...m1
+    denominator = forgetting_factor + weight * torch.sum(x.conj() * gain.squeeze(-1), -1).real
+    update = (weight / denominator)[..., None, None] * torch.matmul(gain, gain.mH)
+    return (inv - update) / forgetting_factor
+
+
 def condition_scm(x, eps=1e-6, dim1=-2, dim2=-1):
     """Condition input SCM with (x + eps tr(x) I) / (1 + eps) along `dim1` and `dim2`.
 
     See https://stt.msu.edu/users/mauryaas/Ashwini_JPEN.pdf (2.3).
     """
-    # Assume 4d with ...mm
+    # Assume ...mm
     if dim1 != -2 or dim2 != -1:
         raise NotImplementedError
     scale = eps * batch_trace(x, dim1=dim1, dim2=dim2)[..., None, None] / x.shape[dim1]
-    scaled_eye = torch.eye(x.shape[dim1], device=x.device)[None, None] * scale
+    scaled_eye = torch.eye(x.shape[dim1], device=x.device) * scale
     return (x + scaled_eye) / (1 + eps)
 
 
+def _condition_failed(x, info, eps=1e-6):
+    """Condition only the matrices of the batch `x` for which `info` (from ``*_ex``
+    linalg functions) reports a failure. The other matrices are left untouched."""
+    return torch.where((info != 0)[..., None, None], condition_scm(x, eps), x)
+
+
 def batch_trace(x, dim1=-2, dim2=-1):
     """Compute the trace along `dim1` and `dim2` for a any matrix `ndim>=2`."""
     return torch.diagonal(x, dim1=dim1, dim2=dim2).sum(-1)
@@ -416,11 +941,11 @@ def stable_solve(b, a):
 
 
 def _stable_solve(b, a, eps=1e-6):
-    try:
-        return torch.linalg.solve(a, b)
-    except RuntimeError:
-        a = condition_scm(a, eps)
-        return torch.linalg.solve(a, b)
+    # Batched: only the singular matrices are conditioned, in a single extra call.
+    sol, info = torch.linalg.solve_ex(a, b)
+    if torch.any(info != 0):
+        sol = torch.linalg.solve(_condition_failed(a, info, eps), b)
+    return sol
 
 
 def stable_cholesky(input, upper=False, out=None, eps=1e-6):
@@ -442,15 +967,15 @@ def stable_cholesky(input, upper=False, out=None, eps=1e-6):
 
 
 def _stable_cholesky(input, upper=False, out=None, eps=1e-6):
-    try:
-        if upper:
-            return torch.linalg.cholesky(input, out=out).mH
-        return torch.linalg.cholesky(input, out=out)
-    except RuntimeError:
-        input = condition_scm(input, eps)
-        if upper:
-            return torch.linalg.cholesky(input, out=out).mH
-        return torch.linalg.cholesky(input, out=out)
+    # Batched: only the non-p.d. matrices are conditioned, in a single extra call.
+    chol, info = torch.linalg.cholesky_ex(input)
+    if torch.any(info != 0):
+        chol = torch.linalg.cholesky(_condition_failed(input, info, eps))
+    if upper:
+        chol = chol.mH
+    if out is not None:
+        return out.copy_(chol)
+    return chol
 
 
 def generalized_eigenvalue_decomposition(a, b):
@@ -1,4 +1,7 @@
+from typing import Optional
+
 import torch
+import torch.nn.functional as F
 from torch import nn
 from ..losses.pit_wrapper import PITReorder
 
@@ -202,6 +205,71 @@ def _reorder_sources(
     return current.reshape(batch, frames)
 
 
+def strided_unfold(x, chunk_size: int, hop_size: int, padding: Optional[int] = None):
+    r"""Split the last dimension of `x` in overlapping chunks, without copying them.
+
+    Equivalent to :func:`torch.nn.functional.unfold` applied on the last dimension, with
+    `padding` zeros on both sides, but the chunks are a strided view of the padded input
+    instead of a $(\dots, chunksize \times nchunks)$ copy.
+
+    Args:
+        x (:class:`torch.Tensor`): Tensor of shape $(\dots, time)$.
+        chunk_size (int): Size of the chunks.
+        hop_size (int): Hop size between consecutive chunks.
+        padding (int, optional): Number of zeros padded on both sides.
+            Defaults to `chunk_size`.
+
+    Returns:
+        :class:`torch.Tensor`: view of shape $(\dots, chunksize, nchunks)$. Chunks
+        overlap in memory, write to a copy if needed (ex: in-place operations).
+    """
+    padding = chunk_size if padding is None else padding
+    x = F.pad(x, [padding, padding])
+    return x.unfold(-1, chunk_size, hop_size).transpose(-1, -2)
+
+
+def overlap_add(x, hop_size: int, output_size: int, padding: Optional[int] = None):
+    r"""Overlap-add chunks back into a signal. Inverse of :func:`strided_unfold`,
+    up to the sum of overlapping chunks (there is no normalization).
+
+    Equivalent to :func:`torch.nn.functional.fold` applied on the last dimension,
+    without the $(\dots, chunksize \times nchunks)$ buffer. When `hop_size` divides
+    `chunk_size`, the chunks are summed with `chunk_size // hop_size` shifted
+    additions, otherwise with a single `index_add`.
+
+    Args:
+        x (:class:`torch.Tensor`): Tensor of shape $(\dots, chunksize, nchunks)$.
+        hop_size (int): Hop size between consecutive chunks.
+        output_size (int): Length of the output (before padding).
+        padding (int, optional): Number of padded samples to remove from the start.
+            Defaults to `chunk_size`.
+
+    Returns:
+        :class:`torch.Tensor`: Tensor of shape $(\dots, output\_size)$.
+    """
+    batch_shape = x.shape[:-2]
+    chunk_size, n_chunks = x.shape[-2], x.shape[-1]
+    padding = chunk_size if padding is None else padding
+    full_size = (n_chunks - 1) * hop_size + chunk_size
+    if chunk_size % hop_size == 0:
+        ratio = chunk_size // hop_size
+        # (..., ratio, n_chunks, hop_size): the i-th part of the chunk l goes to block l + i.
+        x = x.reshape(batch_shape + (ratio, hop_size, n_chunks)).transpose(-1, -2)
+        out = x.new_zeros(batch_shape + (n_chunks + ratio - 1, hop_size))
+        for i in range(ratio):
+            out[..., i : i + n_chunks, :] += x[..., i, :, :]
+        out = out.reshape(batch_shape + (full_size,))
+    else:
+        index = torch.arange(chunk_size, device=x.device).unsqueeze(1) + hop_size * torch.arange(
+            n_chunks, device=x.device
+        )
+        out = x.new_zeros(batch_shape + (full_size,))
+        out = out.index_add(-1, index.reshape(-1), x.reshape(batch_shape + (-1,)))
+    if full_size < padding + output_size:
+        out = F.pad(out, [0, padding + output_size - full_size])
+    return out[..., padding : padding + output_size]
+
+
 class DualPathProcessing(nn.Module):
     """
     Perform Dual-Path processing via overlap-add as in DPRNN [1].
@@ -236,19 +304,10 @@ class DualPathProcessing(nn.Module):
 
         """
         # x is (batch, chan, frames)
-        batch, chan, frames = x.size()
         assert x.ndim == 3
         self.n_orig_frames = x.shape[-1]
-        unfolded = torch.nn.functional.unfold(
-            x.unsqueeze(-1),
-            kernel_size=(self.chunk_size, 1),
-            padding=(self.chunk_size, 0),
-            stride=(self.hop_size, 1),
-        )
-
-        return unfolded.reshape(
-            batch, chan, self.chunk_size, -1
-        )  # (batch, chan, chunk_size, n_chunks)
+        # (batch, chan, chunk_size, n_chunks), strided view of the padded input.
+        return strided_unfold(x, self.chunk_size, self.hop_size)
 
     def fold(self, x, output_size=None):
         r"""
@@ -271,20 +330,9 @@ class DualPathProcessing(nn.Module):
         """
         output_size = output_size if output_size is not None else self.n_orig_frames
         # x is (batch, chan, chunk_size, n_chunks)
-        batch, chan, chunk_size, n_chunks = x.size()
-        to_unfold = x.reshape(batch, chan * self.chunk_size, n_chunks)
-        x = torch.nn.functional.fold(
-            to_unfold,
-            (output_size, 1),
-            kernel_size=(self.chunk_size, 1),
-            padding=(self.chunk_size, 0),
-            stride=(self.hop_size, 1),
-        )
-
+        x = overlap_add(x, self.hop_size, output_size)
         # force float div for torch jit
-        x /= float(self.chunk_size) / self.hop_size
-
-        return x.reshape(batch, chan, self.n_orig_frames)
+        return x / (float(self.chunk_size) / self.hop_size)
 
     @staticmethod
     def intra_process(x, module):
@@ -306,11 +354,9 @@ class DualPathProcessing(nn.Module):
 
         # x is (batch, channels, chunk_size, n_chunks)
         batch, channels, chunk_size, n_chunks = x.size()
-        # we reshape to batch*chunk_size, channels, n_chunks
-        x = x.transpose(1, -1).reshape(batch * n_chunks, chunk_size, channels).transpose(1, -1)
-        x = module(x)
-        x = x.reshape(batch, n_chunks, channels, chunk_size).transpose(1, -1).transpose(1, 2)
-        return x
+        # (batch * n_chunks, channels, chunk_size), only copied if the layout requires it.
+        x = module(x.permute(0, 3, 1, 2).reshape(batch * n_chunks, channels, chunk_size))
+        return x.reshape(batch, n_chunks, channels, chunk_size).permute(0, 2, 3, 1)
 
     @staticmethod
     def inter_process(x, module):
@@ -332,7 +378,5 @@ class DualPathProcessing(nn.Module):
         """
 
         batch, channels, chunk_size, n_chunks = x.size()
-        x = x.transpose(1, 2).reshape(batch * chunk_size, channels, n_chunks)
-        x = module(x)
-        x = x.reshape(batch, chunk_size, channels, n_chunks).transpose(1, 2)
-        return x
+        x = module(x.permute(0, 2, 1, 3).reshape(batch * chunk_size, channels, n_chunks))
+        return x.reshape(batch, chunk_size, channels, n_chunks).permute(0, 2, 1, 3)
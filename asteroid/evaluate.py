@@ -0,0 +1,250 @@
+"""Sharded and resumable evaluation of separation models.
+
+:func:`evaluate` runs a model on (a shard of) a test set and appends the metrics of
+each utterance to a jsonl file as soon as they are computed, so that an interrupted
+evaluation resumes where it stopped. Metrics are computed by a pool of worker
+processes while the model separates the next utterances. Once all the shards are
+done, :func:`merge_results` gathers them into ``all_metrics.csv`` and
+``final_metrics.json``.
+
+Examples
+    >>> # On each of the 4 processes (or nodes), e.g. with `--shard_id $SLURM_PROCID`
+    >>> evaluate(model, test_set, "exp/eval", sample_rate=8000, shard_id=i, n_shards=4)
+    >>> # Then, once
+    >>> final_results = merge_results("exp/eval", metrics_list=["si_sdr", "sdr"])
+"""
+import glob
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import torch
+
+from .losses import PITLossWrapper, pairwise_neg_sisdr
+from .metrics import get_metrics
+from .utils import get_device
+
+RESULTS_DIR = "results"
+
+
+def evaluate(
+    model,
+    dataset,
+    out_dir,
+    sample_rate,
+    metrics_list=("si_sdr", "sdr", "sir", "sar", "stoi"),
+    shard_id=None,
+    n_shards=None,
+    batch_size=1,
+    n_workers=0,
+    reorder=True,
+    utt_callback=None,
+    ignore_metrics_errors=False,
+):
+    """Evaluate a model on a shard of a dataset, appending results to a jsonl file.
+
+    Utterances already in the results file (from an interrupted run) are skipped.
+
+    Args:
+        model (nn.Module): Separation model, taking mixtures of shape $(batch, time)$.
+        dataset (Dataset): Test set. Items start with the mixture of shape $(time,)$
+            and the sources of shape $(n\\_src, time)$, as in :class:`LibriMix`
+            with ``segment=None``.
+        out_dir (str): Evaluation directory. Results are written in
+            ``out_dir/results/shard_{shard_id}-of-{n_shards}.jsonl``.
+        sample_rate (int): Sample rate of the dataset.
+        metrics_list (list): Metrics to compute, see :func:`~asteroid.metrics.get_metrics`.
+        shard_id (int, optional): Index of the shard to evaluate. Shards are contiguous
+            ranges of the dataset's indices. Defaults to the ``RANK`` or ``SLURM_PROCID``
+            environment variable, or 0.
+        n_shards (int, optional): Number of shards. Defaults to the ``WORLD_SIZE`` or
+            ``SLURM_NTASKS`` environment variable, or 1.
+        batch_size (int): Number of utterances separated together. Shorter utterances
+            are zero-padded, which slightly changes the estimates of models using
+            non-causal global operations (e.g. ``gLN``).
+        n_workers (int): Number of processes computing the metrics. If 0, metrics are
+            computed in the main process.
+        reorder (bool): Whether to reorder the estimates to match the sources (PIT on
+            SI-SDR) before computing the metrics.
+        utt_callback (callable, optional): Called in the main process as
+            ``utt_callback(idx, item, est_sources)`` with the dataset item and the
+            (reordered) estimates as :class:`numpy.ndarray`. It can save examples and
+            return a dictionary of additional fields to store (e.g. paths, WER).
+        ignore_metrics_errors (bool): Whether to ignore errors when computing metrics.
+
+    Returns:
+        str: Path of the results file of the shard.
+    """
+    shard_id, n_shards = _default_shard(shard_id, n_shards)
+    indices = shard_indices(len(dataset), shard_id, n_shards)
+    results_dir = os.path.join(out_dir, RESULTS_DIR)
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"shard_{shard_id}-of-{n_shards}.jsonl")
+    done = {row["idx"] for row in _read_results(path, repair=True)}
+    todo = [idx for idx in indices if idx not in done]
+
+    compute_metrics = partial(
+        get_metrics,
+        sample_rate=sample_rate,
+        metrics_list=list(metrics_list),
+        ignore_metrics_errors=ignore_metrics_errors,
+    )
+    loss_func = PITLossWrapper(pairwise_neg_sisdr, pit_from="pw_mtx")
+    model_device = get_device(model, default="cpu")
+    executor = ProcessPoolExecutor(n_workers) if n_workers > 0 else None
+    pending = {}
+    with open(path, "a") as results_file:
+        write = partial(_write_result, results_file)
+        for start in range(0, len(todo), batch_size):
+            batch_ids = todo[start : start + batch_size]
+            items = [dataset[idx] for idx in batch_ids]
+            est_batch = _separate_batch(model, [item[0] for item in items], model_device)
+            for idx, item, est_sources in zip(batch_ids, items, est_batch):
+                mix, sources = _to_numpy(item[0]), _to_numpy(item[1])
+                if reorder:
+                    est_sources = loss_func(
+                        torch.from_numpy(est_sources)[None],
+                        torch.from_numpy(sources)[None],
+                        return_est=True,
+                    )[1][0].numpy()
+                extra = {}
+                if utt_callback is not None:
+                    extra = utt_callback(idx, item, est_sources) or {}
+                kwargs = dict(filename=str(idx))
+                if executor is None:
+                    write(idx, compute_metrics(mix, sources, est_sources, **kwargs), extra)
+                    continue
+                future = executor.submit(compute_metrics, mix, sources, est_sources, **kwargs)
+                pending[future] = (idx, extra)
+                # Bound the number of estimates waiting for their metrics.
+                if len(pending) >= 2 * n_workers:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        idx, extra = pending.pop(future)
+                        write(idx, future.result(), extra)
+        for future in wait(pending)[0]:
+            idx, extra = pending.pop(future)
+            write(idx, future.result(), extra)
+    if executor is not None:
+        executor.shutdown()
+    return path
+
+
+def merge_results(out_dir, metrics_list=("si_sdr", "sdr", "sir", "sar", "stoi"), n_items=None):
+    """Merge the results of all the shards and compute the average metrics.
+
+    Writes ``all_metrics.csv`` (one row per utterance) and ``final_metrics.json``
+    (average metrics and improvements over the mixture) in ``out_dir``.
+
+    Args:
+        out_dir (str): Evaluation directory given to :func:`evaluate`.
+        metrics_list (list): Metrics to average. ``metric_imp`` is the average
+            improvement of ``metric`` over ``input_metric``.
+        n_items (int, optional): Size of the dataset. If given, raises if some
+            utterances were not evaluated.
+
+    Returns:
+        dict: The average metrics.
+    """
+    metrics_df = load_results(out_dir)
+    if n_items is not None:
+        missing = missing_indices(out_dir, n_items)
+        if missing:
+            raise RuntimeError(
+                f"{len(missing)} utterances out of {n_items} were not evaluated, "
+                "run the remaining shards first."
+            )
+    metrics_df.to_csv(os.path.join(out_dir, "all_metrics.csv"))
+    final_results = {}
+    for metric_name in metrics_list:
+        input_metric_name = "input_" + metric_name
+        ldf = metrics_df[metric_name] - metrics_df[input_metric_name]
+        final_results[metric_name] = metrics_df[metric_name].mean()
+        final_results[metric_name + "_imp"] = ldf.mean()
+    with open(os.path.join(out_dir, "final_metrics.json"), "w") as f:
+        json.dump(final_results, f, indent=0)
+    return final_results
+
+
+def load_results(out_dir):
+    """Load the results of all the shards of an evaluation as a dataframe indexed by
+    utterance index."""
+    rows = {}
+    for path in sorted(glob.glob(os.path.join(out_dir, RESULTS_DIR, "*.jsonl"))):
+        rows.update((row["idx"], row) for row in _read_results(path))
+    metrics_df = pd.DataFrame([rows[idx] for idx in sorted(rows)])
+    return metrics_df.set_index("idx") if len(metrics_df) else metrics_df
+
+
+def missing_indices(out_dir, n_items):
+    """Indices of the dataset (of size ``n_items``) that were not evaluated yet."""
+    done = set(load_results(out_dir).index)
+    return [idx for idx in range(n_items) if idx not in done]
+
+
+def shard_indices(n_items, shard_id=0, n_shards=1):
+    """Contiguous range of indices of shard ``shard_id`` out of ``n_shards``."""
+    if not 0 <= shard_id < n_shards:
+        raise ValueError(f"Expected 0 <= shard_id < n_shards, got {shard_id} and {n_shards}.")
+    return range(n_items * shard_id // n_shards, n_items * (shard_id + 1) // n_shards)
+
+
+def _default_shard(shard_id, n_shards):
+    env = os.environ
+    if shard_id is None:
+        shard_id = int(env.get("RANK", env.get("SLURM_PROCID", 0)))
+    if n_shards is None:
+        n_shards = int(env.get("WORLD_SIZE", env.get("SLURM_NTASKS", 1)))
+    return shard_id, n_shards
+
+
+@torch.no_grad()
+def _separate_batch(model, mixtures, model_device):
+    """Separate mixtures of different lengths, zero-padded into a batch."""
+    mixtures = [torch.as_tensor(mix) for mix in mixtures]
+    lengths = [mix.shape[-1] for mix in mixtures]
+    batch = torch.stack(
+        [torch.nn.functional.pad(mix, (0, max(lengths) - mix.shape[-1])) for mix in mixtures]
+    )
+    est_sources = model(batch.to(model_device)).cpu().numpy()
+    return [est[..., :length] for est, length in zip(est_sources, lengths)]
+
+
+def _to_numpy(tensor):
+    return tensor.cpu().numpy() if isinstance(tensor, torch.Tensor) else np.asarray(tensor)
+
+
+def _write_result(results_file, idx, utt_metrics, extra):
+    row = dict(idx=idx, **utt_metrics, **extra)
+    results_file.write(json.dumps(row, default=_json_default) + "\n")
+    results_file.flush()
+
+
+def _json_default(obj):
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable.")
+
+
+def _read_results(path, repair=False):
+    """Read a results file. With ``repair``, truncate it after the last complete line
+    (the last line may be partially written if the evaluation was killed)."""
+    if not os.path.exists(path):
+        return []
+    rows, valid_size = [], 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                break
+            valid_size += len(line)
+    if repair and valid_size < os.path.getsize(path):
+        with open(path, "r+b") as f:
+            f.truncate(valid_size)
+    return rows
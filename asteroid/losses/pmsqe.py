@@ -2,8 +2,6 @@ import numpy as np
 import torch
 from torch import tensor
 import torch.nn as nn
-import pathlib
-import os
 
 
 class SingleSrcPMSQE(nn.Module):
@@ -24,6 +22,9 @@ class SingleSrcPMSQE(nn.Module):
         bark_eq (bool, optional): Whether to apply bark equalization.
         gain_eq (bool, optional): Whether to apply gain equalization.
         sample_rate (int): Sample rate of the input audio.
+        banded_bark (bool, optional): Whether to compute the Bark spectra as sums
+            over the bins of each band (default). If False, or on CUDA with
+            deterministic algorithms, the dense Bark matrix is used instead.
 
     References
         [1] J.M.Martin, A.M.Gomez, J.A.Gonzalez, A.M.Peinado 'A Deep Learning
@@ -57,6 +58,16 @@ class SingleSrcPMSQE(nn.Module):
         >>> loss_value = loss_func(ref_spec, est_spec)
     """
 
+    # Constant tensors of each sample rate, computed once for all the instances.
+    _constants_cache = {}
+    # Constants that previous versions stored as parameters, kept in the state dict.
+    STATE_DICT_CONSTANTS = (
+        "abs_thresh_power",
+        "modified_zwicker_power",
+        "width_of_band_bark",
+        "bark_matrix",
+    )
+
     def __init__(
         self,
         window_name="sqrt_hann",
@@ -64,12 +75,14 @@ class SingleSrcPMSQE(nn.Module):
         bark_eq=True,
         gain_eq=True,
         sample_rate=16000,
+        banded_bark=True,
     ):
         super().__init__()
         self.window_name = window_name
         self.window_weight = window_weight
         self.bark_eq = bark_eq
         self.gain_eq = gain_eq
+        self.banded_bark = banded_bark
 
         if sample_rate not in [16000, 8000]:
             raise ValueError("Unsupported sample rate {}".format(sample_rate))
@@ -90,14 +103,8 @@ class SingleSrcPMSQE(nn.Module):
 
         pow_correc_factor = self.get_correction_factor(window_name)
         self.pow_correc_factor = pow_correc_factor * self.window_weight
-        # Initialize to None and populate as a function of sample rate.
-        self.abs_thresh_power = None
-        self.modified_zwicker_power = None
-        self.width_of_band_bark = None
-        self.bark_matrix = None
-        self.mask_sll = None
+        # Register the constants as a function of sample rate.
         self.populate_constants(self.sample_rate)
-        self.sqrt_total_width = torch.sqrt(torch.sum(self.width_of_band_bark))
         self.EPS = 1e-8
 
     def forward(self, est_targets, targets, pad_mask=None):
@@ -118,8 +125,8 @@ class SingleSrcPMSQE(nn.Module):
         Returns
             torch.tensor of shape (B, ), wD + 0.309 * wDA
 
-        ..note:: Dimensions (B, F, T) are also supported by SingleSrcPMSQE but are
-            less efficient because input tensors are transposed (not inplace).
+        ..note:: Dimensions (B, F, T) are also supported by SingleSrcPMSQE, the
+            input tensors are then transposed (as views).
 
         """
         assert est_targets.shape == targets.shape
@@ -138,11 +145,6 @@ class SingleSrcPMSQE(nn.Module):
         if pad_mask is not None:
             # Transpose the pad mask as well if needed.
             pad_mask = pad_mask.transpose(1, 2) if freq_idx == 1 else pad_mask
-        else:
-            # Suppose no padding if no pad_mask is provided.
-            pad_mask = torch.ones(
-                est_targets.shape[0], est_targets.shape[1], 1, device=est_targets.device
-            )
         # SLL equalization
         ref_spectra = self.magnitude_at_sll(targets, pad_mask)
         deg_spectra = self.magnitude_at_sll(est_targets, pad_mask)
@@ -155,55 +157,64 @@ class SingleSrcPMSQE(nn.Module):
         if self.bark_eq:
             deg_bark_spectra = self.bark_freq_equalization(ref_bark_spectra, deg_bark_spectra)
 
+        audible_power_ref = self.compute_audible_power(ref_bark_spectra, 1.0)
         if self.gain_eq:
-            deg_bark_spectra = self.bark_gain_equalization(ref_bark_spectra, deg_bark_spectra)
+            deg_bark_spectra = self.bark_gain_equalization(
+                ref_bark_spectra, deg_bark_spectra, audible_power_ref=audible_power_ref
+            )
 
         # Distortion matrix computation
         sym_d, asym_d = self.compute_distortion_tensors(ref_bark_spectra, deg_bark_spectra)
 
         # Per-frame distortion
-        audible_power_ref = self.compute_audible_power(ref_bark_spectra, 1.0)
         wd_frame, wda_frame = self.per_frame_distortion(sym_d, asym_d, audible_power_ref)
         # Mean distortions over frames : keep batch dims
         dims = [-1, -2]
-        pmsqe_frame = (self.alpha * wd_frame + self.beta * wda_frame) * pad_mask
-        pmsqe = torch.sum(pmsqe_frame, dim=dims) / pad_mask.sum(dims)
-        return pmsqe
-
-    def magnitude_at_sll(self, spectra, pad_mask):
-        # Apply padding and SLL masking
-        masked_spectra = spectra * pad_mask * self.mask_sll
-        # Compute mean over frequency
-        freq_mean_masked_spectra = torch.mean(masked_spectra, dim=-1, keepdim=True)
+        pmsqe_frame = self.alpha * wd_frame + self.beta * wda_frame
+        if pad_mask is None:
+            return pmsqe_frame.mean(dims)
+        return torch.sum(pmsqe_frame * pad_mask, dim=dims) / pad_mask.sum(dims)
+
+    def magnitude_at_sll(self, spectra, pad_mask=None):
+        # Mean over frequency of the SLL masked spectra
+        freq_mean_masked_spectra = torch.matmul(spectra, self.mask_sll) / spectra.shape[-1]
         # Compute mean over time (taking into account padding)
-        sum_spectra = torch.sum(freq_mean_masked_spectra, dim=-2, keepdim=True)
-        seq_len = torch.sum(pad_mask, dim=-2, keepdim=True)
-        mean_pow = sum_spectra / seq_len
+        if pad_mask is None:
+            mean_pow = freq_mean_masked_spectra.mean(-1)
+        else:
+            pad_mask = pad_mask[..., 0]
+            mean_pow = (freq_mean_masked_spectra * pad_mask).sum(-1) / pad_mask.sum(-1)
         # Compute final SLL spectra
-        return 10000000.0 * spectra / mean_pow
+        return spectra * (10000000.0 / mean_pow)[..., None, None]
 
     def bark_computation(self, spectra):
-        return self.Sp * torch.matmul(spectra, self.bark_matrix)
+        # `scatter_add_` is not deterministic on CUDA.
+        deterministic = spectra.is_cuda and torch.are_deterministic_algorithms_enabled()
+        if not self.banded_bark or deterministic:
+            return self.Sp * torch.matmul(spectra, self.bark_matrix)
+        # Bark bands are contiguous with a single weight per band: sum the bins of
+        # each band (the last bin belongs to no band and is not summed).
+        n_bins = self.band_index.shape[-1]
+        band_index = self.band_index.expand(spectra.shape[:-1] + (n_bins,))
+        bark_spectra = spectra.new_zeros(spectra.shape[:-1] + (self.nbark,))
+        bark_spectra = bark_spectra.scatter_add_(-1, band_index, spectra[..., :n_bins])
+        return bark_spectra * self.band_weights
 
     def compute_audible_power(self, bark_spectra, factor=1.0):
         # Apply absolute hearing threshold to each band
-        thr_bark = torch.where(
-            bark_spectra > self.abs_thresh_power * factor,
-            bark_spectra,
-            torch.zeros_like(bark_spectra),
-        )
+        thr_bark = torch.where(bark_spectra > self.abs_thresh_power * factor, bark_spectra, 0.0)
         # Sum band power over frequency
         return torch.sum(thr_bark, dim=-1, keepdim=True)
 
-    def bark_gain_equalization(self, ref_bark_spectra, deg_bark_spectra):
+    def bark_gain_equalization(self, ref_bark_spectra, deg_bark_spectra, audible_power_ref=None):
         # Compute audible power
-        audible_power_ref = self.compute_audible_power(ref_bark_spectra, 1.0)
+        if audible_power_ref is None:
+            audible_power_ref = self.compute_audible_power(ref_bark_spectra, 1.0)
         audible_power_deg = self.compute_audible_power(deg_bark_spectra, 1.0)
         # Compute gain factor
         gain = (audible_power_ref + 5.0e3) / (audible_power_deg + 5.0e3)
         # Limit the range of the gain factor
-        limited_gain = torch.min(gain, 5.0 * torch.ones_like(gain))
-        limited_gain = torch.max(limited_gain, 3.0e-4 * torch.ones_like(limited_gain))
+        limited_gain = gain.clamp(3.0e-4, 5.0)
         # Apply gain correction on degraded
         return limited_gain * deg_bark_spectra
 
@@ -212,42 +223,26 @@ class SingleSrcPMSQE(nn.Module):
         # Identification of speech active frames
         audible_power_x100 = self.compute_audible_power(ref_bark_spectra, 100.0)
         not_silent = audible_power_x100 >= 1.0e7
-        # Threshold for active bark bins
-        cond_thr = ref_bark_spectra >= self.abs_thresh_power * 100.0
-        ref_thresholded = torch.where(
-            cond_thr, ref_bark_spectra, torch.zeros_like(ref_bark_spectra)
-        )
-        deg_thresholded = torch.where(
-            cond_thr, deg_bark_spectra, torch.zeros_like(deg_bark_spectra)
-        )
+        # Threshold for active bark bins, in active frames
+        cond_thr = (ref_bark_spectra >= self.abs_thresh_power * 100.0) & not_silent
         # Total power per bark bin (ppb)
-        avg_ppb_ref = torch.sum(
-            torch.where(not_silent, ref_thresholded, torch.zeros_like(ref_thresholded)),
-            dim=-2,
-            keepdim=True,
-        )
-        avg_ppb_deg = torch.sum(
-            torch.where(not_silent, deg_thresholded, torch.zeros_like(deg_thresholded)),
-            dim=-2,
-            keepdim=True,
-        )
+        avg_ppb_ref = torch.where(cond_thr, ref_bark_spectra, 0.0).sum(dim=-2, keepdim=True)
+        avg_ppb_deg = torch.where(cond_thr, deg_bark_spectra, 0.0).sum(dim=-2, keepdim=True)
         # Compute equalizer
         equalizer = (avg_ppb_ref + 1000.0) / (avg_ppb_deg + 1000.0)
-        equalizer = torch.min(equalizer, 100.0 * torch.ones_like(equalizer))
-        equalizer = torch.max(equalizer, 0.01 * torch.ones_like(equalizer))
+        equalizer = equalizer.clamp(0.01, 100.0)
         # Apply frequency correction on degraded
         return equalizer * deg_bark_spectra
 
     def loudness_computation(self, bark_spectra):
         # Bark spectra transformed to a sone loudness scale using Zwicker's law
-        aterm = torch.pow(self.abs_thresh_power / 0.5, self.modified_zwicker_power)
         bterm = (
             torch.pow(0.5 + 0.5 * bark_spectra / self.abs_thresh_power, self.modified_zwicker_power)
             - 1.0
         )
-        loudness_dens = self.Sl * aterm * bterm
+        loudness_dens = self.loudness_scale * bterm
         cond = bark_spectra < self.abs_thresh_power
-        return torch.where(cond, torch.zeros_like(loudness_dens), loudness_dens)
+        return torch.where(cond, 0.0, loudness_dens)
 
     def compute_distortion_tensors(self, ref_bark_spec, deg_bark_spec):
         # After bark spectra are compensated, transform to sone loudness
@@ -256,15 +251,12 @@ class SingleSrcPMSQE(nn.Module):
         # Loudness difference
         r = torch.abs(distorted_loudness - original_loudness)
         # Masking effect computation
-        m = 0.25 * torch.min(original_loudness, distorted_loudness)
+        m = 0.25 * torch.minimum(original_loudness, distorted_loudness)
         # Center clipping using masking effect
-        sym_d = torch.max(r - m, torch.ones_like(r) * self.EPS)
+        sym_d = (r - m).clamp_min(self.EPS)
         # Asymmetry factor computation
         asym = torch.pow((deg_bark_spec + 50.0) / (ref_bark_spec + 50.0), 1.2)
-        cond = asym < 3.0 * torch.ones_like(asym)
-        asym_factor = torch.where(
-            cond, torch.zeros_like(asym), torch.min(asym, 12.0 * torch.ones_like(asym))
-        )
+        asym_factor = torch.where(asym < 3.0, 0.0, asym.clamp_max(12.0))
         # Asymmetric Disturbance matrix computation
         asym_d = asym_factor * sym_d
         return sym_d, asym_d
@@ -272,22 +264,15 @@ class SingleSrcPMSQE(nn.Module):
     def per_frame_distortion(self, sym_d, asym_d, total_power_ref):
         # Computation of the norms over bark bands for each frame
         # 2 and 1 for sym_d and asym_d, respectively
-        d_frame = torch.sum(
-            torch.pow(sym_d * self.width_of_band_bark, 2.0) + self.EPS, dim=-1, keepdim=True
-        )
-        # a = torch.pow(sym_d * self.width_of_band_bark, 2.0)
-        # b = sym_d
-        # print(a.min(),a.max(),b.min(),b.max(), d_frame.min(), d_frame.max())
-        # print(self.width_of_band_bark.requires_grad)
-        # print(d_frame.requires_grad)
-        d_frame = torch.sqrt(d_frame) * self.sqrt_total_width
-        da_frame = torch.sum(asym_d * self.width_of_band_bark, dim=-1, keepdim=True)
+        d_frame = torch.matmul(sym_d.square(), self.width_of_band_bark.square())
+        d_frame = torch.sqrt(d_frame + self.nbark * self.EPS) * self.sqrt_total_width
+        da_frame = torch.matmul(asym_d, self.width_of_band_bark)
         # Weighting by the audible power raised to 0.04
-        weights = torch.pow((total_power_ref + 1e5) / 1e7, 0.04)
+        weights = torch.pow((total_power_ref[..., 0] + 1e5) / 1e7, 0.04)
         # Bounded computation of the per frame distortion metric
-        wd_frame = torch.min(d_frame / weights, 45.0 * torch.ones_like(d_frame))
-        wda_frame = torch.min(da_frame / weights, 45.0 * torch.ones_like(da_frame))
-        return wd_frame, wda_frame
+        wd_frame = (d_frame / weights).clamp_max(45.0)
+        wda_frame = (da_frame / weights).clamp_max(45.0)
+        return wd_frame.unsqueeze(-1), wda_frame.unsqueeze(-1)
 
     @staticmethod
     def get_correction_factor(window_name):
@@ -306,10 +291,37 @@ class SingleSrcPMSQE(nn.Module):
             raise ValueError("Unexpected window type {}".format(window_name))
 
     def populate_constants(self, sample_rate):
-        if sample_rate == 8000:
-            self.register_8k_constants()
-        elif sample_rate == 16000:
-            self.register_16k_constants()
+        constants = self._constants_cache.get(sample_rate)
+        if constants is None:
+            if sample_rate == 8000:
+                constants = self.get_8k_constants()
+            elif sample_rate == 16000:
+                constants = self.get_16k_constants()
+            constants = {name: tensor(value) for name, value in constants.items()}
+            band_edges = constants.pop("band_edges")
+            band_weights = constants.pop("band_weights")
+            widths = band_edges.diff()
+            # Band of each frequency bin (up to the end of the last band).
+            band_index = torch.arange(self.nbark).repeat_interleave(widths)
+            bark_matrix = torch.zeros(self.nbins // 2 + 1, self.nbark)
+            bark_matrix[torch.arange(len(band_index)), band_index] = band_weights[band_index]
+            aterm = torch.pow(
+                constants["abs_thresh_power"] / 0.5, constants["modified_zwicker_power"]
+            )
+            constants.update(
+                bark_matrix=bark_matrix,
+                band_index=band_index,
+                band_weights=self.Sp * band_weights,
+                sqrt_total_width=torch.sqrt(torch.sum(constants["width_of_band_bark"])),
+                loudness_scale=self.Sl * aterm,
+            )
+            self._constants_cache[sample_rate] = constants
+        for name, value in constants.items():
+            if name in self.STATE_DICT_CONSTANTS:
+                # Copied, as loading a state dict writes into the buffers.
+                self.register_buffer(name, value.clone())
+            else:
+                self.register_buffer(name, value, persistent=False)
         # Mask SSL
         mask_sll = np.zeros(shape=[self.nbins // 2 + 1], dtype=np.float32)
         mask_sll[11] = 0.5 * 25.0 / 31.25
@@ -317,9 +329,11 @@ class SingleSrcPMSQE(nn.Module):
         mask_sll[104] = 0.5
         correction = self.pow_correc_factor * (self.nbins + 2.0) / self.nbins**2
         mask_sll = mask_sll * correction
-        self.mask_sll = nn.Parameter(tensor(mask_sll), requires_grad=False)
+        self.register_buffer("mask_sll", tensor(mask_sll))
 
-    def register_16k_constants(self):
+    @staticmethod
+    def get_16k_constants():
+        """Constants of the 16kHz version, as lists."""
         # Absolute threshold power
         abs_thresh_power = [
             51286152.00,
@@ -372,7 +386,6 @@ class SingleSrcPMSQE(nn.Module):
             0.416869,
             0.537032,
         ]
-        self.abs_thresh_power = nn.Parameter(tensor(abs_thresh_power), requires_grad=False)
         # Modified zwicker power
         modif_zwicker_power = [
             0.25520097857560436,
@@ -425,7 +438,6 @@ class SingleSrcPMSQE(nn.Module):
             0.23,
             0.23,
         ]
-        self.modified_zwicker_power = nn.Parameter(tensor(modif_zwicker_power), requires_grad=False)
         # Width of band bark
         width_of_band_bark = [
             0.157344,
@@ -478,14 +490,123 @@ class SingleSrcPMSQE(nn.Module):
             0.578125,
             0.585232,
         ]
-        self.width_of_band_bark = nn.Parameter(tensor(width_of_band_bark), requires_grad=False)
-        # Bark matrix
-        local_path = pathlib.Path(__file__).parent.absolute()
-        bark_path = os.path.join(local_path, "bark_matrix_16k.mat")
-        bark_matrix = self.load_mat(bark_path)["Bark_matrix_16k"].astype("float32")
-        self.bark_matrix = nn.Parameter(tensor(bark_matrix), requires_grad=False)
-
-    def register_8k_constants(self):
+        # Bark bands: first frequency bin of each band (and end of the last band)
+        # and weight of the bins of each band, equal to the `Bark_matrix_16k`
+        # of the reference implementation.
+        band_edges = [
+            0,
+            1,
+            2,
+            3,
+            4,
+            5,
+            6,
+            7,
+            8,
+            10,
+            11,
+            12,
+            13,
+            14,
+            15,
+            17,
+            18,
+            19,
+            21,
+            23,
+            25,
+            27,
+            29,
+            31,
+            33,
+            35,
+            38,
+            41,
+            44,
+            47,
+            51,
+            54,
+            58,
+            63,
+            67,
+            72,
+            78,
+            84,
+            91,
+            99,
+            108,
+            117,
+            129,
+            141,
+            156,
+            172,
+            190,
+            211,
+            236,
+            256,
+        ]
+        band_weights = [
+            100.000000,
+            99.999992,
+            100.000000,
+            100.000008,
+            100.000008,
+            100.000015,
+            99.999992,
+            99.999969,
+            50.000027,
+            100.000000,
+            99.999969,
+            100.000015,
+            99.999947,
+            100.000061,
+            53.047077,
+            110.000046,
+            117.991989,
+            65.000000,
+            68.760147,
+            69.999931,
+            71.428818,
+            75.000038,
+            76.843384,
+            80.968781,
+            88.646126,
+            63.864388,
+            68.155350,
+            72.547775,
+            75.584831,
+            58.379192,
+            80.950836,
+            64.135651,
+            54.384785,
+            73.821884,
+            64.437073,
+            59.176456,
+            65.521278,
+            61.399822,
+            58.144047,
+            57.004543,
+            64.126297,
+            54.311001,
+            61.114979,
+            55.077751,
+            56.849335,
+            55.628868,
+            53.137054,
+            54.985844,
+            79.546974,
+        ]
+        return dict(
+            abs_thresh_power=abs_thresh_power,
+            modified_zwicker_power=modif_zwicker_power,
+            width_of_band_bark=width_of_band_bark,
+            band_edges=band_edges,
+            band_weights=band_weights,
+        )
+
+    @staticmethod
+    def get_8k_constants():
+        """Constants of the 8kHz version, as lists."""
         # Absolute threshold power
         abs_thresh_power = [
             51286152,
@@ -531,7 +652,6 @@ class SingleSrcPMSQE(nn.Module):
             0.524807,
             0.524807,
         ]
-        self.abs_thresh_power = nn.Parameter(tensor(abs_thresh_power), requires_grad=False)
         # Modified zwicker power
         modif_zwicker_power = [
             0.25520097857560436,
@@ -577,7 +697,6 @@ class SingleSrcPMSQE(nn.Module):
             0.23,
             0.23,
         ]
-        self.modified_zwicker_power = nn.Parameter(tensor(modif_zwicker_power), requires_grad=False)
         # Width of band bark
         width_of_band_bark = [
             0.157344,
@@ -623,14 +742,102 @@ class SingleSrcPMSQE(nn.Module):
             0.530308,
             0.536934,
         ]
-        self.width_of_band_bark = nn.Parameter(tensor(width_of_band_bark), requires_grad=False)
-        # Bark matrix
-        local_path = pathlib.Path(__file__).parent.absolute()
-        bark_path = os.path.join(local_path, "bark_matrix_8k.mat")
-        bark_matrix = self.load_mat(bark_path)["Bark_matrix_8k"].astype("float32")
-        self.bark_matrix = nn.Parameter(tensor(bark_matrix), requires_grad=False)
-
-    def load_mat(self, *args, **kwargs):
-        from scipy.io import loadmat
-
-        return loadmat(*args, **kwargs)
+        # Bark bands: first frequency bin of each band (and end of the last band)
+        # and weight of the bins of each band, equal to the `Bark_matrix_8k`
+        # of the reference implementation.
+        band_edges = [
+            0,
+            1,
+            2,
+            3,
+            4,
+            5,
+            6,
+            7,
+            8,
+            10,
+            11,
+            12,
+            13,
+            14,
+            15,
+            17,
+            18,
+            19,
+            21,
+            23,
+            25,
+            27,
+            29,
+            31,
+            33,
+            35,
+            38,
+            41,
+            44,
+            47,
+            51,
+            54,
+            58,
+            63,
+            67,
+            72,
+            78,
+            84,
+            91,
+            99,
+            108,
+            117,
+            128,
+        ]
+        band_weights = [
+            100.000000,
+            99.999992,
+            100.000000,
+            100.000008,
+            100.000008,
+            100.000015,
+            99.999992,
+            99.999969,
+            50.000027,
+            100.000000,
+            99.999969,
+            100.000015,
+            99.999947,
+            100.000061,
+            53.047077,
+            110.000046,
+            117.991989,
+            65.000000,
+            68.760147,
+            69.999931,
+            71.428818,
+            75.000038,
+            76.843384,
+            80.968781,
+            88.646126,
+            63.864388,
+            68.155350,
+            72.547775,
+            75.584831,
+            58.379192,
+            80.950836,
+            64.135651,
+            54.384785,
+            73.821884,
+            64.437073,
+            59.176456,
+            65.521278,
+            61.399822,
+            58.144047,
+            57.004543,
+            64.126297,
+            59.248363,
+        ]
+        return dict(
+            abs_thresh_power=abs_thresh_power,
+            modified_zwicker_power=modif_zwicker_power,
+            width_of_band_bark=width_of_band_bark,
+            band_edges=band_edges,
+            band_weights=band_weights,
+        )
@@ -2,11 +2,77 @@ from math import ceil
 import warnings
 
 import torch.nn as nn
+import torch.nn.functional as F
 from torch.nn.modules.activation import MultiheadAttention
 from . import activations, norms
 import torch
 from ..utils import has_arg
 from ..dsp.overlap_add import DualPathProcessing
+from ..utils.torch_utils import checkpointed_loop
+
+ATTENTION_BACKENDS = ("mha", "sdpa", "chunked")
+
+
+def local_attention_mask(q_start, q_end, k_start, k_end, window, device=None):
+    """Boolean mask of local attention between positions ``[q_start, q_end)``
+    (queries) and ``[k_start, k_end)`` (keys).
+
+    Args:
+        q_start (int): First query position.
+        q_end (int): Last query position (excluded).
+        k_start (int): First key position.
+        k_end (int): Last key position (excluded).
+        window (int): Queries attend to keys at most ``window`` positions away.
+        device (torch.device, optional): Device of the mask.
+
+    Returns:
+        :class:`torch.Tensor`: Boolean tensor of shape $(q_end - q_start, k_end - k_start)$,
+        ``True`` where attention is allowed (convention of
+        :func:`torch.nn.functional.scaled_dot_product_attention`).
+    """
+    q_pos = torch.arange(q_start, q_end, device=device)
+    k_pos = torch.arange(k_start, k_end, device=device)
+    return (q_pos[:, None] - k_pos[None, :]).abs() <= window
+
+
+def chunked_attention(query, key, value, chunk_size, window=None, dropout_p=0.0):
+    """Scaled dot-product attention computed by chunks of ``chunk_size`` queries.
+
+    Only a $(chunk\_size, key\_len)$ attention matrix is built at a time (or
+    $(chunk\_size, chunk\_size + 2 window)$ for local attention), so that memory grows
+    linearly with the sequence length instead of quadratically.
+
+    Args:
+        query (:class:`torch.Tensor`): Tensor of shape $(..., seq\_len, head\_dim)$.
+        key (:class:`torch.Tensor`): Tensor of shape $(..., key\_len, head\_dim)$.
+        value (:class:`torch.Tensor`): Tensor of shape $(..., key\_len, head\_dim)$.
+        chunk_size (int): Number of queries processed at once.
+        window (int, optional): If given, queries only attend to keys at most
+            ``window`` positions away (see :func:`local_attention_mask`).
+        dropout_p (float, optional): Dropout probability on the attention weights.
+
+    Returns:
+        :class:`torch.Tensor`: Tensor of shape $(..., seq\_len, head\_dim)$.
+    """
+    seq_len, key_len = query.shape[-2], key.shape[-2]
+    outputs = []
+    for start in range(0, seq_len, chunk_size):
+        end = min(start + chunk_size, seq_len)
+        if window is None:
+            k_start, k_end, mask = 0, key_len, None
+        else:
+            k_start, k_end = max(start - window, 0), min(end + window, key_len)
+            mask = local_attention_mask(start, end, k_start, k_end, window, device=query.device)
+        outputs.append(
+            F.scaled_dot_product_attention(
+                query[..., start:end, :],
+                key[..., k_start:k_end, :],
+                value[..., k_start:k_end, :],
+                attn_mask=mask,
+                dropout_p=dropout_p,
+            )
+        )
+    return torch.cat(outputs, dim=-2)
 
 
 class ImprovedTransformedLayer(nn.Module):
@@ -24,6 +90,19 @@ class ImprovedTransformedLayer(nn.Module):
         bidirectional (bool, optional): True for bidirectional Inter-Chunk RNN
             (Intra-Chunk is always bidirectional).
         norm (str, optional): Type of normalization to use.
+        attention (str, optional): Attention backend, one of
+
+            - ``'mha'``: :class:`torch.nn.MultiheadAttention`.
+            - ``'sdpa'`` (default): fused :func:`torch.nn.functional.scaled_dot_product_attention`
+              (flash/memory-efficient kernels when available).
+            - ``'chunked'``: :func:`chunked_attention`, memory linear in the sequence length.
+
+            All backends share the same parameters, so that they can be changed after training.
+        attention_window (int, optional): If given, positions only attend to positions at
+            most ``attention_window`` steps away. Memory is only linear in the sequence length
+            with the ``'chunked'`` backend.
+        attention_chunk_size (int, optional): Number of queries processed at once by the
+            ``'chunked'`` backend. Defaults to 256.
 
     References
         [1] Chen, Jingjing, Qirong Mao, and Dong Liu. "Dual-Path Transformer
@@ -40,8 +119,14 @@ class ImprovedTransformedLayer(nn.Module):
         activation="relu",
         bidirectional=True,
         norm="gLN",
+        attention="sdpa",
+        attention_window=None,
+        attention_chunk_size=256,
     ):
         super(ImprovedTransformedLayer, self).__init__()
+        self.attention = attention
+        self.attention_window = attention_window
+        self.attention_chunk_size = attention_chunk_size
 
         self.mha = MultiheadAttention(embed_dim, n_heads, dropout=dropout)
         self.dropout = nn.Dropout(dropout)
@@ -52,13 +137,23 @@ class ImprovedTransformedLayer(nn.Module):
         self.norm_mha = norms.get(norm)(embed_dim)
         self.norm_ff = norms.get(norm)(embed_dim)
 
+    @property
+    def attention(self):
+        return self._attention
+
+    @attention.setter
+    def attention(self, backend):
+        if backend not in ATTENTION_BACKENDS:
+            raise ValueError(
+                f"Unknown attention backend {backend}, expected one of {ATTENTION_BACKENDS}."
+            )
+        self._attention = backend
+
     def forward(self, x):
-        tomha = x.permute(2, 0, 1)
         # x is batch, channels, seq_len
-        # mha is seq_len, batch, channels
         # self-attention is applied
-        out = self.mha(tomha, tomha, tomha)[0]
-        x = self.dropout(out.permute(1, 2, 0)) + x
+        out = self.self_attention(x.transpose(1, 2))
+        x = self.dropout(out.transpose(1, 2)) + x
         x = self.norm_mha(x)
 
         # lstm is applied
@@ -66,6 +161,54 @@ class ImprovedTransformedLayer(nn.Module):
         x = self.dropout(out.transpose(1, -1)) + x
         return self.norm_ff(x)
 
+    def self_attention(self, x):
+        """Self-attention with the selected backend.
+
+        Args:
+            x (:class:`torch.Tensor`): Tensor of shape $(batch, seq\_len, channels)$
+
+        Returns:
+            :class:`torch.Tensor`: Tensor of shape $(batch, seq\_len, channels)$
+        """
+        batch, seq_len, embed_dim = x.shape
+        if self.attention == "mha":
+            mask = None
+            if self.attention_window is not None:
+                # MultiheadAttention masks positions where the mask is True.
+                mask = ~local_attention_mask(
+                    0, seq_len, 0, seq_len, self.attention_window, device=x.device
+                )
+            # mha is seq_len, batch, channels
+            tomha = x.transpose(0, 1)
+            out = self.mha(tomha, tomha, tomha, attn_mask=mask, need_weights=False)[0]
+            return out.transpose(0, 1)
+        # Same projections as self.mha, with heads split for the fused kernels.
+        n_heads = self.mha.num_heads
+        qkv = F.linear(x, self.mha.in_proj_weight, self.mha.in_proj_bias)
+        qkv = qkv.reshape(batch, seq_len, 3, n_heads, embed_dim // n_heads).permute(2, 0, 3, 1, 4)
+        query, key, value = qkv.unbind(0)
+        dropout_p = self.mha.dropout if self.training else 0.0
+        if self.attention == "sdpa":
+            mask = None
+            if self.attention_window is not None:
+                mask = local_attention_mask(
+                    0, seq_len, 0, seq_len, self.attention_window, device=x.device
+                )
+            out = F.scaled_dot_product_attention(
+                query, key, value, attn_mask=mask, dropout_p=dropout_p
+            )
+        else:
+            out = chunked_attention(
+                query,
+                key,
+                value,
+                self.attention_chunk_size,
+                window=self.attention_window,
+                dropout_p=dropout_p,
+            )
+        out = out.transpose(1, 2).reshape(batch, seq_len, embed_dim)
+        return self.mha.out_proj(out)
+
 
 class DPTransformer(nn.Module):
     """Dual-path Transformer introduced in [1].
@@ -87,6 +230,19 @@ class DPTransformer(nn.Module):
         bidirectional (bool, optional): True for bidirectional Inter-Chunk RNN
             (Intra-Chunk is always bidirectional).
         dropout (float, optional): Dropout ratio, must be in [0,1].
+        attention (str, optional): Attention backend, one of ``'mha'``, ``'sdpa'``
+            (default) and ``'chunked'``. See :class:`ImprovedTransformedLayer`.
+        attention_chunk_size (int, optional): Number of queries processed at once by the
+            ``'chunked'`` backend. Defaults to 256.
+        inter_attention_window (int, optional): If given, inter-chunk attention is local:
+            chunks only attend to chunks at most ``inter_attention_window`` chunks away.
+            Combined with ``attention='chunked'``, memory is linear in the input length.
+        checkpoint_blocks (int, optional): If non-zero, the transformer layers are run
+            with gradient checkpointing, by segments of ``checkpoint_blocks`` repeats (pairs
+            of intra- and inter-chunk layers, see
+            :func:`~asteroid.utils.torch_utils.checkpointed_loop`). Saves activation memory
+            during training, at the cost of recomputing the layers in backward.
+            Defaults to 0 (disabled).
 
     References
         [1] Chen, Jingjing, Qirong Mao, and Dong Liu. "Dual-Path Transformer
@@ -108,6 +264,10 @@ class DPTransformer(nn.Module):
         mask_act="relu",
         bidirectional=True,
         dropout=0,
+        attention="sdpa",
+        attention_chunk_size=256,
+        inter_attention_window=None,
+        checkpoint_blocks=0,
     ):
         super(DPTransformer, self).__init__()
         self.in_chan = in_chan
@@ -124,6 +284,10 @@ class DPTransformer(nn.Module):
         self.mask_act = mask_act
         self.bidirectional = bidirectional
         self.dropout = dropout
+        self.attention = attention
+        self.attention_chunk_size = attention_chunk_size
+        self.inter_attention_window = inter_attention_window
+        self.checkpoint_blocks = checkpoint_blocks
 
         self.mha_in_dim = ceil(self.in_chan / self.n_heads) * self.n_heads
         if self.in_chan % self.n_heads != 0:
@@ -153,6 +317,8 @@ class DPTransformer(nn.Module):
                             self.ff_activation,
                             True,
                             self.norm_type,
+                            attention=self.attention,
+                            attention_chunk_size=self.attention_chunk_size,
                         ),
                         ImprovedTransformedLayer(
                             self.mha_in_dim,
@@ -162,6 +328,9 @@ class DPTransformer(nn.Module):
                             self.ff_activation,
                             self.bidirectional,
                             self.norm_type,
+                            attention=self.attention,
+                            attention_window=self.inter_attention_window,
+                            attention_chunk_size=self.attention_chunk_size,
                         ),
                     ]
                 )
@@ -197,10 +366,9 @@ class DPTransformer(nn.Module):
         mixture_w = self.ola.unfold(mixture_w)
         batch, n_filters, self.chunk_size, n_chunks = mixture_w.size()
 
-        for layer_idx in range(len(self.layers)):
-            intra, inter = self.layers[layer_idx]
-            mixture_w = self.ola.intra_process(mixture_w, intra)
-            mixture_w = self.ola.inter_process(mixture_w, inter)
+        (mixture_w,) = checkpointed_loop(
+            self._layer_step, len(self.layers), (mixture_w,), self.checkpoint_blocks
+        )
 
         output = self.first_out(mixture_w)
         output = output.reshape(batch * self.n_src, self.in_chan, self.chunk_size, n_chunks)
@@ -212,6 +380,11 @@ class DPTransformer(nn.Module):
         est_mask = self.output_act(output)
         return est_mask
 
+    def _layer_step(self, layer_idx, mixture_w):
+        intra, inter = self.layers[layer_idx]
+        mixture_w = self.ola.intra_process(mixture_w, intra)
+        return (self.ola.inter_process(mixture_w, inter),)
+
     def get_config(self):
         config = {
             "in_chan": self.in_chan,
@@ -226,5 +399,9 @@ class DPTransformer(nn.Module):
             "mask_act": self.mask_act,
             "bidirectional": self.bidirectional,
             "dropout": self.dropout,
+            "attention": self.attention,
+            "attention_chunk_size": self.attention_chunk_size,
+            "inter_attention_window": self.inter_attention_window,
+            "checkpoint_blocks": self.checkpoint_blocks,
         }
         return config
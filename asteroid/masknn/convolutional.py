@@ -12,7 +12,7 @@ from .norms import GlobLN
 from ..utils import has_arg
 from ._dcunet_architectures import DCUNET_ARCHITECTURES
 from ._local import _DilatedConvNorm, _NormAct, _ConvNormAct, _ConvNorm
-from ..utils.torch_utils import script_if_tracing, pad_x_to_y
+from ..utils.torch_utils import script_if_tracing, pad_x_to_y, checkpointed_loop
 
 
 class _Chop1d(nn.Module):
@@ -120,6 +120,11 @@ class TDConvNet(nn.Module):
             ``'cLN'``.
         mask_act (str, optional): Which non-linear function to generate mask.
         causal (bool, optional) : Whether or not the convolutions are causal.
+        checkpoint_blocks (int, optional): If non-zero, the ``Conv1DBlock`` layers are run
+            with gradient checkpointing, by segments of ``checkpoint_blocks`` blocks (see
+            :func:`~asteroid.utils.torch_utils.checkpointed_loop`). Saves activation memory
+            during training, at the cost of recomputing the blocks in backward.
+            Defaults to 0 (disabled).
 
     References
         [1] : "Conv-TasNet: Surpassing ideal time-frequency magnitude masking
@@ -141,6 +146,7 @@ class TDConvNet(nn.Module):
         norm_type="gLN",
         mask_act="relu",
         causal=False,
+        checkpoint_blocks=0,
     ):
         super(TDConvNet, self).__init__()
         self.in_chan = in_chan
@@ -156,6 +162,7 @@ class TDConvNet(nn.Module):
         self.norm_type = norm_type
         self.mask_act = mask_act
         self.causal = causal
+        self.checkpoint_blocks = checkpoint_blocks
 
         layer_norm = norms.get(norm_type)(in_chan)
         bottleneck_conv = nn.Conv1d(in_chan, bn_chan, 1)
@@ -203,15 +210,9 @@ class TDConvNet(nn.Module):
         batch, _, n_frames = mixture_w.size()
         output = self.bottleneck(mixture_w)
         skip_connection = torch.tensor([0.0], device=output.device)
-        for layer in self.TCN:
-            # Common to w. skip and w.o skip architectures
-            tcn_out = layer(output)
-            if self.skip_chan:
-                residual, skip = tcn_out
-                skip_connection = skip_connection + skip
-            else:
-                residual = tcn_out
-            output = output + residual
+        output, skip_connection = checkpointed_loop(
+            self._tcn_step, len(self.TCN), (output, skip_connection), self.checkpoint_blocks
+        )
         # Use residual output when no skip connection
         mask_inp = skip_connection if self.skip_chan else output
         score = self.mask_net(mask_inp)
@@ -219,6 +220,16 @@ class TDConvNet(nn.Module):
         est_mask = self.output_act(score)
         return est_mask
 
+    def _tcn_step(self, i, output, skip_connection):
+        # Common to w. skip and w.o skip architectures
+        tcn_out = self.TCN[i](output)
+        if self.skip_chan:
+            residual, skip = tcn_out
+            skip_connection = skip_connection + skip
+        else:
+            residual = tcn_out
+        return output + residual, skip_connection
+
     def get_config(self):
         config = {
             "in_chan": self.in_chan,
@@ -233,6 +244,7 @@ class TDConvNet(nn.Module):
             "norm_type": self.norm_type,
             "mask_act": self.mask_act,
             "causal": self.causal,
+            "checkpoint_blocks": self.checkpoint_blocks,
         }
         return config
 
@@ -259,6 +271,11 @@ class TDConvNetpp(nn.Module):
         norm_type (str, optional): To choose from ``'BN'``, ``'gLN'``,
             ``'cLN'``.
         mask_act (str, optional): Which non-linear function to generate mask.
+        checkpoint_blocks (int, optional): If non-zero, the ``Conv1DBlock`` layers are run
+            with gradient checkpointing, by segments of ``checkpoint_blocks`` blocks (see
+            :func:`~asteroid.utils.torch_utils.checkpointed_loop`). Saves activation memory
+            during training, at the cost of recomputing the blocks in backward.
+            Defaults to 0 (disabled).
 
     References
         [1] : Kavalerov, Ilya et al. “Universal Sound Separation.” in WASPAA 2019
@@ -290,6 +307,7 @@ class TDConvNetpp(nn.Module):
         conv_kernel_size=3,
         norm_type="fgLN",
         mask_act="relu",
+        checkpoint_blocks=0,
     ):
         super().__init__()
         self.in_chan = in_chan
@@ -304,6 +322,7 @@ class TDConvNetpp(nn.Module):
         self.conv_kernel_size = conv_kernel_size
         self.norm_type = norm_type
         self.mask_act = mask_act
+        self.checkpoint_blocks = checkpoint_blocks
 
         layer_norm = norms.get(norm_type)(in_chan)
         bottleneck_conv = nn.Conv1d(in_chan, bn_chan, 1)
@@ -361,26 +380,12 @@ class TDConvNetpp(nn.Module):
         output_copy = output
 
         skip_connection = 0.0
-        for r in range(self.n_repeats):
-            # Long range skip connection TDCNpp
-            if r != 0:
-                # Transform the input to repeat r-1 and add to new repeat inp
-                output = self.dense_skip[r - 1](output_copy) + output
-                # Copy this for later.
-                output_copy = output
-            for x in range(self.n_blocks):
-                # Common to w. skip and w.o skip architectures
-                i = r * self.n_blocks + x
-                tcn_out = self.TCN[i](output)
-                if self.skip_chan:
-                    residual, skip = tcn_out
-                    skip_connection = skip_connection + skip
-                else:
-                    residual, _ = tcn_out
-                # Initialized exp decay scale factor TDCNpp for residual connections
-                scale = self.scaling_param[r, x - 1] if x > 0 else 1.0
-                residual = residual * scale
-                output = output + residual
+        output, _, skip_connection = checkpointed_loop(
+            self._tcn_step,
+            len(self.TCN),
+            (output, output_copy, skip_connection),
+            self.checkpoint_blocks,
+        )
         # Use residual output when no skip connection
         mask_inp = skip_connection if self.skip_chan else output
         score = self.mask_net(mask_inp)
@@ -392,6 +397,26 @@ class TDConvNetpp(nn.Module):
 
         return est_mask, weights
 
+    def _tcn_step(self, i, output, output_copy, skip_connection):
+        r, x = divmod(i, self.n_blocks)
+        # Long range skip connection TDCNpp
+        if r != 0 and x == 0:
+            # Transform the input to repeat r-1 and add to new repeat inp
+            output = self.dense_skip[r - 1](output_copy) + output
+            # Copy this for later.
+            output_copy = output
+        # Common to w. skip and w.o skip architectures
+        tcn_out = self.TCN[i](output)
+        if self.skip_chan:
+            residual, skip = tcn_out
+            skip_connection = skip_connection + skip
+        else:
+            residual, _ = tcn_out
+        # Initialized exp decay scale factor TDCNpp for residual connections
+        scale = self.scaling_param[r, x - 1] if x > 0 else 1.0
+        residual = residual * scale
+        return output + residual, output_copy, skip_connection
+
     def get_config(self):
         config = {
             "in_chan": self.in_chan,
@@ -405,6 +430,7 @@ class TDConvNetpp(nn.Module):
             "n_src": self.n_src,
             "norm_type": self.norm_type,
             "mask_act": self.mask_act,
+            "checkpoint_blocks": self.checkpoint_blocks,
         }
         return config
 
@@ -530,6 +556,8 @@ class DCUMaskNet(BaseDCUMaskNet):
         self.encoders_stride_product = np.prod(
             [enc_stride for _, _, _, enc_stride, _ in encoders], axis=0
         )
+        # Python ints are constants for torch.jit.trace and torch.compile.
+        self._stride_product = tuple(int(s) for s in self.encoders_stride_product)
 
         # Avoid circual import
         from .convolutional import DCUNetComplexDecoderBlock, DCUNetComplexEncoderBlock
@@ -542,19 +570,16 @@ class DCUMaskNet(BaseDCUMaskNet):
         )
 
     def fix_input_dims(self, x):
-        return _fix_dcu_input_dims(
-            self.fix_length_mode, x, torch.from_numpy(self.encoders_stride_product)
-        )
+        freq_prod, time_prod = self._stride_product
+        return _fix_dcu_input_dims(self.fix_length_mode, x, freq_prod, time_prod)
 
     def fix_output_dims(self, out, x):
         return _fix_dcu_output_dims(self.fix_length_mode, out, x)
 
 
 @script_if_tracing
-def _fix_dcu_input_dims(fix_length_mode: Optional[str], x, encoders_stride_product):
+def _fix_dcu_input_dims(fix_length_mode: Optional[str], x, freq_prod: int, time_prod: int):
     """Pad or trim `x` to a length compatible with DCUNet."""
-    freq_prod = int(encoders_stride_product[0])
-    time_prod = int(encoders_stride_product[1])
     if (x.shape[1] - 1) % freq_prod:
         raise TypeError(
             f"Input shape must be [batch, freq + 1, time + 1] with freq divisible by "
@@ -595,6 +620,11 @@ class SuDORMRF(nn.Module):
         num_blocks (int): Number of of UBlocks.
         upsampling_depth (int): Depth of upsampling.
         mask_act (str): Name of output activation.
+        checkpoint_blocks (int, optional): If non-zero, the ``UBlock`` layers are run
+            with gradient checkpointing, by segments of ``checkpoint_blocks`` blocks (see
+            :func:`~asteroid.utils.torch_utils.checkpointed_loop`). Saves activation memory
+            during training, at the cost of recomputing the blocks in backward.
+            Defaults to 0 (disabled).
 
     References
         [1] : "Sudo rm -rf: Efficient Networks for Universal Audio Source Separation",
@@ -609,6 +639,7 @@ class SuDORMRF(nn.Module):
         num_blocks=16,
         upsampling_depth=4,
         mask_act="softmax",
+        checkpoint_blocks=0,
     ):
         super().__init__()
         self.in_chan = in_chan
@@ -617,6 +648,7 @@ class SuDORMRF(nn.Module):
         self.num_blocks = num_blocks
         self.upsampling_depth = upsampling_depth
         self.mask_act = mask_act
+        self.checkpoint_blocks = checkpoint_blocks
 
         # Norm before the rest, and apply one more dense layer
         self.ln = nn.GroupNorm(1, in_chan, eps=1e-08)
@@ -656,7 +688,7 @@ class SuDORMRF(nn.Module):
     def forward(self, x):
         x = self.ln(x)
         x = self.l1(x)
-        x = self.sm(x)
+        (x,) = checkpointed_loop(self._sm_step, len(self.sm), (x,), self.checkpoint_blocks)
 
         if self.bn_chan != self.in_chan:
             x = self.reshape_before_masks(x)
@@ -666,6 +698,9 @@ class SuDORMRF(nn.Module):
         x = self.output_act(x)
         return x
 
+    def _sm_step(self, i, x):
+        return (self.sm[i](x),)
+
     def get_config(self):
         config = {
             "in_chan": self.in_chan,
@@ -674,6 +709,7 @@ class SuDORMRF(nn.Module):
             "num_blocks": self.num_blocks,
             "upsampling_depth": self.upsampling_depth,
             "mask_act": self.mask_act,
+            "checkpoint_blocks": self.checkpoint_blocks,
         }
         return config
 
@@ -688,7 +724,11 @@ class SuDORMRFImproved(nn.Module):
         num_blocks (int): Number of of UBlocks
         upsampling_depth (int): Depth of upsampling
         mask_act (str): Name of output activation.
-
+        checkpoint_blocks (int, optional): If non-zero, the ``UConvBlock`` layers are run
+            with gradient checkpointing, by segments of ``checkpoint_blocks`` blocks (see
+            :func:`~asteroid.utils.torch_utils.checkpointed_loop`). Saves activation memory
+            during training, at the cost of recomputing the blocks in backward.
+            Defaults to 0 (disabled).
 
     References
         [1] : "Sudo rm -rf: Efficient Networks for Universal Audio Source Separation",
@@ -703,6 +743,7 @@ class SuDORMRFImproved(nn.Module):
         num_blocks=16,
         upsampling_depth=4,
         mask_act="relu",
+        checkpoint_blocks=0,
     ):
         super().__init__()
         self.in_chan = in_chan
@@ -711,6 +752,7 @@ class SuDORMRFImproved(nn.Module):
         self.num_blocks = num_blocks
         self.upsampling_depth = upsampling_depth
         self.mask_act = mask_act
+        self.checkpoint_blocks = checkpoint_blocks
 
         # Norm before the rest, and apply one more dense layer
         self.ln = GlobLN(in_chan)
@@ -742,13 +784,16 @@ class SuDORMRFImproved(nn.Module):
     def forward(self, x):
         x = self.ln(x)
         x = self.bottleneck(x)
-        x = self.sm(x)
+        (x,) = checkpointed_loop(self._sm_step, len(self.sm), (x,), self.checkpoint_blocks)
 
         x = self.mask_net(x)
         x = x.view(x.shape[0], self.n_src, self.in_chan, -1)
         x = self.output_act(x)
         return x
 
+    def _sm_step(self, i, x):
+        return (self.sm[i](x),)
+
     def get_config(self):
         config = {
             "in_chan": self.in_chan,
@@ -757,6 +802,7 @@ class SuDORMRFImproved(nn.Module):
             "num_blocks": self.num_blocks,
             "upsampling_depth": self.upsampling_depth,
             "mask_act": self.mask_act,
+            "checkpoint_blocks": self.checkpoint_blocks,
         }
         return config
 
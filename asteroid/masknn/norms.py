@@ -1,11 +1,11 @@
 from functools import partial
 import torch
-from torch import nn
+from torch import nn, Tensor
+import torch.nn.functional as F
 from torch.nn.modules.batchnorm import _BatchNorm
-from typing import List
+from typing import List, Optional, Tuple
 
 from .. import complex_nn
-from ..utils.torch_utils import script_if_tracing
 
 EPS = 1e-8
 
@@ -17,18 +17,6 @@ def z_norm(x, dims: List[int], eps: float = 1e-8):
     return value
 
 
-@script_if_tracing
-def _glob_norm(x, eps: float = 1e-8):
-    dims: List[int] = torch.arange(1, len(x.shape)).tolist()
-    return z_norm(x, dims, eps)
-
-
-@script_if_tracing
-def _feat_glob_norm(x, eps: float = 1e-8):
-    dims: List[int] = torch.arange(2, len(x.shape)).tolist()
-    return z_norm(x, dims, eps)
-
-
 class _LayerNorm(nn.Module):
     """Layer Normalization base class."""
 
@@ -44,7 +32,11 @@ class _LayerNorm(nn.Module):
 
 
 class GlobLN(_LayerNorm):
-    """Global Layer Normalization (globLN)."""
+    """Global Layer Normalization (globLN).
+
+    Computed as a group normalization with a single group, whose kernel computes
+    the statistics in one pass and fuses the gain and bias.
+    """
 
     def forward(self, x, EPS: float = 1e-8):
         """Applies forward pass.
@@ -57,12 +49,15 @@ class GlobLN(_LayerNorm):
         Returns:
             :class:`torch.Tensor`: gLN_x `[batch, chan, *]`
         """
-        value = _glob_norm(x, eps=EPS)
-        return self.apply_gain_and_bias(value)
+        return F.group_norm(x, 1, self.gamma, self.beta, EPS)
 
 
 class ChanLN(_LayerNorm):
-    """Channel-wise Layer Normalization (chanLN)."""
+    """Channel-wise Layer Normalization (chanLN).
+
+    Computed as a layer normalization over the (transposed) channel dimension, in
+    one fused kernel.
+    """
 
     def forward(self, x, EPS: float = 1e-8):
         """Applies forward pass.
@@ -75,13 +70,18 @@ class ChanLN(_LayerNorm):
         Returns:
             :class:`torch.Tensor`: chanLN_x `[batch, chan, *]`
         """
-        mean = torch.mean(x, dim=1, keepdim=True)
-        var = torch.var(x, dim=1, keepdim=True, unbiased=False)
-        return self.apply_gain_and_bias((x - mean) / (var + EPS).sqrt())
+        normed_x = F.layer_norm(x.transpose(1, -1), [self.channel_size], self.gamma, self.beta, EPS)
+        return normed_x.transpose(1, -1)
 
 
 class CumLN(_LayerNorm):
-    """Cumulative Global layer normalization(cumLN)."""
+    """Cumulative Global layer normalization(cumLN).
+
+    The statistics of each frame are computed over all the previous frames.
+    They are accumulated in float64, such that long streams do not drift, and
+    :meth:`forward_stream` continues them across chunks: normalizing a signal
+    chunk by chunk gives the same output as normalizing it at once.
+    """
 
     def forward(self, x, EPS: float = 1e-8):
         """
@@ -91,20 +91,54 @@ class CumLN(_LayerNorm):
         Returns:
              :class:`torch.Tensor`: cumLN_x `[batch, channels, length]`
         """
-        batch, chan, spec_len = x.size()
-        cum_sum = torch.cumsum(x.sum(1, keepdim=True), dim=-1)
-        cum_pow_sum = torch.cumsum(x.pow(2).sum(1, keepdim=True), dim=-1)
-        cnt = torch.arange(
-            start=chan, end=chan * (spec_len + 1), step=chan, dtype=x.dtype, device=x.device
+        return self.forward_stream(x, EPS=EPS)[0]
+
+    def forward_stream(
+        self, x, state: Optional[Tuple[Tensor, Tensor, Tensor]] = None, EPS: float = 1e-8
+    ) -> Tuple[Tensor, Tuple[Tensor, Tensor, Tensor]]:
+        """Normalizes a chunk of a stream, continuing the statistics of the previous chunks.
+
+        Args:
+            x (:class:`torch.Tensor`): Chunk, of shape `[batch, channels, length]`
+            state (tuple, optional): State returned by the call on the previous
+                chunk. None for the first chunk.
+        Returns:
+            tuple: cumLN_x `[batch, channels, length]` and the new state: the
+            number of elements, their sum and the sum of their squares, of
+            shape `[batch, 1, 1]` and dtype float64.
+
+        Examples
+            >>> state = None
+            >>> for chunk in x.split(100, dim=-1):
+            >>>     out, state = norm.forward_stream(chunk, state)
+        """
+        chan, spec_len = x.shape[1], x.shape[2]
+        if state is None:
+            count = torch.zeros(x.shape[0], 1, 1, dtype=torch.float64, device=x.device)
+            sum_, pow_sum = count, count
+        else:
+            count, sum_, pow_sum = state
+        cum_sum = sum_ + torch.cumsum(x.sum(1, keepdim=True, dtype=torch.float64), dim=-1)
+        cum_pow_sum = pow_sum + torch.cumsum(
+            x.pow(2).sum(1, keepdim=True, dtype=torch.float64), dim=-1
+        )
+        cnt = count + torch.arange(
+            start=chan, end=chan * (spec_len + 1), step=chan, dtype=torch.float64, device=x.device
         ).view(1, 1, -1)
         cum_mean = cum_sum / cnt
-        cum_var = cum_pow_sum / cnt - cum_mean.pow(2)
-        return self.apply_gain_and_bias((x - cum_mean) / (cum_var + EPS).sqrt())
+        cum_std = (cum_pow_sum / cnt - cum_mean.pow(2) + EPS).sqrt()
+        normed_x = (x - cum_mean.to(x.dtype)) / cum_std.to(x.dtype)
+        new_state = (cnt[..., -1:], cum_sum[..., -1:], cum_pow_sum[..., -1:])
+        return self.apply_gain_and_bias(normed_x), new_state
 
 
 class FeatsGlobLN(_LayerNorm):
     """Feature-wise global Layer Normalization (FeatsGlobLN).
-    Applies normalization over frames for each channel."""
+    Applies normalization over frames for each channel.
+
+    Computed as a group normalization with one group per channel, in one fused
+    kernel.
+    """
 
     def forward(self, x, EPS: float = 1e-8):
         """Applies forward pass.
@@ -117,8 +151,7 @@ class FeatsGlobLN(_LayerNorm):
         Returns:
             :class:`torch.Tensor`: chanLN_x `[batch, chan, time]`
         """
-        value = _feat_glob_norm(x, eps=EPS)
-        return self.apply_gain_and_bias(value)
+        return F.group_norm(x, self.channel_size, self.gamma, self.beta, EPS)
 
 
 class BatchNorm(_BatchNorm):
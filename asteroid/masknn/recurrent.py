@@ -1,10 +1,11 @@
 import torch
 from torch import nn
-from torch.nn.functional import fold, unfold
 import numpy as np
 
 from .. import complex_nn
+from ..dsp.overlap_add import strided_unfold, overlap_add
 from ..utils import has_arg
+from ..utils.torch_utils import checkpointed_loop
 from . import activations, norms
 from ._dccrn_architectures import DCCRN_ARCHITECTURES
 from .base import BaseDCUMaskNet
@@ -316,10 +317,10 @@ class DPRNNBlock(nn.Module):
         x = self.intra_norm(x)
         output = output + x
         # Inter-chunk processing
-        x = output.transpose(1, 2).transpose(2, -1).reshape(B * K, L, N)
+        x = output.permute(0, 2, 3, 1).reshape(B * K, L, N)
         x = self.inter_RNN(x)
         x = self.inter_linear(x)
-        x = x.reshape(B, K, L, N).transpose(1, -1).transpose(2, -1).contiguous()
+        x = x.reshape(B, K, L, N).permute(0, 3, 1, 2)
         x = self.inter_norm(x)
         return output + x
 
@@ -353,6 +354,11 @@ class DPRNN(nn.Module):
             ``'LSTM'`` and ``'GRU'``.
         num_layers (int, optional): Number of layers in each RNN.
         dropout (float, optional): Dropout ratio, must be in [0,1].
+        checkpoint_blocks (int, optional): If non-zero, the ``DPRNNBlock`` layers are run
+            with gradient checkpointing, by segments of ``checkpoint_blocks`` blocks (see
+            :func:`~asteroid.utils.torch_utils.checkpointed_loop`). Saves activation memory
+            during training, at the cost of recomputing the blocks in backward.
+            Defaults to 0 (disabled).
 
     References
         [1] "Dual-path RNN: efficient long sequence modeling for
@@ -377,6 +383,7 @@ class DPRNN(nn.Module):
         use_mulcat=False,
         num_layers=1,
         dropout=0,
+        checkpoint_blocks=0,
     ):
         super(DPRNN, self).__init__()
         self.in_chan = in_chan
@@ -396,6 +403,7 @@ class DPRNN(nn.Module):
         self.num_layers = num_layers
         self.dropout = dropout
         self.use_mulcat = use_mulcat
+        self.checkpoint_blocks = checkpoint_blocks
 
         layer_norm = norms.get(norm_type)(in_chan)
         bottleneck_conv = nn.Conv1d(in_chan, bn_chan, 1)
@@ -444,29 +452,19 @@ class DPRNN(nn.Module):
         """
         batch, n_filters, n_frames = mixture_w.size()
         output = self.bottleneck(mixture_w)  # [batch, bn_chan, n_frames]
-        output = unfold(
-            output.unsqueeze(-1),
-            kernel_size=(self.chunk_size, 1),
-            padding=(self.chunk_size, 0),
-            stride=(self.hop_size, 1),
-        )
+        # [batch, bn_chan, chunk_size, n_chunks], strided view of the padded output.
+        output = strided_unfold(output, self.chunk_size, self.hop_size)
         n_chunks = output.shape[-1]
-        output = output.reshape(batch, self.bn_chan, self.chunk_size, n_chunks)
         # Apply stacked DPRNN Blocks sequentially
-        output = self.net(output)
+        (output,) = checkpointed_loop(
+            self._net_step, len(self.net), (output,), self.checkpoint_blocks
+        )
         # Map to sources with kind of 2D masks
         output = self.first_out(output)
         output = output.reshape(batch * self.n_src, self.bn_chan, self.chunk_size, n_chunks)
         # Overlap and add:
         # [batch, out_chan, chunk_size, n_chunks] -> [batch, out_chan, n_frames]
-        to_unfold = self.bn_chan * self.chunk_size
-        output = fold(
-            output.reshape(batch * self.n_src, to_unfold, n_chunks),
-            (n_frames, 1),
-            kernel_size=(self.chunk_size, 1),
-            padding=(self.chunk_size, 0),
-            stride=(self.hop_size, 1),
-        )
+        output = overlap_add(output, self.hop_size, n_frames)
         # Apply gating
         output = output.reshape(batch * self.n_src, self.bn_chan, -1)
         output = self.net_out(output) * self.net_gate(output)
@@ -476,6 +474,9 @@ class DPRNN(nn.Module):
         est_mask = est_mask.view(batch, self.n_src, self.out_chan, n_frames)
         return est_mask
 
+    def _net_step(self, i, output):
+        return (self.net[i](output),)
+
     def get_config(self):
         config = {
             "in_chan": self.in_chan,
@@ -493,6 +494,7 @@ class DPRNN(nn.Module):
             "num_layers": self.num_layers,
             "dropout": self.dropout,
             "use_mulcat": self.use_mulcat,
+            "checkpoint_blocks": self.checkpoint_blocks,
         }
         return config
 
@@ -667,7 +669,9 @@ class DCCRMaskNet(BaseDCUMaskNet):
             [enc_stride for _, _, _, enc_stride, _ in encoders], axis=0
         )
 
-        freq_prod, _ = self.encoders_stride_product
+        # Python ints are constants for torch.jit.trace and torch.compile.
+        self._stride_product = tuple(int(s) for s in self.encoders_stride_product)
+        freq_prod, _ = self._stride_product
         last_encoder_out_shape = (encoders[-1][1], int(np.ceil(n_freqs / freq_prod)))
 
         # Avoid circual import
@@ -676,7 +680,7 @@ class DCCRMaskNet(BaseDCUMaskNet):
         super().__init__(
             encoders=[
                 *(DCUNetComplexEncoderBlock(*args, activation="prelu") for args in encoders),
-                DCCRMaskNetRNN(np.prod(last_encoder_out_shape)),
+                DCCRMaskNetRNN(int(np.prod(last_encoder_out_shape))),
             ],
             decoders=[
                 torch.nn.Identity(),
@@ -689,7 +693,7 @@ class DCCRMaskNet(BaseDCUMaskNet):
     def fix_input_dims(self, x):
         # TODO: We can probably lift the shape requirements once Keras-style "same"
         # padding for convolutions has landed: https://github.com/pytorch/pytorch/pull/42190
-        freq_prod, _ = self.encoders_stride_product
+        freq_prod, _ = self._stride_product
         if x.shape[1] % freq_prod:
             raise TypeError(
                 f"Input shape must be [batch, freq, time] with freq divisible by {freq_prod}, "
@@ -52,23 +52,14 @@ class TAC(nn.Module):
         """
         # Input is 5D because it is multi-channel DPRNN. DPRNN single channel is 4D.
         batch_size, nmics, channels, chunk_size, n_chunks = x.size()
-        if valid_mics is None:
-            valid_mics = torch.LongTensor([nmics] * batch_size)
         # First operation: transform the input for each frame and independently on each mic channel.
         output = self.input_tf(
             x.permute(0, 3, 4, 1, 2).reshape(batch_size * nmics * chunk_size * n_chunks, channels)
         ).reshape(batch_size, chunk_size, n_chunks, nmics, self.hidden_dim)
 
-        # Mean pooling across channels
-        if valid_mics.max() == 0:
-            # Fixed geometry array
-            mics_mean = output.mean(1)
-        else:
-            # Only consider valid channels in each batch element: each example can have different number of microphones.
-            mics_mean = [
-                output[b, :, :, : valid_mics[b]].mean(2).unsqueeze(0) for b in range(batch_size)
-            ]  # 1, dim1*dim2, H
-            mics_mean = torch.cat(mics_mean, 0)  # B*dim1*dim2, H
+        # Mean pooling across channels, only over the valid channels of each batch element:
+        # each example can have different number of microphones.
+        mics_mean = valid_mics_mean(output, valid_mics, dim=3)  # B, dim1, dim2, H
 
         # The average is processed by a non-linear transform
         mics_mean = self.avg_tf(
@@ -92,3 +83,30 @@ class TAC(nn.Module):
 
         output += x
         return output
+
+
+def valid_mics_mean(x, valid_mics=None, dim=1):
+    """Average ``x`` along the microphone dimension ``dim``, only over the valid microphones
+    of each batch element (the padded channels are masked out, without looping over the batch).
+
+    Args:
+        x (:class:`torch.Tensor`): Tensor with batch as first dimension.
+        valid_mics (:class:`torch.LongTensor`, optional): effective number of microphones of each
+            batch element. If None, the mean is taken over all the microphones (fixed geometry
+            array), as for the batch elements with 0 valid microphones. Shape: :math:`(batch)`.
+        dim (int): microphone dimension.
+
+    Returns:
+        :class:`torch.Tensor`: ``x`` averaged over ``dim``.
+    """
+    if valid_mics is None:
+        return x.mean(dim)
+    dim = dim % x.ndim
+    valid_mics = valid_mics.to(x.device)
+    # No data-dependent branch (torch.compile): 0 valid mics stands for all of them.
+    valid_mics = valid_mics.masked_fill(valid_mics == 0, x.shape[dim])
+    mask_shape = [1] * x.ndim
+    mask_shape[0], mask_shape[dim] = x.shape[0], x.shape[dim]
+    is_valid = torch.arange(x.shape[dim], device=x.device) < valid_mics[:, None]
+    summed = x.masked_fill(~is_valid.reshape(mask_shape), 0.0).sum(dim)
+    return summed / valid_mics.reshape(-1, *[1] * (summed.ndim - 1)).to(x.dtype)
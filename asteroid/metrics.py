@@ -1,7 +1,12 @@
+import hashlib
 import json
+import numbers
+import os
+import re
 import torch
 import warnings
 import traceback
+from functools import lru_cache, partial
 from typing import List
 from collections import Counter
 import pandas as pd
@@ -12,6 +17,7 @@ import torch.nn as nn
 from .utils import average_arrays_in_dic
 
 ALL_METRICS = ["si_sdr", "sdr", "sir", "sar", "stoi", "pesq"]
+HSDI_KEYS = ["hits", "substitutions", "deletions", "insertions"]
 
 
 def get_metrics(
@@ -117,9 +123,202 @@ def get_metrics(
         return utt_metrics
 
 
+class RunningStats:
+    """Streaming count, mean, variance, extrema and quantiles of a metric.
+
+    The mean and variance are updated with Welford's algorithm, and quantiles are
+    estimated from a uniform reservoir sample of ``sketch_size`` values (they are
+    exact until more values are seen). Values can be arrays of a fixed shape (e.g.
+    one value per source), the statistics are then elementwise. NaN values are
+    ignored.
+
+    Args:
+        sketch_size (int): Number of values kept to estimate the quantiles.
+        seed (int): Seed of the reservoir sampling.
+    """
+
+    def __init__(self, sketch_size=10000, seed=0):
+        self.sketch_size = sketch_size
+        self._rng = np.random.default_rng(seed)
+        self.n_seen = 0
+        self._count = None
+        self._mean = None
+        self._m2 = None
+        self._min = None
+        self._max = None
+        self._sketch = None
+        self._warned_shape = False
+
+    def update(self, value):
+        """Add a value (a number, an array of the shape of the previous values or None).
+
+        None (a missing value) and values of another shape than the first one (e.g.
+        per-source metrics with a varying number of sources) are ignored.
+        """
+        if value is None:
+            if self._count is None:
+                # Missing first value, the shape is not known yet.
+                return
+            value = np.full(self._count.shape, np.nan)
+        value = np.asarray(value, dtype=np.float64)
+        if self._count is None:
+            self._count = np.zeros(value.shape, dtype=np.int64)
+            self._mean = np.zeros(value.shape)
+            self._m2 = np.zeros(value.shape)
+            self._min = np.full(value.shape, np.nan)
+            self._max = np.full(value.shape, np.nan)
+            self._sketch = np.empty((self.sketch_size,) + value.shape)
+        elif value.shape != self._count.shape:
+            if not self._warned_shape:
+                warnings.warn(
+                    f"Ignoring values of shape {value.shape} in statistics of values of "
+                    f"shape {self._count.shape}."
+                )
+                self._warned_shape = True
+            value = np.full(self._count.shape, np.nan)
+        valid = ~np.isnan(value)
+        self._count += valid
+        delta = np.where(valid, value - self._mean, 0.0)
+        self._mean += delta / np.maximum(self._count, 1)
+        self._m2 += np.where(valid, delta * (value - self._mean), 0.0)
+        self._min = np.fmin(self._min, value)
+        self._max = np.fmax(self._max, value)
+        # Reservoir sampling (algorithm R).
+        if self.n_seen < self.sketch_size:
+            self._sketch[self.n_seen] = value
+        else:
+            pos = self._rng.integers(self.n_seen + 1)
+            if pos < self.sketch_size:
+                self._sketch[pos] = value
+        self.n_seen += 1
+
+    @property
+    def count(self):
+        """Number of (non NaN) values."""
+        return 0 if self._count is None else _as_output(self._count)
+
+    @property
+    def mean(self):
+        if self._count is None:
+            return np.nan
+        return _as_output(np.where(self._count > 0, self._mean, np.nan))
+
+    @property
+    def var(self):
+        """Unbiased variance, as in :meth:`pandas.Series.var`."""
+        if self._count is None:
+            return np.nan
+        var = self._m2 / np.maximum(self._count - 1, 1)
+        return _as_output(np.where(self._count > 1, var, np.nan))
+
+    @property
+    def std(self):
+        return _as_output(np.sqrt(self.var))
+
+    @property
+    def min(self):
+        return np.nan if self._min is None else _as_output(self._min)
+
+    @property
+    def max(self):
+        return np.nan if self._max is None else _as_output(self._max)
+
+    def quantile(self, q):
+        """Estimated quantile(s) ``q`` (in [0, 1]) of the values."""
+        if self.n_seen == 0:
+            return _as_output(np.full(np.shape(q), np.nan))
+        with warnings.catch_warnings():
+            # All-NaN slices return NaN.
+            warnings.simplefilter("ignore", RuntimeWarning)
+            sketch = self._sketch[: min(self.n_seen, self.sketch_size)]
+            return _as_output(np.nanquantile(sketch, q, axis=0))
+
+    def as_dict(self, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        """Dictionary of all the statistics."""
+        stats = dict(count=self.count, mean=self.mean, std=self.std, min=self.min, max=self.max)
+        for q in quantiles:
+            stats[f"q{100 * q:g}"] = self.quantile(q)
+        return stats
+
+
+class _ColumnStore:
+    """Per-utterance results in numpy columns, whose capacity grows geometrically.
+
+    Numeric values are stored in float64 columns (one row per utterance, of the shape
+    of the values), missing values being NaN. Other values (or numeric values of
+    varying shapes) are stored in object columns.
+    """
+
+    def __init__(self, capacity=64):
+        self.capacity = capacity
+        self.n_rows = 0
+        self.columns = {}
+
+    def append(self, row):
+        if self.n_rows == self.capacity:
+            self._grow(2 * self.capacity)
+        for name, value in row.items():
+            column = self.columns.get(name)
+            if column is None:
+                column = self.columns[name] = self._new_column(value)
+            elif column.dtype != object and not self._fits(column, value):
+                column = self.columns[name] = self._to_object(column)
+            if column.dtype != object and value is None:
+                value = np.nan
+            column[self.n_rows] = value
+        self.n_rows += 1
+
+    def to_frame(self):
+        data = {}
+        for name, column in self.columns.items():
+            column = column[: self.n_rows]
+            # Rows of 2D (or more) columns are stored as arrays in the dataframe.
+            data[name] = column if column.ndim == 1 else list(column)
+        return pd.DataFrame(data, index=range(self.n_rows))
+
+    def _new_column(self, value):
+        if value is None or self._is_numeric(value):
+            shape = () if value is None else np.shape(value)
+            return np.full((self.capacity,) + shape, np.nan)
+        return np.full(self.capacity, None, dtype=object)
+
+    def _grow(self, capacity):
+        for name, column in self.columns.items():
+            fill = None if column.dtype == object else np.nan
+            grown = np.full((capacity,) + column.shape[1:], fill, dtype=column.dtype)
+            grown[: self.n_rows] = column[: self.n_rows]
+            self.columns[name] = grown
+        self.capacity = capacity
+
+    def _to_object(self, column):
+        obj_column = np.full(self.capacity, None, dtype=object)
+        for i in range(self.n_rows):
+            obj_column[i] = column[i] if column.ndim == 1 else column[i].copy()
+        return obj_column
+
+    @classmethod
+    def _fits(cls, column, value):
+        return value is None or (cls._is_numeric(value) and np.shape(value) == column.shape[1:])
+
+    @staticmethod
+    def _is_numeric(value):
+        numeric_types = (numbers.Real, np.ndarray)
+        return isinstance(value, numeric_types) and np.asarray(value).dtype.kind in "iuf"
+
+
+def _as_output(array):
+    return float(array) if np.ndim(array) == 0 else array
+
+
 class MetricTracker:
     """Metric tracker, subject to change.
 
+    The results of each utterance are stored in numpy columns (not one
+    :class:`pandas.Series` per utterance) and the statistics of each metric and of its
+    improvement over the mixture are updated online (see :class:`RunningStats`), so
+    that millions of utterances can be tracked. With ``spill_dir``, the results are
+    also written to disk every ``spill_size`` utterances and freed from memory.
+
     Args:
         sample_rate (int): sampling rate of the audio clips.
         metrics_list (Union[List[str], str): List of metrics to compute.
@@ -129,6 +328,15 @@ class MetricTracker:
             estimate sources for the output metrics (default False)
         ignore_metrics_errors (bool): Whether to ignore errors that occur in
             computing the metrics. A warning will be printed instead.
+        spill_dir (str, optional): Directory where the per-utterance results are
+            written (and read back by :meth:`as_df`). If None, they are kept in memory.
+        spill_size (int): Number of utterances kept in memory before being written
+            to ``spill_dir``.
+        sketch_size (int): Number of values kept per metric to estimate quantiles.
+
+    Attributes:
+        stats (dict): :class:`RunningStats` of ``metric``, ``input_metric`` and
+            ``metric_imp`` for each metric.
     """
 
     def __init__(
@@ -138,15 +346,33 @@ class MetricTracker:
         average=True,
         compute_permutation=False,
         ignore_metrics_errors=False,
+        spill_dir=None,
+        spill_size=100000,
+        sketch_size=10000,
     ):
         self.sample_rate = sample_rate
         # TODO: support WER in metrics_list when merged.
+        if metrics_list == "all":
+            metrics_list = ALL_METRICS
+        if isinstance(metrics_list, str):
+            metrics_list = [metrics_list]
         self.metrics_list = metrics_list
         self.average = average
         self.compute_permutation = compute_permutation
         self.ignore_metrics_errors = ignore_metrics_errors
-
-        self.series_list = []
+        self.spill_dir = spill_dir
+        self.spill_size = spill_size
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+        self.stats = {
+            name: RunningStats(sketch_size)
+            for metric in self.metrics_list
+            for name in (metric, "input_" + metric, metric + "_imp")
+        }
+        self._store = _ColumnStore()
+        self._spilled_paths = []
+        self._n_spilled = 0
         self._len_last_saved = 0
         self._all_metrics = pd.DataFrame()
 
@@ -176,31 +402,59 @@ class MetricTracker:
             filename=filename,
         )
         utt_metrics.update(kwargs)
-        self.series_list.append(pd.Series(utt_metrics))
+        self.add(utt_metrics)
+
+    def add(self, utt_metrics):
+        """Log the (already computed) metrics of an utterance."""
+        for metric in self.metrics_list:
+            output, inputs = (utt_metrics.get(prefix + metric) for prefix in ("", "input_"))
+            self.stats[metric].update(output)
+            self.stats["input_" + metric].update(inputs)
+            missing = output is None or inputs is None
+            imp = None if missing else np.asarray(output) - np.asarray(inputs)
+            self.stats[metric + "_imp"].update(imp)
+        self._store.append(utt_metrics)
+        if self.spill_dir is not None and self._store.n_rows >= self.spill_size:
+            self._spill()
+
+    def __len__(self):
+        return self._n_spilled + self._store.n_rows
 
     def as_df(self):
         """Return dataframe containing the results (cached)."""
-        if self._len_last_saved == len(self.series_list):
+        if self._len_last_saved == len(self):
             return self._all_metrics
-        self._len_last_saved = len(self.series_list)
-        self._all_metrics = pd.DataFrame(self.series_list)
-        return pd.DataFrame(self.series_list)
+        frames = [pd.read_pickle(path) for path in self._spilled_paths]
+        frames.append(self._store.to_frame())
+        self._len_last_saved = len(self)
+        self._all_metrics = pd.concat(frames, ignore_index=True)
+        return self._all_metrics
 
     def final_report(self, dump_path: str = None):
         """Return dict of average metrics. Dump to JSON if `dump_path` is not None."""
         final_results = {}
-        metrics_df = self.as_df()
         for metric_name in self.metrics_list:
-            input_metric_name = "input_" + metric_name
-            ldf = metrics_df[metric_name] - metrics_df[input_metric_name]
-            final_results[metric_name] = metrics_df[metric_name].mean()
-            final_results[metric_name + "_imp"] = ldf.mean()
+            final_results[metric_name] = self.stats[metric_name].mean
+            final_results[metric_name + "_imp"] = self.stats[metric_name + "_imp"].mean
         if dump_path is not None:
             dump_path = dump_path + ".json" if not dump_path.endswith(".json") else dump_path
             with open(dump_path, "w") as f:
                 json.dump(final_results, f, indent=0)
         return final_results
 
+    def summary(self, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        """Return the statistics (count, mean, std, min, max, quantiles) of each metric."""
+        return {name: stats.as_dict(quantiles) for name, stats in self.stats.items()}
+
+    def _spill(self):
+        path = os.path.join(self.spill_dir, f"metrics_{len(self._spilled_paths):05d}.pkl")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._store.to_frame().to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+        self._spilled_paths.append(path)
+        self._n_spilled += self._store.n_rows
+        self._store = _ColumnStore()
+
 
 class MockWERTracker:
     def __init__(self, *args, **kwargs):
@@ -216,29 +470,61 @@ class MockWERTracker:
 class WERTracker:
     """Word Error Rate Tracker. Subject to change.
 
+    All the waveforms of a call that need a transcription are decoded together, in
+    batches of ``batch_size`` waveforms sorted by length (with ESPnet, the encoder
+    runs once per batch and the beam search once per waveform). The hypotheses of
+    the mixtures and clean sources do not depend on the separation model, so with
+    ``cache_dir`` they are stored on disk, keyed by model name, utterance IDs and a
+    hash of the audio, and reused by the next evaluations.
+
     Args:
         model_name (str): Name of the petrained model to use.
         trans_df (dataframe): Containing field `utt_id` and `text`.
             See librimix/ConvTasNet recipe.
         use_gpu (bool): Whether to use GPU for forward caculation.
+        cache_dir (str, optional): Directory of the hypotheses cache. No cache if None.
+        batch_size (int): Maximum number of waveforms decoded together.
+        recognizer (callable, optional): Replaces the ESPnet model: maps a list
+            of 1D float32 waveforms to the list of their transcriptions.
+            ``model_name`` then only names the cache.
+        sample_rate (int, optional): Sample rate expected by ``recognizer``.
+            Required if ``recognizer`` is given.
     """
 
-    def __init__(self, model_name, trans_df, use_gpu=True):
-
-        from espnet2.bin.asr_inference import Speech2Text
-        from espnet_model_zoo.downloader import ModelDownloader
+    def __init__(
+        self,
+        model_name,
+        trans_df,
+        use_gpu=True,
+        cache_dir=None,
+        batch_size=8,
+        recognizer=None,
+        sample_rate=None,
+    ):
         import jiwer
 
         self.model_name = model_name
         self.device = "cuda" if use_gpu else "cpu"
-        d = ModelDownloader()
-        self.asr_model = Speech2Text(**d.download_and_unpack(model_name), device=self.device)
+        self.batch_size = batch_size
+        if recognizer is None:
+            from espnet2.bin.asr_inference import Speech2Text
+            from espnet_model_zoo.downloader import ModelDownloader
+
+            d = ModelDownloader()
+            self.asr_model = Speech2Text(**d.download_and_unpack(model_name), device=self.device)
+            self.sample_rate = int(d.data_frame[d.data_frame["name"] == model_name]["fs"])
+            self.recognizer = partial(_espnet_decode_batch, self.asr_model)
+        else:
+            if sample_rate is None:
+                raise ValueError("`sample_rate` is required with a custom `recognizer`.")
+            self.asr_model = None
+            self.sample_rate = sample_rate
+            self.recognizer = recognizer
         self.input_txt_list = []
         self.clean_txt_list = []
         self.output_txt_list = []
         self.transcriptions = []
         self.true_txt_list = []
-        self.sample_rate = int(d.data_frame[d.data_frame["name"] == model_name]["fs"])
         self.trans_df = trans_df
         self.trans_dic = self._df_to_dict(trans_df)
         self.mix_counter = Counter()
@@ -254,6 +540,13 @@ class WERTracker:
                 jiwer.RemoveEmptyStrings(),
             ]
         )
+        self.cache_path = None
+        self._cache = {}
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            cache_name = re.sub(r"[^\w.-]", "_", model_name)
+            self.cache_path = os.path.join(cache_dir, f"{cache_name}.jsonl")
+            self._cache = self._load_cache(self.cache_path)
 
     def __call__(
         self,
@@ -269,16 +562,25 @@ class WERTracker:
             mix, clean, estimate = self.resample(
                 mix, clean, estimate, fs_from=sample_rate, fs_to=self.sample_rate
             )
+        # Transcribe the mixture, the clean sources and the estimates at once.
+        keys = [self._cache_key("mix", "_".join(wav_id), mix)]
+        keys += [self._cache_key("clean", tmp_id, wav) for wav, tmp_id in zip(clean, wav_id)]
+        wavs = [mix] + list(clean) + list(estimate)
+        txts = [self._cache.get(key) for key in keys] + [None] * len(estimate)
+        to_decode = [i for i, txt in enumerate(txts) if txt is None]
+        for i, txt in zip(to_decode, self.predict_hypotheses([wavs[i] for i in to_decode])):
+            txts[i] = txt
+            if i < len(keys):
+                self._add_to_cache(keys[i], txt)
+        mix_txt, clean_txts, est_txts = txts[0], txts[1 : len(keys)], txts[len(keys) :]
+
         local_mix_counter = Counter()
         local_clean_counter = Counter()
         local_est_counter = Counter()
-        # Count the mixture output for each speaker
-        txt = self.predict_hypothesis(mix)
-
         # Dict to gather transcriptions and IDs
         trans_dict = dict(mixture_txt={}, clean={}, estimates={}, truth={})
         # Get mixture transcription
-        trans_dict["mixture_txt"] = txt
+        trans_dict["mixture_txt"] = mix_txt
         #  Get ground truth transcription and IDs
         for i, tmp_id in enumerate(wav_id):
             trans_dict["truth"][f"utt_id_{i}"] = tmp_id
@@ -288,15 +590,16 @@ class WERTracker:
         for tmp_id in wav_id:
             out_count = Counter(
                 self.hsdi(
-                    truth=self.trans_dic[tmp_id], hypothesis=txt, transformation=self.transformation
+                    truth=self.trans_dic[tmp_id],
+                    hypothesis=mix_txt,
+                    transformation=self.transformation,
                 )
             )
             self.mix_counter += out_count
             local_mix_counter += out_count
-            self.input_txt_list.append(dict(utt_id=tmp_id, text=txt))
+            self.input_txt_list.append(dict(utt_id=tmp_id, text=mix_txt))
         # Average WER for the clean pair
-        for i, (wav, tmp_id) in enumerate(zip(clean, wav_id)):
-            txt = self.predict_hypothesis(wav)
+        for i, (txt, tmp_id) in enumerate(zip(clean_txts, wav_id)):
             out_count = Counter(
                 self.hsdi(
                     truth=self.trans_dic[tmp_id], hypothesis=txt, transformation=self.transformation
@@ -308,8 +611,7 @@ class WERTracker:
             trans_dict["clean"][f"utt_id_{i}"] = tmp_id
             trans_dict["clean"][f"txt_{i}"] = txt
         # Average WER for the estimate pair
-        for i, (est, tmp_id) in enumerate(zip(estimate, wav_id)):
-            txt = self.predict_hypothesis(est)
+        for i, (txt, tmp_id) in enumerate(zip(est_txts, wav_id)):
             out_count = Counter(
                 self.hsdi(
                     truth=self.trans_dic[tmp_id], hypothesis=txt, transformation=self.transformation
@@ -321,22 +623,27 @@ class WERTracker:
             trans_dict["estimates"][f"utt_id_{i}"] = tmp_id
             trans_dict["estimates"][f"txt_{i}"] = txt
         self.transcriptions.append(trans_dict)
-        return dict(
-            input_wer=self.wer_from_hsdi(**dict(local_mix_counter)),
-            clean_wer=self.wer_from_hsdi(**dict(local_clean_counter)),
-            wer=self.wer_from_hsdi(**dict(local_est_counter)),
+        counters = dict(
+            input_wer=local_mix_counter, clean_wer=local_clean_counter, wer=local_est_counter
         )
+        wers = {name: self.wer_from_hsdi(**dict(counter)) for name, counter in counters.items()}
+        # Word counts, to aggregate the WER over the results of several processes.
+        for name, counter in counters.items():
+            wers.update({f"{name}_{k}": counter[k] for k in HSDI_KEYS})
+        return wers
 
     @staticmethod
     def wer_from_hsdi(hits=0, substitutions=0, deletions=0, insertions=0):
-        wer = (substitutions + deletions + insertions) / (hits + substitutions + deletions)
-        return wer
+        n_words = hits + substitutions + deletions
+        if n_words == 0:
+            return float("nan")
+        return (substitutions + deletions + insertions) / n_words
 
     @staticmethod
     def hsdi(truth, hypothesis, transformation):
         from jiwer import compute_measures
 
-        keep = ["hits", "substitutions", "deletions", "insertions"]
+        keep = HSDI_KEYS
         out = compute_measures(
             truth=truth,
             hypothesis=hypothesis,
@@ -346,16 +653,54 @@ class WERTracker:
         return {k: v for k, v in out if k in keep}
 
     def predict_hypothesis(self, wav):
-        wav = torch.from_numpy(wav).to(self.device)
-        nbests = self.asr_model(wav)
-        text, *_ = nbests[0]
-        return text
+        return self.predict_hypotheses([wav])[0]
+
+    def predict_hypotheses(self, wavs):
+        """Transcribe waveforms, in batches of waveforms of similar lengths."""
+        wavs = [np.ascontiguousarray(wav, dtype=np.float32).reshape(-1) for wav in wavs]
+        order = sorted(range(len(wavs)), key=lambda i: len(wavs[i]), reverse=True)
+        txts = [None] * len(wavs)
+        for start in range(0, len(order), self.batch_size):
+            batch_ids = order[start : start + self.batch_size]
+            for i, txt in zip(batch_ids, self.recognizer([wavs[i] for i in batch_ids])):
+                txts[i] = txt
+        return txts
 
     @staticmethod
     def resample(*wavs: np.ndarray, fs_from=None, fs_to=None):
-        from resampy import resample as _resample
+        """Resample the waveforms (along their last axis) with a polyphase filter."""
+        from scipy.signal import resample_poly
+
+        gcd = np.gcd(int(fs_from), int(fs_to))
+        up, down = int(fs_to) // gcd, int(fs_from) // gcd
+        window = _polyphase_filter(up, down)
+        return [resample_poly(w, up, down, axis=-1, window=window) for w in wavs]
+
+    def _cache_key(self, kind, utt_id, wav):
+        digest = hashlib.sha1(np.ascontiguousarray(wav, dtype=np.float32).tobytes()).hexdigest()
+        return f"{kind}/{utt_id}/{digest[:16]}"
 
-        return [_resample(w, sr_orig=fs_from, sr_new=fs_to) for w in wavs]
+    def _add_to_cache(self, key, txt):
+        self._cache[key] = txt
+        if self.cache_path is not None:
+            # Appended line by line, so that an interrupted evaluation keeps its hypotheses.
+            with open(self.cache_path, "a") as f:
+                f.write(json.dumps(dict(key=key, text=txt)) + "\n")
+
+    @staticmethod
+    def _load_cache(path):
+        cache = {}
+        if not os.path.isfile(path):
+            return cache
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partially written last line.
+                    continue
+                cache[entry["key"]] = entry["text"]
+        return cache
 
     @staticmethod
     def _df_to_dict(df):
@@ -363,26 +708,46 @@ class WERTracker:
 
     def final_df(self):
         """Generate a MarkDown table, as done by ESPNet."""
-        mix_n_word = sum(self.mix_counter[k] for k in ["hits", "substitutions", "deletions"])
-        clean_n_word = sum(self.clean_counter[k] for k in ["hits", "substitutions", "deletions"])
-        est_n_word = sum(self.est_counter[k] for k in ["hits", "substitutions", "deletions"])
-        mix_wer = self.wer_from_hsdi(**dict(self.mix_counter))
-        clean_wer = self.wer_from_hsdi(**dict(self.clean_counter))
-        est_wer = self.wer_from_hsdi(**dict(self.est_counter))
-
-        mix_hsdi = [
-            self.mix_counter[k] for k in ["hits", "substitutions", "deletions", "insertions"]
-        ]
-        clean_hsdi = [
-            self.clean_counter[k] for k in ["hits", "substitutions", "deletions", "insertions"]
-        ]
-        est_hsdi = [
-            self.est_counter[k] for k in ["hits", "substitutions", "deletions", "insertions"]
-        ]
+        return self._hsdi_table(self.mix_counter, self.clean_counter, self.est_counter)
+
+    def final_report_as_markdown(self):
+        return self.final_df().to_markdown(index=False, tablefmt="github")
+
+    @classmethod
+    def final_df_from_results(cls, metrics_df):
+        """Same as :meth:`final_df`, from the results of all the processes of an evaluation
+        (e.g. :func:`asteroid.evaluate.load_results`), which hold the outputs of the calls."""
+        counters = []
+        for name in ["input_wer", "clean_wer", "wer"]:
+            columns = [f"{name}_{k}" for k in HSDI_KEYS]
+            missing = [col for col in columns if col not in metrics_df]
+            if missing:
+                raise ValueError(f"The results have no word counts, missing columns {missing}.")
+            counts = {k: int(metrics_df[col].sum()) for k, col in zip(HSDI_KEYS, columns)}
+            # Drop the zero counts, as the in-place additions of `__call__` do.
+            counters.append(+Counter(counts))
+        return cls._hsdi_table(*counters)
+
+    @classmethod
+    def final_report_as_markdown_from_results(cls, metrics_df):
+        return cls.final_df_from_results(metrics_df).to_markdown(index=False, tablefmt="github")
+
+    @classmethod
+    def _hsdi_table(cls, mix_counter, clean_counter, est_counter):
+        mix_n_word = sum(mix_counter[k] for k in ["hits", "substitutions", "deletions"])
+        clean_n_word = sum(clean_counter[k] for k in ["hits", "substitutions", "deletions"])
+        est_n_word = sum(est_counter[k] for k in ["hits", "substitutions", "deletions"])
+        mix_wer = cls.wer_from_hsdi(**dict(mix_counter))
+        clean_wer = cls.wer_from_hsdi(**dict(clean_counter))
+        est_wer = cls.wer_from_hsdi(**dict(est_counter))
+
+        mix_hsdi = [mix_counter[k] for k in HSDI_KEYS]
+        clean_hsdi = [clean_counter[k] for k in HSDI_KEYS]
+        est_hsdi = [est_counter[k] for k in HSDI_KEYS]
         #                   Snt               Wrd         HSDI       Err     S.Err
-        for_mix = [len(self.mix_counter), mix_n_word] + mix_hsdi + [mix_wer, "-"]
-        for_clean = [len(self.clean_counter), clean_n_word] + clean_hsdi + [clean_wer, "-"]
-        for_est = [len(self.est_counter), est_n_word] + est_hsdi + [est_wer, "-"]
+        for_mix = [len(mix_counter), mix_n_word] + mix_hsdi + [mix_wer, "-"]
+        for_clean = [len(clean_counter), clean_n_word] + clean_hsdi + [clean_wer, "-"]
+        for_est = [len(est_counter), est_n_word] + est_hsdi + [est_wer, "-"]
 
         table = [
             ["test_clean / mixture"] + for_mix,
@@ -394,8 +759,42 @@ class WERTracker:
         )
         return df
 
-    def final_report_as_markdown(self):
-        return self.final_df().to_markdown(index=False, tablefmt="github")
+
+@lru_cache(maxsize=16)
+def _polyphase_filter(up, down):
+    """Anti-aliasing filter of :func:`scipy.signal.resample_poly`, designed once per ratio."""
+    from scipy.signal import firwin
+
+    max_rate = max(up, down)
+    return firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=("kaiser", 5.0))
+
+
+@torch.no_grad()
+def _espnet_decode_batch(speech2text, wavs):
+    """Transcribe waveforms with ESPnet's ``Speech2Text``: the encoder runs once on the
+    padded batch, and the beam search once per waveform."""
+    lengths = torch.tensor([len(wav) for wav in wavs])
+    speech = torch.zeros(len(wavs), int(lengths.max()), dtype=getattr(torch, speech2text.dtype))
+    for i, wav in enumerate(wavs):
+        speech[i, : len(wav)] = torch.from_numpy(wav)
+    enc, enc_lens = speech2text.asr_model.encode(
+        speech.to(speech2text.device), lengths.to(speech2text.device)
+    )
+    if isinstance(enc, tuple):
+        # Encoders with intermediate outputs.
+        enc = enc[0]
+    txts = []
+    for feats, n_frames in zip(enc, enc_lens):
+        nbests = speech2text.beam_search(
+            x=feats[:n_frames],
+            maxlenratio=speech2text.maxlenratio,
+            minlenratio=speech2text.minlenratio,
+        )
+        # Remove <sos>, <eos> and blanks, as in `Speech2Text.__call__`.
+        token_int = [tok for tok in nbests[0].yseq[1:-1].tolist() if tok != 0]
+        tokens = speech2text.converter.ids2tokens(token_int)
+        txts.append(speech2text.tokenizer.tokens2text(tokens))
+    return txts
 
 
 class F1Tracker(nn.Module):
@@ -1,3 +1,4 @@
+import contextlib
 import torch
 import warnings
 from typing import Optional
@@ -5,10 +6,21 @@ from typing import Optional
 from .. import separate
 from ..masknn import activations
 from ..utils.torch_utils import pad_x_to_y, script_if_tracing, jitable_shape
-from ..utils.hub_utils import cached_download, SR_HASHTABLE
+from ..utils.torch_utils import build_with_state_dict
+from ..utils.hub_utils import cached_download, load_package, SR_HASHTABLE
 from ..utils.deprecation_utils import is_overridden, mark_deprecated
 
 
+def _dynamo_config():
+    """Context manager with the ``torch._dynamo`` options of :meth:`BaseModel.compile`:
+    recurrent layers are compiled instead of breaking the graph (if supported)."""
+    import torch._dynamo
+
+    if hasattr(torch._dynamo.config, "allow_rnn"):
+        return torch._dynamo.config.patch(allow_rnn=True)
+    return contextlib.nullcontext()
+
+
 @script_if_tracing
 def _unsqueeze_to_3d(x):
     """Normalize shape of `x` to [batch, n_chan, time]."""
@@ -88,6 +100,57 @@ class BaseModel(torch.nn.Module):
         """
         return self(wav, *args, **kwargs)
 
+    def compile(self, mode=None, fullgraph=False, dynamic=None, backend="inductor", **kwargs):
+        """Compile the ``forward`` of the model with :func:`torch.compile`, in place.
+
+        Unlike the default of ``torch.compile``, recurrent layers (``nn.LSTM``, ...)
+        are compiled instead of breaking the graph. Compilation happens on the first
+        calls, and again for new input shapes (with ``dynamic=None``, the second shape
+        triggers a dynamic-shape compilation). For inference, call ``model.eval()``
+        first and run the model under :func:`torch.inference_mode`.
+
+        Args:
+            mode (str, optional): ``torch.compile`` mode, e.g. ``"reduce-overhead"``
+                or ``"max-autotune"``. None for the default mode.
+            fullgraph (bool): Whether to raise on graph breaks instead of running
+                the unsupported code eagerly.
+            dynamic (bool, optional): Whether to compile for dynamic input shapes.
+            backend (str): ``torch.compile`` backend.
+            **kwargs: Passed to :func:`torch.compile`.
+
+        Returns:
+            BaseModel: The model itself, whose calls are compiled (as with
+            :meth:`torch.nn.Module.compile`, ``forward`` is left untouched). Copies
+            and pickles of the model are not compiled.
+
+        Examples
+            >>> model = ConvTasNet.from_pretrained(...).eval().compile(dynamic=True)
+            >>> with torch.inference_mode():
+            >>>     est_sources = model(mixture)
+        """
+        if not hasattr(self, "_compiled_call_impl"):
+            raise RuntimeError(
+                "BaseModel.compile requires torch>=2.2, use torch.compile(model) instead."
+            )
+        compiled_call_impl = torch.compile(
+            self._call_impl,
+            mode=mode,
+            fullgraph=fullgraph,
+            dynamic=dynamic,
+            backend=backend,
+            **kwargs,
+        )
+
+        def call_impl(*args, **kwargs):
+            # Compilation happens during the call, with RNNs allowed.
+            with _dynamo_config():
+                return compiled_call_impl(*args, **kwargs)
+
+        # Same as nn.Module.compile: `__call__` runs `_compiled_call_impl` if set,
+        # and nn.Module drops it when copying or pickling the module.
+        self._compiled_call_impl = call_impl
+        return self
+
     @classmethod
     def from_pretrained(cls, pretrained_model_conf_or_path, *args, **kwargs):
         """Instantiate separation model from a model config (file or dict).
@@ -106,12 +169,18 @@ class BaseModel(torch.nn.Module):
         Raises:
             ValueError if the input config file doesn't contain the keys
                 `model_name`, `model_args` or `state_dict`.
+
+        .. note:: When loading from a file, the weights are memory-mapped (see
+            :func:`~asteroid.utils.hub_utils.load_package`) and used by the model without
+            copy, and the model is instantiated without random initialization.
+            The weights are read lazily and shared by all the processes using the
+            same file, e.g. forked workers.
         """
         from . import get  # Avoid circular imports
 
         if isinstance(pretrained_model_conf_or_path, str):
             cached_model = cached_download(pretrained_model_conf_or_path)
-            conf = torch.load(cached_model, map_location="cpu")
+            conf = load_package(cached_model)
         else:
             conf = pretrained_model_conf_or_path
 
@@ -141,11 +210,14 @@ class BaseModel(torch.nn.Module):
         try:
             model_class = get(conf["model_name"])
         except ValueError:  # Couldn't get the model, maybe custom.
-            model = cls(*args, **conf["model_args"])  # Child class.
-        else:
-            model = model_class(*args, **conf["model_args"])
-        model.load_state_dict(conf["state_dict"])
-        return model
+            model_class = cls  # Child class.
+        # All the weights are overwritten by the state dict, skip their initialization.
+        # With a path, use the loaded tensors directly: we own them.
+        return build_with_state_dict(
+            lambda: model_class(*args, **conf["model_args"]),
+            conf["state_dict"],
+            zero_copy=isinstance(pretrained_model_conf_or_path, str),
+        )
 
     def serialize(self):
         """Serialize model and output dictionary.
@@ -165,7 +237,7 @@ class BaseModel(torch.nn.Module):
         # Additional infos
         infos = dict()
         infos["software_versions"] = dict(
-            torch_version=torch.__version__,
+            torch_version=str(torch.__version__),
             pytorch_lightning_version=pl.__version__,
             asteroid_version=asteroid_version,
         )
@@ -37,6 +37,9 @@ class ConvTasNet(BaseEncoderMaskerDecoder):
         stride (int, optional): Stride of the convolution.
             If None (default), set to ``kernel_size // 2``.
         sample_rate (float): Sampling rate of the model.
+        checkpoint_blocks (int, optional): If non-zero, run the masker's repeated
+            blocks with gradient checkpointing, by segments of ``checkpoint_blocks``
+            blocks, to save memory during training. See :class:`~asteroid.masknn.TDConvNet`.
         **fb_kwargs (dict): Additional kwards to pass to the filterbank
             creation.
 
@@ -66,6 +69,7 @@ class ConvTasNet(BaseEncoderMaskerDecoder):
         stride=8,
         encoder_activation=None,
         sample_rate=8000,
+        checkpoint_blocks=0,
         **fb_kwargs,
     ):
         encoder, decoder = make_enc_dec(
@@ -105,6 +109,7 @@ class ConvTasNet(BaseEncoderMaskerDecoder):
             norm_type=norm_type,
             mask_act=mask_act,
             causal=causal,
+            checkpoint_blocks=checkpoint_blocks,
         )
         super().__init__(encoder, masker, decoder, encoder_activation=encoder_activation)
 
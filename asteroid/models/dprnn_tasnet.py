@@ -40,6 +40,9 @@ class DPRNNTasNet(BaseEncoderMaskerDecoder):
         stride (int, optional): Stride of the convolution.
             If None (default), set to ``kernel_size // 2``.
         sample_rate (float): Sampling rate of the model.
+        checkpoint_blocks (int, optional): If non-zero, run the masker's repeated
+            blocks with gradient checkpointing, by segments of ``checkpoint_blocks``
+            blocks, to save memory during training. See :class:`~asteroid.masknn.DPRNN`.
         **fb_kwargs (dict): Additional kwards to pass to the filterbank
             creation.
 
@@ -72,6 +75,7 @@ class DPRNNTasNet(BaseEncoderMaskerDecoder):
         encoder_activation=None,
         sample_rate=8000,
         use_mulcat=False,
+        checkpoint_blocks=0,
         **fb_kwargs,
     ):
         encoder, decoder = make_enc_dec(
@@ -107,5 +111,6 @@ class DPRNNTasNet(BaseEncoderMaskerDecoder):
             num_layers=num_layers,
             dropout=dropout,
             use_mulcat=use_mulcat,
+            checkpoint_blocks=checkpoint_blocks,
         )
         super().__init__(encoder, masker, decoder, encoder_activation=encoder_activation)
@@ -40,6 +40,15 @@ class DPTNet(BaseEncoderMaskerDecoder):
         stride (int, optional): Stride of the convolution.
             If None (default), set to ``kernel_size // 2``.
         sample_rate (float): Sampling rate of the model.
+        attention (str, optional): Attention backend, one of ``'mha'``, ``'sdpa'``
+            (default) and ``'chunked'``. See :class:`~asteroid.masknn.DPTransformer`.
+        attention_chunk_size (int, optional): Number of queries processed at once by the
+            ``'chunked'`` backend.
+        inter_attention_window (int, optional): If given, inter-chunk attention only
+            spans ``inter_attention_window`` chunks on each side.
+        checkpoint_blocks (int, optional): If non-zero, run the masker's repeated
+            blocks with gradient checkpointing, by segments of ``checkpoint_blocks``
+            blocks, to save memory during training. See :class:`~asteroid.masknn.DPTransformer`.
         **fb_kwargs (dict): Additional kwards to pass to the filterbank
             creation.
 
@@ -69,6 +78,10 @@ class DPTNet(BaseEncoderMaskerDecoder):
         n_filters=64,
         stride=8,
         sample_rate=8000,
+        attention="sdpa",
+        attention_chunk_size=256,
+        inter_attention_window=None,
+        checkpoint_blocks=0,
         **fb_kwargs,
     ):
         encoder, decoder = make_enc_dec(
@@ -101,5 +114,9 @@ class DPTNet(BaseEncoderMaskerDecoder):
             mask_act=mask_act,
             bidirectional=bidirectional,
             dropout=dropout,
+            attention=attention,
+            attention_chunk_size=attention_chunk_size,
+            inter_attention_window=inter_attention_window,
+            checkpoint_blocks=checkpoint_blocks,
         )
         super().__init__(encoder, masker, decoder, encoder_activation=encoder_activation)
@@ -5,8 +5,9 @@ import torch.nn.functional as F
 from .base_models import BaseModel
 from ..masknn.recurrent import DPRNNBlock
 from ..masknn import norms
-from ..masknn.tac import TAC
+from ..masknn.tac import TAC, valid_mics_mean
 from ..dsp.spatial import xcorr
+from ..dsp.overlap_add import strided_unfold, overlap_add
 
 
 class FasNetTAC(BaseModel):
@@ -126,15 +127,8 @@ class FasNetTAC(BaseModel):
     @staticmethod
     def windowing_with_context(x, window, context):
         batch_size, nmic, nsample = x.shape
-        unfolded = F.unfold(
-            x.unsqueeze(-1),
-            kernel_size=(window + 2 * context, 1),
-            padding=(context + window, 0),
-            stride=(window // 2, 1),
-        )
-
-        n_chunks = unfolded.size(-1)
-        unfolded = unfolded.reshape(batch_size, nmic, window + 2 * context, n_chunks)
+        # (batch, nmic, window + 2 * context, n_chunks), strided view of the padded input.
+        unfolded = strided_unfold(x, window + 2 * context, window // 2, padding=context + window)
         return (
             unfolded[:, :, context : context + window].transpose(2, -1),
             unfolded.transpose(2, -1),
@@ -153,8 +147,6 @@ class FasNetTAC(BaseModel):
         Returns:
             bf_signal (:class:`torch.Tensor`): beamformed signal with shape :math:`(batch, n\_src, samples)`.
         """
-        if valid_mics is None:
-            valid_mics = torch.LongTensor([x.shape[1]] * x.shape[0])
         n_samples = x.size(-1)  # Original number of samples of multichannel audio
         all_seg, all_mic_context = self.windowing_with_context(x, self.window, self.context)
         batch_size, n_mics, seq_length, feats = all_mic_context.size()
@@ -190,16 +182,8 @@ class FasNetTAC(BaseModel):
         # Apply bottleneck to reduce parameters and feed to DPRNN
         input_feature = self.bottleneck(input_feature.reshape(batch_size * n_mics, -1, seq_length))
         # We unfold the features for dual path processing
-        unfolded = F.unfold(
-            input_feature.unsqueeze(-1),
-            kernel_size=(self.chunk_size, 1),
-            padding=(self.chunk_size, 0),
-            stride=(self.hop_size, 1),
-        )
+        unfolded = strided_unfold(input_feature, self.chunk_size, self.hop_size)
         n_chunks = unfolded.size(-1)
-        unfolded = unfolded.reshape(
-            batch_size * n_mics, self.feature_dim, self.chunk_size, n_chunks
-        )
 
         for i in range(self.n_layers):
             # At each layer we apply DPRNN to process each mic independently and then TAC for inter-mic processing.
@@ -214,54 +198,34 @@ class FasNetTAC(BaseModel):
                 )
         # Output, 2D conv to get different feats for each source
         unfolded = self.conv_2D(unfolded).reshape(
-            batch_size * n_mics * self.n_src, self.feature_dim * self.chunk_size, n_chunks
+            batch_size * n_mics * self.n_src, self.feature_dim, self.chunk_size, n_chunks
         )
         # Dual path processing is done we fold back
-        folded = F.fold(
-            unfolded,
-            (seq_length, 1),
-            kernel_size=(self.chunk_size, 1),
-            padding=(self.chunk_size, 0),
-            stride=(self.hop_size, 1),
-        )
+        folded = overlap_add(unfolded, self.hop_size, seq_length)
         # Dividing to assure perfect reconstruction
-        folded = folded.squeeze(-1) / (self.chunk_size / self.hop_size)
+        folded = folded / (self.chunk_size / self.hop_size)
         # apply gating to output and scaling to -1 and 1
         folded = self.tanh(folded) * self.gate(folded)
         folded = folded.view(batch_size, n_mics, self.n_src, -1, seq_length)
 
         # Beamforming
         # Convolving with all mic context --> Filter and Sum
-        all_mic_context = all_mic_context.unsqueeze(2).repeat(1, 1, self.n_src, 1, 1)
+        # Each context window is one group with n_src output channels: the n_src filters
+        # share the same input, which is broadcast by the grouped conv instead of repeated.
         all_bf_output = F.conv1d(
-            all_mic_context.view(1, -1, self.context * 2 + self.window),
-            folded.transpose(3, -1).contiguous().view(-1, 1, self.filter_dim),
-            groups=batch_size * n_mics * self.n_src * seq_length,
+            all_mic_context.reshape(1, -1, self.context * 2 + self.window),
+            folded.permute(0, 1, 4, 2, 3).reshape(-1, 1, self.filter_dim),
+            groups=batch_size * n_mics * seq_length,
         )
-        all_bf_output = all_bf_output.view(batch_size, n_mics, self.n_src, seq_length, self.window)
+        all_bf_output = all_bf_output.view(batch_size, n_mics, seq_length, self.n_src, self.window)
 
-        # Fold back to obtain signal
-        all_bf_output = F.fold(
-            all_bf_output.reshape(
-                batch_size * n_mics * self.n_src, seq_length, self.window
-            ).transpose(1, -1),
-            (n_samples, 1),
-            kernel_size=(self.window, 1),
-            padding=(self.window, 0),
-            stride=(self.window // 2, 1),
-        )
-        bf_signal = all_bf_output.reshape(batch_size, n_mics, self.n_src, n_samples)
+        # We sum over mics after filtering (filters will realign the signals --> delay and sum).
+        # Overlap-add is linear, the average over valid mics is taken before folding.
+        all_bf_output = valid_mics_mean(all_bf_output, valid_mics, dim=1)
 
-        # We sum over mics after filtering (filters will realign the signals --> delay and sum)
-        if valid_mics.max() == 0:
-            bf_signal = bf_signal.mean(1)
-        else:
-            bf_signal = [
-                bf_signal[b, : valid_mics[b]].mean(0).unsqueeze(0) for b in range(batch_size)
-            ]
-            bf_signal = torch.cat(bf_signal, 0)
-
-        return bf_signal
+        # Fold back to obtain signal
+        # (batch, n_src, window, seq_length) -> (batch, n_src, n_samples)
+        return overlap_add(all_bf_output.permute(0, 2, 3, 1), self.window // 2, n_samples)
 
     def get_model_args(self):
         config = {
@@ -27,6 +27,9 @@ class SuDORMRFNet(BaseEncoderMaskerDecoder):
         stride (int, optional): Stride of the convolution.
             If None (default), set to ``kernel_size // 2``.
         sample_rate (float): Sampling rate of the model.
+        checkpoint_blocks (int, optional): If non-zero, run the masker's repeated
+            blocks with gradient checkpointing, by segments of ``checkpoint_blocks``
+            blocks, to save memory during training. See :class:`~asteroid.masknn.SuDORMRF`.
         **fb_kwargs (dict): Additional kwards to pass to the filterbank
             creation.
 
@@ -48,6 +51,7 @@ class SuDORMRFNet(BaseEncoderMaskerDecoder):
         n_filters=512,
         stride=None,
         sample_rate=8000,
+        checkpoint_blocks=0,
         **fb_kwargs,
     ):
         # Need the encoder to determine the number of input channels
@@ -79,6 +83,7 @@ class SuDORMRFNet(BaseEncoderMaskerDecoder):
             num_blocks=num_blocks,
             upsampling_depth=upsampling_depth,
             mask_act=mask_act,
+            checkpoint_blocks=checkpoint_blocks,
         )
         super().__init__(enc, masker, dec, encoder_activation="relu")
 
@@ -101,6 +106,9 @@ class SuDORMRFImprovedNet(BaseEncoderMaskerDecoder):
         kernel_size (int): Length of the filters.
         stride (int, optional): Stride of the convolution.
             If None (default), set to ``kernel_size // 2``.
+        checkpoint_blocks (int, optional): If non-zero, run the masker's repeated
+            blocks with gradient checkpointing, by segments of ``checkpoint_blocks``
+            blocks, to save memory during training. See :class:`~asteroid.masknn.SuDORMRFImproved`.
         **fb_kwargs (dict): Additional kwards to pass to the filterbank
             creation.
 
@@ -122,6 +130,7 @@ class SuDORMRFImprovedNet(BaseEncoderMaskerDecoder):
         n_filters=512,
         stride=None,
         sample_rate=8000,
+        checkpoint_blocks=0,
         **fb_kwargs,
     ):
         stride = kernel_size // 2 if not stride else stride
@@ -154,6 +163,7 @@ class SuDORMRFImprovedNet(BaseEncoderMaskerDecoder):
             num_blocks=num_blocks,
             upsampling_depth=upsampling_depth,
             mask_act=mask_act,
+            checkpoint_blocks=checkpoint_blocks,
         )
         super().__init__(enc, masker, dec, encoder_activation=None)
 
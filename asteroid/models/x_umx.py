@@ -173,7 +173,7 @@ class XUMX(BaseModel):
         return masked_mixture, time_signals
 
     def forward_masker(self, input_spec):
-        shapes = input_spec.data.shape
+        shapes = input_spec.shape
 
         # crop
         x = input_spec[..., : self.max_bin]
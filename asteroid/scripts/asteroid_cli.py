@@ -4,6 +4,7 @@ import torch
 import yaml
 import itertools
 import glob
+import time
 import warnings
 from typing import List
 
@@ -138,6 +139,20 @@ def infer(argv=None):
         help="Disable automatic reordering of overlap-add chunk. See asteroid.dsp.LambdaOverlapAdd for details. "
         "Only used if --ola-window is set.",
     )
+    parser.add_argument(
+        "--block-duration",
+        type=float,
+        default=None,
+        help="Separate files in streaming mode, by blocks of this duration (in seconds), "
+        "to bound memory usage on long files. If not set (default), files are loaded in memory.",
+    )
+    parser.add_argument(
+        "--block-overlap",
+        type=float,
+        default=None,
+        help="Crossfade duration between blocks in seconds. Defaults to block-duration / 4. "
+        "Only used if --block-duration is set.",
+    )
     parser.add_argument(
         "-o", "--output-dir", default=None, type=str, help="Output directory to save files."
     )
@@ -176,9 +191,77 @@ def infer(argv=None):
             force_overwrite=args.force_overwrite,
             output_dir=args.output_dir,
             resample=args.resample,
+            block_duration=args.block_duration,
+            block_overlap=args.block_overlap,
         )
 
 
+def serve(argv=None):
+    """CLI function to serve a pretrained model over HTTP, with dynamic batching."""
+    from asteroid.serve import SeparationServer
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("url_or_path", type=str, help="Path to the pretrained model.")
+    parser.add_argument("--host", default="127.0.0.1", type=str, help="Host to bind to.")
+    parser.add_argument("--port", default=8000, type=int, help="Port to listen on.")
+    parser.add_argument(
+        "--max-batch-size",
+        default=8,
+        type=int,
+        help="Maximum number of requests separated in the same batch.",
+    )
+    parser.add_argument(
+        "--max-latency-ms",
+        default=10.0,
+        type=float,
+        help="Maximum time (in milliseconds) a request waits for others to be batched with.",
+    )
+    parser.add_argument(
+        "--bucket-duration",
+        default=1.0,
+        type=float,
+        help="Only requests whose durations fall in the same bucket of this duration "
+        "(in seconds) are batched together, to limit padding.",
+    )
+    parser.add_argument("--workers", default=1, type=int, help="Number of inference threads.")
+    parser.add_argument(
+        "--compile",
+        nargs="?",
+        const="default",
+        default=None,
+        type=str,
+        help="Compile the model with torch.compile (for dynamic shapes), optionally with "
+        "this mode, e.g. 'max-autotune'. The first batches are slow while compiling.",
+    )
+    parser.add_argument(
+        "-d",
+        "--device",
+        default=None,
+        type=str,
+        help="Device to run the model on, eg. 'cuda:0'."
+        "Defaults to 'cuda' if CUDA is available, else 'cpu'.",
+    )
+    args = parser.parse_args(argv)
+
+    if args.device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    else:
+        device = args.device
+
+    model = BaseModel.from_pretrained(pretrained_model_conf_or_path=args.url_or_path)
+    model = model.to(device).eval()
+    if args.compile is not None:
+        model.compile(mode=args.compile, dynamic=True)
+    server = SeparationServer(
+        model,
+        max_batch_size=args.max_batch_size,
+        max_latency=args.max_latency_ms / 1000,
+        bucket_duration=args.bucket_duration,
+        num_workers=args.workers,
+    )
+    server.serve_forever(host=args.host, port=args.port)
+
+
 def register_sample_rate():
     """CLI to register sample rate to an Asteroid model saved without `sample_rate`,  before 0.4.0."""
 
@@ -197,6 +280,47 @@ def register_sample_rate():
     _register_sample_rate(filename=args.filename, sample_rate=args.sample_rate)
 
 
+def cache(argv=None):
+    """CLI to prefetch, list and prune the pretrained models cache."""
+    from asteroid.utils.hub_utils import cached_download, get_model_cache
+    from asteroid.utils.cache_utils import parse_size
+
+    parser = argparse.ArgumentParser()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    prefetch_parser = subparsers.add_parser("prefetch", help="Download models to the cache.")
+    prefetch_parser.add_argument(
+        "models", nargs="+", help="Model names, URLs or Hugging Face model ids."
+    )
+    subparsers.add_parser("list", help="List cached models, least recently used first.")
+    prune_parser = subparsers.add_parser("prune", help="Remove cached models.")
+    prune_parser.add_argument(
+        "--max-size", default=None, type=str, help="Evict LRU models above this size, ex: 5G."
+    )
+    prune_parser.add_argument(
+        "--older-than-days", default=None, type=float, help="Remove models not used since."
+    )
+    prune_parser.add_argument("--all", action="store_true", help="Remove all the cached models.")
+    args = parser.parse_args(argv)
+
+    if args.command == "prefetch":
+        for model in args.models:
+            print(f"{model}: {cached_download(model)}")
+        return
+    model_cache = get_model_cache()
+    if args.command == "list":
+        for entry in model_cache.entries():
+            last_access = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["last_access"]))
+            print(f"{entry['size'] / 2 ** 20:10.1f}M  {last_access}  {entry['url']}")
+        print(f"Total: {model_cache.total_size() / 2 ** 20:.1f}M in {model_cache.root}")
+    elif args.command == "prune":
+        older_than = args.older_than_days * 86400 if args.older_than_days is not None else None
+        removed = model_cache.prune(
+            max_size=parse_size(args.max_size), older_than=older_than, clear=args.all
+        )
+        for entry in removed:
+            print(f"Removed {entry['url']}")
+
+
 def _process_files_as_list(files_str: List[str]) -> List[str]:
     """Support filename, folder name, and globs. Returns list of filenames."""
     all_files = []
@@ -1,3 +1,4 @@
+import math
 import os
 import warnings
 import torch
@@ -14,6 +15,7 @@ except ImportError:  # noqa
 
 
 from .dsp.overlap_add import LambdaOverlapAdd
+from .losses.pit_wrapper import PITLossWrapper
 from .utils import get_device
 
 
@@ -58,7 +60,9 @@ def separate(
             (when separating from file).
         resample (bool): Whether to resample input files with wrong sample rate
             (when separating from file).
-        **kwargs: keyword arguments to be passed to `forward_wav`.
+        **kwargs: keyword arguments to be passed to `forward_wav`, or to
+            `file_separate` for its streaming options (``block_duration``,
+            ``block_overlap`` and ``reorder_blocks``).
 
     Returns:
         Union[torch.Tensor, numpy.ndarray, None], the estimated sources.
@@ -126,9 +130,29 @@ def file_separate(
     output_dir=None,
     force_overwrite=False,
     resample=False,
+    block_duration: Optional[float] = None,
+    block_overlap: Optional[float] = None,
+    reorder_blocks=True,
     **kwargs,
 ) -> None:
-    """Filename interface to `separate`."""
+    """Filename interface to `separate`.
+
+    If ``block_duration`` is given, the file is separated in streaming mode: overlapping
+    blocks are read, resampled, separated and written one after the other, and merged
+    with crossfades. Peak memory is then set by the block size instead of the file
+    length, and the estimates match the ones of the in-memory path up to block
+    boundary effects.
+
+    Args:
+        block_duration (float, optional): Duration of the blocks in seconds. If None
+            (default), the whole file is loaded in memory.
+        block_overlap (float, optional): Duration of the crossfades between consecutive
+            blocks, in seconds. At most half of ``block_duration``. Defaults to a quarter
+            of ``block_duration``.
+        reorder_blocks (bool): Whether to reorder the sources of each block to match the
+            previous block, based on their correlation on the overlap (for permutation
+            invariant models). See :class:`~asteroid.dsp.LambdaOverlapAdd`.
+    """
 
     if not hasattr(model, "sample_rate"):
         raise TypeError(
@@ -151,21 +175,25 @@ def file_separate(
         )
         return
 
+    if block_duration is not None:
+        _stream_file_separate(
+            model,
+            filename,
+            save_name_template,
+            resample,
+            block_duration,
+            block_duration / 4 if block_overlap is None else block_overlap,
+            reorder_blocks,
+            **kwargs,
+        )
+        return
+
     # SoundFile wav shape: [time, n_chan]
     wav, fs = _load_audio(filename)
-    if wav.shape[-1] > 1:
-        warnings.warn(
-            f"Received multichannel signal with {wav.shape[-1]} signals, "
-            f"using the first channel only."
-        )
+    _check_audio(model, wav.shape[-1], fs, resample)
     # FIXME: support only single-channel files for now.
     if resample:
         wav = _resample(wav[:, 0], orig_sr=fs, target_sr=int(model.sample_rate))[:, None]
-    elif fs != model.sample_rate:
-        raise RuntimeError(
-            f"Received a signal with a sampling rate of {fs}Hz for a model "
-            f"of {model.sample_rate}Hz. You can pass `resample=True` to resample automatically."
-        )
     # Pass wav as [batch, n_chan, time]; here: [1, chan, time]
     wav = wav.T[None]
     (est_srcs,) = numpy_separate(model, wav, **kwargs)
@@ -179,6 +207,128 @@ def file_separate(
         sf.write(save_name_template.format(src_idx), est_src, fs)
 
 
+def _stream_file_separate(
+    model, filename, save_name_template, resample, block_duration, block_overlap, reorder, **kwargs
+):
+    """Streaming version of `file_separate`, see its docstring."""
+    with sf.SoundFile(filename) as in_file:
+        fs, n_frames = in_file.samplerate, in_file.frames
+        _check_audio(model, in_file.channels, fs, resample)
+        block_size = int(block_duration * fs)
+        overlap = int(block_overlap * fs)
+        if block_size <= 0 or not 0 <= overlap <= block_size // 2:
+            raise ValueError(
+                f"Expected a positive block duration and an overlap of at most half of it, "
+                f"received {block_duration}s and {block_overlap}s."
+            )
+        model_sr = int(model.sample_rate) if resample else fs
+        model_overlap = round(overlap * model_sr / fs)
+        model_device = get_device(model, default="cpu")
+        separate_func = getattr(model, "forward_wav", model)
+
+        part_files = []
+        # Energy matching of `torch_separate`, accumulated over the whole file.
+        in_energy, out_energy = 0.0, 0.0
+        previous, pending = None, None
+        hop_size = block_size - overlap
+        for offset in range(0, max(n_frames - overlap, 1), hop_size):
+            in_file.seek(offset)
+            block = in_file.read(block_size, dtype="float32", always_2d=True)[:, 0]
+            fade_in, fade_out = offset > 0, offset + block_size < n_frames
+
+            wav = torch.from_numpy(_resample(block, orig_sr=fs, target_sr=model_sr))
+            with torch.no_grad():
+                est_srcs = separate_func(wav[None, None].to(model_device), **kwargs)[0].cpu()
+            in_window = _crossfade_window(wav.shape[-1], model_overlap, fade_in, fade_out)
+            out_window = _crossfade_window(est_srcs.shape[-1], model_overlap, fade_in, fade_out)
+            in_energy += (in_window * wav.abs()).sum().item()
+            out_energy += (out_window * est_srcs.abs()).sum().item()
+
+            # Back to the original sample rate and length.
+            est_srcs = torch.stack(
+                [
+                    _fix_length(_resample(est.numpy(), orig_sr=model_sr, target_sr=fs), len(block))
+                    for est in est_srcs
+                ]
+            )
+            if previous is not None and reorder and overlap > 0:
+                est_srcs = _reorder_block(est_srcs, previous, overlap)
+            previous = est_srcs
+            est_srcs = est_srcs * _crossfade_window(len(block), overlap, fade_in, fade_out)
+            if pending is not None:
+                est_srcs[:, :overlap] += pending
+
+            if not part_files:
+                part_files = [
+                    sf.SoundFile(
+                        save_name_template.format(src_idx) + ".part",
+                        "w",
+                        samplerate=fs,
+                        channels=1,
+                        format="WAV",
+                        subtype="FLOAT",
+                    )
+                    for src_idx in range(1, len(est_srcs) + 1)
+                ]
+            n_final = len(block) if not fade_out else hop_size
+            for part_file, est in zip(part_files, est_srcs):
+                part_file.write(est[:n_final].numpy())
+            pending = est_srcs[:, n_final:]
+
+    # Rescale the estimates and write them to their final file.
+    scale = in_energy / out_energy if out_energy > 0 else 1.0
+    for src_idx, part_file in enumerate(part_files, 1):
+        part_file.close()
+        save_name = save_name_template.format(src_idx)
+        with sf.SoundFile(save_name, "w", samplerate=fs, channels=1) as out_file:
+            for est in sf.blocks(part_file.name, blocksize=block_size, dtype="float32"):
+                out_file.write(est * scale)
+        os.remove(part_file.name)
+
+
+def _check_audio(model, n_channels, fs, resample):
+    if n_channels > 1:
+        warnings.warn(
+            f"Received multichannel signal with {n_channels} signals, "
+            f"using the first channel only."
+        )
+    if not resample and fs != model.sample_rate:
+        raise RuntimeError(
+            f"Received a signal with a sampling rate of {fs}Hz for a model "
+            f"of {model.sample_rate}Hz. You can pass `resample=True` to resample automatically."
+        )
+
+
+def _crossfade_window(length, overlap, fade_in, fade_out):
+    """Window of a block, with squared sine fades on the `overlap` first/last samples,
+    such that the windows of consecutive blocks sum to one."""
+    window = torch.ones(length)
+    if overlap > 0:
+        ramp = torch.sin(0.5 * math.pi * (torch.arange(overlap) + 0.5) / overlap) ** 2
+        if fade_in:
+            window[:overlap] *= ramp[:length]
+        if fade_out:
+            window[-overlap:] *= ramp.flip(0)[-length:]
+    return window
+
+
+def _reorder_block(est_srcs, previous, overlap):
+    """Reorder the sources of a block to maximize their correlation with the previous
+    block on their overlap."""
+    current = est_srcs[:, :overlap]
+    previous = previous[:, -overlap:]
+    current = current - current.mean(-1, keepdim=True)
+    previous = previous - previous.mean(-1, keepdim=True)
+    pair_wise_losses = -torch.sum(current.unsqueeze(1) * previous.unsqueeze(0), dim=-1)
+    _, batch_indices = PITLossWrapper.find_best_perm(pair_wise_losses[None])
+    return PITLossWrapper.reorder_source(est_srcs[None], batch_indices)[0]
+
+
+def _fix_length(wav, length):
+    wav = torch.from_numpy(wav)[:length]
+    return torch.nn.functional.pad(wav, (0, length - wav.shape[-1]))
+
+
 def _resample(wav, orig_sr, target_sr, _resamplers={}):
     from julius import ResampleFrac
 
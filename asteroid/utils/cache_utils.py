@@ -0,0 +1,331 @@
+"""Content-addressed, integrity-checked cache for pretrained models.
+
+Layout of a cache (or mirror) directory::
+
+    <root>/blobs/<sha256>       # Model files, named after the sha256 of their content.
+    <root>/refs/<url hash>.json # Which blob a URL resolves to (+ size and URL).
+    <root>/locks/               # Inter-process file locks.
+
+Downloads go to a temporary file which is hashed, verified and atomically
+renamed into ``blobs/``, under a per-URL file lock: concurrent processes
+calling :meth:`ModelCache.fetch` on the same URL download it once and never
+see partially written files. The last access time of each entry is the
+modification time of its ref, which is used for LRU eviction.
+"""
+import json
+import os
+import re
+import tempfile
+import time
+from hashlib import sha256
+from typing import Callable, Dict, List, Optional, Union
+
+from filelock import FileLock
+from torch import hub
+
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(size: Optional[Union[int, str]]) -> Optional[int]:
+    """Parse a size in bytes, with optional binary suffix (ex: ``"500M"``, ``"2G"``)."""
+    if size is None or isinstance(size, int):
+        return size
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*", str(size), flags=re.IGNORECASE)
+    if match is None:
+        raise ValueError(f"Could not parse size {size}. Expected a number with optional K/M/G/T.")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def file_sha256(path: str, chunk_size: int = 2**20) -> str:
+    """Return the sha256 hex digest of the file at ``path``, reading it by chunks."""
+    digest = sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def url_to_key(url: str) -> str:
+    """Consistently convert ``url`` into a cache key."""
+    return sha256(url.encode("utf-8")).hexdigest()
+
+
+class CacheIntegrityError(RuntimeError):
+    """Raised when a cached or downloaded file doesn't match its expected sha256."""
+
+
+class ModelCache:
+    """Concurrent-safe, content-addressed model cache with LRU eviction.
+
+    Args:
+        root (str): Cache directory.
+        max_size (int or str, optional): Maximum total size of the cached blobs
+            (ex: ``"5G"``). Least recently used entries are evicted after each
+            download. No limit if None.
+        mirror (str, optional): Read-only directory with the same layout as the cache
+            (ex: a cache copied from a connected machine). It is looked up
+            before downloading anything.
+        offline (bool): If True, never download: resolve from the cache or the mirror only.
+        downloader (callable, optional): ``downloader(url, dst_path)`` writing the content
+            of ``url`` to ``dst_path``. Defaults to ``torch.hub.download_url_to_file``.
+        verify_on_hit (bool): Whether to re-hash cached files on every access. By default,
+            files are hashed when written and only their size is checked on access.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        max_size: Optional[Union[int, str]] = None,
+        mirror: Optional[str] = None,
+        offline: bool = False,
+        downloader: Optional[Callable[[str, str], None]] = None,
+        verify_on_hit: bool = False,
+    ):
+        self.root = root
+        self.max_size = parse_size(max_size)
+        self.mirror = mirror
+        self.offline = offline
+        self.downloader = downloader or _default_downloader
+        self.verify_on_hit = verify_on_hit
+        for sub_dir in ["blobs", "refs", "locks"]:
+            os.makedirs(os.path.join(root, sub_dir), exist_ok=True)
+
+    @classmethod
+    def from_env(cls, root: str, **kwargs):
+        """Instantiate with the settings of the ``ASTEROID_CACHE_MAX_SIZE``,
+        ``ASTEROID_CACHE_MIRROR`` and ``ASTEROID_OFFLINE`` environment variables."""
+        kwargs.setdefault("max_size", os.getenv("ASTEROID_CACHE_MAX_SIZE"))
+        kwargs.setdefault("mirror", os.getenv("ASTEROID_CACHE_MIRROR"))
+        kwargs.setdefault("offline", os.getenv("ASTEROID_OFFLINE", "0").lower() in ["1", "true"])
+        return cls(root, **kwargs)
+
+    def blob_path(self, digest: str, root: Optional[str] = None) -> str:
+        return os.path.join(root or self.root, "blobs", digest)
+
+    def ref_path(self, url: str, root: Optional[str] = None) -> str:
+        return os.path.join(root or self.root, "refs", url_to_key(url) + ".json")
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Return the path of the cached file for ``url`` (cache, then mirror), or None."""
+        for root in [self.root, self.mirror]:
+            if root is None:
+                continue
+            ref = _read_ref(self.ref_path(url, root=root))
+            if ref is None:
+                continue
+            path = self.blob_path(ref["sha256"], root=root)
+            if self._is_valid(path, ref):
+                if root == self.root:
+                    _touch(self.ref_path(url))
+                return path
+        return None
+
+    def fetch(self, url: str, sha256_digest: Optional[str] = None) -> str:
+        """Return a local path to the content of ``url``, downloading it if needed.
+
+        Args:
+            url (str): URL of the file.
+            sha256_digest (str, optional): Expected sha256 of the file. If given, the
+                download is rejected if it doesn't match.
+
+        Returns:
+            str, path to the verified file.
+        """
+        path = self.lookup(url)
+        if path is not None:
+            _check_digest(path, sha256_digest, hashed=self.verify_on_hit)
+            return path
+        if self.offline:
+            raise FileNotFoundError(
+                f"{url} is not in the cache ({self.root}) nor in the mirror ({self.mirror}) "
+                f"and downloads are disabled (offline mode)."
+            )
+        with FileLock(os.path.join(self.root, "locks", url_to_key(url) + ".lock")):
+            # Another process might have downloaded it while we were waiting for the lock.
+            path = self.lookup(url)
+            if path is None:
+                path = self._download(url, sha256_digest)
+        self.evict(keep=[path])
+        _check_digest(path, sha256_digest, hashed=False)
+        return path
+
+    def add_file(self, url: str, filename: str, move: bool = False) -> str:
+        """Register a local file as the content of ``url`` (ex: to seed a mirror)."""
+        with FileLock(os.path.join(self.root, "locks", url_to_key(url) + ".lock")):
+            tmp_path = _tmp_file(os.path.join(self.root, "blobs"))
+            if move:
+                os.replace(filename, tmp_path)
+            else:
+                with open(filename, "rb") as src, open(tmp_path, "wb") as dst:
+                    for chunk in iter(lambda: src.read(2**20), b""):
+                        dst.write(chunk)
+            return self._commit(url, tmp_path)
+
+    def entries(self) -> List[Dict]:
+        """List the cache entries, least recently used first."""
+        all_entries = []
+        refs_dir = os.path.join(self.root, "refs")
+        for name in os.listdir(refs_dir):
+            if name.startswith("."):
+                continue
+            ref_path = os.path.join(refs_dir, name)
+            ref = _read_ref(ref_path)
+            if ref is None:
+                continue
+            try:
+                last_access = os.path.getmtime(ref_path)
+            except FileNotFoundError:
+                continue
+            all_entries.append(
+                dict(
+                    ref,
+                    ref_path=ref_path,
+                    path=self.blob_path(ref["sha256"]),
+                    last_access=last_access,
+                )
+            )
+        return sorted(all_entries, key=lambda e: e["last_access"])
+
+    def total_size(self) -> int:
+        """Total size in bytes of the cached blobs."""
+        blobs_dir = os.path.join(self.root, "blobs")
+        return sum(
+            os.path.getsize(os.path.join(blobs_dir, name))
+            for name in os.listdir(blobs_dir)
+            if not name.startswith(".")
+        )
+
+    def evict(self, max_size: Optional[Union[int, str]] = None, keep=()) -> List[Dict]:
+        """Remove least recently used entries until the cache is smaller than ``max_size``
+        (defaults to the cache's ``max_size``). Paths in ``keep`` are never removed.
+
+        Returns:
+            list of the removed entries.
+        """
+        max_size = parse_size(max_size) if max_size is not None else self.max_size
+        if max_size is None:
+            return []
+        removed = []
+        with FileLock(os.path.join(self.root, "locks", "evict.lock")):
+            size = self.total_size()
+            for entry in self.entries():
+                if size <= max_size:
+                    break
+                if entry["path"] in keep:
+                    continue
+                size -= self._remove(entry)
+                removed.append(entry)
+        return removed
+
+    def prune(self, max_size=None, older_than: Optional[float] = None, clear: bool = False):
+        """Remove entries: all of them (``clear``), those not accessed for ``older_than``
+        seconds, then the least recently used ones above ``max_size``.
+
+        Returns:
+            list of the removed entries.
+        """
+        removed = []
+        with FileLock(os.path.join(self.root, "locks", "evict.lock")):
+            now = time.time()
+            for entry in self.entries():
+                if clear or (older_than is not None and now - entry["last_access"] > older_than):
+                    self._remove(entry)
+                    removed.append(entry)
+            self._remove_dangling_blobs()
+        if max_size is not None:
+            removed += self.evict(max_size=max_size)
+        return removed
+
+    def _download(self, url: str, sha256_digest: Optional[str]) -> str:
+        tmp_path = _tmp_file(os.path.join(self.root, "blobs"))
+        try:
+            self.downloader(url, tmp_path)
+            return self._commit(url, tmp_path, sha256_digest)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _commit(self, url: str, tmp_path: str, sha256_digest: Optional[str] = None) -> str:
+        """Hash, verify and atomically move ``tmp_path`` into the cache, then write the ref."""
+        digest = file_sha256(tmp_path)
+        if sha256_digest is not None and digest != sha256_digest:
+            os.remove(tmp_path)
+            raise CacheIntegrityError(
+                f"Downloaded file from {url} has sha256 {digest}, expected {sha256_digest}."
+            )
+        path = self.blob_path(digest)
+        size = os.path.getsize(tmp_path)
+        os.replace(tmp_path, path)
+        ref = {"url": url, "sha256": digest, "size": size}
+        ref_tmp_path = _tmp_file(os.path.join(self.root, "refs"))
+        with open(ref_tmp_path, "w") as f:
+            json.dump(ref, f)
+        os.replace(ref_tmp_path, self.ref_path(url))
+        return path
+
+    def _remove(self, entry: Dict) -> int:
+        """Remove the ref of ``entry`` and its blob if no other ref uses it.
+        Returns the number of bytes freed."""
+        _silent_remove(entry["ref_path"])
+        if any(e["sha256"] == entry["sha256"] for e in self.entries()):
+            return 0
+        freed = os.path.getsize(entry["path"]) if os.path.exists(entry["path"]) else 0
+        _silent_remove(entry["path"])
+        return freed
+
+    def _remove_dangling_blobs(self):
+        used = {e["sha256"] for e in self.entries()}
+        blobs_dir = os.path.join(self.root, "blobs")
+        for name in os.listdir(blobs_dir):
+            if not name.startswith(".") and name not in used:
+                _silent_remove(os.path.join(blobs_dir, name))
+
+    def _is_valid(self, path: str, ref: Dict) -> bool:
+        try:
+            if os.path.getsize(path) != ref["size"]:
+                return False
+        except FileNotFoundError:
+            return False
+        return not self.verify_on_hit or file_sha256(path) == ref["sha256"]
+
+
+def _default_downloader(url, dst):
+    hub.download_url_to_file(url, dst)
+
+
+def _tmp_file(dirname):
+    # Hidden temporary files are ignored by size accounting and listing.
+    fd, path = tempfile.mkstemp(dir=dirname, prefix=".tmp-")
+    os.close(fd)
+    return path
+
+
+def _read_ref(ref_path):
+    try:
+        with open(ref_path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _check_digest(path, sha256_digest, hashed):
+    if sha256_digest is None:
+        return
+    digest = os.path.basename(path) if not hashed else file_sha256(path)
+    if digest != sha256_digest:
+        raise CacheIntegrityError(f"{path} has sha256 {digest}, expected {sha256_digest}.")
+
+
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError:  # Read-only or concurrently removed.
+        pass
+
+
+def _silent_remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
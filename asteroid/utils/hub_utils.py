@@ -1,12 +1,17 @@
 import os
+import json
+import contextlib
 from functools import lru_cache
 from hashlib import sha256
 from typing import Union, Dict, List
 
 import requests
-from torch import hub
+import torch
 import huggingface_hub
 
+from .cache_utils import ModelCache
+from .generic_utils import has_arg
+
 
 CACHE_DIR = os.getenv(
     "ASTEROID_CACHE",
@@ -43,6 +48,10 @@ def cached_download(filename_or_url):
 
     Returns:
         str, normalized path to the downloaded (or not) model
+
+    .. note:: URLs and Zenodo models are stored in a concurrent-safe, sha256-verified
+        cache, see :func:`get_model_cache`. Hugging Face models use the Hugging Face
+        cache in ``ASTEROID_CACHE``.
     """
     from .. import __version__ as asteroid_version  # Avoid circular imports
 
@@ -52,7 +61,7 @@ def cached_download(filename_or_url):
     if filename_or_url.startswith(huggingface_hub.HUGGINGFACE_CO_URL_HOME):
         filename_or_url = filename_or_url[len(huggingface_hub.HUGGINGFACE_CO_URL_HOME) :]
 
-    if filename_or_url.startswith(("http://", "https://")):
+    if filename_or_url.startswith(("http://", "https://", "file://")):
         url = filename_or_url
     elif filename_or_url in MODELS_URLS_HASHTABLE:
         url = MODELS_URLS_HASHTABLE[filename_or_url]
@@ -73,19 +82,91 @@ def cached_download(filename_or_url):
             revision=revision,
             library_name="asteroid",
             library_version=asteroid_version,
+            local_files_only=get_model_cache().offline,
         )
 
-    cached_filename = url_to_filename(url)
-    cached_dir = os.path.join(get_cache_dir(), cached_filename)
-    cached_path = os.path.join(cached_dir, "model.pth")
-
-    os.makedirs(cached_dir, exist_ok=True)
-    if not os.path.isfile(cached_path):
-        hub.download_url_to_file(url, cached_path)
+    cache = get_model_cache()
+    cached_path = cache.lookup(url)
+    if cached_path is not None:
+        print(f"Using cached model `{filename_or_url}`")
         return cached_path
-    # It was already downloaded
-    print(f"Using cached model `{filename_or_url}`")
-    return cached_path
+    # Models downloaded by previous versions of Asteroid are moved to the new cache layout.
+    legacy_path = os.path.join(get_cache_dir(), url_to_filename(url), "model.pth")
+    if os.path.isfile(legacy_path):
+        try:
+            return cache.add_file(url, legacy_path, move=True)
+        except FileNotFoundError:  # Moved by another process in the meantime.
+            pass
+    return cache.fetch(url)
+
+
+def load_package(filename, mmap=True):
+    """Load a model package (as returned by ``BaseModel.serialize``) on CPU.
+
+    The weights are memory-mapped when possible: they are only read when used and
+    the pages are shared by all the processes loading the same file (and by forked
+    workers). Safetensors files (``.safetensors``, see :func:`save_safetensors_package`)
+    are always memory-mapped, and require the ``safetensors`` package.
+
+    Args:
+        filename (str): Path to the model package.
+        mmap (bool): Whether to memory-map torch files. Files saved with the legacy
+            (non zipfile) serialization are always fully loaded.
+
+    Returns:
+        dict, the model package.
+    """
+    if filename.endswith(".safetensors"):
+        return _load_safetensors_package(filename)
+    with _allow_torch_version():
+        if mmap and has_arg(torch.load, "mmap"):
+            try:
+                return torch.load(filename, map_location="cpu", mmap=True)
+            except RuntimeError:  # Legacy serialization.
+                pass
+        return torch.load(filename, map_location="cpu")
+
+
+def _allow_torch_version():
+    # Packages saved before Asteroid stored the torch version as a string
+    # can't be loaded with `weights_only=True` (default since torch 2.6) otherwise.
+    if hasattr(torch.serialization, "safe_globals"):
+        return torch.serialization.safe_globals([torch.torch_version.TorchVersion])
+    return contextlib.nullcontext()
+
+
+def save_safetensors_package(model_package, filename):
+    """Save a model package (as returned by ``BaseModel.serialize``) in the safetensors format,
+    to be loaded without copy by ``BaseModel.from_pretrained``.
+
+    Args:
+        model_package (dict): Model package with ``model_name``, ``model_args``
+            and ``state_dict`` keys.
+        filename (str): Path to save to, ending with ``.safetensors``.
+    """
+    from safetensors.torch import save_file
+
+    metadata = {
+        "model_name": model_package["model_name"],
+        "model_args": json.dumps(model_package["model_args"]),
+        "infos": json.dumps(model_package.get("infos", {})),
+    }
+    state_dict = {k: v.contiguous() for k, v in model_package["state_dict"].items()}
+    save_file(state_dict, filename, metadata=metadata)
+
+
+def _load_safetensors_package(filename):
+    from safetensors import safe_open
+    from safetensors.torch import load_file
+
+    with safe_open(filename, framework="pt") as f:
+        metadata = f.metadata()
+    return dict(
+        model_name=metadata["model_name"],
+        model_args=json.loads(metadata["model_args"]),
+        infos=json.loads(metadata.get("infos", "{}")),
+        state_dict=load_file(filename),
+    )
 
 
 def url_to_filename(url):
@@ -101,6 +182,17 @@ def get_cache_dir():
     return CACHE_DIR
 
 
+def get_model_cache(**kwargs):
+    """Return the :class:`~asteroid.utils.cache_utils.ModelCache` in ``ASTEROID_CACHE``.
+
+    It is configured with the ``ASTEROID_CACHE_MAX_SIZE`` (ex: ``"10G"``),
+    ``ASTEROID_CACHE_MIRROR`` (local mirror directory, looked up before downloading)
+    and ``ASTEROID_OFFLINE`` (``1`` to disable downloads) environment variables,
+    which ``kwargs`` override.
+    """
+    return ModelCache.from_env(get_cache_dir(), **kwargs)
+
+
 @lru_cache()
 def model_list(
     endpoint=huggingface_hub.HUGGINGFACE_CO_URL_HOME, name_only=False
@@ -1,9 +1,13 @@
+import contextlib
 import functools
 
 import torch
 from torch import nn
+from torch.utils.checkpoint import checkpoint
 from collections import OrderedDict
 
+from .generic_utils import has_arg
+
 
 def to_cuda(tensors):  # pragma: no cover
     """Transfer tensor, dict or list of tensors to GPU.
@@ -66,28 +70,46 @@ def get_device(tensor_or_module, default=None):
             a ``torch.nn.Module``, or anything else that has a ``device`` attribute
             or a ``parameters() -> Iterator[torch.Tensor]`` method.
         default (Optional[Union[str, torch.device]]): If the device can not be
-            determined, return this device instead. If ``None`` (the default),
-            raise a ``TypeError`` instead.
+            determined (e.g. a module without parameters), return this device
+            instead. If ``None`` (the default), raise a ``TypeError`` instead.
 
     Returns:
         torch.device: The device that ``tensor_or_module`` is on.
     """
     if hasattr(tensor_or_module, "device"):
         return tensor_or_module.device
-    elif hasattr(tensor_or_module, "parameters"):
-        return next(tensor_or_module.parameters()).device
+    param = None
+    if hasattr(tensor_or_module, "parameters"):
+        param = next(iter(tensor_or_module.parameters()), None)
+    if param is not None:
+        return param.device
     elif default is None:
         raise TypeError(f"Don't know how to get device of {type(tensor_or_module)} object")
     else:
         return torch.device(default)
 
 
+def is_compiling():
+    """
+    Returns ``True`` when the code is being compiled by ``torch.compile``
+    (TorchDynamo), and ``False`` otherwise (or if ``torch.compiler.is_compiling``
+    is not available).
+    """
+    compiler = getattr(torch, "compiler", None)
+    if compiler is not None and hasattr(compiler, "is_compiling"):
+        return compiler.is_compiling()
+    return False
+
+
 def is_tracing():
     # Taken for pytorch for compat in 1.6.0
     """
     Returns ``True`` in tracing (if a function is called during the tracing of
     code with ``torch.jit.trace``) and ``False`` otherwise.
     """
+    if is_compiling():
+        # `torch._C._is_tracing` would break the graph, and compiling is not tracing.
+        return False
     return torch._C._is_tracing()
 
 
@@ -212,3 +234,171 @@ def jitable_shape(tensor):
         torch.Tensor: Shape of ``tensor``
     """
     return torch.tensor(tensor.shape)
+
+
+_INIT_FUNCTIONS = [
+    "uniform_",
+    "normal_",
+    "trunc_normal_",
+    "constant_",
+    "ones_",
+    "zeros_",
+    "eye_",
+    "dirac_",
+    "xavier_uniform_",
+    "xavier_normal_",
+    "kaiming_uniform_",
+    "kaiming_normal_",
+    "orthogonal_",
+    "sparse_",
+]
+
+
+@contextlib.contextmanager
+def skip_init():
+    """Context manager in which the ``torch.nn.init`` functions are no-ops.
+
+    Use it to instantiate a model whose weights will be overwritten right after
+    (e.g. by ``load_state_dict``): parameters are left uninitialized, which saves
+    the cost of the random initialization and doesn't touch their memory.
+
+    .. note:: This patches ``torch.nn.init`` for the whole process while the
+        context is active, don't instantiate other models concurrently. Prefer
+        :func:`build_with_state_dict`, which only uses it with old torch versions.
+    """
+    originals = {name: getattr(nn.init, name) for name in _INIT_FUNCTIONS if hasattr(nn.init, name)}
+    for name in originals:
+        setattr(nn.init, name, _no_init)
+    try:
+        yield
+    finally:
+        for name, fn in originals.items():
+            setattr(nn.init, name, fn)
+
+
+def _no_init(tensor, *args, **kwargs):
+    return tensor
+
+
+def load_state_dict_zero_copy(model, state_dict):
+    """Strictly load ``state_dict`` in ``model``, using its tensors without copy when possible.
+
+    If all the tensors of ``state_dict`` have the same dtype as the ones in ``model``, they
+    replace them (``load_state_dict(assign=True)``), so that memory-mapped tensors stay
+    memory-mapped and are shared across processes. Otherwise, they are copied.
+
+    Args:
+        state_dict (OrderedDict): the state_dict to load.
+        model (torch.nn.Module): the model to load it into
+
+    Returns:
+        torch.nn.Module: model with loaded weights.
+    """
+    model_state = model.state_dict()
+    same_dtypes = all(
+        k in state_dict and state_dict[k].dtype == v.dtype for k, v in model_state.items()
+    )
+    if same_dtypes and has_arg(model.load_state_dict, "assign"):
+        model.load_state_dict(state_dict, assign=True)
+    else:
+        model.load_state_dict(state_dict)
+    return model
+
+
+def build_with_state_dict(build, state_dict, zero_copy=False):
+    """Instantiate a model with ``build()`` and strictly load ``state_dict`` in it,
+    without initializing the weights that are overwritten.
+
+    The model is built on the ``meta`` device (nothing is allocated nor initialized),
+    then its tensors are replaced by the ones of ``state_dict``, cast to the dtypes of
+    the model. Models creating other tensors in ``__init__`` (or not supporting the
+    ``meta`` device) are built again and initialized normally. With torch versions
+    without ``load_state_dict(assign=True)``, the initialization is skipped with
+    :func:`skip_init` instead.
+
+    Args:
+        build (callable): Function returning the model.
+        state_dict (OrderedDict): the state_dict to load.
+        zero_copy (bool): Whether to use the tensors of ``state_dict`` without copy
+            when they have the right dtype (memory-mapped tensors stay memory-mapped).
+            ``state_dict`` must then not be modified afterwards.
+
+    Returns:
+        torch.nn.Module: model with loaded weights.
+    """
+    if not has_arg(nn.Module.load_state_dict, "assign"):
+        with skip_init():
+            model = build()
+        if zero_copy:
+            return load_state_dict_zero_copy(model, state_dict)
+        model.load_state_dict(state_dict)
+        return model
+    try:
+        with torch.device("meta"):
+            model = build()
+    except (NotImplementedError, RuntimeError):
+        model = None
+    if model is not None:
+        model_state = model.state_dict()
+        tensors = OrderedDict()
+        for name, tensor in state_dict.items():
+            if isinstance(tensor, torch.Tensor) and name in model_state:
+                if tensor.dtype != model_state[name].dtype:
+                    tensor = tensor.to(model_state[name].dtype)
+                elif not zero_copy:
+                    tensor = tensor.clone()
+            tensors[name] = tensor
+        model.load_state_dict(tensors, assign=True)
+        if not _has_meta_tensors(model):
+            return model
+    model = build()
+    model.load_state_dict(state_dict)
+    return model
+
+
+def _has_meta_tensors(model):
+    """Whether parameters, buffers or tensor attributes of ``model`` are on the meta device."""
+    tensors = list(model.parameters()) + list(model.buffers())
+    for module in model.modules():
+        tensors += [v for v in vars(module).values() if isinstance(v, torch.Tensor)]
+    return any(tensor.is_meta for tensor in tensors)
+
+
+def checkpointed_loop(step, n_steps, state, segment_size=0):
+    """Run ``state = step(i, *state)`` for ``i`` in ``range(n_steps)``, with gradient
+    checkpointing by segments of ``segment_size`` consecutive steps.
+
+    Only the states at segment boundaries are kept for backward, activations inside
+    a segment are recomputed. This trades compute for memory when the steps are the
+    repeated blocks of a network.
+
+    Args:
+        step (callable): Function of the step index and the state tensors, returning
+            the new state as a tuple.
+        n_steps (int): Number of steps.
+        state (tuple): Initial state.
+        segment_size (int, optional): Number of steps per checkpointed segment.
+            If 0 (default), or if gradients are disabled or during tracing, no
+            checkpointing is applied.
+
+    Returns:
+        tuple: The final state.
+
+    .. note:: Modules updating buffers in forward (e.g. ``BatchNorm`` running
+        statistics) are called twice per step during training.
+    """
+    state = tuple(state)
+    if not segment_size or not torch.is_grad_enabled() or is_tracing():
+        for i in range(n_steps):
+            state = step(i, *state)
+        return state
+
+    def run_segment(start, stop, *state):
+        for i in range(start, stop):
+            state = step(i, *state)
+        return state
+
+    for start in range(0, n_steps, segment_size):
+        stop = min(start + segment_size, n_steps)
+        state = checkpoint(run_segment, start, stop, *state, use_reentrant=False)
+    return state
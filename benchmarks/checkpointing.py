@@ -0,0 +1,86 @@
+"""Benchmark activation checkpointing in the mask networks: peak memory and step time.
+
+Runs forward and backward passes of ConvTasNet, DPRNNTasNet, DPTNet, SuDORMRFNet and
+SuDORMRFImprovedNet with ``checkpoint_blocks=0`` (no checkpointing) and with the
+given segment sizes. Peak memory is measured with ``torch.cuda.max_memory_allocated``
+on GPU, and from the profiler's allocation events on CPU.
+
+Usage:
+    python benchmarks/checkpointing.py --n_samples 32000 --segment_sizes 1 2
+"""
+import argparse
+import time
+
+import torch
+from torch.profiler import profile, ProfilerActivity
+
+from asteroid.models import ConvTasNet, DPRNNTasNet, DPTNet, SuDORMRFNet, SuDORMRFImprovedNet
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--n_samples", type=int, default=32000)
+parser.add_argument("--batch_size", type=int, default=2)
+parser.add_argument("--n_repeats", type=int, default=3)
+parser.add_argument("--segment_sizes", type=int, nargs="+", default=[1, 2])
+parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+
+
+def train_step(model, mix):
+    model.zero_grad(set_to_none=True)
+    model(mix).pow(2).mean().backward()
+
+
+def cpu_peak_memory(fn):
+    with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+        fn()
+    events = sorted(prof.events(), key=lambda e: e.time_range.start)
+    current, peak = 0, 0
+    for event in events:
+        if event.name == "[memory]":
+            current += event.cpu_memory_usage
+            peak = max(peak, current)
+    return peak
+
+
+def measure(fn, n_repeats, device):
+    fn()
+    if device == "cuda":
+        torch.cuda.synchronize()
+        torch.cuda.reset_peak_memory_stats()
+        base = torch.cuda.memory_allocated()
+        fn()
+        torch.cuda.synchronize()
+        peak = torch.cuda.max_memory_allocated() - base
+    else:
+        peak = cpu_peak_memory(fn)
+    tic = time.perf_counter()
+    for _ in range(n_repeats):
+        fn()
+    if device == "cuda":
+        torch.cuda.synchronize()
+    return (time.perf_counter() - tic) / n_repeats, peak
+
+
+def main(args):
+    torch.manual_seed(0)
+    mix = torch.randn(args.batch_size, args.n_samples, device=args.device)
+    models = {
+        "ConvTasNet": (ConvTasNet, dict(n_src=3)),
+        "DPRNNTasNet": (DPRNNTasNet, dict(n_src=3, n_repeats=6)),
+        "DPTNet": (DPTNet, dict(n_src=3, n_repeats=2)),
+        "SuDORMRFNet": (SuDORMRFNet, dict(n_src=3, num_blocks=8)),
+        "SuDORMRFImprovedNet": (SuDORMRFImprovedNet, dict(n_src=3, num_blocks=8)),
+    }
+    for name, (model_cls, kwargs) in models.items():
+        print(name)
+        for segment_size in [0] + args.segment_sizes:
+            model = model_cls(**kwargs, checkpoint_blocks=segment_size).to(args.device).train()
+            duration, peak = measure(lambda: train_step(model, mix), args.n_repeats, args.device)
+            print(
+                f"  checkpoint_blocks={segment_size}: {duration * 1000:8.1f}ms/step, "
+                f"{peak / 2**20:8.1f}MB peak"
+            )
+
+
+if __name__ == "__main__":
+    main(parser.parse_args())
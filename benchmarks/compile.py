@@ -0,0 +1,69 @@
+"""Benchmark `BaseModel.compile`: eager and compiled CPU inference latency.
+
+For each model (with its default configuration), reports the compilation time
+(first call) and the average latency of the eager and compiled forward passes
+under `torch.inference_mode`.
+
+Usage:
+    python benchmarks/compile.py --models ConvTasNet DPRNNTasNet --duration 4
+"""
+import argparse
+import time
+
+import torch
+
+from asteroid import models
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument(
+    "--models",
+    nargs="+",
+    default=["ConvTasNet", "DPRNNTasNet", "DPTNet", "SuDORMRFImprovedNet", "DCCRNet"],
+)
+parser.add_argument("--duration", type=float, default=4.0, help="Input duration in seconds.")
+parser.add_argument("--sample_rate", type=int, default=8000)
+parser.add_argument("--batch_size", type=int, default=1)
+parser.add_argument("--n_repeats", type=int, default=10)
+parser.add_argument("--mode", default=None, help="torch.compile mode.")
+parser.add_argument("--n_threads", type=int, default=None)
+
+MODEL_ARGS = {
+    "DCUNet": dict(architecture="DCUNet-10", fix_length_mode="pad"),
+    "DCCRNet": dict(architecture="DCCRN-CL"),
+    "DeMask": dict(),
+}
+
+
+def measure(fn, inputs, n_repeats):
+    tic = time.perf_counter()
+    for _ in range(n_repeats):
+        fn(inputs)
+    return (time.perf_counter() - tic) / n_repeats
+
+
+def main(args):
+    if args.n_threads is not None:
+        torch.set_num_threads(args.n_threads)
+    torch.manual_seed(0)
+    n_samples = int(args.duration * args.sample_rate)
+    inputs = torch.randn(args.batch_size, n_samples)
+    print(f"Input of shape {tuple(inputs.shape)}, {torch.get_num_threads()} threads")
+    for name in args.models:
+        model = models.get(name)(**MODEL_ARGS.get(name, dict(n_src=2))).eval()
+        with torch.inference_mode():
+            model(inputs)  # Warm up
+            eager = measure(model, inputs, args.n_repeats)
+            model.compile(mode=args.mode)
+            tic = time.perf_counter()
+            model(inputs)
+            compilation = time.perf_counter() - tic
+            compiled = measure(model, inputs, args.n_repeats)
+        print(
+            f"  {name:>20s}: eager {eager * 1000:8.1f}ms, compiled {compiled * 1000:8.1f}ms "
+            f"({eager / compiled:4.2f}x), compilation {compilation:6.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    main(parser.parse_args())
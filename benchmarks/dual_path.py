@@ -0,0 +1,93 @@
+"""Benchmark the dual-path segmentation: time and allocated memory of a forward pass.
+
+Compares `F.unfold`/`F.fold` segmentation (previous implementation) with the
+strided-view segmentation and overlap-add of `asteroid.dsp.overlap_add`, then
+reports the forward pass of DPRNNTasNet, DPTNet and FasNetTAC (compare across
+commits to measure changes of the dual-path blocks).
+
+Usage:
+    python benchmarks/dual_path.py --n_samples 32000
+"""
+import argparse
+import time
+
+import torch
+import torch.nn.functional as F
+from torch.profiler import profile, ProfilerActivity
+
+from asteroid.dsp import strided_unfold, overlap_add
+from asteroid.models import DPRNNTasNet, DPTNet, FasNetTAC
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--n_samples", type=int, default=32000)
+parser.add_argument("--batch_size", type=int, default=2)
+parser.add_argument("--n_repeats", type=int, default=5)
+
+
+def unfold_unfold(x, chunk_size, hop_size, padding=None):
+    padding = chunk_size if padding is None else padding
+    unfolded = F.unfold(
+        x.unsqueeze(-1),
+        kernel_size=(chunk_size, 1),
+        padding=(padding, 0),
+        stride=(hop_size, 1),
+    )
+    return unfolded.reshape(*x.shape[:-1], chunk_size, -1)
+
+
+def fold_overlap_add(x, hop_size, output_size, padding=None):
+    *batch, chunk_size, n_chunks = x.shape
+    padding = chunk_size if padding is None else padding
+    folded = F.fold(
+        x.reshape(-1, chunk_size, n_chunks),
+        (output_size, 1),
+        kernel_size=(chunk_size, 1),
+        padding=(padding, 0),
+        stride=(hop_size, 1),
+    )
+    return folded.reshape(*batch, output_size)
+
+
+def measure(fn, n_repeats):
+    with torch.no_grad():
+        fn()
+        tic = time.perf_counter()
+        for _ in range(n_repeats):
+            fn()
+        duration = (time.perf_counter() - tic) / n_repeats
+        with profile(activities=[ProfilerActivity.CPU], profile_memory=True) as prof:
+            fn()
+    allocated = sum(max(e.cpu_memory_usage, 0) for e in prof.key_averages())
+    return duration, allocated
+
+
+def main(args):
+    torch.manual_seed(0)
+    feats = torch.randn(args.batch_size, 128, args.n_samples // 8)
+    mix = torch.randn(args.batch_size, args.n_samples)
+    multi_mix = torch.randn(args.batch_size, 4, args.n_samples)
+    segmentations = {
+        "F.unfold/F.fold": (unfold_unfold, fold_overlap_add),
+        "strided/overlap_add": (strided_unfold, overlap_add),
+    }
+    print("Segmentation and overlap-add")
+    for name, (unfold_fn, fold_fn) in segmentations.items():
+        duration, allocated = measure(
+            lambda: fold_fn(unfold_fn(feats, 100, 50) * 2, 50, feats.shape[-1]), args.n_repeats
+        )
+        print(f"  {name:>20s}: {duration * 1000:8.1f}ms, {allocated / 2**20:8.1f}MB allocated")
+
+    models = {
+        "DPRNNTasNet": (DPRNNTasNet(2), mix),
+        "DPTNet": (DPTNet(2, n_repeats=2), mix),
+        "FasNetTAC": (FasNetTAC(2), multi_mix),
+    }
+    print("Forward pass")
+    for name, (model, inputs) in models.items():
+        duration, allocated = measure(lambda: model.eval()(inputs), args.n_repeats)
+        print(f"  {name:>20s}: {duration * 1000:8.1f}ms, {allocated / 2**20:8.1f}MB allocated")
+
+
+if __name__ == "__main__":
+    main(parser.parse_args())
@@ -0,0 +1,134 @@
+"""Benchmark `BaseModel.from_pretrained`: load time and memory.
+
+Compares the previous loading procedure (full `torch.load`, random initialization,
+state dict copy) with the current one (memory-mapped weights, skipped initialization,
+zero-copy state dict), each in a fresh process. Then forks workers from a parent
+which loaded the model, and reports how much of their memory is shared.
+
+Usage:
+    python benchmarks/model_loading.py --model DPTNet --n_workers 4
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+import multiprocessing
+
+import torch
+
+from asteroid import models
+from asteroid.models import BaseModel
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--model", default="DPTNet", choices=["DPTNet", "XUMX", "DPRNNTasNet"])
+parser.add_argument("--n_repeats", type=int, default=3, help="Number of loads per method.")
+parser.add_argument("--n_workers", type=int, default=4, help="Number of forked workers.")
+
+MODEL_ARGS = {
+    "DPTNet": dict(n_src=2, n_repeats=6, ff_hid=1024, n_heads=8, in_chan=256, n_filters=256),
+    "XUMX": dict(
+        sources=["bass", "drums", "vocals", "other"], hidden_size=1024, window_length=4096
+    ),
+    "DPRNNTasNet": dict(n_src=2, n_repeats=12, hid_size=512, bn_chan=256, n_filters=256),
+}
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10
+
+
+def legacy_from_pretrained(path):
+    conf = torch.load(path, map_location="cpu")
+    model = models.get(conf["model_name"])(**conf["model_args"])
+    model.load_state_dict(conf["state_dict"])
+    return model
+
+
+def measure(method, path, queue):
+    load_fn = legacy_from_pretrained if method == "legacy" else BaseModel.from_pretrained
+    rss_before = rss_mb()
+    tic = time.perf_counter()
+    model = load_fn(path)
+    duration = time.perf_counter() - tic
+    queue.put(
+        dict(
+            time=duration,
+            peak=peak_rss_mb() - rss_before,
+            rss=rss_mb() - rss_before,
+        )
+    )
+
+
+def smaps_rollup():
+    out = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ["Rss:", "Pss:", "Shared_Clean:", "Private_Dirty:"]:
+                out[parts[0][:-1]] = int(parts[1]) / 2**10
+    return out
+
+
+def worker(model, n_samples, queue):
+    with torch.no_grad():
+        model(torch.randn(1, n_samples))
+    queue.put(smaps_rollup())
+
+
+def main(args):
+    model = models.get(args.model)(**MODEL_ARGS[args.model])
+    n_params = sum(p.numel() for p in model.parameters())
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "model.pth")
+        torch.save(model.serialize(), path)
+        del model
+        print(
+            f"{args.model}: {n_params / 1e6:.1f}M parameters, {os.path.getsize(path) / 2**20:.0f}MB"
+        )
+
+        ctx = multiprocessing.get_context("spawn")
+        for method in ["legacy", "from_pretrained"]:
+            results = []
+            for _ in range(args.n_repeats):
+                queue = ctx.Queue()
+                proc = ctx.Process(target=measure, args=(method, path, queue))
+                proc.start()
+                results.append(queue.get())
+                proc.join()
+            best = min(results, key=lambda r: r["time"])
+            print(
+                f"{method:>16s}: {best['time'] * 1000:7.1f}ms, "
+                f"peak RSS +{best['peak']:.0f}MB, RSS after load +{best['rss']:.0f}MB"
+            )
+
+        # Forked workers share the memory-mapped weights.
+        if args.model == "XUMX":
+            return
+        model = BaseModel.from_pretrained(path).eval()
+        ctx = multiprocessing.get_context("fork")
+        queue = ctx.Queue()
+        procs = [
+            ctx.Process(target=worker, args=(model, 8000, queue)) for _ in range(args.n_workers)
+        ]
+        for proc in procs:
+            proc.start()
+        stats = [queue.get() for _ in procs]
+        for proc in procs:
+            proc.join()
+        mean = {k: sum(s[k] for s in stats) / len(stats) for k in stats[0]}
+        print(
+            f"{args.n_workers} forked workers, per worker: RSS {mean['Rss']:.0f}MB, "
+            f"PSS {mean['Pss']:.0f}MB, shared clean {mean['Shared_Clean']:.0f}MB, "
+            f"private dirty {mean['Private_Dirty']:.0f}MB"
+        )
+
+
+if __name__ == "__main__":
+    main(parser.parse_args())
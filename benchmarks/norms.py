@@ -0,0 +1,72 @@
+"""Benchmark the layer normalizations of the mask networks on CPU.
+
+Compares the previous implementations (separate mean and variance reductions,
+then gain and bias) with the fused `F.group_norm`/`F.layer_norm` formulations of
+`asteroid.masknn.norms`, for the forward pass and the forward and backward pass
+of a single layer.
+
+Usage:
+    python benchmarks/norms.py --n_frames 4000
+"""
+import argparse
+import time
+
+import torch
+
+from asteroid.masknn import norms
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--batch_size", type=int, default=4)
+parser.add_argument("--n_chan", type=int, default=128)
+parser.add_argument("--n_frames", type=int, default=4000)
+parser.add_argument("--n_repeats", type=int, default=50)
+parser.add_argument("--n_threads", type=int, default=None)
+
+
+def unfused(norm, dims):
+    def forward(x):
+        return norm.apply_gain_and_bias(norms.z_norm(x, dims(x)))
+
+    return forward
+
+
+def measure(fn, x, n_repeats, backward=False):
+    def step():
+        out = fn(x)
+        if backward:
+            out.sum().backward()
+
+    step()
+    tic = time.perf_counter()
+    for _ in range(n_repeats):
+        step()
+    return (time.perf_counter() - tic) / n_repeats
+
+
+def main(args):
+    if args.n_threads is not None:
+        torch.set_num_threads(args.n_threads)
+    torch.manual_seed(0)
+    x = torch.randn(args.batch_size, args.n_chan, args.n_frames, requires_grad=True)
+    layers = {
+        "gLN": (norms.GlobLN, lambda x: list(range(1, x.ndim))),
+        "cLN": (norms.ChanLN, lambda x: [1]),
+        "fgLN": (norms.FeatsGlobLN, lambda x: list(range(2, x.ndim))),
+    }
+    print(f"Input of shape {tuple(x.shape)}, {torch.get_num_threads()} threads")
+    for name, (norm_cls, dims) in layers.items():
+        norm = norm_cls(args.n_chan)
+        for backward in [False, True]:
+            with torch.set_grad_enabled(backward):
+                before = measure(unfused(norm, dims), x, args.n_repeats, backward)
+                after = measure(norm, x, args.n_repeats, backward)
+            pass_name = "fwd+bwd" if backward else "fwd"
+            print(
+                f"  {name:>5s} {pass_name:>8s}: {before * 1000:7.2f}ms -> {after * 1000:7.2f}ms "
+                f"({before / after:4.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main(parser.parse_args())
@@ -0,0 +1,184 @@
+"""Benchmark `SingleSrcPMSQE` used as a pairwise PIT loss.
+
+Compares the previous implementation (dense Bark matrix product, all-ones
+`pad_mask`, `torch.ones_like` bounds) with the current one (Bark bands summed
+with `scatter_add_`, constants shared across instances, fewer intermediate
+tensors), for the forward pass and the forward and backward pass of
+`PITLossWrapper(SingleSrcPMSQE(), pit_from="pw_pt")`.
+
+Usage:
+    python benchmarks/pmsqe.py --n_src 3 --device cuda
+"""
+import argparse
+import time
+
+import torch
+
+from asteroid.losses import PITLossWrapper, SingleSrcPMSQE
+
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--batch_size", type=int, default=4)
+parser.add_argument("--n_src", type=int, default=2)
+parser.add_argument("--n_frames", type=int, default=250)
+parser.add_argument("--sample_rate", type=int, default=16000)
+parser.add_argument("--n_repeats", type=int, default=20)
+parser.add_argument("--device", default="cpu")
+
+
+class PreviousPMSQE(SingleSrcPMSQE):
+    """`SingleSrcPMSQE` with the formulations of the previous implementation,
+    for (B, T, F) inputs."""
+
+    def forward(self, est_targets, targets, pad_mask=None):
+        if pad_mask is None:
+            pad_mask = torch.ones(
+                est_targets.shape[0], est_targets.shape[1], 1, device=est_targets.device
+            )
+        ref_spectra = self.magnitude_at_sll(targets, pad_mask)
+        deg_spectra = self.magnitude_at_sll(est_targets, pad_mask)
+        ref_bark_spectra = self.bark_computation(ref_spectra)
+        deg_bark_spectra = self.bark_computation(deg_spectra)
+        if self.bark_eq:
+            deg_bark_spectra = self.bark_freq_equalization(ref_bark_spectra, deg_bark_spectra)
+        if self.gain_eq:
+            deg_bark_spectra = self.bark_gain_equalization(ref_bark_spectra, deg_bark_spectra)
+        sym_d, asym_d = self.compute_distortion_tensors(ref_bark_spectra, deg_bark_spectra)
+        audible_power_ref = self.compute_audible_power(ref_bark_spectra, 1.0)
+        wd_frame, wda_frame = self.per_frame_distortion(sym_d, asym_d, audible_power_ref)
+        dims = [-1, -2]
+        pmsqe_frame = (self.alpha * wd_frame + self.beta * wda_frame) * pad_mask
+        return torch.sum(pmsqe_frame, dim=dims) / pad_mask.sum(dims)
+
+    def magnitude_at_sll(self, spectra, pad_mask):
+        masked_spectra = spectra * pad_mask * self.mask_sll
+        freq_mean_masked_spectra = torch.mean(masked_spectra, dim=-1, keepdim=True)
+        sum_spectra = torch.sum(freq_mean_masked_spectra, dim=-2, keepdim=True)
+        seq_len = torch.sum(pad_mask, dim=-2, keepdim=True)
+        return 10000000.0 * spectra / (sum_spectra / seq_len)
+
+    def bark_computation(self, spectra):
+        return self.Sp * torch.matmul(spectra, self.bark_matrix)
+
+    def compute_audible_power(self, bark_spectra, factor=1.0):
+        thr_bark = torch.where(
+            bark_spectra > self.abs_thresh_power * factor,
+            bark_spectra,
+            torch.zeros_like(bark_spectra),
+        )
+        return torch.sum(thr_bark, dim=-1, keepdim=True)
+
+    def bark_gain_equalization(self, ref_bark_spectra, deg_bark_spectra):
+        audible_power_ref = self.compute_audible_power(ref_bark_spectra, 1.0)
+        audible_power_deg = self.compute_audible_power(deg_bark_spectra, 1.0)
+        gain = (audible_power_ref + 5.0e3) / (audible_power_deg + 5.0e3)
+        limited_gain = torch.min(gain, 5.0 * torch.ones_like(gain))
+        limited_gain = torch.max(limited_gain, 3.0e-4 * torch.ones_like(limited_gain))
+        return limited_gain * deg_bark_spectra
+
+    def bark_freq_equalization(self, ref_bark_spectra, deg_bark_spectra):
+        audible_power_x100 = self.compute_audible_power(ref_bark_spectra, 100.0)
+        not_silent = audible_power_x100 >= 1.0e7
+        cond_thr = ref_bark_spectra >= self.abs_thresh_power * 100.0
+        ref_thresholded = torch.where(
+            cond_thr, ref_bark_spectra, torch.zeros_like(ref_bark_spectra)
+        )
+        deg_thresholded = torch.where(
+            cond_thr, deg_bark_spectra, torch.zeros_like(deg_bark_spectra)
+        )
+        avg_ppb_ref = torch.sum(
+            torch.where(not_silent, ref_thresholded, torch.zeros_like(ref_thresholded)),
+            dim=-2,
+            keepdim=True,
+        )
+        avg_ppb_deg = torch.sum(
+            torch.where(not_silent, deg_thresholded, torch.zeros_like(deg_thresholded)),
+            dim=-2,
+            keepdim=True,
+        )
+        equalizer = (avg_ppb_ref + 1000.0) / (avg_ppb_deg + 1000.0)
+        equalizer = torch.min(equalizer, 100.0 * torch.ones_like(equalizer))
+        equalizer = torch.max(equalizer, 0.01 * torch.ones_like(equalizer))
+        return equalizer * deg_bark_spectra
+
+    def loudness_computation(self, bark_spectra):
+        aterm = torch.pow(self.abs_thresh_power / 0.5, self.modified_zwicker_power)
+        bterm = (
+            torch.pow(0.5 + 0.5 * bark_spectra / self.abs_thresh_power, self.modified_zwicker_power)
+            - 1.0
+        )
+        loudness_dens = self.Sl * aterm * bterm
+        cond = bark_spectra < self.abs_thresh_power
+        return torch.where(cond, torch.zeros_like(loudness_dens), loudness_dens)
+
+    def compute_distortion_tensors(self, ref_bark_spec, deg_bark_spec):
+        original_loudness = self.loudness_computation(ref_bark_spec)
+        distorted_loudness = self.loudness_computation(deg_bark_spec)
+        r = torch.abs(distorted_loudness - original_loudness)
+        m = 0.25 * torch.min(original_loudness, distorted_loudness)
+        sym_d = torch.max(r - m, torch.ones_like(r) * self.EPS)
+        asym = torch.pow((deg_bark_spec + 50.0) / (ref_bark_spec + 50.0), 1.2)
+        cond = asym < 3.0 * torch.ones_like(asym)
+        asym_factor = torch.where(
+            cond, torch.zeros_like(asym), torch.min(asym, 12.0 * torch.ones_like(asym))
+        )
+        return sym_d, asym_factor * sym_d
+
+    def per_frame_distortion(self, sym_d, asym_d, total_power_ref):
+        d_frame = torch.sum(
+            torch.pow(sym_d * self.width_of_band_bark, 2.0) + self.EPS, dim=-1, keepdim=True
+        )
+        d_frame = torch.sqrt(d_frame) * self.sqrt_total_width
+        da_frame = torch.sum(asym_d * self.width_of_band_bark, dim=-1, keepdim=True)
+        weights = torch.pow((total_power_ref + 1e5) / 1e7, 0.04)
+        wd_frame = torch.min(d_frame / weights, 45.0 * torch.ones_like(d_frame))
+        wda_frame = torch.min(da_frame / weights, 45.0 * torch.ones_like(da_frame))
+        return wd_frame, wda_frame
+
+
+def measure(fn, inputs, n_repeats, device, backward=False):
+    def step():
+        out = fn(*inputs)
+        if backward:
+            out.backward()
+
+    def sync():
+        if device.startswith("cuda"):
+            torch.cuda.synchronize()
+
+    step()
+    sync()
+    tic = time.perf_counter()
+    for _ in range(n_repeats):
+        step()
+    sync()
+    return (time.perf_counter() - tic) / n_repeats
+
+
+def main(args):
+    torch.manual_seed(0)
+    n_bins = 257 if args.sample_rate == 16000 else 129
+    shape = (args.batch_size, args.n_src, args.n_frames, n_bins)
+    est = torch.rand(shape, device=args.device, requires_grad=True)
+    ref = torch.rand(shape, device=args.device)
+
+    losses = {
+        name: PITLossWrapper(cls(sample_rate=args.sample_rate), pit_from="pw_pt").to(args.device)
+        for name, cls in [("previous", PreviousPMSQE), ("current", SingleSrcPMSQE)]
+    }
+    with torch.no_grad():
+        diff = (losses["previous"](est, ref) - losses["current"](est, ref)).abs().max()
+    print(f"Input of shape {shape} on {args.device}, max abs difference {diff.item():.2e}")
+    for backward in [False, True]:
+        with torch.set_grad_enabled(backward):
+            before = measure(losses["previous"], (est, ref), args.n_repeats, args.device, backward)
+            after = measure(losses["current"], (est, ref), args.n_repeats, args.device, backward)
+        pass_name = "fwd+bwd" if backward else "fwd"
+        print(
+            f"  {pass_name:>8s}: {before * 1000:7.2f}ms -> {after * 1000:7.2f}ms "
+            f"({before / after:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(parser.parse_args())
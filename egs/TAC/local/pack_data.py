@@ -0,0 +1,41 @@
+import os
+import json
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from asteroid.data.packed_audio import pack_audio
+
+parser = argparse.ArgumentParser("packing the microphones and sources of each tac example")
+parser.add_argument("--in_json", type=str, help="Json file written by parse_data.py")
+parser.add_argument("--out_dir", type=str, help="Directory of the packed wav files")
+parser.add_argument("--out_json", type=str)
+parser.add_argument("--num_workers", type=int, default=8)
+
+
+def pack_example(c_ex, out_path):
+    """Pack the mixtures of all mics, then spk1 and spk2 of all mics, in one wav file."""
+    mics = sorted(c_ex.keys(), key=int)
+    paths = [c_ex[mic][key] for key in ["mixture", "spk1", "spk2"] for mic in mics]
+    if not os.path.isfile(out_path):
+        pack_audio(paths, out_path)
+    sample_dir = str(Path(c_ex[mics[0]]["mixture"]).parent)
+    length = c_ex[mics[0]]["length"]
+    return {"path": out_path, "n_mics": len(mics), "length": length, "id": sample_dir}
+
+
+def pack_dataset(in_json, out_dir, out_json, num_workers=8):
+    with open(in_json, "r") as f:
+        examples = json.load(f)
+    os.makedirs(out_dir, exist_ok=True)
+    out_paths = [os.path.join(out_dir, "{}.wav".format(i)) for i in range(len(examples))]
+    with ThreadPoolExecutor(num_workers) as executor:
+        packed = list(executor.map(pack_example, examples, out_paths))
+
+    with open(out_json, "w") as f:
+        json.dump(packed, f, indent=4)
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    pack_dataset(args.in_json, args.out_dir, args.out_json, args.num_workers)
@@ -2,9 +2,11 @@ from torch.utils.data import Dataset
 import json
 import soundfile as sf
 import torch
+import torch.nn.functional as F
 import numpy as np
 from pathlib import Path
 from asteroid.data.librimix_dataset import librispeech_license
+from asteroid.data.packed_audio import read_packed
 
 
 class TACDataset(Dataset):
@@ -12,6 +14,7 @@ class TACDataset(Dataset):
 
     Args:
         json_file (str): Path to json file resulting from the data prep script which contains parsed examples.
+            Examples packed with ``local/pack_data.py`` are read with a single seek.
         segment (float, optional): Length of the segments used for training, in seconds.
             If None, use full utterances (e.g. for test).
         sample_rate (int, optional): The sampling rate of the wav files.
@@ -34,7 +37,7 @@ class TACDataset(Dataset):
             target_len = int(segment * sample_rate)
             self.examples = []
             for ex in examples:
-                if ex["1"]["length"] < target_len:
+                if self._length(ex) < target_len:
                     continue
                 self.examples.append(ex)
             print(
@@ -46,16 +49,57 @@ class TACDataset(Dataset):
             self.examples = examples
         if not train:
             # sort examples based on number
-            self.examples = sorted(
-                self.examples, key=lambda x: str(Path(x["2"]["spk1"]).parent).strip("sample")
-            )
+            self.examples = sorted(self.examples, key=lambda x: self._sample_id(x).strip("sample"))
 
     def __len__(self):
         return len(self.examples)
 
+    @staticmethod
+    def _is_packed(c_ex):
+        # Examples packed by local/pack_data.py into a single file.
+        return "path" in c_ex
+
+    def _length(self, c_ex):
+        return c_ex["length"] if self._is_packed(c_ex) else c_ex["1"]["length"]
+
+    def _sample_id(self, c_ex):
+        return c_ex["id"] if self._is_packed(c_ex) else str(Path(c_ex["2"]["spk1"]).parent)
+
     def __getitem__(self, item):
         """Returns mixtures, sources and the number of mics in the recording, padded to `max_mics`."""
         c_ex = self.examples[item]
+        offset, stop = 0, None
+        if self.segment:
+            seg_len = int(self.segment * self.sample_rate)
+            if self._length(c_ex) > seg_len:
+                offset = np.random.randint(0, self._length(c_ex) - seg_len)
+            stop = offset + seg_len
+
+        if self._is_packed(c_ex):
+            mixtures, sources = self._read_packed(c_ex, offset, stop)
+        else:
+            mixtures, sources = self._read_mics(c_ex, offset, stop)
+
+        # we pad till max_mic
+        valid_mics = mixtures.shape[0]
+        if valid_mics < self.max_mics:
+            mixtures = F.pad(mixtures, (0, 0, 0, self.max_mics - valid_mics))
+            sources = F.pad(sources, (0, 0, 0, 0, 0, self.max_mics - valid_mics))
+        return mixtures, sources, valid_mics
+
+    def _read_packed(self, c_ex, offset, stop):
+        """Read all the mics of the mixture and sources with a single seek."""
+        # Channels are [mixture mics..., spk1 mics..., spk2 mics...].
+        audio = read_packed(c_ex["path"], start=offset, stop=stop)
+        audio = torch.from_numpy(audio).view(3, c_ex["n_mics"], -1)
+        mixtures, sources = audio[0], audio[1:].transpose(0, 1)
+        if self.train:
+            # randomly permute during training to change ref mics
+            perm = torch.from_numpy(np.random.permutation(c_ex["n_mics"]))
+            mixtures, sources = mixtures[perm], sources[perm]
+        return mixtures.contiguous(), sources.contiguous()
+
+    def _read_mics(self, c_ex, offset, stop):
         # randomly select ref mic
         mics = [x for x in c_ex.keys()]
         if self.train:
@@ -63,39 +107,11 @@ class TACDataset(Dataset):
 
         mixtures = []
         sources = []
-        for i in range(len(mics)):
-            c_mic = c_ex[mics[i]]
-
-            if self.segment:
-                offset = 0
-                if c_mic["length"] > int(self.segment * self.sample_rate):
-                    offset = np.random.randint(
-                        0, c_mic["length"] - int(self.segment * self.sample_rate)
-                    )
-
-                # we load mixture
-                mixture, fs = sf.read(
-                    c_mic["mixture"],
-                    start=offset,
-                    stop=offset + int(self.segment * self.sample_rate),
-                    dtype="float32",
-                )
-                spk1, fs = sf.read(
-                    c_mic["spk1"],
-                    start=offset,
-                    stop=offset + int(self.segment * self.sample_rate),
-                    dtype="float32",
-                )
-                spk2, fs = sf.read(
-                    c_mic["spk2"],
-                    start=offset,
-                    stop=offset + int(self.segment * self.sample_rate),
-                    dtype="float32",
-                )
-            else:
-                mixture, fs = sf.read(c_mic["mixture"], dtype="float32")  # load all
-                spk1, fs = sf.read(c_mic["spk1"], dtype="float32")
-                spk2, fs = sf.read(c_mic["spk2"], dtype="float32")
+        for mic in mics:
+            c_mic = c_ex[mic]
+            mixture, fs = sf.read(c_mic["mixture"], start=offset, stop=stop, dtype="float32")
+            spk1, fs = sf.read(c_mic["spk1"], start=offset, stop=stop, dtype="float32")
+            spk2, fs = sf.read(c_mic["spk2"], start=offset, stop=stop, dtype="float32")
 
             mixture = torch.from_numpy(mixture).unsqueeze(0)
             spk1 = torch.from_numpy(spk1).unsqueeze(0)
@@ -105,15 +121,7 @@ class TACDataset(Dataset):
             mixtures.append(mixture)
             sources.append(torch.cat((spk1, spk2), 0))
 
-        mixtures = torch.cat(mixtures, 0)
-        sources = torch.stack(sources)
-        # we pad till max_mic
-        valid_mics = mixtures.shape[0]
-        if mixtures.shape[0] < self.max_mics:
-            dummy = torch.zeros((self.max_mics - mixtures.shape[0], mixtures.shape[-1]))
-            mixtures = torch.cat((mixtures, dummy), 0)
-            sources = torch.cat((sources, dummy.unsqueeze(1).repeat(1, sources.shape[1], 1)), 0)
-        return mixtures, sources, valid_mics
+        return torch.cat(mixtures, 0), torch.stack(sources)
 
     def get_infos(self):
         """Get dataset infos (for publishing models).
@@ -27,6 +27,7 @@ eval_use_gpu=1
 # Dataset option
 dataset_type=adhoc
 samplerate=16000
+pack_data=0  # If 1, pack the mics and sources of each example in a single wav file
 
 . utils/parse_options.sh
 
@@ -87,9 +88,18 @@ if [[ $stage -le 2 ]]; then
   echo "Parsing dataset to json to speed up subsequent experiments"
   for split in train validation test; do
       $python_path ./local/parse_data.py --in_dir $storage_dir/MC_Libri_${dataset_type}/$split --out_json $dumpdir/${split}.json
+      if [[ $pack_data -eq 1 ]]; then
+        $python_path ./local/pack_data.py --in_json $dumpdir/${split}.json \
+          --out_dir $dumpdir/packed/$split --out_json $dumpdir/${split}_packed.json
+      fi
   done
 fi
 
+json_suffix=""
+if [[ $pack_data -eq 1 ]]; then
+  json_suffix="_packed"
+fi
+
 # Generate a random ID for the run if no tag is specified
 uuid=$($python_path -c 'import uuid, sys; print(str(uuid.uuid4())[:8])')
 if [[ -z ${tag} ]]; then
@@ -102,7 +112,8 @@ echo "Results from the following experiment will be stored in $expdir"
 if [[ $stage -le 3 ]]; then
   echo "Stage 3: Training"
   mkdir -p logs
-  CUDA_VISIBLE_DEVICES=$id $python_path train.py --sample_rate $samplerate --exp_dir ${expdir} | tee logs/train_${tag}.log
+  CUDA_VISIBLE_DEVICES=$id $python_path train.py --sample_rate $samplerate --exp_dir ${expdir} \
+    --train_json $dumpdir/train${json_suffix}.json --dev_json $dumpdir/validation${json_suffix}.json | tee logs/train_${tag}.log
 	cp logs/train_${tag}.log $expdir/train.log
 
 	# Get ready to publish
@@ -113,7 +124,7 @@ fi
 
 if [[ $stage -le 4 ]]; then
 	echo "Stage 4 : Evaluation"
-	CUDA_VISIBLE_DEVICES=$id $python_path eval.py --test_json $dumpdir/test.json \
+	CUDA_VISIBLE_DEVICES=$id $python_path eval.py --test_json $dumpdir/test${json_suffix}.json \
 		--use_gpu $eval_use_gpu \
 		--exp_dir ${expdir} | tee logs/eval_${tag}.log
 	cp logs/eval_${tag}.log $expdir/eval.log
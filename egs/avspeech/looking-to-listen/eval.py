@@ -1,17 +1,14 @@
 import sys
 import yaml
 import collections
-from pathlib import Path
 from argparse import ArgumentParser
 import torch
 import numpy as np
 from catalyst.dl import utils
 from catalyst.dl.runner import SupervisedRunner
-from asteroid.data.avspeech_dataset import AVSpeechDataset
 
-from local.loader.constants import EMBED_DIR
 from model import make_model_and_optimizer, load_best_model
-from train import SNRCallback, SDRCallback, ParamConfig
+from train import SNRCallback, SDRCallback, ParamConfig, make_dataset
 
 
 def validate(model, val_dataset, config):
@@ -49,7 +46,7 @@ def main(conf):
         learning_rate=conf["optim"]["lr"],
     )
 
-    val_dataset = AVSpeechDataset(Path("data/val.csv"), Path(EMBED_DIR), conf["main_args"]["n_src"])
+    val_dataset = make_dataset("data/val.csv", conf)
 
     model = load_best_model(conf, conf["main_args"]["exp_dir"])
 
@@ -4,10 +4,8 @@ import torch
 import numpy as np
 from pathlib import Path
 from argparse import ArgumentParser
-from asteroid.data.avspeech_dataset import AVSpeechDataset
 
-from local.loader.constants import EMBED_DIR
-from train import train, ParamConfig
+from train import train, ParamConfig, make_dataset
 from model import make_model_and_optimizer, load_best_model
 
 
@@ -43,8 +41,8 @@ def main(conf):
         learning_rate=conf["optim"]["lr"],
     )
 
-    dataset = AVSpeechDataset(Path("data/train.csv"), Path(EMBED_DIR), conf["main_args"]["n_src"])
-    val_dataset = AVSpeechDataset(Path("data/val.csv"), Path(EMBED_DIR), conf["main_args"]["n_src"])
+    dataset = make_dataset("data/train.csv", conf)
+    val_dataset = make_dataset("data/val.csv", conf)
 
     model, optimizer = make_model_and_optimizer(conf)
     print(f"AVFusion has {sum(np.prod(i.shape) for i in model.parameters()):,} parameters")
@@ -2,3 +2,4 @@ from .config import ParamConfig
 from .metric_utils import snr, sdr
 from .callbacks import SNRCallback, SDRCallback
 from .trainer import train
+from .features import make_dataset
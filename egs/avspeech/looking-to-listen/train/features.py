@@ -0,0 +1,21 @@
+from pathlib import Path
+
+from asteroid.data.avspeech_dataset import AVSpeechDataset
+
+from local.loader.constants import EMBED_DIR
+
+
+def make_dataset(csv_path, conf):
+    """AVSpeechDataset of `csv_path`, served from precomputed features if
+    `data.feature_dir` is set in the config (features are computed on the first run)."""
+    dataset = AVSpeechDataset(
+        Path(csv_path),
+        Path(EMBED_DIR),
+        conf["main_args"]["n_src"],
+        cache_size=conf["data"]["cache_size"],
+    )
+    if conf["data"]["feature_dir"]:
+        feature_dir = Path(conf["data"]["feature_dir"]) / Path(csv_path).stem
+        print(f"Materializing features of {csv_path} in {feature_dir}")
+        dataset.materialize(feature_dir, num_workers=conf["data"]["materialize_workers"])
+    return dataset
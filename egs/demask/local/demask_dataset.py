@@ -1,3 +1,4 @@
+from torch import nn
 from torch.utils.data import Dataset
 import torch
 import glob
@@ -5,10 +6,10 @@ import soundfile as sf
 import numpy as np
 import json
 from scipy.signal import fftconvolve
-from scipy.signal import firwin2
 from pysndfx import AudioEffectsChain
 from asteroid.data.librimix_dataset import librispeech_license
 from asteroid.data.fuss_dataset import fuss_license
+from asteroid.data.fir_augmentation import FIRFilterBank, design_fir_bank
 
 # We approximate the effect of a surgical or tissue mask with an ad-hoc FIR
 # filter whose frequency response is taken from [1].
@@ -57,7 +58,18 @@ mask_firs = {
 }
 
 
+def make_sampler(expression):
+    """Compile a random expression of the config (e.g. `np.random.randint(3, 12)`) once."""
+    return eval("lambda: " + str(expression), {"np": np})
+
+
 class DeMaskDataset(Dataset):
+    """Clean (augmented) speech segments, to be masked on the batch by `DeMaskAugment`.
+
+    Items are dictionaries with the clean segment (key `clean`) and, with
+    `noises_dataset`, a noise segment normalized to the level of the speech
+    (key `noise`).
+    """
 
     dataset_name = "Surgical_mask_speech_enhancement_v1"
 
@@ -66,18 +78,19 @@ class DeMaskDataset(Dataset):
     ):
         self.configs = configs
         self.train = train
+        self.target_len = int(self.configs["data"]["fs"] * self.configs["data"]["length"])
+        self.speed_augm = make_sampler(self.configs["training"]["speed_augm"])
+        self.gain_augm = make_sampler(self.configs["training"]["gain_augm"])
 
         with open(clean_speech_dataset, "r") as f:
             clean = json.load(f)
 
         self.clean = []
         for c in clean:
-            if c["length"] < self.configs["data"]["fs"] * self.configs["data"]["length"]:
+            if c["length"] < self.target_len:
                 continue
             self.clean.append(c["file"])
 
-        self.firs = mask_firs
-
         self.rirs = None
         if rirs_dataset:
             with open(rirs_dataset, "r") as f:
@@ -88,18 +101,15 @@ class DeMaskDataset(Dataset):
         if noises_dataset:
             with open(noises_dataset, "r") as f:
                 noises = json.load(f)
-                for n in noises:
-                    if n["length"] < self.configs["data"]["fs"] * self.configs["data"]["length"]:
-                        continue
-                    self.clean.append(n["file"])
+            self.noises = [n["file"] for n in noises if n["length"] >= self.target_len]
 
     def __len__(self):
         return len(self.clean)
 
     def augment_clean(self, clean):
 
-        speed = eval(self.configs["training"]["speed_augm"])
-        c_gain = eval(self.configs["training"]["gain_augm"])
+        speed = self.speed_augm()
+        c_gain = self.gain_augm()
 
         fx = AudioEffectsChain().speed(speed)  # speed perturb
         clean = fx(clean)
@@ -115,11 +125,9 @@ class DeMaskDataset(Dataset):
 
         return clean, c_gain
 
-    def add_noise(self, clean, masked, c_gain):
+    def read_noise(self, c_gain):
 
-        fx = AudioEffectsChain().custom(
-            "norm {}".format(eval(c_gain - self.configs["training"]["snr"]))
-        )
+        fx = AudioEffectsChain().custom("norm {}".format(c_gain - self.configs["training"]["snr"]))
 
         noise = np.random.choice(self.noises, 1)[0]
         noise, fs = sf.read(noise)
@@ -127,17 +135,12 @@ class DeMaskDataset(Dataset):
             # select random channel
             noise = noise[:, np.random.randint(0, noise.shape - 1)]
         offset = 0
-        target_len = int(self.configs["data"]["fs"] * self.configs["data"]["length"])
-        if len(noise) > target_len:
-            offset = np.random.randint(0, len(noise) - target_len)
+        if len(noise) > self.target_len:
+            offset = np.random.randint(0, len(noise) - self.target_len)
 
-        noise = noise[offset : offset + target_len]
+        noise = noise[offset : offset + self.target_len]
         assert fs == self.configs["data"]["fs"]
-        noise = fx(noise)
-        clean = clean + noise  # NB demask is not doing denoising
-        masked = masked + noise
-
-        return clean, masked
+        return fx(noise)
 
     def __getitem__(self, item):
         # 1 we sample a clean utterance
@@ -145,65 +148,20 @@ class DeMaskDataset(Dataset):
         clean, fs = sf.read(clean)
         assert fs == self.configs["data"]["fs"]
         # we sample a random window
-        target_len = int(self.configs["data"]["fs"] * self.configs["data"]["length"])
         offset = 0
-        if len(clean) > target_len:
-            offset = np.random.randint(0, len(clean) - target_len)
-
-        clean = clean[offset : offset + target_len]
-        clean, c_gain = self.augment_clean(clean)
+        if len(clean) > self.target_len:
+            offset = np.random.randint(0, len(clean) - self.target_len)
 
+        clean = clean[offset : offset + self.target_len]
         # we add reverberation, speed perturb and random scaling
-        masks = list(self.firs.keys())
-        c_mask = np.random.choice(masks, 1)[0]
-        c_mask = self.firs[c_mask]
-
-        gains = np.array(c_mask["gain"])
-        freqs = np.array(c_mask["freq"])
-
-        if self.train:
-            # augment the gains with random noise: no mask is created equal
-            snr = 10 ** (eval(self.configs["training"]["gaussian_mask_noise_snr_dB"]) / 20)
-            gains += np.random.normal(0, np.var(gains) / snr, gains.shape)
-
-        fir = firwin2(
-            self.configs["training"]["n_taps"], freqs, gains, fs=self.configs["data"]["fs"]
-        )
-
-        masked = fftconvolve(clean, fir)
-        clean = np.pad(clean, ((len(fir) - 1) // 2, 0), mode="constant")
-        trim_start = (len(fir) - 1) // 2
-        trim_end = len(clean) - len(fir) + 1
-        clean = clean[trim_start:trim_end]
-        masked = masked[trim_start:trim_end]
-
-        if len(clean) > target_len:
-            clean = clean[:target_len]
-            masked = masked[:target_len]
-        elif len(clean) < target_len:
-            clean = np.pad(
-                clean,
-                (0, int(self.configs["data"]["fs"] * self.configs["data"]["length"]) - len(clean)),
-                mode="constant",
-            )
-            masked = np.pad(
-                masked,
-                (0, int(self.configs["data"]["fs"] * self.configs["data"]["length"]) - len(masked)),
-                mode="constant",
-            )
-        else:
-            pass
+        clean, c_gain = self.augment_clean(clean)
+        clean = np.pad(clean[: self.target_len], (0, max(self.target_len - len(clean), 0)))
 
+        # The mask filtering is applied on the batch, see DeMaskAugment.
+        sample = {"clean": torch.from_numpy(clean).float()}
         if self.noises:
-            clean, masked = self.add_noise(clean, masked, c_gain)
-        else:  # if no noises still add gaussian noise when training
-            if self.train:
-                snr = 10 ** (eval(self.configs["training"]["white_noise_dB"]) / 20)
-                noise = np.random.normal(0, np.var(masked) / snr, masked.shape)
-                masked += noise  # NB demask is not doing denoising
-                clean += noise
-
-        return torch.from_numpy(masked).float(), torch.from_numpy(clean).float()
+            sample["noise"] = torch.from_numpy(self.read_noise(c_gain)).float()
+        return sample
 
     def get_infos(self):
         """Get dataset infos (for publishing models).
@@ -218,6 +176,46 @@ class DeMaskDataset(Dataset):
         return infos
 
 
+class DeMaskAugment(nn.Module):
+    """Mask a batch of clean speech from `DeMaskDataset`, on its device.
+
+    Mask filters are drawn from a FIR bank designed once. When training, the
+    gains of the mask responses are randomly perturbed (no mask is created equal)
+    and white noise is added when there is no noise dataset.
+
+    Returns:
+        tuple: masked and clean speech, of shape $(batch, time)$.
+    """
+
+    def __init__(self, configs, train):
+        super().__init__()
+        self.train_mode = train
+        self.white_noise_db = make_sampler(configs["training"]["white_noise_dB"])
+        firs = design_fir_bank(
+            list(mask_firs.values()),
+            n_taps=configs["training"]["n_taps"],
+            sample_rate=configs["data"]["fs"],
+            n_filters=configs["training"]["fir_bank_size"] if train else None,
+            jitter_snr_db=configs["training"]["gaussian_mask_noise_snr_dB"] if train else None,
+        )
+        self.fir_bank = FIRFilterBank(firs)
+
+    def forward(self, batch):
+        clean = batch["clean"]
+        masked = self.fir_bank(clean)
+        if "noise" in batch:
+            noise = batch["noise"]
+        elif self.train_mode:
+            # if no noises still add gaussian noise when training
+            snr = [10 ** (self.white_noise_db() / 20) for _ in range(len(clean))]
+            std = masked.var(-1, keepdim=True) / torch.tensor(snr, device=clean.device)[:, None]
+            noise = torch.randn_like(masked) * std
+        else:
+            return masked, clean
+        # NB demask is not doing denoising
+        return masked + noise, clean + noise
+
+
 demask_license = dict(
     title="Acoustic effects of medical, cloth, and transparent face masks on speech signals",
     title_link="https://arxiv.org/abs/2008.04521",
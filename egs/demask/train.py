@@ -10,7 +10,7 @@ from pytorch_lightning.callbacks import ModelCheckpoint, EarlyStopping
 
 from asteroid import DeMask
 from asteroid.models import save_publishable
-from local.demask_dataset import DeMaskDataset
+from local.demask_dataset import DeMaskDataset, DeMaskAugment
 from asteroid.engine.optimizers import make_optimizer
 from asteroid.engine.system import System
 from asteroid.losses import singlesrc_neg_sisdr
@@ -26,6 +26,16 @@ parser.add_argument("--exp_dir", default="exp/tmp", help="Full path to save best
 
 
 class DeMaskSystem(System):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Masking is applied on the batches, on the device.
+        self.train_augment = DeMaskAugment(self.config, train=True)
+        self.val_augment = DeMaskAugment(self.config, train=False)
+
+    def on_after_batch_transfer(self, batch, dataloader_idx):
+        augment = self.train_augment if self.training else self.val_augment
+        return augment(batch)
+
     def common_step(self, batch, batch_nb, train=True):
         inputs, targets = batch
         est_targets = self(inputs)
@@ -6,16 +6,13 @@ import yaml
 import json
 import argparse
 import pandas as pd
-from tqdm import tqdm
 from pprint import pprint
 from pathlib import Path
 
-from asteroid.metrics import get_metrics
+from asteroid.evaluate import evaluate, load_results, merge_results, missing_indices
 from asteroid.data.librimix_dataset import LibriMix
-from asteroid.losses import PITLossWrapper, pairwise_neg_sisdr
 from asteroid import ConvTasNet
 from asteroid.models import save_publishable
-from asteroid.utils import tensors_to_device
 from asteroid.dsp.normalization import normalize_estimates
 from asteroid.metrics import WERTracker, MockWERTracker
 
@@ -46,6 +43,22 @@ parser.add_argument(
 parser.add_argument(
     "--compute_wer", type=int, default=0, help="Compute WER using ESPNet's pretrained model"
 )
+parser.add_argument(
+    "--shard_id",
+    type=int,
+    default=None,
+    help="Index of the part of the test set to evaluate. Defaults to $RANK or $SLURM_PROCID",
+)
+parser.add_argument(
+    "--n_shards",
+    type=int,
+    default=None,
+    help="Number of parts of the test set. Defaults to $WORLD_SIZE or $SLURM_NTASKS",
+)
+parser.add_argument("--batch_size", type=int, default=1, help="Batch size for the model")
+parser.add_argument(
+    "--n_metric_workers", type=int, default=0, help="Number of processes computing the metrics"
+)
 
 COMPUTE_METRICS = ["si_sdr", "sdr", "sir", "sar", "stoi"]
 ASR_MODEL_PATH = (
@@ -80,7 +93,6 @@ def main(conf):
     # Handle device placement
     if conf["use_gpu"]:
         model.cuda()
-    model_device = next(model.parameters()).device
     test_set = LibriMix(
         csv_dir=conf["test_dir"],
         task=conf["task"],
@@ -89,38 +101,21 @@ def main(conf):
         segment=None,
         return_id=True,
     )  # Uses all segment length
-    # Used to reorder sources only
-    loss_func = PITLossWrapper(pairwise_neg_sisdr, pit_from="pw_mtx")
 
-    # Randomly choose the indexes of sentences to save.
+    # Randomly choose the indexes of sentences to save (the same ones in all shards).
     eval_save_dir = os.path.join(conf["exp_dir"], conf["out_dir"])
     ex_save_dir = os.path.join(eval_save_dir, "examples/")
     if conf["n_save_ex"] == -1:
         conf["n_save_ex"] = len(test_set)
-    save_idx = random.sample(range(len(test_set)), conf["n_save_ex"])
-    series_list = []
-    torch.no_grad().__enter__()
-    for idx in tqdm(range(len(test_set))):
-        # Forward the network on the mixture.
-        mix, sources, ids = test_set[idx]
-        mix, sources = tensors_to_device([mix, sources], device=model_device)
-        est_sources = model(mix.unsqueeze(0))
-        loss, reordered_sources = loss_func(est_sources, sources[None], return_est=True)
+    save_idx = random.Random(0).sample(range(len(test_set)), conf["n_save_ex"])
+
+    def utt_callback(idx, item, est_sources_np):
+        mix, sources, ids = item
         mix_np = mix.cpu().data.numpy()
         sources_np = sources.cpu().data.numpy()
-        est_sources_np = reordered_sources.squeeze(0).cpu().data.numpy()
-        # For each utterance, we get a dictionary with the mixture path,
-        # the input and output metrics
-        utt_metrics = get_metrics(
-            mix_np,
-            sources_np,
-            est_sources_np,
-            sample_rate=conf["sample_rate"],
-            metrics_list=COMPUTE_METRICS,
-        )
-        utt_metrics["mix_path"] = test_set.mixture_path
         est_sources_np_normalized = normalize_estimates(est_sources_np, mix_np)
-        utt_metrics.update(
+        utt_infos = dict(mix_path=test_set.df.iloc[idx]["mixture_path"])
+        utt_infos.update(
             **wer_tracker(
                 mix=mix_np,
                 clean=sources_np,
@@ -129,9 +124,7 @@ def main(conf):
                 sample_rate=conf["sample_rate"],
             )
         )
-        series_list.append(pd.Series(utt_metrics))
-
-        # Save some examples in a folder. Wav files and metrics as text.
+        # Save some examples in a folder. Wav files and infos as text.
         if idx in save_idx:
             local_save_dir = os.path.join(ex_save_dir, "ex_{}/".format(idx))
             os.makedirs(local_save_dir, exist_ok=True)
@@ -145,42 +138,55 @@ def main(conf):
                     est_src,
                     conf["sample_rate"],
                 )
-            # Write local metrics to the example folder.
-            with open(local_save_dir + "metrics.json", "w") as f:
-                json.dump(utt_metrics, f, indent=0)
-
-    # Save all metrics to the experiment folder.
-    all_metrics_df = pd.DataFrame(series_list)
-    all_metrics_df.to_csv(os.path.join(eval_save_dir, "all_metrics.csv"))
-
-    # Print and save summary metrics
-    final_results = {}
-    for metric_name in compute_metrics:
-        input_metric_name = "input_" + metric_name
-        ldf = all_metrics_df[metric_name] - all_metrics_df[input_metric_name]
-        final_results[metric_name] = all_metrics_df[metric_name].mean()
-        final_results[metric_name + "_imp"] = ldf.mean()
+        return utt_infos
+
+    # Results are appended to `eval_save_dir/results/` utterance by utterance:
+    # an interrupted evaluation resumes where it stopped.
+    evaluate(
+        model,
+        test_set,
+        eval_save_dir,
+        sample_rate=conf["sample_rate"],
+        metrics_list=COMPUTE_METRICS,
+        shard_id=conf["shard_id"],
+        n_shards=conf["n_shards"],
+        batch_size=conf["batch_size"],
+        n_workers=conf["n_metric_workers"],
+        utt_callback=utt_callback,
+    )
+    missing = missing_indices(eval_save_dir, len(test_set))
+    if missing:
+        print(
+            f"{len(missing)} utterances are left to evaluate in other shards. "
+            "Run eval.py again once they are done to merge the results."
+        )
+        return
+    # Merge the results of all shards, save all metrics and the summary metrics.
+    final_results = merge_results(eval_save_dir, compute_metrics)
+    # Write local metrics to the example folders.
+    all_metrics_df = load_results(eval_save_dir)
+    for idx in save_idx:
+        with open(os.path.join(ex_save_dir, "ex_{}/".format(idx), "metrics.json"), "w") as f:
+            json.dump(all_metrics_df.loc[idx].to_dict(), f, indent=0)
 
     print("Overall metrics :")
     pprint(final_results)
     if conf["compute_wer"]:
+        # Aggregated over the results of all shards.
         print("\nWER report")
-        wer_card = wer_tracker.final_report_as_markdown()
+        wer_card = WERTracker.final_report_as_markdown_from_results(all_metrics_df)
         print(wer_card)
         # Save the report
         with open(os.path.join(eval_save_dir, "final_wer.md"), "w") as f:
             f.write(wer_card)
 
-    with open(os.path.join(eval_save_dir, "final_metrics.json"), "w") as f:
-        json.dump(final_results, f, indent=0)
-
     model_dict = torch.load(model_path, map_location="cpu")
     os.makedirs(os.path.join(conf["exp_dir"], "publish_dir"), exist_ok=True)
     publishable = save_publishable(
         os.path.join(conf["exp_dir"], "publish_dir"),
         model_dict,
         metrics=final_results,
-        train_conf=train_conf,
+        train_conf=conf["train_conf"],
     )
 
 
@@ -47,6 +47,8 @@ def load_datasets(parser, args):
         random_segments=True,
         sample_rate=args.sample_rate,
         samples_per_track=args.samples_per_track,
+        cache_size=args.cache_size,
+        cache_dir=args.cache_dir,
         **dataset_kwargs,
     )
     train_dataset = filtering_out_valid(train_dataset)
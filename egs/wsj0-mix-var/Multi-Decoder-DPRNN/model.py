@@ -21,6 +21,7 @@ from torch.nn.functional import fold, unfold
 from asteroid import torch_utils
 from asteroid.models import BaseModel
 from asteroid_filterbanks import make_enc_dec
+from asteroid.dsp.overlap_add import overlap_add
 from asteroid.engine.optimizers import make_optimizer
 from asteroid.masknn import activations, norms
 from asteroid.masknn.recurrent import DPRNNBlock
@@ -196,20 +197,23 @@ class MultiDecoderDPRNN(BaseModel):
             est_masks_list, tf_rep, ground_truth=[est_spks] * slice_nb
         )  # [slice_nb, 1, n_spks, slice_size]
         output_wavs = output_wavs.squeeze(1)[:, :est_spks, :]
-        # TODO: overlap and add (with division)
-        output_cat = output_wavs.new_zeros(est_spks, slice_nb * slice_size)
-        output_cat[:, :slice_size] = output_wavs[0]
-        start = slice_stride
-        for i in range(1, slice_nb):
-            overlap_prev = output_cat[:, start : start + slice_stride].unsqueeze(0)
-            overlap_next = output_wavs[i : i + 1, :, :slice_stride]
+        reordered = output_wavs
+        if slice_nb > 1:
+            # Permutations between the overlapping halves of consecutive slices, in one call.
+            overlap_prev = output_wavs[:-1, :, slice_stride:]
+            overlap_next = output_wavs[1:, :, :slice_stride]
             pw_losses = pairwise_neg_sisdr(overlap_next, overlap_prev)
-            _, best_indices = PITLossWrapper.find_best_perm(pw_losses)
-            reordered = PITLossWrapper.reorder_source(output_wavs[i : i + 1, :, :], best_indices)
-            output_cat[:, start : start + slice_size] += reordered.squeeze(0)
-            output_cat[:, start : start + slice_stride] /= 2
-            start += slice_stride
-        return output_cat[:, :T]
+            _, rel_indices = PITLossWrapper.find_best_perm(pw_losses)
+            # Chain them to align every slice with the first one.
+            indices = [torch.arange(est_spks, device=output_wavs.device)]
+            for rel in rel_indices:
+                indices.append(rel[indices[-1]])
+            reordered = PITLossWrapper.reorder_source(output_wavs, torch.stack(indices))
+        # Overlap-add, averaging the overlapping halves.
+        chunks = reordered.permute(1, 2, 0)  # [n_spks, slice_size, slice_nb]
+        output_cat = overlap_add(chunks, slice_stride, T_padded, padding=0)
+        counts = overlap_add(torch.ones_like(chunks[:1]), slice_stride, T_padded, padding=0)
+        return (output_cat / counts)[:, :T]
 
 
 class DPRNN_MultiStage(nn.Module):
@@ -437,19 +441,26 @@ class Decoder_Select(nn.Module):
         )
         selector_output = self.selector(output).reshape(batch, num_stages, -1)
         output = output.reshape(batch, num_stages, bn_chan, chunk_size, n_chunks)
-        # [batch, num_stages, in_chan, n_frames]
-        mixture_w = mixture_w.unsqueeze(1).repeat(1, num_stages, 1, 1)
         if ground_truth is not None:  # oracle
-            decoder_selected = torch.LongTensor([self.n_src2idx[truth] for truth in ground_truth])
+            decoder_selected = torch.tensor(
+                [self.n_src2idx[int(truth)] for truth in ground_truth], device=output.device
+            )
         else:
             assert num_stages == 1  # can't use select with multistage
             decoder_selected = selector_output.reshape(batch, -1).argmax(1)
         T = self.kernel_size + self.stride * (n_frames - 1)
-        output_wavs = torch.zeros(batch, num_stages, max(self.n_srcs), T).to(output.device)
-        for i in range(batch):
-            output_wavs[i, :, : self.n_srcs[decoder_selected[i]], :] = self.decoders[
-                decoder_selected[i]
-            ](output[i], mixture_w[i])
+        output_wavs = output.new_zeros(batch, num_stages, max(self.n_srcs), T)
+        # Run each decoder once, on all the examples (and stages) that selected it.
+        for dec_idx, decoder in enumerate(self.decoders):
+            group = (decoder_selected == dec_idx).nonzero(as_tuple=True)[0]
+            if len(group) == 0:
+                continue
+            n_src = self.n_srcs[dec_idx]
+            est_wavs = decoder(
+                output[group].reshape(len(group) * num_stages, bn_chan, chunk_size, n_chunks),
+                mixture_w[group].repeat_interleave(num_stages, dim=0),
+            )
+            output_wavs[group, :, :n_src] = est_wavs.reshape(len(group), num_stages, n_src, T)
         return output_wavs, selector_output
 
 
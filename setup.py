@@ -41,6 +41,7 @@ setup(
         "scipy>=1.10.1",
         "torch>=2.0.0",
         "asteroid-filterbanks>=0.4.0",
+        "filelock",
         "SoundFile>=0.10.2",
         "huggingface_hub>=0.0.2",
         # From requirements/install.txt
@@ -59,6 +60,8 @@ setup(
             "asteroid-upload=asteroid.scripts.asteroid_cli:upload",
             "asteroid-infer=asteroid.scripts.asteroid_cli:infer",
             "asteroid-register-sr=asteroid.scripts.asteroid_cli:register_sample_rate",
+            "asteroid-cache=asteroid.scripts.asteroid_cli:cache",
+            "asteroid-serve=asteroid.scripts.asteroid_cli:serve",
             "asteroid-versions=asteroid.scripts.asteroid_versions:print_versions",
         ]
     },
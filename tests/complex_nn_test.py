@@ -87,3 +87,52 @@ def test_complexsinglernn(n_layers):
         imre = layer.im_module(inp.real)
         inp = cnn.torch_complex_from_reim(rere - imim, reim + imre)
     assert_close(out, inp)
+
+
+@pytest.mark.parametrize("fuse_mode", cnn.FUSE_MODES)
+@pytest.mark.parametrize(
+    "module_cls, args, shape",
+    [
+        (torch.nn.Linear, (10, 6), (3, 5, 10)),
+        (torch.nn.Conv1d, (4, 6, 3), (3, 4, 20)),
+        (torch.nn.Conv2d, (4, 6, (3, 5), (1, 2), (1, 2)), (3, 4, 17, 9)),
+        (torch.nn.ConvTranspose2d, (4, 6, (3, 5), (2, 1), (1, 2), (1, 0)), (3, 4, 17, 9)),
+        (torch.nn.PReLU, (), (3, 4, 17)),
+    ],
+)
+@pytest.mark.parametrize("bias", [True, False])
+def test_complex_mul_wrapper_fuse_modes(fuse_mode, module_cls, args, shape, bias):
+    kwargs = {"bias": bias} if module_cls is not torch.nn.PReLU else {}
+    torch.manual_seed(0)
+    fn = cnn.ComplexMultiplicationWrapper(module_cls, *args, **kwargs)
+    inp = torch.randn(shape, dtype=torch.complex64)
+    expected = cnn.torch_complex_from_reim(
+        fn.re_module(inp.real) - fn.im_module(inp.imag),
+        fn.re_module(inp.imag) + fn.im_module(inp.real),
+    )
+    fn.fuse_mode = fuse_mode
+    assert_close(fn(inp), expected, rtol=1e-5, atol=1e-5)
+
+
+def test_complex_mul_wrapper_batch_calls():
+    fn = cnn.ComplexMultiplicationWrapper(torch.nn.Linear, 10, 6)
+    n_calls = []
+    for module in [fn.re_module, fn.im_module]:
+        module.register_forward_hook(lambda *args: n_calls.append(1))
+    fn(torch.randn(3, 10, dtype=torch.complex64))
+    assert len(n_calls) == 2
+    # Weights are only used functionally in native mode.
+    fn.fuse_mode = "native"
+    fn(torch.randn(3, 10, dtype=torch.complex64))
+    assert len(n_calls) == 2
+
+
+def test_set_fuse_mode():
+    crnn = cnn.ComplexSingleRNN("LSTM", 10, 10, n_layers=2)
+    model = torch.nn.Sequential(crnn, cnn.ComplexMultiplicationWrapper(torch.nn.Linear, 10, 4))
+    inp = torch.randn(2, 5, 10, dtype=torch.complex64)
+    expected = cnn.set_fuse_mode(model, None)(inp)
+    for fuse_mode in ["batch", "gauss", "native"]:
+        assert_close(cnn.set_fuse_mode(model, fuse_mode)(inp), expected)
+    with pytest.raises(ValueError):
+        cnn.set_fuse_mode(model, "foo")
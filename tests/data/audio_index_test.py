@@ -0,0 +1,79 @@
+import json
+import random
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from asteroid.data import AudioIndex, LibriVADDataset, MUSDB18Dataset
+
+
+def _write_wavs(tmp_path, lengths, sample_rate=8000, channels=1):
+    paths = []
+    for i, length in enumerate(lengths):
+        path = str(tmp_path / f"{i}.wav")
+        sf.write(path, np.random.randn(length, channels).astype("float32"), sample_rate)
+        paths.append(path)
+    return paths
+
+
+def test_audio_index(tmp_path, monkeypatch):
+    paths = _write_wavs(tmp_path, [800, 1600, 2400], channels=2)
+    index_path = str(tmp_path / "audio_index.json")
+    index = AudioIndex(paths, index_path=index_path, num_workers=2)
+    assert len(index) == 3
+    for path, length in zip(paths, [800, 1600, 2400]):
+        assert index[path] == (length, 8000, 2)
+        assert index[path].duration == pytest.approx(length / 8000)
+    with open(index_path) as f:
+        assert set(json.load(f)) == set(paths)
+
+    # Headers are only read for files not in the saved index.
+    (tmp_path / "new").mkdir()
+    new_path = _write_wavs(tmp_path / "new", [100])[0]
+    read_paths = []
+    info = sf.info
+    monkeypatch.setattr(sf, "info", lambda path: read_paths.append(path) or info(path))
+    index = AudioIndex(paths + [new_path], index_path=index_path)
+    assert read_paths == [new_path]
+    assert index.frames(new_path) == 100
+    AudioIndex(paths, index_path=index_path, refresh=True)
+    assert sorted(read_paths[1:]) == sorted(paths)
+
+
+@pytest.mark.parametrize("length", [1000, 8000])
+def test_sample_segment(tmp_path, length):
+    path = _write_wavs(tmp_path, [length])[0]
+    index = AudioIndex([path])
+    rng = random.Random(0)
+    for _ in range(10):
+        start, stop = index.sample_segment(path, 4000, rng=rng)
+        assert stop - start == 4000
+        assert 0 <= start <= max(length - 4000, 0)
+
+
+def test_vad_dataset(tmp_path):
+    # Segments of files shorter than the segment are zero-padded.
+    paths = _write_wavs(tmp_path, [16000, 24000, 5000])
+    md = [dict(mixture_path=p, VAD=dict(start=[100], stop=[2000])) for p in paths]
+    md_path = tmp_path / "md.json"
+    with open(md_path, "w") as f:
+        json.dump(md, f)
+    dataset = LibriVADDataset(str(md_path), segment=1)
+    assert (tmp_path / "audio_index.json").is_file()
+    for source, label in dataset:
+        assert source.shape == (8000,)
+        assert label.shape == (1, 8000)
+
+
+def test_musdb_dataset(tmp_path):
+    sources = ["vocals", "bass"]
+    for track, length in [("a", 44100), ("b", 88200)]:
+        (tmp_path / "train" / track).mkdir(parents=True)
+        for src in sources:
+            sf.write(tmp_path / "train" / track / f"{src}.wav", np.zeros((length, 2)), 44100)
+    dataset = MUSDB18Dataset(tmp_path, sources=sources, segment=0.5, random_segments=True)
+    assert sorted(t["min_duration"] for t in dataset.tracks) == [1.0, 2.0]
+    assert (tmp_path / "train" / "audio_index.json").is_file()
+    mix, _ = dataset[0]
+    assert mix.shape == (2, 22050)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+import soundfile as sf
+import torch
+from torch.testing import assert_close
+from torch.utils.data import DataLoader
+
+from asteroid.data import DynamicMixingDataset, DynamicMixer
+from asteroid.data.dynamic_mixing import fft_convolve, speed_perturb
+from asteroid.data.utils import online_mixing_collate
+
+
+def _write_pool(tmp_path, name, n_files, n_samples, sample_rate=8000):
+    index = []
+    for i in range(n_files):
+        path = str(tmp_path / f"{name}{i}.wav")
+        length = n_samples + 100 * i
+        sf.write(path, np.random.randn(length) * 0.1, sample_rate)
+        index.append([path, length, f"spk{i % 3}"])
+    return index
+
+
+@pytest.mark.parametrize("speed_range", [None, (0.9, 1.1)])
+def test_dynamic_mixing(tmp_path, speed_range):
+    sources = _write_pool(tmp_path, "s", 6, 3000)
+    noises = [info[:2] for info in _write_pool(tmp_path, "n", 2, 5000)]
+    rirs = [info[:2] for info in _write_pool(tmp_path, "r", 2, 50)]
+    dataset = DynamicMixingDataset(
+        sources,
+        n_src=2,
+        segment=0.25,
+        noise_index=noises,
+        rir_index=rirs,
+        speed_range=speed_range,
+        rir_duration=0.01,
+        seed=0,
+    )
+    mixer = DynamicMixer(dataset.seg_len)
+    batch = next(iter(DataLoader(dataset, batch_size=3, num_workers=0)))
+    mixture, targets = mixer(batch)
+    assert mixture.shape == (3, dataset.seg_len)
+    assert targets.shape == (3, 2, dataset.seg_len)
+    # Targets are the dry sources at the drawn levels.
+    levels = 10 * torch.log10(targets.pow(2).mean(-1))
+    assert_close(levels, batch["levels_db"], atol=1e-3, rtol=0)
+    # Deterministic under a seed, new mixtures at each epoch.
+    other_batch = next(iter(DataLoader(dataset, batch_size=3, num_workers=2)))
+    assert_close(other_batch["sources"], batch["sources"])
+    dataset.set_epoch(1)
+    assert not torch.equal(dataset[0]["sources"], batch["sources"][0])
+
+
+def test_speed_perturb_and_fft_convolve():
+    wav = torch.randn(2, 3, 100)
+    assert_close(speed_perturb(wav, torch.ones(2, 3), 80), wav[..., :80])
+    assert_close(speed_perturb(wav, torch.full((2, 3), 2.0), 40), wav[..., :80:2])
+    filters = torch.randn(2, 3, 7)
+    expected = torch.stack(
+        [
+            torch.from_numpy(np.convolve(w.double().numpy(), f.double().numpy())[:100])
+            for w, f in zip(wav.reshape(-1, 100), filters.reshape(-1, 7))
+        ]
+    ).reshape(2, 3, 100)
+    assert_close(fft_convolve(wav, filters, 100), expected.float(), atol=1e-4, rtol=1e-4)
+
+
+def test_online_mixing_collate():
+    targets = torch.randn(4, 2, 50)
+    batch = [(t.sum(0), t) for t in targets]
+    inputs, new_targets = online_mixing_collate(batch)
+    assert_close(inputs, new_targets.sum(1))
+    # Each source is a rescaled source of the same index from the batch.
+    for i in range(2):
+        norms = new_targets[:, i].norm(dim=-1)
+        assert_close(norms, targets[:, i].norm(dim=-1))
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from asteroid.data import FeatureStore
+
+
+def get_item(idx):
+    rng = np.random.RandomState(idx)
+    return dict(spec=rng.randn(3, 5).astype("float32"), embed=np.full((2,), idx, dtype="int64"))
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_feature_store(tmp_path, num_workers):
+    store_dir = str(tmp_path / "store")
+    store = FeatureStore.write(store_dir, get_item, 10, shard_size=4, num_workers=num_workers)
+    assert len(store) == 10 and len(list((tmp_path / "store").glob("*.npy"))) == 3 * 2
+    for idx in range(10):
+        item = store[idx]
+        np.testing.assert_array_equal(item["spec"], get_item(idx)["spec"])
+        np.testing.assert_array_equal(item["embed"], get_item(idx)["embed"])
+        assert item["embed"].dtype == np.int64
+    with pytest.raises(IndexError):
+        store[10]
+
+
+def test_feature_store_cache(tmp_path):
+    FeatureStore.write(str(tmp_path), get_item, 5, shard_size=2)
+    store = FeatureStore(str(tmp_path), cache_size=2)
+    for idx in [0, 1, 0, 2, 1]:
+        store[idx]
+    # 1 is evicted by 2 (0 was used more recently).
+    assert (store.hits, store.misses) == (1, 4)
+    assert store.stats()["n_cached"] == 2
+
+
+def test_feature_store_resume(tmp_path):
+    store_dir = tmp_path / "store"
+    FeatureStore.write(str(store_dir), get_item, 6, shard_size=2, fingerprint="a")
+    (store_dir / "spec_00001.npy").unlink()
+    with pytest.raises(RuntimeError):
+        FeatureStore(str(store_dir))
+    store = FeatureStore.write(str(store_dir), get_item, 6, shard_size=2, fingerprint="a")
+    np.testing.assert_array_equal(store[3]["spec"], get_item(3)["spec"])
+    store.check(6, "a")
+    with pytest.raises(ValueError):
+        store.check(6, "b")
+    with pytest.raises(ValueError):
+        FeatureStore.write(str(store_dir), get_item, 6, shard_size=2, fingerprint="b")
+    # A complete store is returned without computing any item.
+    computed = []
+    FeatureStore.write(str(store_dir), computed.append, 6, shard_size=2, fingerprint="a")
+    assert computed == []
+
+
+def test_feature_store_shape_mismatch(tmp_path):
+    def bad_item(idx):
+        return dict(spec=np.zeros(idx + 1))
+
+    with pytest.raises(ValueError):
+        FeatureStore.write(str(tmp_path), bad_item, 3)
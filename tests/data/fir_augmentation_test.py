@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+import torch
+from scipy.signal import fftconvolve, firwin2
+
+from asteroid.data import FIRFilterBank, design_fir_bank
+
+RESPONSES = [
+    dict(freq=[0, 1000, 2000, 4000], gain=[1, 0.8, 0.5, 0]),
+    dict(freq=[0, 1500, 3000, 4000], gain=[1, 1, 0.3, 0]),
+]
+
+
+def test_design_fir_bank():
+    firs = design_fir_bank(RESPONSES, n_taps=31, sample_rate=8000)
+    assert firs.shape == (2, 31)
+    np.testing.assert_allclose(firs[1], firwin2(31, *RESPONSES[1].values(), fs=8000))
+    jittered = design_fir_bank(
+        RESPONSES, n_taps=31, sample_rate=8000, n_filters=10, jitter_snr_db=(3, 12), seed=0
+    )
+    assert jittered.shape == (10, 31)
+    # All different filters, reproducible with the seed.
+    assert len(np.unique(jittered.round(8), axis=0)) == 10
+    np.testing.assert_array_equal(
+        jittered,
+        design_fir_bank(
+            RESPONSES, n_taps=31, sample_rate=8000, n_filters=10, jitter_snr_db=(3, 12), seed=0
+        ),
+    )
+
+
+@pytest.mark.parametrize("shape", [(3, 1000), (3, 2, 1000)])
+@pytest.mark.parametrize("compensate_delay", [True, False])
+def test_fir_filter_bank(shape, compensate_delay):
+    firs = design_fir_bank(RESPONSES, n_taps=31, sample_rate=8000)
+    fir_bank = FIRFilterBank(firs, compensate_delay=compensate_delay)
+    wav = torch.randn(shape)
+    fir_ids = torch.tensor([0, 1, 1])
+    out = fir_bank(wav, fir_ids)
+    assert out.shape == wav.shape
+    delay = 15 if compensate_delay else 0
+    for i, fir_id in enumerate(fir_ids.tolist()):
+        full = fftconvolve(wav[i].numpy(), firs[fir_id][None] if len(shape) == 3 else firs[fir_id])
+        expected = full[..., delay : delay + shape[-1]]
+        np.testing.assert_allclose(out[i].numpy(), expected, atol=1e-4)
+    # Random filters
+    assert fir_bank(wav).shape == wav.shape
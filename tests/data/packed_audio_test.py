@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from asteroid.data import pack_audio, read_packed
+
+
+@pytest.fixture
+def wav_paths(tmp_path):
+    paths = []
+    for i, n_chan in enumerate([1, 2, 1]):
+        path = str(tmp_path / f"{i}.wav")
+        sf.write(path, np.random.randn(1000, n_chan).astype("float32"), 8000, subtype="FLOAT")
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize("ext", [".wav", ".npy"])
+def test_pack_audio(tmp_path, wav_paths, ext):
+    out_path = str(tmp_path / f"packed{ext}")
+    assert pack_audio(wav_paths, out_path) == [1, 2, 1]
+    expected = np.concatenate(
+        [sf.read(path, dtype="float32", always_2d=True)[0] for path in wav_paths], axis=1
+    ).T
+    np.testing.assert_array_equal(read_packed(out_path), expected)
+    np.testing.assert_array_equal(read_packed(out_path, 100, 300), expected[:, 100:300])
+    segment = read_packed(out_path, 100, 300, channels=[1, 2])
+    np.testing.assert_array_equal(segment, expected[1:3, 100:300])
+    assert segment.flags["C_CONTIGUOUS"] and segment.dtype == np.float32
+
+
+def test_pack_audio_mismatch(tmp_path, wav_paths):
+    short_path = str(tmp_path / "short.wav")
+    sf.write(short_path, np.zeros(500, dtype="float32"), 8000)
+    with pytest.raises(ValueError):
+        pack_audio(wav_paths + [short_path], str(tmp_path / "packed.wav"))
+    with pytest.raises(ValueError):
+        pack_audio(wav_paths, str(tmp_path / "packed.mp3"))
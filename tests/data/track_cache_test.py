@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from asteroid.data import MUSDB18Dataset, TrackCache
+
+
+@pytest.fixture
+def wav_paths(tmp_path):
+    paths = []
+    for i in range(3):
+        path = str(tmp_path / f"{i}.wav")
+        sf.write(path, np.random.randn(1000, 2).astype("float32"), 8000, subtype="FLOAT")
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize("store", [False, True])
+def test_track_cache(tmp_path, wav_paths, store):
+    cache = TrackCache(10**6, store_dir=str(tmp_path / "store") if store else None)
+    for path in wav_paths + wav_paths:
+        expected = sf.read(path, dtype="float32", always_2d=True, start=100, stop=300)[0]
+        np.testing.assert_array_equal(cache.read(path, start=100, stop=300), expected)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 3, 0)
+    assert stats["size_bytes"] == 3 * 1000 * 2 * 4
+    if store:
+        assert len(list((tmp_path / "store").glob("*.npy"))) == 3
+
+
+def test_track_cache_eviction(wav_paths):
+    # Room for two files only.
+    cache = TrackCache(2 * 1000 * 2 * 4)
+    for path in wav_paths:
+        cache.read(path)
+    assert cache.stats()["evictions"] == 1
+    cache.read(wav_paths[0])  # Evicted first, decoded again.
+    cache.read(wav_paths[2])
+    assert cache.misses == 4 and cache.hits == 1
+    assert cache.size <= cache.max_bytes
+
+
+def test_track_cache_too_large(wav_paths):
+    cache = TrackCache(100)
+    cache.read(wav_paths[0])
+    cache.read(wav_paths[0])
+    assert cache.stats()["n_tracks"] == 0
+    assert cache.misses == 2
+
+
+def test_musdb_track_cache(tmp_path):
+    sources = ["vocals", "bass"]
+    for track in ["a", "b"]:
+        (tmp_path / "train" / track).mkdir(parents=True)
+        for src in sources:
+            wav = np.random.randn(44100, 2).astype("float32")
+            sf.write(tmp_path / "train" / track / f"{src}.wav", wav, 44100, subtype="FLOAT")
+    kwargs = dict(root=tmp_path, sources=sources, segment=0.5, samples_per_track=4)
+    dataset = MUSDB18Dataset(**kwargs)
+    cached = MUSDB18Dataset(**kwargs, cache_size=10**7)
+    for idx in range(len(dataset)):
+        mix, _ = dataset[idx]
+        cached_mix, _ = cached[idx]
+        np.testing.assert_allclose(mix.numpy(), cached_mix.numpy(), rtol=1e-6)
+    assert cached.cache.stats()["misses"] == 4
+    assert cached.cache.stats()["hits"] == 12
@@ -10,7 +10,15 @@ from asteroid.dsp.beamforming import (
     SDWMWFBeamformer,
     GEVBeamformer,
     GEVDBeamformer,
+    BeamformerPipeline,
+    SCMDecomposition,
+    OnlineSCM,
+    OnlineMVDRBeamformer,
+    OnlineGEVBeamformer,
+    compute_scm,
+    sherman_morrison_update,
     stable_cholesky,
+    stable_solve,
 )
 
 
@@ -97,3 +105,181 @@ def test_stable_cholesky():
     a = torch.randn(3, 3)
     a = torch.mm(a, a.t())  # make symmetric positive-definite
     stable_cholesky(a)
+
+
+def _random_scms(batch_size, n_mics, n_frames=16000):
+    speech = torch.randn(batch_size, n_mics, n_frames)
+    noise = torch.randn(batch_size, n_mics, n_frames)
+    mix_stft = stft(speech + noise)
+    scm = SCM()
+    return mix_stft, scm(stft(speech)), scm(stft(noise))
+
+
+@pytest.mark.parametrize("n_mics", [2, 4])
+@pytest.mark.parametrize("batch_size", [1, 3])
+@pytest.mark.parametrize("ref_mic", [0, None])
+def test_pipeline_matches_beamformers(n_mics, batch_size, ref_mic):
+    mix, sigma_ss, sigma_nn = _random_scms(batch_size, n_mics)
+    pipeline = BeamformerPipeline(
+        beamformers=("souden_mvdr", "rtf_mvdr", "sdw_mwf", "gevd", "gev"), mu=2.0, rank=1
+    )
+    outputs = pipeline(mix, target_scm=sigma_ss, noise_scm=sigma_nn, ref_mic=ref_mic)
+    kwargs = dict(mix=mix, target_scm=sigma_ss, noise_scm=sigma_nn)
+    expected = {
+        "souden_mvdr": SoudenMVDRBeamformer()(**kwargs, ref_mic=ref_mic),
+        "rtf_mvdr": RTFMVDRBeamformer()(**kwargs),
+        "sdw_mwf": SDWMWFBeamformer(mu=2.0)(**kwargs, ref_mic=ref_mic),
+        "gevd": GEVDBeamformer(mu=2.0, rank=1)(**kwargs),
+    }
+    for name, ref in expected.items():
+        torch.testing.assert_close(outputs[name], ref, rtol=1e-3, atol=1e-3 * ref.abs().max())
+    # GEV vectors are defined up to a phase: compare the vectors themselves.
+    gev_ref = GEVBeamformer.compute_beamforming_vector(sigma_ss, sigma_nn)
+    gev = SCMDecomposition(sigma_ss, sigma_nn).gev_vector()
+    inner = torch.einsum("bmf,bmf->bf", gev.conj(), gev_ref).abs()
+    torch.testing.assert_close(inner, torch.ones_like(inner), rtol=1e-3, atol=1e-3)
+
+
+def test_pipeline_from_masks():
+    mix, _, _ = _random_scms(2, 3)
+    mask = torch.rand(2, *mix.shape[-2:])
+    outputs = BeamformerPipeline()(mix, target_mask=mask, noise_mask=1 - mask)
+    for out in outputs.values():
+        assert out.shape == (2, *mix.shape[-2:])
+
+
+def test_pipeline_unknown_beamformer():
+    with pytest.raises(ValueError):
+        BeamformerPipeline(beamformers=("mvdr_typo",))
+
+
+def test_stable_solve_conditions_singular_items_only():
+    a = torch.randn(3, 4, 4, dtype=torch.complex128)
+    a = a @ a.mH
+    a[1] = 0.0
+    a[1, 0, 0] = 1.0  # Rank deficient
+    b = torch.randn(3, 4, 2, dtype=torch.complex128)
+    sol = stable_solve(b, a)
+    assert torch.isfinite(sol).all()
+    # Well-conditioned items are solved exactly, without loading.
+    torch.testing.assert_close(sol[[0, 2]], torch.linalg.solve(a[[0, 2]], b[[0, 2]]))
+
+
+def test_stable_cholesky_batched():
+    a = torch.randn(3, 4, 4, dtype=torch.float64)
+    a = a @ a.transpose(-1, -2)
+    a[2] = 0.0
+    a[2, 0, 0] = 1.0
+    chol = stable_cholesky(a)
+    assert torch.isfinite(chol).all()
+    torch.testing.assert_close(chol[:2], torch.linalg.cholesky(a[:2]))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 50])
+def test_online_scm_matches_offline(chunk_size):
+    x = torch.randn(2, 3, 5, 50, dtype=torch.complex128)
+    mask = torch.rand(2, 5, 50, dtype=torch.float64)
+    online_scm = OnlineSCM(forgetting_factor=1.0)
+    state = None
+    for start in range(0, x.shape[-1], chunk_size):
+        block = slice(start, start + chunk_size)
+        scm, state = online_scm(x[..., block], mask=mask[..., block], state=state)
+    torch.testing.assert_close(scm, compute_scm(x, mask=mask))
+
+
+def test_online_scm_forgetting():
+    x = torch.randn(1, 2, 3, 10, dtype=torch.complex128)
+    alpha = 0.9
+    # One chunk vs frame by frame (rank-1 updates).
+    scm_chunk, _ = OnlineSCM(forgetting_factor=alpha)(x)
+    state = None
+    for t in range(x.shape[-1]):
+        scm_frame, state = OnlineSCM(forgetting_factor=alpha)(x[..., t : t + 1], state=state)
+    torch.testing.assert_close(scm_chunk, scm_frame)
+    with pytest.raises(ValueError):
+        OnlineSCM(forgetting_factor=0.0)
+
+
+def test_sherman_morrison_update():
+    a = torch.randn(4, 3, 3, dtype=torch.complex128)
+    a = a @ a.mH + torch.eye(3)
+    x = torch.randn(4, 3, dtype=torch.complex128)
+    w = torch.rand(4, dtype=torch.float64)
+    updated = sherman_morrison_update(torch.linalg.inv(a), x, w, forgetting_factor=0.8)
+    expected = torch.linalg.inv(0.8 * a + w[:, None, None] * x[..., None] @ x[:, None].conj())
+    torch.testing.assert_close(updated, expected)
+
+
+def _rank1_target_stft(batch_size=2, n_mics=3, n_freqs=6, n_frames=40):
+    steering = torch.randn(batch_size, n_mics, n_freqs, 1, dtype=torch.complex128)
+    target = steering * torch.randn(batch_size, 1, n_freqs, n_frames, dtype=torch.complex128)
+    noise = 0.3 * torch.randn(batch_size, n_mics, n_freqs, n_frames, dtype=torch.complex128)
+    # The target is active in half of the frames, the oracle masks mark them.
+    target_mask = (torch.rand(batch_size, 1, n_frames) > 0.5).expand(-1, n_freqs, -1).double()
+    return target_mask[:, None] * target + noise, target_mask, 1 - target_mask
+
+
+@pytest.mark.parametrize("update_every", [1, 8, 40])
+def test_online_mvdr_matches_offline(update_every):
+    mix, target_mask, noise_mask = _rank1_target_stft()
+    online = OnlineMVDRBeamformer(forgetting_factor=1.0, update_every=update_every)
+    output, state = online(mix, target_mask, noise_mask)
+    assert output.shape == (mix.shape[0], *mix.shape[-2:])
+    target_scm, noise_scm = compute_scm(mix, target_mask), compute_scm(mix, noise_mask)
+    offline = SoudenMVDRBeamformer()(mix, target_scm, noise_scm)
+    # Up to the initial diagonal loading.
+    tol = dict(rtol=1e-4, atol=1e-5)
+    if update_every >= mix.shape[-1]:
+        torch.testing.assert_close(output, offline, **tol)
+    # The last filter always matches the offline one.
+    torch.testing.assert_close(
+        online.apply_beamforming_vector(state["bf_vect"], mix)[..., -update_every:],
+        offline[..., -update_every:],
+        **tol,
+    )
+
+
+def test_online_mvdr_chunked_stream():
+    mix, target_mask, noise_mask = _rank1_target_stft()
+    online = OnlineMVDRBeamformer(forgetting_factor=0.95, update_every=4)
+    full, _ = online(mix, target_mask, noise_mask)
+    state, outputs = None, []
+    for start in range(0, mix.shape[-1], 8):
+        block = slice(start, start + 8)
+        out, state = online(mix[..., block], target_mask[..., block], noise_mask[..., block], state)
+        outputs.append(out)
+    torch.testing.assert_close(torch.cat(outputs, -1), full)
+
+
+def test_online_gev_matches_offline():
+    mix, target_mask, noise_mask = _rank1_target_stft()
+    online = OnlineGEVBeamformer(forgetting_factor=1.0, update_every=10)
+    output, state = online(mix, target_mask, noise_mask)
+    target_scm, noise_scm = compute_scm(mix, target_mask), compute_scm(mix, noise_mask)
+    offline = GEVBeamformer.compute_beamforming_vector(target_scm, noise_scm)
+    # Defined up to a phase.
+    inner = torch.einsum("bmf,bmf->bf", state["bf_vect"].conj(), offline).abs()
+    torch.testing.assert_close(inner, torch.ones_like(inner), rtol=1e-5, atol=1e-5)
+    assert output.shape == (mix.shape[0], *mix.shape[-2:])
+
+
+def test_online_gev_silent_start():
+    mix, target_mask, noise_mask = _rank1_target_stft(n_frames=100)
+    target_mask[..., :50] = 0
+    online = OnlineGEVBeamformer(forgetting_factor=1.0, update_every=50, n_power_iterations=20)
+    _, state = online(mix, target_mask, noise_mask)
+    target_scm, noise_scm = compute_scm(mix, target_mask), compute_scm(mix, noise_mask)
+    offline = GEVBeamformer.compute_beamforming_vector(target_scm, noise_scm)
+    # The filter recovers once the target becomes active.
+    inner = torch.einsum("bmf,bmf->bf", state["bf_vect"].conj(), offline).abs()
+    torch.testing.assert_close(inner, torch.ones_like(inner), rtol=1e-5, atol=1e-5)
+
+
+def test_online_noise_inverse_bounded_without_noise():
+    mix, target_mask, noise_mask = _rank1_target_stft(n_frames=200)
+    online = OnlineMVDRBeamformer(forgetting_factor=0.9, update_every=8, diag_loading=1e-2)
+    output, state = online(mix, target_mask, torch.zeros_like(noise_mask))
+    # Without noise frames, the noise SCM stays at the diagonal loading.
+    eye = torch.eye(mix.shape[1], dtype=mix.dtype).expand_as(state["noise_inv"])
+    torch.testing.assert_close(state["noise_inv"], eye / 1e-2)
+    assert torch.all(torch.isfinite(output))
@@ -2,7 +2,12 @@ import torch
 from torch.testing import assert_close
 import pytest
 
-from asteroid.dsp.overlap_add import LambdaOverlapAdd
+from asteroid.dsp.overlap_add import (
+    LambdaOverlapAdd,
+    DualPathProcessing,
+    strided_unfold,
+    overlap_add,
+)
 
 
 @pytest.mark.parametrize("length", [1390, 8372])
@@ -17,3 +22,35 @@ def test_overlap_add(length, batch_size, n_src, window, window_size, hop_size):
     oladd = LambdaOverlapAdd(nnet, n_src, window_size, hop_size, window)
     oladded = oladd(mix)
     assert_close(mix.repeat(1, n_src, 1), oladded)
+
+
+@pytest.mark.parametrize("length", [97, 200])
+@pytest.mark.parametrize("chunk_size, hop_size", [(20, 10), (20, 5), (21, 8), (10, 10), (9, 4)])
+@pytest.mark.parametrize("padding", [None, 3, 25])
+def test_strided_unfold_and_overlap_add(length, chunk_size, hop_size, padding):
+    x = torch.randn(2, 3, length, requires_grad=True)
+    pad = chunk_size if padding is None else padding
+    fold_kwargs = dict(kernel_size=(chunk_size, 1), padding=(pad, 0), stride=(hop_size, 1))
+    expected = torch.nn.functional.unfold(x.unsqueeze(-1), **fold_kwargs)
+    unfolded = strided_unfold(x, chunk_size, hop_size, padding=padding)
+    assert unfolded.shape == (2, 3, chunk_size, expected.shape[-1])
+    assert_close(unfolded, expected.reshape(unfolded.shape))
+
+    expected = torch.nn.functional.fold(expected, (length, 1), **fold_kwargs).reshape(2, 3, -1)
+    folded = overlap_add(unfolded, hop_size, length, padding=padding)
+    assert_close(folded, expected)
+    # Gradients flow back through the strided view.
+    grad = torch.autograd.grad(folded.sum(), x)[0]
+    assert_close(grad, torch.autograd.grad(expected.sum(), x)[0])
+
+
+def test_dual_path_processing():
+    x = torch.randn(2, 8, 317)
+    ola = DualPathProcessing(chunk_size=20, hop_size=10)
+    chunks = ola.unfold(x)
+    # Chunks are a strided view of the padded input, not a copy.
+    assert chunks._base is not None
+    module = torch.nn.Conv1d(8, 8, 1)
+    chunks = ola.inter_process(ola.intra_process(chunks, module), module)
+    assert chunks.shape == (2, 8, 20, 34)
+    assert_close(ola.fold(ola.unfold(x)), x)
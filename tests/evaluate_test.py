@@ -0,0 +1,125 @@
+import json
+import os
+
+import numpy as np
+import pytest
+import torch
+from torch import nn
+
+from asteroid.evaluate import (
+    evaluate,
+    load_results,
+    merge_results,
+    missing_indices,
+    shard_indices,
+)
+
+
+class _PointwiseSeparator(nn.Module):
+    def __init__(self, n_src=2):
+        super().__init__()
+        self.gains = nn.Parameter(torch.arange(1, n_src + 1, dtype=torch.float))
+
+    def forward(self, wav):
+        return wav[:, None] * self.gains[:, None]
+
+
+class _Dataset(torch.utils.data.Dataset):
+    def __init__(self, n_items=6, n_src=2):
+        rng = np.random.default_rng(0)
+        self.sources = [
+            rng.standard_normal((n_src, 800 + 100 * i)).astype("float32") for i in range(n_items)
+        ]
+
+    def __len__(self):
+        return len(self.sources)
+
+    def __getitem__(self, idx):
+        sources = torch.from_numpy(self.sources[idx])
+        return sources.sum(0), sources
+
+
+@pytest.mark.parametrize("n_items", [5, 6, 7])
+@pytest.mark.parametrize("n_shards", [1, 3])
+def test_shard_indices(n_items, n_shards):
+    indices = [idx for i in range(n_shards) for idx in shard_indices(n_items, i, n_shards)]
+    assert indices == list(range(n_items))
+
+
+def test_shard_indices_raises():
+    with pytest.raises(ValueError):
+        shard_indices(10, 2, 2)
+
+
+@pytest.mark.parametrize("batch_size", [1, 4])
+@pytest.mark.parametrize("n_workers", [0, 2])
+def test_evaluate(tmp_path, batch_size, n_workers):
+    dataset = _Dataset()
+    calls = []
+
+    def utt_callback(idx, item, est_sources):
+        calls.append(idx)
+        assert est_sources.shape == tuple(item[1].shape)
+        return dict(length=est_sources.shape[-1])
+
+    evaluate(
+        _PointwiseSeparator(),
+        dataset,
+        str(tmp_path),
+        sample_rate=8000,
+        metrics_list=["si_sdr"],
+        shard_id=0,
+        n_shards=1,
+        batch_size=batch_size,
+        n_workers=n_workers,
+        utt_callback=utt_callback,
+    )
+    assert sorted(calls) == list(range(len(dataset)))
+    final_results = merge_results(str(tmp_path), metrics_list=["si_sdr"], n_items=len(dataset))
+    assert set(final_results) == {"si_sdr", "si_sdr_imp"}
+    df = load_results(str(tmp_path))
+    assert list(df.index) == list(range(len(dataset)))
+    assert list(df["length"]) == [800 + 100 * i for i in range(len(dataset))]
+    with open(tmp_path / "final_metrics.json") as f:
+        assert json.load(f) == pytest.approx(final_results)
+    assert os.path.isfile(tmp_path / "all_metrics.csv")
+
+
+def test_evaluate_shards(tmp_path):
+    dataset = _Dataset()
+    model = _PointwiseSeparator()
+    kwargs = dict(sample_rate=8000, metrics_list=["si_sdr"])
+    evaluate(model, dataset, str(tmp_path / "full"), shard_id=0, n_shards=1, **kwargs)
+    for shard_id in range(3):
+        evaluate(model, dataset, str(tmp_path / "sharded"), shard_id=shard_id, n_shards=3, **kwargs)
+        if shard_id < 2:
+            with pytest.raises(RuntimeError):
+                merge_results(str(tmp_path / "sharded"), ["si_sdr"], n_items=len(dataset))
+    full = merge_results(str(tmp_path / "full"), ["si_sdr"], n_items=len(dataset))
+    sharded = merge_results(str(tmp_path / "sharded"), ["si_sdr"], n_items=len(dataset))
+    assert full == pytest.approx(sharded)
+
+
+def test_evaluate_resume(tmp_path):
+    dataset = _Dataset()
+    calls = []
+    kwargs = dict(
+        sample_rate=8000,
+        metrics_list=["si_sdr"],
+        shard_id=0,
+        n_shards=1,
+        utt_callback=lambda idx, item, est: calls.append(idx),
+    )
+    path = evaluate(_PointwiseSeparator(), dataset, str(tmp_path), **kwargs)
+    # Simulate a job killed while writing the fourth result.
+    with open(path) as f:
+        lines = f.readlines()
+    with open(path, "w") as f:
+        f.writelines(lines[:3] + [lines[3][:10]])
+    assert missing_indices(str(tmp_path), len(dataset)) == [3, 4, 5]
+    calls.clear()
+    evaluate(_PointwiseSeparator(), dataset, str(tmp_path), **kwargs)
+    assert calls == [3, 4, 5]
+    assert missing_indices(str(tmp_path), len(dataset)) == []
+    with open(path) as f:
+        assert [json.loads(line)["idx"] for line in f] == list(range(len(dataset)))
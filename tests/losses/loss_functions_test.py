@@ -1,9 +1,11 @@
+import os
 import pytest
 import torch
 from torch.testing import assert_close
 import warnings
 
 from asteroid_filterbanks import STFTFB, Encoder, transforms
+from asteroid import losses
 from asteroid.losses import PITLossWrapper
 from asteroid.losses import sdr, mse
 from asteroid.losses import deep_clustering_loss, SingleSrcPMSQE
@@ -154,6 +156,60 @@ def test_pmsqe(sample_rate):
     assert_close(loss_value, tr_loss_value)
 
 
+@pytest.mark.parametrize("sample_rate", [8000, 16000])
+def test_pmsqe_bark_bands(sample_rate):
+    from scipy.io import loadmat
+
+    rate = f"{sample_rate // 1000}k"
+    mat_path = os.path.join(os.path.dirname(losses.__file__), f"bark_matrix_{rate}.mat")
+    bark_matrix = torch.from_numpy(loadmat(mat_path)[f"Bark_matrix_{rate}"].astype("float32"))
+    loss_func = SingleSrcPMSQE(sample_rate=sample_rate)
+    assert_close(loss_func.bark_matrix, bark_matrix, rtol=0, atol=0)
+    # Banded projection against the dense Bark matrix.
+    spectra = torch.rand(2, 10, bark_matrix.shape[0]) * 1e7
+    expected = loss_func.Sp * spectra @ bark_matrix
+    assert_close(loss_func.bark_computation(spectra), expected, rtol=1e-5, atol=1e-5)
+    # Gradients of the banded projection, checked numerically and against the dense one.
+    loss_func.double()
+    spectra = torch.rand(2, 3, bark_matrix.shape[0], dtype=torch.double, requires_grad=True)
+    assert torch.autograd.gradcheck(loss_func.bark_computation, (spectra,))
+    grad_out = torch.rand(2, 3, loss_func.nbark, dtype=torch.double)
+    (grad,) = torch.autograd.grad(loss_func.bark_computation(spectra), spectra, grad_out)
+    dense = loss_func.Sp * spectra @ loss_func.bark_matrix
+    (dense_grad,) = torch.autograd.grad(dense, spectra, grad_out)
+    assert_close(grad, dense_grad)
+
+
+@pytest.mark.parametrize("sample_rate", [8000, 16000])
+def test_pmsqe_fast_path(sample_rate):
+    n_bins = 257 if sample_rate == 16000 else 129
+    ref, est = torch.rand(3, 20, n_bins), torch.rand(3, 20, n_bins, requires_grad=True)
+    loss_func = SingleSrcPMSQE(sample_rate=sample_rate)
+    loss_value = loss_func(est, ref)
+    # No pad_mask is the same as a mask of ones.
+    assert_close(loss_value, loss_func(est, ref, pad_mask=torch.ones(3, 20, 1)))
+    loss_value.sum().backward()
+    assert torch.isfinite(est.grad).all()
+    # Same loss and gradient with the dense Bark projection.
+    grad = est.grad.clone()
+    est.grad = None
+    dense_loss_func = SingleSrcPMSQE(sample_rate=sample_rate, banded_bark=False)
+    dense_loss_value = dense_loss_func(est, ref)
+    dense_loss_value.sum().backward()
+    assert_close(loss_value, dense_loss_value, rtol=1e-4, atol=1e-5)
+    assert_close(grad, est.grad, rtol=1e-3, atol=1e-5)
+    # Constants are buffers, with the state dict of previous versions.
+    assert not list(loss_func.parameters())
+    assert set(loss_func.state_dict()) == {
+        "abs_thresh_power",
+        "modified_zwicker_power",
+        "width_of_band_bark",
+        "bark_matrix",
+        "mask_sll",
+    }
+    loss_func.load_state_dict(SingleSrcPMSQE(sample_rate=sample_rate).state_dict())
+
+
 @pytest.mark.parametrize("n_src", [2, 3])
 @pytest.mark.parametrize("sample_rate", [8000, 16000])
 def test_pmsqe_pit(n_src, sample_rate):
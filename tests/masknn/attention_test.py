@@ -0,0 +1,71 @@
+import pytest
+import torch
+from torch.testing import assert_close
+
+from asteroid.masknn.attention import (
+    DPTransformer,
+    ImprovedTransformedLayer,
+    chunked_attention,
+    local_attention_mask,
+)
+
+
+@pytest.mark.parametrize("attention", ["sdpa", "chunked"])
+@pytest.mark.parametrize("attention_window", [None, 3])
+def test_attention_backends(attention, attention_window):
+    torch.manual_seed(0)
+    # The reference is the nn.MultiheadAttention backend of the previous checkpoints.
+    layer = ImprovedTransformedLayer(
+        16, 4, 8, attention="mha", attention_window=attention_window
+    ).eval()
+    x = torch.randn(3, 16, 41)
+    expected = layer(x)
+    layer.attention = attention
+    layer.attention_chunk_size = 8
+    assert_close(layer(x), expected)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 32])
+def test_chunked_local_attention(chunk_size):
+    q, k, v = torch.randn(3, 2, 4, 29, 8).unbind(0)
+    mask = local_attention_mask(0, 29, 0, 29, window=4)
+    expected = torch.nn.functional.scaled_dot_product_attention(q, k, v, attn_mask=mask)
+    assert_close(chunked_attention(q, k, v, chunk_size, window=4), expected)
+    expected = torch.nn.functional.scaled_dot_product_attention(q, k, v)
+    assert_close(chunked_attention(q, k, v, chunk_size), expected)
+
+
+def test_attention_raises():
+    with pytest.raises(ValueError):
+        ImprovedTransformedLayer(16, 4, 8, attention="linear")
+
+
+@pytest.mark.parametrize("attention", ["sdpa", "chunked"])
+def test_dptransformer_backends_share_weights(attention):
+    torch.manual_seed(0)
+    reference = DPTransformer(
+        16, 2, n_heads=4, ff_hid=8, chunk_size=10, n_repeats=2, attention="mha"
+    ).eval()
+    x = torch.randn(2, 16, 203)
+    model = DPTransformer(
+        **dict(reference.get_config(), attention=attention, attention_chunk_size=4)
+    )
+    # State dicts of nn.MultiheadAttention checkpoints load in all the backends.
+    model.load_state_dict(reference.state_dict())
+    assert_close(model.eval()(x), reference(x))
+    config = dict(model.get_config(), inter_attention_window=2)
+    assert DPTransformer(**config).get_config() == config
+
+
+def test_dptransformer_checkpoint_blocks():
+    torch.manual_seed(0)
+    model = DPTransformer(16, 2, n_heads=4, ff_hid=8, chunk_size=10, n_repeats=3)
+    checkpointed = DPTransformer(**dict(model.get_config(), checkpoint_blocks=2))
+    checkpointed.load_state_dict(model.state_dict())
+    x = torch.randn(2, 16, 53)
+    out, ref = checkpointed(x), model(x)
+    assert_close(out, ref)
+    out.sum().backward()
+    ref.sum().backward()
+    for p, p_ref in zip(checkpointed.parameters(), model.parameters()):
+        assert_close(p.grad, p_ref.grad)
@@ -1,6 +1,6 @@
 import pytest
 import torch
-from asteroid.masknn import TDConvNet, TDConvNetpp
+from asteroid.masknn import TDConvNet, TDConvNetpp, SuDORMRF, SuDORMRFImproved
 
 
 @pytest.mark.parametrize("mask_act", ["relu", "softmax"])
@@ -51,3 +51,29 @@ def test_tdconvnetpp(mask_act, out_chan, skip_chan):
     _ = model.get_config()
     out_chan = out_chan if out_chan else in_chan
     assert out.shape == (batch, n_src, out_chan, n_frames)
+
+
+@pytest.mark.parametrize(
+    "masker_cls, kwargs",
+    [
+        (TDConvNet, dict(n_blocks=2, n_repeats=2, bn_chan=10, hid_chan=11, skip_chan=12)),
+        (TDConvNetpp, dict(n_blocks=2, n_repeats=2, bn_chan=10, hid_chan=11, skip_chan=12)),
+        (SuDORMRF, dict(bn_chan=10, num_blocks=3, upsampling_depth=2)),
+        (SuDORMRFImproved, dict(bn_chan=10, num_blocks=3, upsampling_depth=2)),
+    ],
+)
+def test_checkpoint_blocks(masker_cls, kwargs):
+    torch.manual_seed(0)
+    model = masker_cls(20, 2, **kwargs)
+    checkpointed = masker_cls(**dict(model.get_config(), checkpoint_blocks=2))
+    checkpointed.load_state_dict(model.state_dict())
+    inp = torch.randn(2, 20, 24)
+    out, ref = checkpointed(inp), model(inp)
+    torch.testing.assert_close(out, ref)
+    sum(o.sum() for o in (out if isinstance(out, tuple) else (out,))).backward()
+    sum(r.sum() for r in (ref if isinstance(ref, tuple) else (ref,))).backward()
+    for p, p_ref in zip(checkpointed.parameters(), model.parameters()):
+        if p_ref.grad is None:
+            assert p.grad is None
+        else:
+            torch.testing.assert_close(p.grad, p_ref.grad)
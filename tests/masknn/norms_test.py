@@ -45,3 +45,34 @@ def test_register():
 
     with pytest.raises(ValueError):
         norms.register_norm(norms.CumLN)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 50])
+def test_cumln_stream(chunk_size):
+    norm = norms.CumLN(16)
+    inp = torch.randn(3, 16, 100) * 3 + 1
+    offline = norm(inp)
+    state, chunks = None, []
+    for chunk in inp.split(chunk_size, dim=-1):
+        out, state = norm.forward_stream(chunk, state)
+        chunks.append(out)
+    assert torch.allclose(torch.cat(chunks, dim=-1), offline, atol=1e-5)
+    count, sum_, pow_sum = state
+    assert count.dtype == torch.float64 and (count == 16 * 100).all()
+    assert torch.allclose(sum_.squeeze().float(), inp.sum((1, 2)), atol=1e-3)
+
+
+@pytest.mark.parametrize(
+    "norm_cls, first_dim, last_dim",
+    [(norms.GlobLN, 1, None), (norms.ChanLN, 1, 2), (norms.FeatsGlobLN, 2, None)],
+)
+@pytest.mark.parametrize("shape", [(3, 16, 50), (2, 16, 10, 7)])
+def test_fused_norms(norm_cls, first_dim, last_dim, shape):
+    # Compare with the unfused statistics, gain and bias.
+    norm = norm_cls(16)
+    nn.init.normal_(norm.gamma)
+    nn.init.normal_(norm.beta)
+    inp = torch.randn(*shape) * 4 + 2
+    dims = list(range(len(shape)))[first_dim:last_dim]
+    expected = norm.apply_gain_and_bias(norms.z_norm(inp, dims))
+    assert torch.allclose(norm(inp), expected, atol=1e-5)
@@ -53,3 +53,17 @@ def test_res_birnn(rnn_type, dropout):
     inp = torch.randn(batch, n_frames, n_units)
     out = model(inp)
     assert out.shape == (batch, n_frames, 2 * n_units)
+
+
+def test_dprnn_checkpoint_blocks():
+    torch.manual_seed(0)
+    model = rec.DPRNN(20, 2, chunk_size=20, n_repeats=3, bn_chan=10, hid_size=11)
+    checkpointed = rec.DPRNN(**dict(model.get_config(), checkpoint_blocks=1))
+    checkpointed.load_state_dict(model.state_dict())
+    inp = torch.randn(2, 20, 78)
+    out, ref = checkpointed(inp), model(inp)
+    torch.testing.assert_close(out, ref)
+    out.sum().backward()
+    ref.sum().backward()
+    for p, p_ref in zip(checkpointed.parameters(), model.parameters()):
+        torch.testing.assert_close(p.grad, p_ref.grad)
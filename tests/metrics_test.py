@@ -1,7 +1,8 @@
 from unittest import mock
 import numpy as np
+import pandas as pd
 import pytest
-from asteroid.metrics import get_metrics, MetricTracker
+from asteroid.metrics import get_metrics, MetricTracker, RunningStats, WERTracker
 
 
 @pytest.mark.parametrize("fs", [8000, 16000])
@@ -85,3 +86,140 @@ def test_metric_tracker():
 
     # Check that kwargs are passed.
     assert "mix_path" in metric_tracker.as_df()
+
+
+@pytest.mark.parametrize("sketch_size", [10, 1000])
+def test_running_stats(sketch_size):
+    values = np.random.randn(200, 2)
+    values[3, 0] = np.nan
+    stats = RunningStats(sketch_size=sketch_size)
+    for value in values:
+        stats.update(value)
+    np.testing.assert_allclose(stats.mean, np.nanmean(values, axis=0))
+    np.testing.assert_allclose(stats.std, np.nanstd(values, axis=0, ddof=1))
+    np.testing.assert_allclose(stats.min, np.nanmin(values, axis=0))
+    np.testing.assert_allclose(stats.max, np.nanmax(values, axis=0))
+    np.testing.assert_array_equal(stats.count, [199, 200])
+    if sketch_size >= len(values):
+        np.testing.assert_allclose(stats.quantile(0.5), np.nanmedian(values, axis=0))
+    assert stats.quantile(0.5).shape == (2,)
+
+
+def test_running_stats_empty():
+    stats = RunningStats()
+    assert stats.count == 0
+    assert np.isnan(stats.mean) and np.isnan(stats.quantile(0.5))
+    stats.update(None)
+    assert stats.count == 0 and np.isnan(stats.mean)
+
+
+def test_running_stats_missing_and_varying_shapes():
+    stats = RunningStats()
+    stats.update(None)
+    stats.update(np.array([1.0, 2.0]))
+    stats.update(None)
+    with pytest.warns(UserWarning):
+        # E.g. another number of sources: ignored.
+        stats.update(np.array([5.0, 6.0, 7.0]))
+    stats.update(np.array([3.0, 4.0]))
+    np.testing.assert_array_equal(stats.count, [2, 2])
+    np.testing.assert_allclose(stats.mean, [2.0, 3.0])
+    np.testing.assert_allclose(stats.quantile(0.5), [2.0, 3.0])
+
+
+@pytest.mark.parametrize("spill", [False, True])
+@pytest.mark.parametrize("average", [True, False])
+def test_metric_tracker_columns(tmp_path, spill, average):
+    metric_tracker = MetricTracker(
+        sample_rate=8000,
+        metrics_list="si_sdr",
+        average=average,
+        spill_dir=str(tmp_path) if spill else None,
+        spill_size=30,
+    )
+    rows = []
+    for i in range(100):
+        shape = () if average else (2,)
+        row = dict(si_sdr=np.random.randn(*shape), input_si_sdr=np.random.randn(*shape))
+        if i == 7:
+            row["si_sdr"] = None
+        row["mix_path"] = f"path{i}"
+        if i > 50:
+            row["speaker"] = i
+        metric_tracker.add(row)
+        rows.append(row)
+    assert len(metric_tracker) == 100
+    assert len(list(tmp_path.iterdir())) == (3 if spill else 0)
+
+    df = metric_tracker.as_df()
+    assert list(df.columns) == ["si_sdr", "input_si_sdr", "mix_path", "speaker"]
+    assert list(df["mix_path"]) == [row["mix_path"] for row in rows]
+    assert df["speaker"].isna().sum() == 51
+    nan = np.full(np.shape(rows[0]["input_si_sdr"]), np.nan)
+    output = np.stack([nan if row["si_sdr"] is None else row["si_sdr"] for row in rows])
+    inputs = np.stack([row["input_si_sdr"] for row in rows])
+    np.testing.assert_allclose(np.stack(df["si_sdr"]), output)
+    np.testing.assert_allclose(np.stack(df["input_si_sdr"]), inputs)
+
+    final_results = metric_tracker.final_report()
+    np.testing.assert_allclose(final_results["si_sdr"], np.nanmean(output, axis=0))
+    np.testing.assert_allclose(final_results["si_sdr_imp"], np.nanmean(output - inputs, axis=0))
+    summary = metric_tracker.summary()
+    np.testing.assert_allclose(summary["input_si_sdr"]["q50"], np.median(inputs, axis=0))
+
+
+class StubRecognizer:
+    """Transcribes loud waveforms fully and quiet ones partially."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, wavs):
+        self.batches.append([len(wav) for wav in wavs])
+        return ["hello world" if np.abs(wav).max() > 0.5 else "hello" for wav in wavs]
+
+
+def test_wer_tracker_batch_and_cache(tmp_path):
+    pytest.importorskip("jiwer")
+    trans_df = pd.DataFrame(dict(utt_id=["a", "b"], text=["Hello world", "hello, world"]))
+    clean = np.random.uniform(0.6, 1, (2, 800))
+    estimate = clean * np.array([[1.0], [0.1]])
+    mix = clean.sum(0)
+    inputs = dict(mix=mix, clean=clean, estimate=estimate, sample_rate=16000, wav_id=["a", "b"])
+    for n_run in range(2):
+        recognizer = StubRecognizer()
+        wer_tracker = WERTracker(
+            "stub/model", trans_df, cache_dir=str(tmp_path), recognizer=recognizer, sample_rate=8000
+        )
+        wers = wer_tracker(**inputs)
+        # Only the estimates are decoded when the mixture and clean sources are cached.
+        assert recognizer.batches == [[400] * (5 if n_run == 0 else 2)]
+        assert {k: wers[k] for k in ["input_wer", "clean_wer", "wer"]} == dict(
+            input_wer=0.0, clean_wer=0.0, wer=0.25
+        )
+    assert [p.name for p in tmp_path.iterdir()] == ["stub_model.jsonl"]
+
+
+def test_wer_tracker_report_from_results():
+    pytest.importorskip("jiwer")
+    trans_df = pd.DataFrame(dict(utt_id=["a", "b"], text=["Hello world", "hello, world"]))
+    clean = np.random.uniform(0.6, 1, (2, 800))
+    rows = []
+    wer_tracker = WERTracker("stub/model", trans_df, recognizer=StubRecognizer(), sample_rate=8000)
+    for gain in [1.0, 0.1]:
+        inputs = dict(mix=clean.sum(0), clean=clean, estimate=gain * clean, wav_id=["a", "b"])
+        rows.append(wer_tracker(**inputs, sample_rate=16000))
+    # Same report from the rows of the results as from the tracker that saw all of them.
+    pd.testing.assert_frame_equal(
+        WERTracker.final_df_from_results(pd.DataFrame(rows)), wer_tracker.final_df()
+    )
+    with pytest.raises(ValueError):
+        WERTracker.final_df_from_results(pd.DataFrame(rows)[["input_wer", "clean_wer", "wer"]])
+
+
+def test_wer_tracker_resample():
+    from scipy.signal import resample_poly
+
+    wav = np.random.randn(2, 16000)
+    (resampled,) = WERTracker.resample(wav, fs_from=16000, fs_to=8000)
+    np.testing.assert_allclose(resampled, resample_poly(wav, 1, 2, axis=-1))
@@ -0,0 +1,122 @@
+import copy
+
+import pytest
+import torch
+from torch.testing import assert_close
+
+from asteroid import models
+from asteroid.models import (
+    ConvTasNet,
+    DCCRNet,
+    DCUNet,
+    DeMask,
+    DPRNNTasNet,
+    DPTNet,
+    FasNetTAC,
+    LSTMTasNet,
+    SuDORMRFImprovedNet,
+    SuDORMRFNet,
+)
+from asteroid.models.base_models import _dynamo_config
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(getattr(torch, "compiler", None), "is_compiling"),
+    reason="torch.compile audit requires torch.compiler.is_compiling",
+)
+
+TAS_ARGS = dict(n_src=2, n_filters=32, kernel_size=32, stride=16)
+SMALL_MODELS = {
+    "ConvTasNet": lambda: ConvTasNet(
+        n_repeats=2, n_blocks=2, bn_chan=8, hid_chan=4, skip_chan=4, **TAS_ARGS
+    ),
+    "DPRNNTasNet": lambda: DPRNNTasNet(
+        n_repeats=2, bn_chan=8, hid_size=4, chunk_size=3, **TAS_ARGS
+    ),
+    "DPTNet": lambda: DPTNet(n_heads=2, ff_hid=4, chunk_size=4, n_repeats=1, **TAS_ARGS),
+    "LSTMTasNet": lambda: LSTMTasNet(hid_size=4, n_layers=2, **TAS_ARGS),
+    "SuDORMRFNet": lambda: SuDORMRFNet(
+        2, bn_chan=10, num_blocks=2, upsampling_depth=2, n_filters=32, kernel_size=21, stride=10
+    ),
+    "SuDORMRFImprovedNet": lambda: SuDORMRFImprovedNet(
+        2, bn_chan=10, num_blocks=2, upsampling_depth=2, n_filters=32, kernel_size=21, stride=10
+    ),
+    "DeMask": lambda: DeMask(hidden_dims=[64], n_filters=32, kernel_size=32, stride=16),
+    "DCUNet": lambda: DCUNet("mini", fix_length_mode="pad"),
+    "DCCRNet": lambda: DCCRNet("mini", stft_n_filters=512, stft_kernel_size=256, stft_stride=100),
+    "FasNetTAC": lambda: FasNetTAC(2, enc_dim=4, feature_dim=8, window_ms=2, context_ms=3),
+}
+# XUMX is not functional with torch 2.x (see xumx_test.py).
+NOT_AUDITED = {"XUMX"}
+
+
+def model_inputs(name):
+    if name == "FasNetTAC":
+        return torch.rand(2, 3, 2000), torch.tensor([3, 2])
+    return (torch.rand(2, 4000),)
+
+
+def test_all_models_audited():
+    model_names = {
+        name
+        for name in models.__all__
+        if isinstance(getattr(models, name), type)
+        and issubclass(getattr(models, name), models.BaseModel)
+    }
+    assert model_names == set(SMALL_MODELS) | NOT_AUDITED
+
+
+@pytest.mark.parametrize("name", sorted(SMALL_MODELS))
+def test_no_graph_break(name):
+    import torch._dynamo
+
+    torch._dynamo.reset()
+    model = SMALL_MODELS[name]().eval()
+    inputs = model_inputs(name)
+    with _dynamo_config(), torch.no_grad():
+        explanation = torch._dynamo.explain(model)(*inputs)
+    assert explanation.graph_break_count == 0, explanation.break_reasons
+
+
+@pytest.mark.parametrize("name", sorted(SMALL_MODELS))
+def test_compile_fullgraph(name):
+    import torch._dynamo
+
+    torch._dynamo.reset()
+    model = SMALL_MODELS[name]().eval()
+    inputs = model_inputs(name)
+    with torch.no_grad():
+        expected = model(*inputs)
+        model.compile(fullgraph=True, backend="eager")
+        assert_close(model(*inputs), expected)
+        assert_close(model.forward(*inputs), expected)
+
+
+def test_compile_deepcopy_and_save(tmp_path):
+    import torch._dynamo
+
+    torch._dynamo.reset()
+    model = SMALL_MODELS["ConvTasNet"]().eval().compile(backend="eager")
+    inputs = model_inputs("ConvTasNet")
+    copied = copy.deepcopy(model)
+    with torch.no_grad():
+        for param in copied.parameters():
+            param.add_(torch.randn_like(param))
+        # The copy runs its own weights.
+        assert_close(copied(*inputs), type(copied).forward(copied, *inputs))
+        assert_close(model(*inputs), type(model).forward(model, *inputs))
+    torch.save(model, tmp_path / "model.pt")
+
+
+def test_compile_inductor():
+    import torch._dynamo
+
+    torch._dynamo.reset()
+    model = SMALL_MODELS["ConvTasNet"]().eval()
+    inputs = model_inputs("ConvTasNet")
+    with torch.inference_mode():
+        expected = model(*inputs)
+        model.compile(dynamic=True)
+        assert_close(model(*inputs), expected, rtol=1e-4, atol=1e-5)
+        # Another length, with the dynamic-shape graph.
+        longer = torch.rand(2, 5000)
+        assert_close(model(longer), type(model).forward(model, longer), rtol=1e-4, atol=1e-5)
@@ -2,6 +2,7 @@ import torch
 import pytest
 
 from asteroid.models.fasnet import FasNetTAC
+from asteroid.masknn.tac import valid_mics_mean
 
 
 @pytest.mark.parametrize("samples", [8372])
@@ -25,3 +26,25 @@ def test_fasnet(batch_size, n_mics, samples, n_src, use_tac, enc_dim, feature_di
         context_ms=context,
     )
     fasnet(mixture, valid_mics)
+
+
+@pytest.mark.parametrize("use_tac", [True, False])
+def test_fasnet_padded_mics(use_tac):
+    fasnet = FasNetTAC(2, use_tac=use_tac, enc_dim=4, feature_dim=8, window_ms=2, context_ms=3)
+    fasnet.eval()
+    mixture = torch.rand((3, 4, 2000))
+    valid_mics = torch.tensor([4, 2, 3])
+    # Padded channels are ignored: batched output equals per-example outputs.
+    batched = fasnet(mixture, valid_mics)
+    for b in range(mixture.shape[0]):
+        single = fasnet(mixture[b : b + 1, : valid_mics[b]])
+        torch.testing.assert_close(batched[b : b + 1], single, rtol=1e-4, atol=1e-5)
+
+
+def test_valid_mics_mean():
+    x = torch.randn(3, 4, 5)
+    valid_mics = torch.tensor([4, 1, 2])
+    mean = valid_mics_mean(x, valid_mics, dim=1)
+    expected = torch.stack([x[b, : valid_mics[b]].mean(0) for b in range(3)])
+    torch.testing.assert_close(mean, expected)
+    torch.testing.assert_close(valid_mics_mean(x, torch.zeros(3, dtype=torch.long)), x.mean(1))
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import torch
 import pytest
 from torch.testing import assert_close
@@ -56,7 +58,7 @@ def test_multichannel_model_loading():
     assert model.in_channels == new_model.in_channels
 
 
-def test_convtasnet_sep():
+def test_convtasnet_sep(tmp_path):
     nnet = ConvTasNet(
         n_src=2,
         n_repeats=2,
@@ -74,20 +76,22 @@ def test_convtasnet_sep():
     wav = np.random.randn(1, 800).astype("float32")
     out = nnet.separate(wav)
     assert isinstance(out, np.ndarray)
-    # Test str input
-    sf.write("tmp.wav", wav[0], 8000)
-    nnet.separate("tmp.wav")
+    # Test str input, the estimates are written next to the input file.
+    wav_path = str(tmp_path / "tmp.wav")
+    sf.write(wav_path, wav[0], 8000)
+    nnet.separate(wav_path)
+    assert (tmp_path / "tmp_est1.wav").is_file()
     # Warning when overwriting
     with pytest.warns(UserWarning):
-        nnet.separate("tmp.wav")
+        nnet.separate(wav_path)
 
     # Test with bad samplerate
-    sf.write("tmp.wav", wav[0], 16000)
+    sf.write(wav_path, wav[0], 16000)
     # Raises
     with pytest.raises(RuntimeError):
-        nnet.separate("tmp.wav", force_overwrite=True)
+        nnet.separate(wav_path, force_overwrite=True)
     # Resamples
-    nnet.separate("tmp.wav", force_overwrite=True, resample=True)
+    nnet.separate(wav_path, force_overwrite=True, resample=True)
 
 
 @pytest.mark.parametrize("fb", ["free", "stft", "analytic_free", "param_sinc"])
@@ -259,6 +263,13 @@ def _default_test_model(model, input_samples=801, test_input=None):
     reconstructed_model = model.__class__.from_pretrained(model_conf)
     assert_close(model(test_input), reconstructed_model(test_input))
 
+    # Load from a file (memory-mapped, zero-copy weights)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = os.path.join(tmp_dir, "model.pth")
+        torch.save(model_conf, model_path)
+        reconstructed_model = model.__class__.from_pretrained(model_path)
+        assert_close(model(test_input), reconstructed_model(test_input))
+
     # Load with and without SR
     sr = model_conf["model_args"].pop("sample_rate")
     reconstructed_model_nosr = model.__class__.from_pretrained(model_conf)
@@ -327,3 +338,89 @@ def test_separate():
     wav = torch.rand(1, 1, 8000)
     model = LambdaOverlapAdd(nnet, None, window_size=1000)
     out = separate(model, wav)
+
+
+class _PointwiseSeparator(torch.nn.Module):
+    sample_rate = 8000
+    in_channels = None
+
+    def forward_wav(self, wav):
+        return torch.cat([wav, -0.5 * wav], dim=1)
+
+
+@pytest.mark.parametrize("n_samples", [3000, 20011])
+def test_streaming_file_separate(tmp_path, n_samples):
+    model = _PointwiseSeparator()
+    wav = np.random.uniform(-0.5, 0.5, n_samples).astype("float32")
+    sf.write(tmp_path / "mix.wav", wav, 8000)
+    (tmp_path / "full").mkdir()
+    (tmp_path / "stream").mkdir()
+    separate(model, str(tmp_path / "mix.wav"), output_dir=str(tmp_path / "full"))
+    separate(
+        model,
+        str(tmp_path / "mix.wav"),
+        output_dir=str(tmp_path / "stream"),
+        block_duration=0.5,
+        block_overlap=0.1,
+    )
+    for src_idx in [1, 2]:
+        full, _ = sf.read(tmp_path / "full" / f"mix_est{src_idx}.wav")
+        stream, _ = sf.read(tmp_path / "stream" / f"mix_est{src_idx}.wav")
+        assert_close(stream, full, atol=1e-4, rtol=0)
+    assert sorted(os.listdir(tmp_path / "stream")) == ["mix_est1.wav", "mix_est2.wav"]
+
+    # With resampling, estimates only differ around block boundaries.
+    sf.write(tmp_path / "mix.wav", wav, 16000)
+    separate(model, str(tmp_path / "mix.wav"), force_overwrite=True, resample=True)
+    separate(
+        model,
+        str(tmp_path / "mix.wav"),
+        output_dir=str(tmp_path / "stream"),
+        force_overwrite=True,
+        resample=True,
+        block_duration=0.25,
+    )
+    full, _ = sf.read(tmp_path / "mix_est1.wav")
+    stream, _ = sf.read(tmp_path / "stream" / "mix_est1.wav")
+    assert stream.shape == wav.shape
+    length = min(len(stream), len(full))
+    assert np.corrcoef(stream[:length], full[:length])[0, 1] > 0.99
+
+
+def test_streaming_file_separate_raises(tmp_path):
+    sf.write(tmp_path / "mix.wav", np.zeros(1000, dtype="float32"), 8000)
+    with pytest.raises(ValueError):
+        separate(
+            _PointwiseSeparator(), str(tmp_path / "mix.wav"), block_duration=0.1, block_overlap=0.1
+        )
+
+
+def test_from_pretrained_safetensors(tmp_path):
+    pytest.importorskip("safetensors")
+    from asteroid.utils.hub_utils import save_safetensors_package
+
+    model = ConvTasNet(n_src=2, n_repeats=1, n_blocks=2, bn_chan=8, hid_chan=8, skip_chan=8)
+    save_safetensors_package(model.serialize(), str(tmp_path / "model.safetensors"))
+    reconstructed_model = ConvTasNet.from_pretrained(str(tmp_path / "model.safetensors"))
+    test_input = torch.randn(1, 801)
+    assert_close(model(test_input), reconstructed_model(test_input))
+    assert reconstructed_model.sample_rate == model.sample_rate
+
+
+def test_from_pretrained_casts_dtype(tmp_path):
+    model = ConvTasNet(n_src=2, n_repeats=1, n_blocks=2, bn_chan=8, hid_chan=8, skip_chan=8)
+    model_conf = model.serialize()
+    model_conf["state_dict"] = {k: v.double() for k, v in model_conf["state_dict"].items()}
+    torch.save(model_conf, tmp_path / "model.pth")
+    # Weights are copied (and cast) instead of being used directly.
+    reconstructed_model = ConvTasNet.from_pretrained(str(tmp_path / "model.pth"))
+    assert all(p.dtype == torch.float32 for p in reconstructed_model.parameters())
+
+
+def test_from_pretrained_old_torch_version_info(tmp_path):
+    model = ConvTasNet(n_src=2, n_repeats=1, n_blocks=2, bn_chan=8, hid_chan=8, skip_chan=8)
+    model_conf = model.serialize()
+    # Packages saved by previous versions store a TorchVersion object.
+    model_conf["infos"]["software_versions"]["torch_version"] = torch.__version__
+    torch.save(model_conf, tmp_path / "model.pth")
+    ConvTasNet.from_pretrained(str(tmp_path / "model.pth"))
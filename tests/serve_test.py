@@ -0,0 +1,175 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+import torch
+from torch import nn
+
+from asteroid import serve
+from asteroid.serve import DynamicBatcher, SeparationServer, request_separation
+
+
+class _PointwiseSeparator(nn.Module):
+    """Pointwise model (unaffected by padding) counting its batches."""
+
+    sample_rate = 8000
+
+    def __init__(self, n_src=2):
+        super().__init__()
+        self.gains = nn.Parameter(torch.arange(1, n_src + 1, dtype=torch.float))
+        self.batch_sizes = []
+
+    def forward_wav(self, wav):
+        self.batch_sizes.append(wav.shape[0])
+        return wav * self.gains[:, None]
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_dynamic_batcher():
+    model = _PointwiseSeparator()
+    wavs = [torch.randn(length) for length in [800, 900, 1000, 5000]]
+
+    async def main():
+        batcher = DynamicBatcher(model, max_batch_size=8, max_latency=0.1, bucket_size=2000)
+        batcher.start()
+        try:
+            return await asyncio.gather(*[batcher.separate(wav) for wav in wavs])
+        finally:
+            await batcher.close()
+
+    est_srcs = _run(main())
+    # Three short requests in one bucket, the long one alone.
+    assert sorted(model.batch_sizes) == [1, 3]
+    for wav, est in zip(wavs, est_srcs):
+        assert est.shape == (2, len(wav))
+        expected = wav * model.gains.detach()[:, None]
+        expected = expected * wav.abs().sum() / expected.abs().sum()
+        torch.testing.assert_close(est, expected)
+
+
+@pytest.mark.parametrize("max_batch_size", [1, 2])
+def test_dynamic_batcher_max_batch_size(max_batch_size):
+    model = _PointwiseSeparator()
+
+    async def main():
+        batcher = DynamicBatcher(model, max_batch_size=max_batch_size, max_latency=0.1)
+        batcher.start()
+        try:
+            await asyncio.gather(*[batcher.separate(torch.randn(100)) for _ in range(4)])
+        finally:
+            await batcher.close()
+        return batcher.metrics
+
+    metrics = _run(main())
+    assert max(model.batch_sizes) <= max_batch_size
+    assert metrics.batched_requests_total == 4
+
+
+def test_dynamic_batcher_error():
+    class _Failing(_PointwiseSeparator):
+        def forward_wav(self, wav):
+            raise RuntimeError("boom")
+
+    async def main():
+        batcher = DynamicBatcher(_Failing())
+        batcher.start()
+        try:
+            await batcher.separate(torch.randn(100))
+        finally:
+            await batcher.close()
+
+    with pytest.raises(RuntimeError, match="boom"):
+        _run(main())
+
+
+@pytest.mark.parametrize("fs", [8000, 16000])
+def test_separation_server(fs):
+    model = _PointwiseSeparator()
+    wavs = [np.random.randn(length).astype("float32") for length in [fs // 2, fs // 2, fs]]
+
+    async def main():
+        server = SeparationServer(model, max_batch_size=4, max_latency=0.1)
+        port = await server.start(port=0)
+        try:
+            est_srcs = await asyncio.gather(
+                *[request_separation("127.0.0.1", port, wav, fs) for wav in wavs]
+            )
+            metrics = await _get(port, "/metrics")
+            health = await _get(port, "/health")
+            with pytest.raises(RuntimeError, match="404"):
+                await _get(port, "/nothing")
+            with pytest.raises(RuntimeError, match="400"):
+                await _post_raw(port, b"not a wav file")
+        finally:
+            await server.close()
+        return est_srcs, metrics, health
+
+    est_srcs, metrics, health = _run(main())
+    assert health == "ok\n"
+    assert max(model.batch_sizes) > 1
+    for wav, est in zip(wavs, est_srcs):
+        assert est.shape == (2, len(wav))
+        if fs == model.sample_rate:
+            expected = wav * np.array([[1.0], [2.0]], dtype="float32")
+            expected *= np.abs(wav).sum() / np.abs(expected).sum()
+            np.testing.assert_allclose(est, expected, rtol=1e-4, atol=1e-5)
+    assert "asteroid_requests_total 3" in metrics
+    assert "asteroid_errors_total 0" in metrics
+    assert 'asteroid_request_latency_seconds_bucket{le="+Inf"} 3' in metrics
+
+
+def test_separation_server_decodes_concurrently(monkeypatch):
+    # Each decoding waits for the other one: it only succeeds if both requests are
+    # decoded at the same time, outside of the event loop.
+    barrier = threading.Barrier(2, timeout=5)
+    resample = serve._resample
+
+    def waiting_resample(*args, **kwargs):
+        barrier.wait()
+        return resample(*args, **kwargs)
+
+    monkeypatch.setattr(serve, "_resample", waiting_resample)
+    model = _PointwiseSeparator()
+    wavs = [np.random.randn(4000).astype("float32") for _ in range(2)]
+
+    async def main():
+        server = SeparationServer(model, max_batch_size=2, max_latency=1.0)
+        port = await server.start(port=0)
+        try:
+            return await asyncio.gather(
+                *[request_separation("127.0.0.1", port, wav, 8000) for wav in wavs]
+            )
+        finally:
+            await server.close()
+
+    est_srcs = _run(main())
+    # Both requests are separated in a single batch.
+    assert model.batch_sizes == [2]
+    assert [est.shape for est in est_srcs] == [(2, 4000)] * 2
+
+
+async def _get(port, path):
+    return await _request(port, f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+
+
+async def _post_raw(port, body):
+    head = f"POST /separate HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+    return await _request(port, head.encode() + body)
+
+
+async def _request(port, message):
+    from asteroid.serve import _read_body, _read_request_head
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(message)
+    await writer.drain()
+    _, status, headers = await _read_request_head(reader)
+    body = (await _read_body(reader, headers)).decode()
+    writer.close()
+    if status != "200":
+        raise RuntimeError(f"{status}: {body}")
+    return body
@@ -0,0 +1,169 @@
+import os
+import time
+import multiprocessing
+import pytest
+
+from asteroid.utils import hub_utils
+from asteroid.utils.cache_utils import (
+    ModelCache,
+    CacheIntegrityError,
+    file_sha256,
+    parse_size,
+)
+from asteroid.scripts import asteroid_cli
+
+
+def _make_remote(tmp_path, name="model.pth", size=1000):
+    remote_dir = tmp_path / "remote"
+    remote_dir.mkdir(exist_ok=True)
+    path = remote_dir / name
+    path.write_bytes(os.urandom(size))
+    return path.as_uri(), str(path)
+
+
+def _slow_copy_downloader(url, dst):
+    # Logs each download and writes slowly, to expose races between processes.
+    with open(os.path.join(os.path.dirname(url[len("file://") :]), "downloads.log"), "a") as f:
+        f.write(url + "\n")
+    with open(url[len("file://") :], "rb") as src, open(dst, "wb") as out:
+        for chunk in iter(lambda: src.read(100), b""):
+            out.write(chunk)
+            out.flush()
+            time.sleep(0.01)
+
+
+def _fetch_in_process(root, url, queue):
+    path = ModelCache(root, downloader=_slow_copy_downloader).fetch(url)
+    with open(path, "rb") as f:
+        queue.put((path, f.read()))
+
+
+def test_fetch_and_hit(tmp_path):
+    url, remote = _make_remote(tmp_path)
+    calls = []
+
+    def downloader(url, dst):
+        calls.append(url)
+        _slow_copy_downloader(url, dst)
+
+    cache = ModelCache(str(tmp_path / "cache"), downloader=downloader)
+    path1 = cache.fetch(url, sha256_digest=file_sha256(remote))
+    path2 = cache.fetch(url)
+    assert path1 == path2
+    assert len(calls) == 1
+    assert os.path.basename(path1) == file_sha256(remote)
+    assert open(path1, "rb").read() == open(remote, "rb").read()
+    assert [e["url"] for e in cache.entries()] == [url]
+
+
+def test_integrity_error(tmp_path):
+    url, _ = _make_remote(tmp_path)
+    cache = ModelCache(str(tmp_path / "cache"))
+    with pytest.raises(CacheIntegrityError):
+        cache.fetch(url, sha256_digest="0" * 64)
+    assert cache.lookup(url) is None
+    assert cache.total_size() == 0
+
+
+def test_truncated_blob_is_refetched(tmp_path):
+    url, _ = _make_remote(tmp_path)
+    cache = ModelCache(str(tmp_path / "cache"))
+    path = cache.fetch(url)
+    with open(path, "r+b") as f:
+        f.truncate(10)
+    assert cache.lookup(url) is None
+    assert os.path.getsize(cache.fetch(url)) == 1000
+
+
+def test_concurrent_fetch(tmp_path):
+    url, remote = _make_remote(tmp_path)
+    root = str(tmp_path / "cache")
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    procs = [ctx.Process(target=_fetch_in_process, args=(root, url, queue)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    results = [queue.get(timeout=60) for _ in procs]
+    for p in procs:
+        p.join()
+    # Downloaded once, and no process read a partially written file.
+    assert len(open(tmp_path / "remote" / "downloads.log").readlines()) == 1
+    assert len({path for path, _ in results}) == 1
+    assert all(content == open(remote, "rb").read() for _, content in results)
+
+
+def test_offline_mirror(tmp_path):
+    url, remote = _make_remote(tmp_path)
+    mirror = ModelCache(str(tmp_path / "mirror"))
+    mirror.add_file(url, remote)
+    cache = ModelCache(str(tmp_path / "cache"), mirror=mirror.root, offline=True)
+    path = cache.fetch(url)
+    assert path.startswith(mirror.root)
+    other_url, _ = _make_remote(tmp_path, name="other.pth")
+    with pytest.raises(FileNotFoundError):
+        cache.fetch(other_url)
+
+
+def test_lru_eviction(tmp_path):
+    cache = ModelCache(str(tmp_path / "cache"), max_size=2500)
+    urls = [_make_remote(tmp_path, name=f"model{i}.pth")[0] for i in range(3)]
+    cache.fetch(urls[0])
+    cache.fetch(urls[1])
+    # Access the first one, the second one is now the least recently used.
+    os.utime(cache.ref_path(urls[1]), (0, 0))
+    cache.fetch(urls[0])
+    cache.fetch(urls[2])
+    assert cache.lookup(urls[1]) is None
+    assert cache.lookup(urls[0]) is not None and cache.lookup(urls[2]) is not None
+    assert cache.total_size() <= 2500
+
+
+def test_prune(tmp_path):
+    cache = ModelCache(str(tmp_path / "cache"))
+    urls = [_make_remote(tmp_path, name=f"model{i}.pth")[0] for i in range(3)]
+    for url in urls:
+        cache.fetch(url)
+    os.utime(cache.ref_path(urls[0]), (0, 0))
+    assert [e["url"] for e in cache.prune(older_than=3600)] == [urls[0]]
+    assert len(cache.prune(max_size=1000)) == 1
+    cache.prune(clear=True)
+    assert cache.entries() == [] and cache.total_size() == 0
+
+
+def test_shared_blob(tmp_path):
+    url, remote = _make_remote(tmp_path)
+    cache = ModelCache(str(tmp_path / "cache"))
+    path1 = cache.fetch(url)
+    path2 = cache.add_file("https://mirror.org/same_model.pth", remote)
+    assert path1 == path2
+    cache.prune(older_than=-1.0)
+    assert cache.total_size() == 0
+
+
+def test_parse_size():
+    assert parse_size("2K") == 2048
+    assert parse_size("1.5G") == int(1.5 * 1024**3)
+    assert parse_size(12) == 12
+    with pytest.raises(ValueError):
+        parse_size("a lot")
+
+
+def test_cached_download_legacy_and_cli(tmp_path, monkeypatch, capsys):
+    url, remote = _make_remote(tmp_path)
+    monkeypatch.setattr(hub_utils, "CACHE_DIR", str(tmp_path / "cache"))
+    # File cached by a previous version of Asteroid.
+    legacy_dir = tmp_path / "cache" / hub_utils.url_to_filename(url)
+    legacy_dir.mkdir(parents=True)
+    (legacy_dir / "model.pth").write_bytes(open(remote, "rb").read())
+    path = hub_utils.cached_download(url)
+    assert os.path.basename(path) == file_sha256(remote)
+    assert hub_utils.cached_download(url) == path
+
+    asteroid_cli.cache(["list"])
+    assert url in capsys.readouterr().out
+    asteroid_cli.cache(["prune", "--all"])
+    assert hub_utils.get_model_cache().entries() == []
+
+    monkeypatch.setenv("ASTEROID_OFFLINE", "1")
+    with pytest.raises(FileNotFoundError):
+        hub_utils.cached_download(url)
@@ -88,3 +88,92 @@ def test_get_device():
     assert torch_utils.get_device(FakeModule()) == "dev1"
     with pytest.raises(TypeError):
         torch_utils.get_device(UnknownObject())
+    # Modules without parameters.
+    assert torch_utils.get_device(torch.nn.ReLU(), default="cpu") == torch.device("cpu")
+    with pytest.raises(TypeError):
+        torch_utils.get_device(torch.nn.ReLU())
+
+
+def test_skip_init():
+    torch.manual_seed(0)
+    with torch_utils.skip_init():
+        nn.Linear(10, 10)
+    after_skipped = torch.rand(1)
+    torch.manual_seed(0)
+    after_nothing = torch.rand(1)
+    # No random number was drawn, and nn.init is restored.
+    assert after_skipped == after_nothing
+    assert nn.init.kaiming_uniform_ is not torch_utils._no_init
+
+
+def test_load_state_dict_zero_copy():
+    model = nn.Sequential(nn.Linear(10, 10), nn.LSTM(10, 5))
+    state_dict = {
+        k: v.clone()
+        for k, v in nn.Sequential(nn.Linear(10, 10), nn.LSTM(10, 5)).state_dict().items()
+    }
+    torch_utils.load_state_dict_zero_copy(model, state_dict)
+    assert model[0].weight.data_ptr() == state_dict["0.weight"].data_ptr()
+    assert model[0].weight.requires_grad
+    model[1](torch.randn(3, 2, 10))
+    # Different dtype: copied.
+    model = nn.Linear(10, 10)
+    state_dict = {k: v.double() for k, v in nn.Linear(10, 10).state_dict().items()}
+    torch_utils.load_state_dict_zero_copy(model, state_dict)
+    assert model.weight.dtype == torch.float32
+    torch.testing.assert_close(model.weight, state_dict["weight"].float())
+
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_build_with_state_dict(zero_copy):
+    state_dict = {k: v.clone() for k, v in nn.Linear(10, 10).state_dict().items()}
+    state_dict["bias"] = state_dict["bias"].double()
+
+    def build():
+        # nn.init is not patched: other threads can initialize their models.
+        assert nn.init.kaiming_uniform_ is not torch_utils._no_init
+        return nn.Linear(10, 10)
+
+    torch.manual_seed(0)
+    model = torch_utils.build_with_state_dict(build, state_dict, zero_copy=zero_copy)
+    # No random number was drawn.
+    after_built = torch.rand(1)
+    torch.manual_seed(0)
+    assert after_built == torch.rand(1)
+    assert (model.weight.data_ptr() == state_dict["weight"].data_ptr()) == zero_copy
+    assert model.weight.requires_grad and not model.weight.is_meta
+    assert model.bias.dtype == torch.float32
+    torch.testing.assert_close(model.bias, state_dict["bias"].float())
+
+
+def test_build_with_state_dict_tensor_attributes():
+    class WithWindow(nn.Linear):
+        def __init__(self):
+            super().__init__(4, 4)
+            self.window = torch.hann_window(4)
+
+    state_dict = WithWindow().state_dict()
+    model = torch_utils.build_with_state_dict(WithWindow, state_dict)
+    # Built again on CPU, the window is not left on the meta device.
+    torch.testing.assert_close(model.window, torch.hann_window(4))
+    torch.testing.assert_close(model.weight, state_dict["weight"])
+
+
+@pytest.mark.parametrize("segment_size", [0, 1, 2, 5])
+def test_checkpointed_loop(segment_size):
+    layers = nn.ModuleList([nn.Linear(6, 6) for _ in range(5)])
+
+    def step(i, x, acc):
+        x = torch.tanh(layers[i](x))
+        return x, acc + x
+
+    inp = torch.randn(3, 6)
+    x, acc = torch_utils.checkpointed_loop(step, len(layers), (inp, 0.0), segment_size)
+    (x.sum() + acc.sum()).backward()
+    grads = [p.grad.clone() for p in layers.parameters()]
+    layers.zero_grad()
+    ref_x, ref_acc = torch_utils.checkpointed_loop(step, len(layers), (inp, 0.0))
+    (ref_x.sum() + ref_acc.sum()).backward()
+    torch.testing.assert_close(x, ref_x)
+    for grad, p in zip(grads, layers.parameters()):
+        torch.testing.assert_close(grad, p.grad)